@@ -6,9 +6,25 @@ Billiards REST API Backend
 """
 
 import json
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+# ملخص التوزيع وقوائم الأفضل المشتركة في جذر المشروع (اختيارية)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+try:
+    from quantile_sketch import QuantileSketch
+    QUANTILES_AVAILABLE = True
+except ImportError:
+    QUANTILES_AVAILABLE = False
+
+try:
+    from leaderboard import Leaderboard
+    LEADERBOARD_AVAILABLE = True
+except ImportError:
+    LEADERBOARD_AVAILABLE = False
+
 class Shot:
     """نموذج التسديقة"""
     def __init__(self, angle, power, distance, difficulty):
@@ -68,9 +84,15 @@ class BilliardsCalculator:
 class BilliardsAPI:
     """واجهة API البلياردو"""
     
-    def __init__(self):
+    def __init__(self, top_k: int = 5):
         self.calculator = BilliardsCalculator()
         self.shots = []
+        # مجاميع تُحدّث مع كل تسديقة بدلاً من المرور على القائمة عند كل طلب
+        self.success_sum = 0.0
+        self.success_sketch = QuantileSketch() if QUANTILES_AVAILABLE else None
+        self.leaderboard = (
+            Leaderboard(k=top_k, partitions=('difficulty',)) if LEADERBOARD_AVAILABLE else None
+        )
     
     def calculate_shot(self, angle: float, power: float, 
                       distance: float, difficulty: int) -> Dict:
@@ -82,6 +104,11 @@ class BilliardsAPI:
         shot = Shot(angle, power, distance, difficulty)
         shot.success_rate = success_rate
         self.shots.append(shot)
+        self.success_sum += success_rate
+        if self.leaderboard is not None:
+            self.leaderboard.add(shot, success_rate, shot, difficulty=difficulty)
+        if self.success_sketch is not None:
+            self.success_sketch.update(success_rate)
         
         return {
             'success': True,
@@ -100,14 +127,61 @@ class BilliardsAPI:
                 'worst_shot': None
             }
         
-        success_rates = [s.success_rate for s in self.shots]
-        
-        return {
+        stats = {
             'total_shots': len(self.shots),
-            'avg_success_rate': sum(success_rates) / len(success_rates),
-            'best_shot': max(self.shots, key=lambda s: s.success_rate).to_dict(),
-            'worst_shot': min(self.shots, key=lambda s: s.success_rate).to_dict()
+            'avg_success_rate': self.success_sum / len(self.shots),
+            'best_shot': self.get_leaderboard(1)[0],
+            'worst_shot': self.get_leaderboard(1, worst=True)[0]
         }
+        if self.success_sketch is not None:
+            stats['success_rate_distribution'] = self.success_sketch.summary()
+        return stats
+    
+    def delete_shot(self, shot_id: int) -> bool:
+        """
+        حذف تسديقة
+        
+        Returns:
+            True إذا وُجدت التسديقة وحُذفت
+        """
+        shot = next((s for s in self.shots if s.id == shot_id), None)
+        if shot is None:
+            return False
+        self.shots.remove(shot)
+        self.success_sum -= shot.success_rate
+        if not self.shots:
+            self.success_sum = 0.0  # إزالة انحراف الفاصلة العائمة
+        if self.leaderboard is not None:
+            self.leaderboard.remove(shot, difficulty=shot.difficulty)
+        # الملخص لا يدعم الحذف؛ يُعاد بناؤه عند الحاجة فقط
+        if self.success_sketch is not None:
+            self.success_sketch = QuantileSketch()
+            self.success_sketch.extend(s.success_rate for s in self.shots)
+        return True
+    
+    def get_leaderboard(self, k: Optional[int] = None, difficulty: Optional[int] = None,
+                        worst: bool = False) -> List[Dict]:
+        """
+        أفضل (أو أسوأ) k تسديقات بدون المرور على كل التسديقات
+        
+        Args:
+            k: عدد التسديقات (افتراضياً top_k)
+            difficulty: تصفية حسب الصعوبة
+            worst: True لأسوأ التسديقات
+        
+        Returns:
+            قائمة قواميس التسديقات من الأفضل (أو الأسوأ)
+        """
+        if self.leaderboard is None:
+            shots = [s for s in self.shots if difficulty is None or s.difficulty == difficulty]
+            ranked = sorted(shots, key=lambda s: s.success_rate, reverse=not worst)
+            return [s.to_dict() for s in ranked[:k or 5]]
+        if self.leaderboard.stale:
+            self.leaderboard.rebuild(
+                (s, s.success_rate, s, {'difficulty': s.difficulty}) for s in self.shots
+            )
+        select = self.leaderboard.worst if worst else self.leaderboard.best
+        return [shot.to_dict() for _, _, shot in select(k, difficulty=difficulty)]
     
     def _get_recommendation(self, success_rate: float) -> str:
         """توصيات بناءً على معدل النجاح"""
@@ -25,6 +25,8 @@ from pathlib import Path
 from collections import defaultdict
 import math
 
+from rolling_analytics import DOWN, FLAT, UP, RollingAnalytics
+
 # ==================== ثوابت التطبيق ====================
 
 # الألوان
@@ -177,31 +179,107 @@ class AdvancedCalculator:
         if len(shots) < 3:
             return {'trend': 'محدود', 'improvement': 0}
         
-        recent = shots[-10:] if len(shots) > 10 else shots
-        success_rates = [s.success for s in recent if s.success is not None]
-        
-        if not success_rates:
+        trend = _recent_trend(shots, lambda s: s.success_rate)
+        if trend is None:
             return {'trend': 'محدود', 'improvement': 0}
         
-        avg_recent = sum(success_rates) / len(success_rates)
-        
-        if len(shots) > 10:
-            older = shots[-20:-10]
-            older_rates = [s.success for s in older if s.success is not None]
-            avg_older = sum(older_rates) / len(older_rates) if older_rates else 50
-        else:
-            avg_older = 50
-        
-        improvement = avg_recent - avg_older
-        
-        if improvement > 5:
-            trend = 'تحسن ملحوظ ⬆️'
-        elif improvement < -5:
-            trend = 'تراجع ملحوظ ⬇️'
-        else:
-            trend = 'مستقر ➡️'
-        
-        return {'trend': trend, 'improvement': improvement}
+        labels = {UP: 'تحسن ملحوظ ⬆️', DOWN: 'تراجع ملحوظ ⬇️', FLAT: 'مستقر ➡️'}
+        return {'trend': labels[trend['direction']], 'improvement': trend['improvement']}
+
+
+def _recent_trend(shots, value):
+    """اتجاه آخر 10 تسديدات مقابل الـ 10 قبلها (نافذتا الاتجاه تحتاجان آخر 20 فقط)"""
+    analytics = RollingAnalytics(windows=(10,), ewma_spans=())
+    analytics.extend(value(s) for s in shots[-20:])
+    return analytics.trend()
+
+
+class ShotSummary:
+    """
+    ملخص إحصائي تراكمي محفوظ بجانب ملف التسديدات
+
+    يُحدَّث مع كل تسديدة (العدد، مجموع النجاح، الأفضل والأسوأ ونوافذ
+    آخر 10 والاتجاه) فلا تُقرأ كل التسديدات عند عرض الإحصائيات.
+    يُعاد بناؤه إذا تغير حجم ملف التسديدات خارج التطبيق.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.reset()
+        self._load()
+
+    def reset(self):
+        self.total_shots = 0
+        self.with_success = 0
+        self.success_sum = 0.0
+        self.best_shot = None
+        self.worst_shot = None
+        # القيم الصفرية تُستبعد من آخر 10 والاتجاه مثل None
+        self.analytics = RollingAnalytics(windows=(10,), ewma_spans=())
+        self.source_size = 0
+
+    def _load(self):
+        """تحميل الملخص المحفوظ إن وجد"""
+        try:
+            if not self.path.exists():
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                return
+            self.total_shots = data['total_shots']
+            self.with_success = data['with_success']
+            self.success_sum = data['success_sum']
+            self.best_shot = data['best_shot']
+            self.worst_shot = data['worst_shot']
+            self.analytics.load_dict(data['analytics'])
+            self.source_size = data['source_size']
+        except Exception:
+            self.reset()
+            self.source_size = -1  # فرض إعادة البناء
+
+    def save(self):
+        """حفظ الملخص على القرص"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.VERSION,
+                'total_shots': self.total_shots,
+                'with_success': self.with_success,
+                'success_sum': self.success_sum,
+                'best_shot': self.best_shot,
+                'worst_shot': self.worst_shot,
+                'analytics': self.analytics.to_dict(),
+                'source_size': self.source_size,
+            }, f, ensure_ascii=False)
+
+    def apply(self, shot_dict):
+        """تحديث المجاميع بتسديدة واحدة - O(1)"""
+        self.total_shots += 1
+        rate = shot_dict.get('success_rate')
+        self.analytics.push(rate or None)
+        if rate is None:
+            return
+        self.with_success += 1
+        self.success_sum += rate
+        # أول تسديدة بأعلى/أقل قيمة، مثل max و min على القائمة
+        if self.best_shot is None or rate > (self.best_shot['success_rate'] or 0):
+            self.best_shot = shot_dict
+        if self.worst_shot is None or rate < (self.worst_shot['success_rate'] or 0):
+            self.worst_shot = shot_dict
+
+    def is_stale(self, source_size):
+        """هل الملخص غير متطابق مع ملف التسديدات؟"""
+        return self.source_size != source_size
+
+    def rebuild(self, shot_dicts, source_size):
+        """إعادة بناء الملخص من جميع التسديدات (مرة واحدة عند عدم التطابق)"""
+        self.reset()
+        for shot_dict in shot_dicts:
+            self.apply(shot_dict)
+        self.source_size = source_size
+        self.save()
 
 class AdvancedDataManager:
     """مدير البيانات المتقدم"""
@@ -211,14 +289,30 @@ class AdvancedDataManager:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.shots_file = self.data_dir / 'shots.json'
         self.sessions_file = self.data_dir / 'sessions.json'
+        self.summary = ShotSummary(self.data_dir / 'stats_summary.json')
+    
+    def _shots_size(self):
+        return self.shots_file.stat().st_size if self.shots_file.exists() else 0
+    
+    def _current_summary(self):
+        """الملخص بعد إعادة بنائه إن لم يكن متطابقاً مع ملف التسديدات"""
+        size = self._shots_size()
+        if self.summary.is_stale(size):
+            self.summary.rebuild(self.load_shots(), size)
+        return self.summary
     
     def save_shot(self, shot):
         """حفظ التسديدة مع معالجة الأخطاء"""
         try:
+            summary = self._current_summary()
             shots = self.load_shots()
-            shots.append(shot.to_dict())
+            shot_dict = shot.to_dict()
+            shots.append(shot_dict)
             with open(self.shots_file, 'w', encoding='utf-8') as f:
                 json.dump(shots, f, ensure_ascii=False, indent=2)
+            summary.apply(shot_dict)
+            summary.source_size = self._shots_size()
+            summary.save()
             return True
         except Exception as e:
             console.print_message(f'خطأ في حفظ التسديدة: {e}', color=(1, 0, 0))
@@ -240,10 +334,10 @@ class AdvancedDataManager:
         return [Shot.from_dict(d) for d in data]
     
     def get_statistics(self):
-        """الحصول على الإحصائيات الشاملة"""
-        shots = self.get_shots_list()
+        """الحصول على الإحصائيات الشاملة (من الملخص التراكمي بدون قراءة التسديدات)"""
+        summary = self._current_summary()
         
-        if not shots:
+        if not summary.total_shots:
             return {
                 'total_shots': 0,
                 'successful_shots': 0,
@@ -254,30 +348,22 @@ class AdvancedDataManager:
                 'favorite_difficulty': 'لا توجد بيانات'
             }
         
-        total = len(shots)
-        with_success = [s for s in shots if s.success_rate is not None]
-        
-        if with_success:
-            success_rates = [s.success_rate for s in with_success]
-            avg_success = sum(success_rates) / len(success_rates)
-            best_shot = max(with_success, key=lambda s: s.success_rate or 0)
-            worst_shot = min(with_success, key=lambda s: s.success_rate or 0)
-        else:
-            avg_success = 0
-            best_shot = None
-            worst_shot = None
+        total = summary.total_shots
+        with_success = summary.with_success
+        avg_success = summary.success_sum / with_success if with_success else 0
+        best_shot = Shot.from_dict(summary.best_shot) if summary.best_shot else None
+        worst_shot = Shot.from_dict(summary.worst_shot) if summary.worst_shot else None
         
         # حساب آخر 10
-        last_10_rates = [s.success_rate for s in shots[-10:] if s.success_rate]
-        last_10_avg = sum(last_10_rates) / len(last_10_rates) if last_10_rates else 0
+        last_10_avg = summary.analytics.mean(10) or 0
         
         # تحليل الاتجاه
-        trend = self._analyze_trend(shots)
+        trend = self._analyze_trend(summary)
         
         return {
             'total_shots': total,
-            'successful_shots': len(with_success),
-            'success_rate': (len(with_success) / total * 100) if total > 0 else 0,
+            'successful_shots': with_success,
+            'success_rate': (with_success / total * 100) if total > 0 else 0,
             'avg_success': avg_success,
             'best_shot': best_shot,
             'worst_shot': worst_shot,
@@ -285,28 +371,16 @@ class AdvancedDataManager:
             'trend': trend
         }
     
-    def _analyze_trend(self, shots):
+    def _analyze_trend(self, summary):
         """تحليل الاتجاه في الأداء"""
-        if len(shots) < 5:
+        if summary.total_shots < 5:
             return 'محدود'
         
-        recent = shots[-10:] if len(shots) > 10 else shots
-        recent_rates = [s.success_rate for s in recent if s.success_rate]
-        
-        if not recent_rates:
+        trend = summary.analytics.trend()
+        if trend is None:
             return 'محدود'
         
-        avg_recent = sum(recent_rates) / len(recent_rates)
-        
-        if len(shots) > 10:
-            older = shots[-20:-10]
-            older_rates = [s.success_rate for s in older if s.success_rate]
-            avg_older = sum(older_rates) / len(older_rates) if older_rates else 50
-        else:
-            avg_older = 50
-        
-        improvement = avg_recent - avg_older
-        
+        improvement = trend['improvement']
         if improvement > 10:
             return 'تحسن كبير ⬆️'
         elif improvement > 0:
@@ -321,8 +395,10 @@ class AdvancedDataManager:
     def clear_data(self):
         """حذف جميع البيانات"""
         try:
-            if self.file_path.exists():
-                self.file_path.unlink()
+            for path in (self.shots_file, self.summary.path):
+                if path.exists():
+                    path.unlink()
+            self.summary.reset()
             console.print_message('تم مسح جميع البيانات بنجاح', color=(0, 1, 0))
             return True
         except Exception as e:
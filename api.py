@@ -7,10 +7,16 @@ API REST محسّن باستخدام FastAPI أو بديل HTTP بسيط
   python run_server.py   # إذا لم تكن FastAPI مثبتة
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import logging
+import shutil
 import sys
+import threading
+import uuid
 
 # إعداد السجل
 logging.basicConfig(level=logging.INFO)
@@ -24,9 +30,34 @@ sys.path.insert(0, str(Path(__file__).parent))
 # ==========================================
 
 try:
-    from backend.billiards.engine import BilliardsEngine
+    from backend.billiards.engine import BilliardsEngine, LEADERBOARD_SIZE
+    from backend.billiards.registry import DEFAULT_TENANT, EngineRegistry, validate_tenant
     from backend.billiards.calculator import ShotCalculator
-    from backend.models.shot import Shot, Difficulty
+    from backend.billiards.calculation_cache import CalculationCache
+    from backend.billiards.inverse import InverseSolver
+    from backend.billiards.simulator import MonteCarloSimulator, NoiseModel, ShotParameters
+    from backend.billiards.sweep import DONE, SweepGrid, SweepService
+    from backend.models.shot import Shot, Difficulty, ShotResult
+    from backend.services.admission import AdmissionASGIMiddleware, AsyncConcurrencyLimiter, RateLimiter
+    from backend.services.cache import SharedCache, create_backend
+    from backend.services.events import EventHub, STATISTICS_EVENT, sse_message
+    from backend.services.jobs import DONE as JOB_DONE, SHUTDOWN_REASON, JobCancelled, JobQueue
+    from backend.services.health import (
+        ProbeASGIMiddleware, ReadinessProbe, check_cache_backend, check_writable_dir,
+    )
+    from backend.services.profiler import RequestProfiler, profiled_route_class
+    from config import (
+        PROFILING_ENABLED, PROFILING_SAMPLE_RATE, PROFILING_HEADER,
+        PROFILING_TRACE_MEMORY, PROFILES_DIR,
+        CACHE_ENABLED, CACHE_TTL, CACHE_URL, READINESS_TTL, CALCULATION_CACHE_SIZE,
+        EVENTS_HISTORY, EVENTS_FRAME_INTERVAL, EVENTS_HEARTBEAT,
+        SIMULATION_WORKERS, SIMULATION_MAX_SAMPLES,
+        SWEEP_WORKERS, SWEEP_MAX_POINTS, SWEEPS_DIR,
+        JOBS_DB, JOBS_DIR, JOB_WORKERS, JOB_TIMEOUT,
+        TENANTS_DIR, ENGINE_CACHE_SIZE, ENGINE_MEMORY_BUDGET_MB,
+        RATE_LIMIT_RPS, RATE_LIMIT_BURST, RATE_LIMIT_KEY_HEADER,
+        MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT,
+    )
     logger.info("✅ تم استيراد مكتبات البلياردو بنجاح")
 except ImportError as e:
     logger.error(f"❌ خطأ في استيراد المكتبات: {e}")
@@ -38,9 +69,14 @@ except ImportError as e:
 # محاولة استيراد FastAPI
 FASTAPI_AVAILABLE = False
 try:
-    from fastapi import FastAPI, HTTPException, File, UploadFile, Query
+    from fastapi import (
+        APIRouter, Body, Depends, FastAPI, HTTPException, File, UploadFile, Query, Request,
+        WebSocket, WebSocketDisconnect,
+    )
+    from fastapi.concurrency import run_in_threadpool
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute
+    from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
     from typing import List, Optional
     
     FASTAPI_AVAILABLE = True
@@ -56,8 +92,48 @@ except ImportError:
 # ==========================================
 
 try:
-    engine = BilliardsEngine()
+    # محرك لكل مستأجر (لاعب أو طاولة)؛ المستأجر الافتراضي يستخدم مجلد المحرك الوحيد سابقاً
+    registry = EngineRegistry(
+        str(TENANTS_DIR),
+        max_engines=ENGINE_CACHE_SIZE,
+        memory_budget_mb=ENGINE_MEMORY_BUDGET_MB,
+        default_dir=str(Path.home() / ".billiards_pro"),
+    )
     calculator = ShotCalculator()
+    # الطلبات المتطابقة تتشارك الحساب؛ حفظ كل تسديقة يبقى لكل طلب
+    calculations = CalculationCache(calculator, max_entries=CALCULATION_CACHE_SIZE)
+    # الفهرس العكسي يُبنى مرة واحدة عند التشغيل
+    inverse = InverseSolver(calculator)
+    profiler = RequestProfiler(
+        enabled=PROFILING_ENABLED,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        header=PROFILING_HEADER,
+        output_dir=str(PROFILES_DIR),
+        trace_memory=PROFILING_TRACE_MEMORY,
+    )
+    # ذاكرة مؤقتة مشتركة بين العمال للإحصائيات والصفحات (تُبطل مع كل كتابة)
+    cache = SharedCache(create_backend(CACHE_URL), ttl=CACHE_TTL, enabled=CACHE_ENABLED)
+    readiness = ReadinessProbe(
+        {
+            "storage": check_writable_dir(registry.default_dir, create=True),
+            "tenants": check_writable_dir(registry.base_dir),
+            "cache": check_cache_backend(cache.backend),
+            "jobs": check_writable_dir(JOBS_DIR),
+        },
+        ttl=READINESS_TTL,
+    )
+    simulator = MonteCarloSimulator(workers=SIMULATION_WORKERS, max_samples=SIMULATION_MAX_SAMPLES)
+    sweeps = SweepService(str(SWEEPS_DIR), workers=SWEEP_WORKERS, max_points=SWEEP_MAX_POINTS)
+    # العمليات الثقيلة تُنفذ في الخلفية؛ المعالجات تُسجل بعد تعريفها أدناه
+    jobs = JobQueue(str(JOBS_DB), str(JOBS_DIR), workers=JOB_WORKERS, timeout=JOB_TIMEOUT)
+    # حدود القبول: لكل عميل ثم للخادم كله
+    rate_limiter = RateLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST)
+    concurrency = AsyncConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT)
+    # بث التغييرات للعملاء بدلاً من الاستطلاع الدوري
+    events = EventHub(history=EVENTS_HISTORY, frame_interval=EVENTS_FRAME_INTERVAL)
+    _statistics_lock = threading.Lock()
+    with registry.acquire(DEFAULT_TENANT) as engine:
+        events.publish_delta(STATISTICS_EVENT, engine.get_statistics())
     logger.info("✅ محرك البلياردو تم تهيئته بنجاح")
 except Exception as e:
     logger.error(f"❌ خطأ في تهيئة المحرك: {e}")
@@ -69,11 +145,22 @@ except Exception as e:
 # ==========================================
 
 if FASTAPI_AVAILABLE:
-    
+
+    @asynccontextmanager
+    async def lifespan(app):
+        """تشغيل طابور المهام مع الخادم، وعند الإغلاق إيقافه وحفظ المحركات المقيمة"""
+        jobs.start()
+        try:
+            yield
+        finally:
+            jobs.close()
+            registry.flush_all()
+
     app = FastAPI(
         title="5A Diamond System Pro API",
         description="API احترافي لنظام تحليل تسديدات البلياردو",
         version="2.0.0",
+        lifespan=lifespan,
     )
     
     # إضافة CORS
@@ -85,6 +172,60 @@ if FASTAPI_AVAILABLE:
         allow_headers=["Content-Type", "Authorization"],
     )
 
+    # تحليل الأداء - لا يُركَّب إلا عند التفعيل. الطبقة الوسيطة تختار العينة
+    # فقط، والتحليل داخل دالة المسار في الخيط الذي ينفذها (ProfiledRoute)
+    route_class = APIRoute
+    if profiler.enabled:
+        route_class = profiled_route_class(profiler)
+        app.router.route_class = route_class
+
+        @app.middleware("http")
+        async def profiling_middleware(request, call_next):
+            """اختيار عينة من الطلبات للتحليل باستخدام cProfile"""
+            with profiler.sampling(request.headers.get):
+                return await call_next(request)
+
+    # حد المعدل والتزامن قبل التحليل والمعالجات؛ الجاهزية والمقاييس مستثناة
+    # والبث الطويل (SSE) يخضع لحد المعدل فقط
+    app.add_middleware(
+        AdmissionASGIMiddleware,
+        rate_limiter=rate_limiter,
+        limiter=concurrency,
+        key_header=RATE_LIMIT_KEY_HEADER,
+        exempt=("/readyz", "/api/v1/metrics"),
+        unbounded=("/api/v1/events",),
+    )
+
+    # /livez يُجاب قبل كل الطبقات الوسيطة (تُضاف آخراً فتكون الخارجية)
+    app.add_middleware(ProbeASGIMiddleware)
+
+    # ==========================================
+    # توجيه المستأجرين
+    # ==========================================
+
+    # مسارات المحرك تُركّب مرتين: /api/v1/... للمستأجر الافتراضي
+    # و /api/v1/tenants/{tenant}/... لكل لاعب أو طاولة
+    router = APIRouter(route_class=route_class)
+
+
+    def tenant_name(request: Request) -> str:
+        """المستأجر من المسار (الافتراضي إذا لم يُحدد)"""
+        try:
+            return validate_tenant(request.path_params.get("tenant", DEFAULT_TENANT))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    def tenant_engine(tenant: str = Depends(tenant_name)):
+        """محرك المستأجر مثبتاً في السجل حتى نهاية الطلب"""
+        with registry.acquire(tenant) as engine:
+            yield engine
+
+
+    def _namespace(tenant: str) -> str:
+        """نطاق الذاكرة المؤقتة لبيانات المستأجر"""
+        return "shots" if tenant == DEFAULT_TENANT else f"shots:{tenant}"
+
     # ==========================================
     # المسارات الأساسية
     # ==========================================
@@ -98,45 +239,81 @@ if FASTAPI_AVAILABLE:
             "status": "جاهز للخدمة",
             "endpoints": {
                 "health": "/health",
+                "live": "/livez",
+                "ready": "/readyz",
                 "calculate": "/api/v1/calculate",
                 "statistics": "/api/v1/statistics",
                 "shots": "/api/v1/shots",
+                "similar": "/api/v1/shots/similar",
+                "leaderboard": "/api/v1/shots/leaderboard",
+                "simulate": "/api/v1/simulate",
+                "inverse": "/api/v1/inverse",
+                "sweeps": "/api/v1/sweeps",
+                "jobs": "/api/v1/jobs",
+                "events": "/api/v1/events",
+                "websocket": "/api/v1/ws",
+                "tenants": "/api/v1/tenants",
+                "metrics": "/api/v1/metrics",
             }
         }
 
 
     @app.get("/health")
-    async def health_check():
+    def health_check(engine: BilliardsEngine = Depends(tenant_engine)):
         """فحص صحة الخادم"""
         try:
+            snapshot = engine.snapshot()
             return {
                 "status": "healthy",
                 "uptime": "جاهز",
-                "total_shots": len(engine.shots),
-                "total_calculations": engine.statistics.total_calculations,
-                "success_rate": round(engine.statistics.success_rate, 2),
+                "total_shots": len(snapshot.shots),
+                "total_calculations": snapshot.statistics.total_calculations,
+                "success_rate": round(snapshot.statistics.success_rate, 2),
             }
         except Exception as e:
             logger.error(f"❌ خطأ في فحص الصحة: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
+    @app.get("/readyz")
+    def readiness_check():
+        """فحص الجاهزية: التخزين والذاكرة المؤقتة (نتيجة مخزنة لثوانٍ)"""
+        ready, body = readiness.check()
+        return Response(
+            content=body,
+            status_code=200 if ready else 503,
+            media_type="application/json",
+            headers={"Cache-Control": "no-store"},
+        )
+
+
     # ==========================================
     # حساب التسديقات
     # ==========================================
 
-    @app.post("/api/v1/calculate")
-    async def calculate_shot(
+    @router.post("/calculate")
+    def calculate_shot(
         rails: int = Query(..., ge=1, le=4, description="عدد الجدران"),
         cue_position: float = Query(..., ge=0, le=10, description="موضع العصا"),
         white_ball: float = Query(..., ge=0, le=10, description="موضع الكرة البيضاء"),
         target: float = Query(..., ge=0, le=10, description="موضع الهدف"),
         pocket: int = Query(..., ge=0, le=5, description="موضع الجيب"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+        tenant: str = Depends(tenant_name),
     ):
-        """حساب تسديقة جديدة مع جميع المعاملات"""
+        """
+        حساب تسديقة جديدة مع جميع المعاملات
+
+        الحساب مشترك بين الطلبات المتطابقة (CalculationCache)، وكل طلب
+        يحفظ تسديقته الخاصة في محرك المستأجر.
+        """
         try:
-            shot = engine.calculate_shot(rails, cue_position, white_ball, target, pocket)
-            summary = calculator.get_calculation_summary(shot)
+            shot, summary = calculations.calculate(rails, cue_position, white_ball, target, pocket)
+            engine.add_shot(shot)
+            cache.invalidate(_namespace(tenant))
+            _publish(engine, tenant, "shot_created", {
+                "shot_id": engine.shot_id(shot), "shot": shot.to_dict(),
+            })
             
             logger.info(f"✅ تم حساب تسديقة: {rails} جدران، صعوبة {shot.difficulty.value}")
             
@@ -153,47 +330,200 @@ if FASTAPI_AVAILABLE:
             raise HTTPException(status_code=500, detail=str(e))
 
 
+    @app.get("/api/v1/inverse")
+    def inverse_shot(
+        white_ball: float = Query(..., ge=0, le=10, description="موضع الكرة البيضاء"),
+        target: float = Query(..., ge=0, le=10, description="موضع الهدف"),
+        pocket: int = Query(..., ge=0, le=5, description="موضع الجيب"),
+        k: int = Query(3, ge=1, le=4, description="عدد الإعدادات"),
+        max_rails: int = Query(4, ge=1, le=4, description="أقصى عدد جدران"),
+        min_success_rate: float = Query(0, ge=0, le=100, description="أقل معدل نجاح مقبول"),
+    ):
+        """أفضل إعدادات (جدران، موضع عصا) للوصول للجيب من موضع الكرتين"""
+        try:
+            setups = inverse.best_setups(white_ball, target, pocket, k, max_rails, min_success_rate)
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في المدخلات: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "angle": inverse.required_angle(white_ball, target),
+            "count": len(setups),
+            "setups": [setup.to_dict() for setup in setups],
+        }
+
+
+    @app.get("/api/v1/simulate")
+    def simulate_shot(
+        angle: float = Query(..., ge=-90, le=90, description="الزاوية بالدرجات"),
+        power: float = Query(..., ge=0, le=100, description="القوة"),
+        distance: float = Query(..., ge=0, description="المسافة"),
+        difficulty: int = Query(2, ge=0, le=5, description="الصعوبة (0-5)"),
+        cue_type: str = Query("عادي", description="نوع العصا"),
+        cue_position: float = Query(5.0, ge=0, le=10, description="موضع العصا"),
+        samples: int = Query(100_000, ge=1, description="عدد العينات"),
+        seed: int = Query(0, ge=0, description="البذرة"),
+        confidence: float = Query(0.95, gt=0, lt=1, description="مستوى الثقة"),
+        noise: str = Query("normal", description="توزيع الضوضاء: normal أو uniform أو none"),
+        angle_noise: float = Query(2.0, ge=0),
+        power_noise: float = Query(5.0, ge=0),
+        distance_noise: float = Query(5.0, ge=0),
+        cue_noise: float = Query(0.3, ge=0),
+    ):
+        """محاكاة مونت كارلو لنتيجة تسديقة: معدل النجاح وفترة الثقة والتوزيع"""
+        params = ShotParameters(angle, power, distance, difficulty, cue_type, cue_position)
+        noise_model = NoiseModel(angle_noise, power_noise, distance_noise, cue_noise, noise)
+        try:
+            # النتيجة حتمية لنفس المعاملات والبذرة: تُخزن بين العمال بدون إبطال
+            body = cache.get_or_compute_json(
+                "simulations",
+                MonteCarloSimulator.cache_key(params, noise_model, samples, seed, confidence),
+                lambda: simulator.simulate(params, noise_model, samples, seed, confidence),
+            )
+            return Response(content=body, media_type="application/json")
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في معاملات المحاكاة: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    # ==========================================
+    # مسح شبكة المعاملات
+    # ==========================================
+
+    def _sweep_job(job_id: str):
+        job = sweeps.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="المسح غير موجود")
+        return job
+
+
+    @app.post("/api/v1/sweeps", status_code=202)
+    def submit_sweep(grid: dict = Body(..., description="قيم أو نطاقات لكل محور")):
+        """
+        بدء مسح لكل تركيبات الشبكة في الخلفية
+
+        مثال: {"rails": [1, 2], "white_ball": {"start": 0, "stop": 10, "step": 0.5}}
+        المسح المطابق لمسح سابق يعود منتهياً من الملف المحفوظ.
+        """
+        try:
+            job = sweeps.submit(SweepGrid.from_dict(grid))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ خطأ في شبكة المسح: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+        return job.to_dict()
+
+
+    @app.get("/api/v1/sweeps/{job_id}")
+    def get_sweep(job_id: str):
+        """حالة المسح وتقدمه"""
+        return _sweep_job(job_id).to_dict()
+
+
+    @app.get("/api/v1/sweeps/{job_id}/results")
+    def get_sweep_results(job_id: str):
+        """النتائج كأسطر JSON (تُبث أثناء التنفيذ حتى الانتهاء)"""
+        job = _sweep_job(job_id)
+        if job.finished and job.state != DONE:
+            raise HTTPException(status_code=409, detail=f"المسح {job.state}")
+        return StreamingResponse(sweeps.stream(job), media_type="application/x-ndjson")
+
+
+    @app.delete("/api/v1/sweeps/{job_id}")
+    def cancel_sweep(job_id: str):
+        """إلغاء مسح جارٍ"""
+        job = _sweep_job(job_id)
+        job.cancel()
+        return job.to_dict()
+
+
     # ==========================================
     # إدارة التسديقات
     # ==========================================
 
-    @app.get("/api/v1/shots")
-    async def get_shots(
+    def _shots_page(engine: BilliardsEngine, rails: Optional[int], difficulty: Optional[str],
+                    skip: int, limit: int) -> dict:
+        """حساب صفحة التسديقات المصفاة (تُخزن مؤقتاً لكل تصفية وصفحة)"""
+        shots = engine.shots
+        
+        # تصفية حسب الجدران
+        if rails:
+            shots = [s for s in shots if s.rails == rails]
+        
+        # تصفية حسب الصعوبة
+        if difficulty:
+            shots = [s for s in shots if s.difficulty.value == difficulty]
+        
+        # ترقيم الصفحات
+        total = len(shots)
+        shots = shots[skip:skip + limit]
+        
+        return {
+            "total": total,
+            "count": len(shots),
+            "skip": skip,
+            "limit": limit,
+            "shots": [s.to_dict() for s in shots],
+        }
+
+
+    @router.get("/shots")
+    def get_shots(
         rails: Optional[int] = Query(None, ge=1, le=4, description="تصفية حسب الجدران"),
         difficulty: Optional[str] = Query(None, description="تصفية حسب الصعوبة"),
         skip: int = Query(0, ge=0, description="عدد العناصر المتخطاة"),
         limit: int = Query(100, ge=1, le=500, description="حد أقصى للعناصر"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+        tenant: str = Depends(tenant_name),
     ):
         """الحصول على قائمة التسديقات مع التصفية والترقيم"""
         try:
-            shots = engine.shots
-            
-            # تصفية حسب الجدران
-            if rails:
-                shots = [s for s in shots if s.rails == rails]
-            
-            # تصفية حسب الصعوبة
-            if difficulty:
-                shots = [s for s in shots if s.difficulty.value == difficulty]
-            
-            # ترقيم الصفحات
-            total = len(shots)
-            shots = shots[skip:skip + limit]
-            
-            return {
-                "total": total,
-                "count": len(shots),
-                "skip": skip,
-                "limit": limit,
-                "shots": [s.to_dict() for s in shots],
-            }
+            body = cache.get_or_compute_json(
+                _namespace(tenant), f"page:{rails}:{difficulty}:{skip}:{limit}",
+                lambda: _shots_page(engine, rails, difficulty, skip, limit),
+            )
+            return Response(content=body, media_type="application/json")
         except Exception as e:
             logger.error(f"❌ خطأ في استرجاع التسديقات: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
-    @app.get("/api/v1/shots/{shot_id}")
-    async def get_shot_by_id(shot_id: int):
+    @router.get("/shots/leaderboard")
+    def get_shots_leaderboard(
+        order: str = Query("best", description="best أو worst"),
+        k: int = Query(10, ge=1, le=LEADERBOARD_SIZE, description="عدد التسديقات"),
+        rails: Optional[int] = Query(None, ge=1, le=4, description="تصفية حسب الجدران"),
+        difficulty: Optional[str] = Query(None, description="تصفية حسب الصعوبة"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+    ):
+        """أفضل أو أسوأ التسديقات حسب معدل النجاح (كلياً أو حسب بعد واحد)"""
+        if order not in ("best", "worst"):
+            raise HTTPException(status_code=400, detail="الترتيب يجب أن يكون best أو worst")
+        try:
+            shots = engine.get_leaderboard(k, order == "worst", rails, difficulty)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"order": order, "count": len(shots), "shots": shots}
+
+
+    @router.get("/shots/similar")
+    def get_similar_shots(
+        white_ball: float = Query(..., ge=0, le=10, description="موضع الكرة البيضاء"),
+        target: float = Query(..., ge=0, le=10, description="موضع الهدف"),
+        cue_position: float = Query(..., ge=0, le=10, description="موضع العصا"),
+        rails: Optional[int] = Query(None, ge=1, le=4, description="عدد الجدران (فارغ = الكل)"),
+        k: int = Query(10, ge=1, le=100, description="عدد الجيران"),
+        radius: Optional[float] = Query(None, ge=0, description="نصف قطر البحث"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+    ):
+        """التسديقات السابقة المشابهة وإحصائيات نجاحها (من الفهرس المكاني)"""
+        try:
+            return engine.find_similar(white_ball, target, cue_position, rails, k, radius)
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في المدخلات: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    @router.get("/shots/{shot_id}")
+    async def get_shot_by_id(shot_id: int, engine: BilliardsEngine = Depends(tenant_engine)):
         """الحصول على تسديقة محددة"""
         try:
             if shot_id < 0 or shot_id >= len(engine.shots):
@@ -207,15 +537,24 @@ if FASTAPI_AVAILABLE:
             raise HTTPException(status_code=500, detail=str(e))
 
 
-    @app.post("/api/v1/shots/{shot_id}/record")
-    async def record_shot_execution(shot_id: int, successful: bool):
+    # الكتابة تمسك قفل المحرك أثناء حفظ الملف، فنقاط الكتابة متزامنة (def)
+    # أو تنقل عملها لمجمع الخيوط حتى لا تتوقف حلقة الأحداث (البث و /readyz)
+
+    @router.post("/shots/{shot_id}/record")
+    def record_shot_execution(
+        shot_id: int,
+        successful: bool,
+        engine: BilliardsEngine = Depends(tenant_engine),
+        tenant: str = Depends(tenant_name),
+    ):
         """تسجيل نتيجة تنفيذ تسديقة"""
         try:
-            if shot_id < 0 or shot_id >= len(engine.shots):
+            try:
+                shot = engine.record_result(shot_id, successful)
+            except ValueError:
                 raise HTTPException(status_code=404, detail="التسديقة غير موجودة")
-            
-            shot = engine.shots[shot_id]
-            engine.record_execution(shot, successful)
+            cache.invalidate(_namespace(tenant))
+            _publish(engine, tenant, "execution_recorded", {"shot_id": shot_id, "successful": successful})
             
             logger.info(f"✅ تم تسجيل النتيجة: {'نجاح' if successful else 'فشل'}")
             
@@ -235,55 +574,138 @@ if FASTAPI_AVAILABLE:
     # الإحصائيات
     # ==========================================
 
-    @app.get("/api/v1/statistics")
-    async def get_statistics():
+    # نقاط القراءة المخزنة مؤقتاً متزامنة (def) حتى ينتظر SharedCache قفل
+    # الحساب في مجمع الخيوط بدلاً من حلقة الأحداث
+
+    @router.get("/statistics")
+    def get_statistics(engine: BilliardsEngine = Depends(tenant_engine), tenant: str = Depends(tenant_name)):
         """الحصول على الإحصائيات الكاملة"""
         try:
-            stats = engine.get_statistics()
+            body = cache.get_or_compute_json(_namespace(tenant), "statistics", engine.get_statistics)
             logger.debug("✅ تم استرجاع الإحصائيات")
-            return stats
+            return Response(content=body, media_type="application/json")
         except Exception as e:
             logger.error(f"❌ خطأ في استرجاع الإحصائيات: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
-    @app.get("/api/v1/statistics/by-rails")
-    async def get_statistics_by_rails():
+    @router.get("/statistics/trends")
+    def get_statistics_trends(engine: BilliardsEngine = Depends(tenant_engine)):
+        """اتجاه الأداء: نوافذ آخر 10/50/500 تنفيذ والنوافذ الزمنية و EWMA"""
+        return engine.get_trends()
+
+
+    @router.get("/statistics/rollups")
+    def get_statistics_rollups(
+        start: Optional[datetime] = Query(None, description="بداية الفترة (افتراضياً قبل 30 يوماً)"),
+        end: Optional[datetime] = Query(None, description="نهاية الفترة (افتراضياً الآن)"),
+        level: Optional[str] = Query(None, description="minute أو hour أو day أو month لسلسلة زمنية"),
+        rails: Optional[int] = Query(None, ge=1, le=4, description="تصفية حسب الجدران"),
+        difficulty: Optional[str] = Query(None, description="تصفية حسب الصعوبة"),
+        pocket: Optional[int] = Query(None, ge=0, le=5, description="تصفية حسب الجيب"),
+        group_by: str = Query("", description="أبعاد التجميع مفصولة بفواصل: rails,difficulty,pocket"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+    ):
+        """إحصائيات فترة زمنية من جداول التجميع (مجموع واحد أو سلسلة لكل خانة)"""
+        end = end or datetime.now()
+        start = start or end - timedelta(days=30)
+        filters = {"rails": rails, "difficulty": difficulty, "pocket": pocket}
+        dimensions = [name for name in group_by.split(",") if name]
+        try:
+            if level:
+                return {"level": level, "series": engine.rollups.series(start, end, level, filters, dimensions)}
+            return engine.rollups.query(start, end, filters, dimensions)
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في معاملات التجميع: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    @router.get("/statistics/distribution")
+    def get_statistics_distribution(
+        metric: str = Query("success_rate", description="success_rate أو power أو angle"),
+        percentiles: str = Query("10,25,50,75,90", description="المئينات مفصولة بفواصل (0-100)"),
+        include_sketch: bool = Query(False, description="إرفاق الملخص نفسه لدمجه مع عمليات أخرى"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+    ):
+        """مئينات التوزيع من ملخص KLL (ذاكرة محدودة، بدون المرور على التسديقات)"""
+        try:
+            values = [float(p) for p in percentiles.split(",") if p.strip()]
+            result = engine.get_distribution(metric, values)
+            if include_sketch:
+                result["sketch"] = engine.snapshot().distributions[metric].to_dict()
+            return result
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في معاملات التوزيع: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    @router.get("/statistics/histogram")
+    def get_statistics_histogram(
+        metric: str = Query("success_rate", description="success_rate أو power أو angle"),
+        bins: int = Query(10, ge=1, le=100, description="عدد الفترات"),
+        low: Optional[float] = Query(None, description="بداية المدى (افتراضياً أصغر قيمة)"),
+        high: Optional[float] = Query(None, description="نهاية المدى (افتراضياً أكبر قيمة)"),
+        engine: BilliardsEngine = Depends(tenant_engine),
+    ):
+        """مدرج تكراري تقريبي من ملخص التوزيع"""
+        try:
+            return engine.get_histogram(metric, bins, low, high)
+        except ValueError as e:
+            logger.warning(f"⚠️ خطأ في معاملات المدرج: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+    def _statistics_by_rails(engine: BilliardsEngine) -> dict:
+        snapshot = engine.snapshot()
+        stats = {}
+        for rails in [1, 2, 3, 4]:
+            shots = snapshot.shots_by_rails(rails)
+            if shots:
+                successful = sum(1 for s in shots if s.executed and s.result == ShotResult.SUCCESSFUL)
+                stats[f"rails_{rails}"] = {
+                    "total": len(shots),
+                    "successful": successful,
+                    "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
+                }
+        return stats
+
+
+    @router.get("/statistics/by-rails")
+    def get_statistics_by_rails(engine: BilliardsEngine = Depends(tenant_engine), tenant: str = Depends(tenant_name)):
         """الإحصائيات حسب عدد الجدران"""
         try:
-            stats = {}
-            for rails in [1, 2, 3, 4]:
-                shots = engine.get_shots_by_rails(rails)
-                if shots:
-                    successful = sum(1 for s in shots if s.executed and s.result)
-                    stats[f"rails_{rails}"] = {
-                        "total": len(shots),
-                        "successful": successful,
-                        "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
-                    }
-            
-            return stats
+            body = cache.get_or_compute_json(
+                _namespace(tenant), "statistics:by-rails", lambda: _statistics_by_rails(engine),
+            )
+            return Response(content=body, media_type="application/json")
         except Exception as e:
             logger.error(f"❌ خطأ في الإحصائيات: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
-    @app.get("/api/v1/statistics/by-difficulty")
-    async def get_statistics_by_difficulty():
+    def _statistics_by_difficulty(engine: BilliardsEngine) -> dict:
+        snapshot = engine.snapshot()
+        stats = {}
+        for difficulty in Difficulty:
+            shots = snapshot.shots_by_difficulty(difficulty.value)
+            if shots:
+                successful = sum(1 for s in shots if s.executed and s.result == ShotResult.SUCCESSFUL)
+                stats[difficulty.value] = {
+                    "total": len(shots),
+                    "successful": successful,
+                    "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
+                }
+        return stats
+
+
+    @router.get("/statistics/by-difficulty")
+    def get_statistics_by_difficulty(engine: BilliardsEngine = Depends(tenant_engine), tenant: str = Depends(tenant_name)):
         """الإحصائيات حسب مستوى الصعوبة"""
         try:
-            stats = {}
-            for difficulty in Difficulty:
-                shots = engine.get_shots_by_difficulty(difficulty.value)
-                if shots:
-                    successful = sum(1 for s in shots if s.executed and s.result)
-                    stats[difficulty.value] = {
-                        "total": len(shots),
-                        "successful": successful,
-                        "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
-                    }
-            
-            return stats
+            body = cache.get_or_compute_json(
+                _namespace(tenant), "statistics:by-difficulty", lambda: _statistics_by_difficulty(engine),
+            )
+            return Response(content=body, media_type="application/json")
         except Exception as e:
             logger.error(f"❌ خطأ في الإحصائيات: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -293,51 +715,71 @@ if FASTAPI_AVAILABLE:
     # استيراد وتصدير البيانات
     # ==========================================
 
-    @app.post("/api/v1/export")
-    async def export_data():
-        """تصدير جميع البيانات"""
+    @router.post("/export")
+    def export_data(engine: BilliardsEngine = Depends(tenant_engine)):
+        """تصدير جميع البيانات (من لقطة واحدة: التسديقات والإحصائيات متسقة)"""
         try:
+            snapshot = engine.snapshot()
             data = {
-                "shots": [s.to_dict() for s in engine.shots],
-                "statistics": engine.get_statistics(),
+                "shots": [s.to_dict() for s in snapshot.shots],
+                "statistics": snapshot.get_statistics(),
             }
-            logger.info(f"✅ تم تصدير {len(engine.shots)} تسديقة")
+            logger.info(f"✅ تم تصدير {len(snapshot.shots)} تسديقة")
             return data
         except Exception as e:
             logger.error(f"❌ خطأ في التصدير: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
-    @app.post("/api/v1/import")
-    async def import_data(file: UploadFile = File(...)):
+    def _shots_from_data(data: dict, context=None) -> List[Shot]:
+        """تحويل التسديقات من بيانات الاستيراد مع تخطي غير الصحيحة"""
+        shots = []
+        for i, shot_data in enumerate(data['shots']):
+            if context is not None and i % 1000 == 0:
+                context.check(i / len(data['shots']))
+            try:
+                shots.append(Shot.from_dict(shot_data))
+            except Exception as e:
+                logger.warning(f"⚠️ تم تخطي تسديقة غير صحيحة: {e}")
+        return shots
+
+
+    def _import_content(engine: BilliardsEngine, tenant: str, content: bytes) -> int:
+        """تحليل ملف الاستيراد واستبدال تسديقات المستأجر؛ يعيد عدد التسديقات"""
+        data = json.loads(content.decode('utf-8'))
+        
+        # التحقق من صحة البيانات
+        if 'shots' not in data:
+            raise ValueError("الملف يجب أن يحتوي على 'shots'")
+        
+        # استيراد التسديقات
+        shots = _shots_from_data(data)
+        
+        # استبدال البيانات الحالية: القراء يرون القديمة حتى يكتمل البناء
+        engine.replace_shots(shots)
+        cache.invalidate(_namespace(tenant))
+        _publish(engine, tenant, "shots_replaced", {"count": len(shots)})
+        return len(shots)
+
+
+    @router.post("/import")
+    async def import_data(
+        file: UploadFile = File(...),
+        engine: BilliardsEngine = Depends(tenant_engine),
+        tenant: str = Depends(tenant_name),
+    ):
         """استيراد البيانات من ملف JSON"""
         try:
             content = await file.read()
-            data = json.loads(content.decode('utf-8'))
-            
-            # التحقق من صحة البيانات
-            if 'shots' not in data:
-                raise ValueError("الملف يجب أن يحتوي على 'shots'")
-            
-            # مسح البيانات الحالية
-            engine.shots = []
-            
-            # استيراد التسديقات
-            for shot_data in data['shots']:
-                try:
-                    shot = Shot.from_dict(shot_data)
-                    engine.shots.append(shot)
-                except Exception as e:
-                    logger.warning(f"⚠️ تم تخطي تسديقة غير صحيحة: {e}")
+            # التحليل والاستبدال في مجمع الخيوط (replace_shots يمسك قفل المحرك)
+            count = await run_in_threadpool(_import_content, engine, tenant, content)
             
-            engine.save_to_storage()
-            
-            logger.info(f"✅ تم استيراد {len(engine.shots)} تسديقة")
+            logger.info(f"✅ تم استيراد {count} تسديقة")
             
             return {
                 "success": True,
-                "message": f"تم استيراد {len(engine.shots)} تسديقة بنجاح",
-                "imported_count": len(engine.shots),
+                "message": f"تم استيراد {count} تسديقة بنجاح",
+                "imported_count": count,
             }
         except json.JSONDecodeError as e:
             logger.error(f"❌ خطأ في صيغة JSON: {e}")
@@ -347,6 +789,281 @@ if FASTAPI_AVAILABLE:
             raise HTTPException(status_code=400, detail=str(e))
 
 
+    # ==========================================
+    # البث المباشر
+    # ==========================================
+
+    def _publish(engine: BilliardsEngine, tenant: str, event_type: str, data: dict) -> None:
+        """
+        نشر حدث الكتابة ثم فرق الإحصائيات الناتج عنه
+
+        فرق الإحصائيات للمستأجر الافتراضي فقط؛ أحداث المستأجرين الآخرين
+        تحمل معرف المستأجر.
+        """
+        if tenant != DEFAULT_TENANT:
+            events.publish(event_type, {"tenant": tenant, **data})
+            return
+        events.publish(event_type, data)
+        # قراءة الإحصائيات ونشر فرقها تحت قفل واحد: كاتبان متزامنان في مجمع
+        # الخيوط لا ينشران لقطة أقدم بعد لقطة أحدث
+        with _statistics_lock:
+            events.publish_delta(STATISTICS_EVENT, engine.get_statistics())
+
+
+    @app.get("/api/v1/events")
+    async def stream_events(request: Request, last_event_id: Optional[str] = Query(None)):
+        """
+        بث الأحداث عبر Server-Sent Events
+
+        المتصفح يعيد الاتصال تلقائياً ويرسل Last-Event-ID للاستئناف.
+        """
+        resume_from = request.headers.get("last-event-id") or last_event_id
+
+        async def stream():
+            async with events.subscribe(resume_from) as subscription:
+                yield "retry: 3000\n\n"
+                while not await request.is_disconnected():
+                    frame = await subscription.next_frame(timeout=EVENTS_HEARTBEAT)
+                    yield sse_message(frame)
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+        )
+
+
+    @app.websocket("/api/v1/ws")
+    async def events_websocket(websocket: WebSocket, last_event_id: Optional[str] = None):
+        """بث الأحداث عبر WebSocket (?last_event_id= للاستئناف)"""
+        await websocket.accept()
+        # قراءة رسائل العميل (وتجاهلها) لاكتشاف الانقطاع فوراً بدلاً من انتظار الإرسال التالي
+        disconnected = asyncio.create_task(_until_disconnect(websocket))
+        try:
+            async with events.subscribe(last_event_id) as subscription:
+                while True:
+                    next_frame = asyncio.create_task(subscription.next_frame(timeout=EVENTS_HEARTBEAT))
+                    await asyncio.wait({next_frame, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                    if disconnected.done():
+                        next_frame.cancel()
+                        break
+                    await websocket.send_text(
+                        json.dumps(next_frame.result() or {"ping": True}, ensure_ascii=False)
+                    )
+        except WebSocketDisconnect:
+            pass
+        finally:
+            disconnected.cancel()
+        logger.debug("🔌 انقطع اتصال WebSocket")
+
+
+    async def _until_disconnect(websocket: WebSocket) -> None:
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+
+    # ==========================================
+    # المهام الخلفية
+    # ==========================================
+
+    # المعالجات تُنفذ في خيوط JobQueue وتكتب النتيجة في context.output
+
+    def _run_export(context) -> dict:
+        """كتابة التصدير إلى ملف على دفعات (نفس صيغة /export)"""
+        with registry.acquire(context.params["tenant"]) as engine:
+            snapshot = engine.snapshot()
+        total = len(snapshot.shots)
+        with open(context.output, "w", encoding="utf-8") as f:
+            f.write('{"shots": [')
+            for i, shot in enumerate(snapshot.shots):
+                if i % 1000 == 0:
+                    context.check(i / total)
+                f.write((", " if i else "") + json.dumps(shot.to_dict(), ensure_ascii=False))
+            f.write('], "statistics": ')
+            json.dump(snapshot.get_statistics(), f, ensure_ascii=False)
+            f.write("}")
+        logger.info(f"✅ تم تصدير {total} تسديقة في الخلفية")
+        return {"exported_count": total}
+
+
+    def _run_import(context) -> dict:
+        """استيراد الملف المرفوع (يُحذف بعد المهمة ما لم تُقطع بإيقاف الخادم)"""
+        tenant = context.params["tenant"]
+        source = Path(context.params["source"])
+        try:
+            data = json.loads(source.read_text(encoding="utf-8"))
+            if 'shots' not in data:
+                raise ValueError("الملف يجب أن يحتوي على 'shots'")
+            shots = _shots_from_data(data, context)
+            context.check()
+            with registry.acquire(tenant) as engine:
+                engine.replace_shots(shots)
+                cache.invalidate(_namespace(tenant))
+                _publish(engine, tenant, "shots_replaced", {"count": len(shots)})
+        finally:
+            if context.reason != SHUTDOWN_REASON:
+                source.unlink(missing_ok=True)
+        result = {"imported_count": len(shots)}
+        context.output.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"✅ تم استيراد {len(shots)} تسديقة في الخلفية")
+        return result
+
+
+    def _run_statistics(context) -> dict:
+        """كل الإحصائيات في ملف واحد"""
+        with registry.acquire(context.params["tenant"]) as engine:
+            data = {
+                "statistics": engine.get_statistics(),
+                "trends": engine.get_trends(),
+                "by_rails": _statistics_by_rails(engine),
+                "by_difficulty": _statistics_by_difficulty(engine),
+            }
+        context.output.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        return {"total_calculations": data["statistics"]["total_calculations"]}
+
+
+    def _run_sweep(context) -> dict:
+        """تنفيذ المسح عبر SweepService ونسخ أسطره إلى ملف المهمة"""
+        job = sweeps.submit(SweepGrid.from_dict(context.params["grid"]))
+        try:
+            while not job.wait(0.5):
+                context.check(job.progress)
+        except JobCancelled:
+            job.cancel()
+            raise
+        if job.state != DONE:
+            raise RuntimeError(job.error or f"المسح {job.state}")
+        shutil.copyfile(job.path, context.output)
+        return {"points": job.total, "cached": job.cached}
+
+
+    def _job(job_id: str) -> dict:
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="المهمة غير موجودة")
+        return job
+
+
+    @router.post("/jobs/export", status_code=202)
+    def submit_export_job(
+        tenant: str = Depends(tenant_name),
+        priority: int = Query(0, ge=-10, le=10, description="الأعلى ينفذ أولاً"),
+    ):
+        """تصدير في الخلفية؛ الملف من /api/v1/jobs/{job_id}/result"""
+        return jobs.submit("export", {"tenant": tenant}, priority)
+
+
+    @router.post("/jobs/statistics", status_code=202)
+    def submit_statistics_job(
+        tenant: str = Depends(tenant_name),
+        priority: int = Query(0, ge=-10, le=10, description="الأعلى ينفذ أولاً"),
+    ):
+        """الإحصائيات الكاملة (العامة والاتجاهات وحسب الجدران والصعوبة) في الخلفية"""
+        return jobs.submit("statistics", {"tenant": tenant}, priority)
+
+
+    @router.post("/jobs/import", status_code=202)
+    def submit_import_job(
+        file: UploadFile = File(...),
+        tenant: str = Depends(tenant_name),
+        priority: int = Query(0, ge=-10, le=10, description="الأعلى ينفذ أولاً"),
+    ):
+        """
+        استيراد في الخلفية
+
+        الملف يُحفظ على القرص قبل تسجيل المهمة حتى تكمل بعد إعادة التشغيل.
+        """
+        source = jobs.results_dir / "uploads" / f"{uuid.uuid4().hex}.json"
+        source.parent.mkdir(exist_ok=True)
+        with open(source, "wb") as out:
+            shutil.copyfileobj(file.file, out)
+        return jobs.submit("import", {"tenant": tenant, "source": str(source)}, priority)
+
+
+    @app.post("/api/v1/jobs/sweep", status_code=202)
+    def submit_sweep_job(
+        grid: dict = Body(..., description="قيم أو نطاقات لكل محور"),
+        priority: int = Query(0, ge=-10, le=10, description="الأعلى ينفذ أولاً"),
+    ):
+        """مسح شبكة المعاملات كمهمة في الطابور (يبقى بعد إعادة التشغيل)"""
+        try:
+            parsed = SweepGrid.from_dict(grid)
+            if parsed.size > sweeps.max_points:
+                raise ValueError(f"عدد التركيبات {parsed.size} يتجاوز الحد {sweeps.max_points}")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ خطأ في شبكة المسح: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+        return jobs.submit("sweep", {"grid": parsed.to_dict()}, priority)
+
+
+    @app.get("/api/v1/jobs")
+    def get_jobs(
+        state: Optional[str] = Query(None),
+        limit: int = Query(50, ge=1, le=500),
+    ):
+        """آخر المهام وعددها حسب الحالة"""
+        return {"jobs": jobs.jobs(limit, state), "stats": jobs.get_stats()}
+
+
+    @app.get("/api/v1/jobs/{job_id}")
+    def get_job(job_id: str):
+        """حالة المهمة وتقدمها"""
+        return _job(job_id)
+
+
+    @app.get("/api/v1/jobs/{job_id}/result")
+    def get_job_result(job_id: str):
+        """تحميل ملف نتيجة المهمة المنتهية"""
+        job = _job(job_id)
+        if job["state"] != JOB_DONE:
+            raise HTTPException(status_code=409, detail=f"المهمة {job['state']}")
+        path = jobs.result_path(job_id)
+        if path is None or not path.exists():
+            raise HTTPException(status_code=404, detail="ملف النتيجة غير موجود")
+        media_type = "application/x-ndjson" if path.suffix == ".jsonl" else "application/json"
+        return FileResponse(path, media_type=media_type, filename=f"{job['kind']}-{path.name}")
+
+
+    @app.delete("/api/v1/jobs/{job_id}")
+    def cancel_job(job_id: str):
+        """إلغاء مهمة منتظرة أو جارية"""
+        _job(job_id)
+        return jobs.cancel(job_id)
+
+
+    @app.get("/api/v1/tenants")
+    def get_tenants():
+        """المحركات المقيمة في الذاكرة والذاكرة التقديرية وعدادات الطرد"""
+        return registry.get_stats()
+
+
+    jobs.register("export", _run_export)
+    jobs.register("statistics", _run_statistics)
+    # الاستيراد يستبدل بيانات المستأجر، والمسح يوزع عمله على مجمعه الخاص
+    jobs.register("import", _run_import, concurrency=1)
+    jobs.register("sweep", _run_sweep, suffix=".jsonl", concurrency=1)
+
+    @app.get("/api/v1/metrics")
+    def get_metrics():
+        """حدود القبول وذاكرة الحسابات والمهام الخلفية والمحركات المقيمة"""
+        return {
+            "admission": {
+                "rate_limit": rate_limiter.get_stats(),
+                "concurrency": concurrency.get_stats(),
+            },
+            "calculations": calculations.get_stats(),
+            "jobs": jobs.get_stats(),
+            "tenants": registry.get_stats(),
+        }
+
+
+    app.include_router(router, prefix="/api/v1")
+    app.include_router(router, prefix="/api/v1/tenants/{tenant}")
+
+
     @app.exception_handler(Exception)
     async def general_exception_handler(request, exc):
         """معالج الأخطاء العام"""
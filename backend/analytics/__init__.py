@@ -0,0 +1,9 @@
+"""
+التحليلات التجميعية فوق التسديقات المسجلة
+"""
+
+from .rollups import RollupStore
+
+__all__ = [
+    'RollupStore',
+]
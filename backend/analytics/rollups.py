@@ -0,0 +1,496 @@
+"""
+جداول التجميع الزمني (Rollups)
+
+Statistics يحفظ عدادات كلية فقط؛ سؤال مثل "معدل النجاح لكل يوم لكل
+عدد جدران" كان يتطلب المرور على كل engine.shots. هنا تُحدَّث عدادات
+مجمعة مع كل كتابة على أربعة مستويات (دقيقة، ساعة، يوم، شهر) لكل
+تركيبة (جدران، صعوبة، جيب):
+- الكتابة O(1): أربع خانات لكل تسديقة
+- الاستعلام عن أي فترة يغطيها بأقل عدد من الخانات المحاذاة (أشهر كاملة
+  في الوسط، ثم أيام، ثم ساعات، ثم دقائق عند الأطراف) فسنة كاملة تُجمع
+  من حوالي 12 خانة بدلاً من كل التسديقات
+- الخانات الفارغة لا تُخزن
+
+التسديقة تُنسب لخانة وقت حسابها (shot.timestamp) حتى عند تسجيل تنفيذها
+لاحقاً، فيمكن إعادة بناء الجداول من التسديقات بنفس النتيجة تماماً.
+الدقة الزمنية للاستعلام دقيقة واحدة خلال فترة الاحتفاظ بخانات الدقائق،
+ثم ساعة، ثم يوم: الخانات الأقدم تُحذف عند الحفظ وأطراف الفترة تُوسّع
+للخانة الأكبر التي تحتويها.
+
+الحفظ بعد دفعة من الكتابات أو مهلة وليس مع كل كتابة؛ أول تغيير بعد
+الحفظ يحذف الملف، فالملف على القرص إما مطابق أو غير موجود (يُعاد البناء).
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    from backend.models.shot import Shot, ShotResult
+except ImportError:
+    from ..models.shot import Shot, ShotResult
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("minute", "hour", "day", "month")
+DIMENSIONS = ("rails", "difficulty", "pocket")
+
+# العدادات لكل تركيبة: [محسوبة، منفذة، ناجحة، مجموع معدل النجاح المتوقع]
+CALCULATED, EXECUTED, SUCCESSFUL, EXPECTED_SUM = range(4)
+
+Combo = Tuple[int, str, int]
+
+# مدة الاحتفاظ بخانات الدقائق والساعات (الأيام والأشهر تبقى دائماً)
+RETENTION = {"minute": timedelta(days=2), "hour": timedelta(days=92)}
+# الحفظ بعد هذا العدد من الكتابات أو هذه المدة بالثواني منذ آخر حفظ
+SAVE_EVERY = 100
+SAVE_INTERVAL = 30.0
+
+
+def truncate(moment: datetime, level: str) -> datetime:
+    """بداية الخانة التي يقع فيها الوقت على المستوى المعطى"""
+    if level == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if level == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if level == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if level == "month":
+        return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"مستوى غير معروف: {level}")
+
+
+def next_bucket(start: datetime, level: str) -> datetime:
+    """بداية الخانة التالية (الأشهر بأطوال مختلفة)"""
+    if level == "minute":
+        return start + timedelta(minutes=1)
+    if level == "hour":
+        return start + timedelta(hours=1)
+    if level == "day":
+        return start + timedelta(days=1)
+    if level == "month":
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    raise ValueError(f"مستوى غير معروف: {level}")
+
+
+def cover(start: datetime, end: datetime) -> List[Tuple[str, datetime]]:
+    """
+    أقل عدد من الخانات المحاذاة يغطي [start, end)
+
+    Args:
+        start: بداية الفترة (تُقرّب لأسفل للدقيقة)
+        end: نهاية الفترة (تُقرّب لأعلى للدقيقة)
+
+    Returns:
+        قائمة (المستوى، بداية الخانة) بالترتيب الزمني
+    """
+    cursor = truncate(start, "minute")
+    end_minute = truncate(end, "minute")
+    if end_minute < end:
+        end_minute += timedelta(minutes=1)
+
+    buckets = []
+    while cursor < end_minute:
+        for level in reversed(LEVELS):
+            if truncate(cursor, level) != cursor:
+                continue
+            following = next_bucket(cursor, level)
+            if following <= end_minute:
+                buckets.append((level, cursor))
+                cursor = following
+                break
+    return buckets
+
+
+def _round_up(moment: datetime, level: str) -> datetime:
+    """بداية الخانة التي تلي الوقت أو الوقت نفسه إذا كان محاذياً"""
+    start = truncate(moment, level)
+    return start if start == moment else next_bucket(start, level)
+
+
+def _naive(moment: datetime) -> datetime:
+    """أوقات التسديقات محلية بدون منطقة زمنية؛ الأوقات ذات المنطقة تُحوّل إليها"""
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _combo_key(combo: Combo) -> str:
+    return f"{combo[0]}|{combo[1]}|{combo[2]}"
+
+
+def _parse_combo(key: str) -> Combo:
+    rails, difficulty, pocket = key.split("|")
+    return int(rails), difficulty, int(pocket)
+
+
+class RollupStore:
+    """
+    عدادات مجمعة لكل مستوى زمني وتركيبة (جدران، صعوبة، جيب)
+
+    آمنة من عدة خيوط (نقاط FastAPI المتزامنة تعمل في مجمع الخيوط).
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Optional[Path] = None, retention: Optional[Dict[str, timedelta]] = None,
+                 save_every: int = SAVE_EVERY, save_interval: float = SAVE_INTERVAL):
+        """
+        Args:
+            path: ملف الحفظ (اختياري؛ بدونه تبقى الجداول في الذاكرة)
+            retention: مدة الاحتفاظ لكل مستوى {"minute": ..., "hour": ...}
+            save_every: عدد الكتابات التي تستدعي الحفظ في maybe_save
+            save_interval: أقصى مدة بالثواني لبقاء كتابات غير محفوظة في maybe_save
+
+        Raises:
+            ValueError: إذا كانت مدد الاحتفاظ غير صحيحة
+        """
+        retention = dict(RETENTION if retention is None else retention)
+        if any(level not in RETENTION or keep <= timedelta(0) for level, keep in retention.items()):
+            raise ValueError("مدة الاحتفاظ يجب أن تكون موجبة للدقائق أو الساعات فقط")
+        if retention.get("minute", timedelta.max) > retention.get("hour", timedelta.max):
+            raise ValueError("الاحتفاظ بالدقائق يجب ألا يتجاوز الاحتفاظ بالساعات")
+        self.path = Path(path) if path else None
+        self.retention = retention
+        self.save_every = max(1, save_every)
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._levels: Dict[str, Dict[datetime, Dict[Combo, list]]] = {level: {} for level in LEVELS}
+        # المستوى ← الخانات قبل هذا الوقت حُذفت (الاستعلام يُوسَّع للمستوى الأكبر)
+        self._pruned_before: Dict[str, datetime] = {}
+        self.source_count = 0
+        self._pending = 0  # كتابات غير محفوظة
+        self._generation = 0
+        self._last_save = time.monotonic()
+
+    # ---------- الكتابة ----------
+
+    def _bump(self, shot: Shot, index: int, amount: float) -> None:
+        combo = (shot.rails, shot.difficulty.value, shot.pocket)
+        for level in LEVELS:
+            buckets = self._levels[level]
+            start = truncate(shot.timestamp, level)
+            combos = buckets.get(start)
+            if combos is None:
+                combos = buckets[start] = {}
+            counters = combos.get(combo)
+            if counters is None:
+                counters = combos[combo] = [0, 0, 0, 0.0]
+            counters[index] += amount
+
+    def _add(self, shot: Shot) -> None:
+        self._bump(shot, CALCULATED, 1)
+        self._bump(shot, EXPECTED_SUM, shot.success_rate)
+        if shot.executed and shot.result is not None:
+            self._apply_result(shot, shot.result, 1)
+
+    def _apply_result(self, shot: Shot, result: ShotResult, sign: int) -> None:
+        self._bump(shot, EXECUTED, sign)
+        if result == ShotResult.SUCCESSFUL:
+            self._bump(shot, SUCCESSFUL, sign)
+
+    def _changed(self) -> None:
+        """يُستدعى مع القفل بعد كل تغيير: الملف المحفوظ لم يعد مطابقاً فيُحذف"""
+        if not self._pending and self.path is not None:
+            self._discard_file()
+        self._pending += 1
+        self._generation += 1
+
+    def _discard_file(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ تعذر حذف جداول التجميع القديمة: {e}")
+
+    def add_shot(self, shot: Shot) -> None:
+        """تسجيل تسديقة محسوبة جديدة"""
+        with self._lock:
+            self._add(shot)
+            self.source_count += 1
+            self._changed()
+
+    def record_result(self, shot: Shot, previous: Optional[ShotResult]) -> None:
+        """
+        تسجيل نتيجة تنفيذ (بعد تحديث shot.result)
+
+        Args:
+            shot: التسديقة بنتيجتها الجديدة
+            previous: النتيجة السابقة إذا كانت التسديقة منفذة من قبل (تُطرح)
+        """
+        with self._lock:
+            if previous is not None:
+                self._apply_result(shot, previous, -1)
+            if shot.result is not None:
+                self._apply_result(shot, shot.result, 1)
+            self._changed()
+
+    def rebuild(self, shots: Iterable[Shot]) -> None:
+        """إعادة بناء كل الجداول من التسديقات"""
+        with self._lock:
+            self._levels = {level: {} for level in LEVELS}
+            self._pruned_before = {}
+            self.source_count = 0
+            for shot in shots:
+                self._add(shot)
+                self.source_count += 1
+            self._changed()
+        logger.info(f"✅ جداول التجميع الزمني: {self.source_count} تسديقة")
+
+    # ---------- الاحتفاظ ----------
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        حذف خانات الدقائق والساعات الأقدم من مدة الاحتفاظ
+
+        الحد يُحاذى لبداية خانة المستوى الأكبر، فكل ساعة (أو يوم) إما
+        بكل دقائقها (أو ساعاتها) أو بدونها.
+
+        Args:
+            now: الوقت المرجعي (افتراضياً الآن)
+
+        Returns:
+            عدد الخانات المحذوفة
+        """
+        now = _naive(now) if now else datetime.now()
+        removed = 0
+        with self._lock:
+            for level, keep in self.retention.items():
+                coarser = LEVELS[LEVELS.index(level) + 1]
+                cutoff = truncate(now - keep, coarser)
+                buckets = self._levels[level]
+                for start in [s for s in buckets if s < cutoff]:
+                    del buckets[start]
+                    removed += 1
+                if cutoff > self._pruned_before.get(level, datetime.min):
+                    self._pruned_before[level] = cutoff
+        return removed
+
+    def _widen(self, start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+        """توسيع طرفي الفترة للخانة الأكبر إذا وقعا قبل حد الحذف (مع القفل)"""
+        for level in LEVELS[:-1]:
+            boundary = self._pruned_before.get(level)
+            if boundary is None:
+                continue
+            coarser = LEVELS[LEVELS.index(level) + 1]
+            if start < boundary:
+                start = truncate(start, coarser)
+            if end < boundary:
+                end = _round_up(end, coarser)
+        return start, end
+
+    # ---------- الحفظ ----------
+
+    def maybe_save(self) -> bool:
+        """
+        الحفظ إذا تراكمت save_every كتابة أو مرت save_interval ثانية منذ آخر حفظ
+
+        Returns:
+            True إذا حُفظت الجداول
+        """
+        with self._lock:
+            due = self._pending >= self.save_every or (
+                self._pending and time.monotonic() - self._last_save >= self.save_interval
+            )
+        if due:
+            self.save()
+        return bool(due)
+
+    def flush(self) -> None:
+        """حفظ الكتابات المتبقية (عند الإيقاف أو طرد المحرك)"""
+        with self._lock:
+            pending = self._pending
+        if pending:
+            self.save()
+
+    def save(self) -> None:
+        """حذف الخانات المنتهية ثم حفظ الجداول بشكل ذري (ملف مؤقت ثم استبدال)"""
+        self.prune()
+        if self.path is None:
+            with self._lock:
+                self._pending = 0
+                self._last_save = time.monotonic()
+            return
+        with self._save_lock:
+            with self._lock:
+                generation = self._generation
+                data = {
+                    "version": self.VERSION,
+                    "source_count": self.source_count,
+                    "pruned_before": {level: b.isoformat() for level, b in self._pruned_before.items()},
+                    "levels": {
+                        level: {
+                            start.isoformat(): {_combo_key(c): v for c, v in combos.items()}
+                            for start, combos in buckets.items()
+                        }
+                        for level, buckets in self._levels.items()
+                    },
+                }
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            with self._lock:
+                self._last_save = time.monotonic()
+                if self._generation == generation:
+                    self._pending = 0
+                else:
+                    # كتابات أثناء الحفظ: الملف الجديد لا يشملها
+                    self._discard_file()
+
+    def load(self, expected_count: int) -> bool:
+        """
+        تحميل الجداول المحفوظة إذا كانت مطابقة لعدد التسديقات
+
+        Args:
+            expected_count: عدد التسديقات المحملة
+
+        Returns:
+            True إذا حُملت؛ False إذا كانت غير موجودة أو قديمة (يلزم rebuild)
+        """
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION or data.get("source_count") != expected_count:
+                return False
+            levels = {
+                level: {
+                    datetime.fromisoformat(start): {_parse_combo(c): v for c, v in combos.items()}
+                    for start, combos in data["levels"][level].items()
+                }
+                for level in LEVELS
+            }
+            pruned_before = {
+                level: datetime.fromisoformat(b) for level, b in data["pruned_before"].items()
+            }
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ خطأ في قراءة جداول التجميع: {e}")
+            return False
+        with self._lock:
+            self._levels = levels
+            self._pruned_before = pruned_before
+            self.source_count = expected_count
+            self._pending = 0
+        return True
+
+    # ---------- الاستعلام ----------
+
+    @staticmethod
+    def _matches(combo: Combo, filters: Dict[str, object]) -> bool:
+        return all(combo[DIMENSIONS.index(name)] == value for name, value in filters.items())
+
+    def _merge(self, buckets: Sequence[Tuple[str, datetime]], filters: Dict[str, object],
+               group_by: Sequence[str]) -> Dict[tuple, list]:
+        positions = [DIMENSIONS.index(name) for name in group_by]
+        groups: Dict[tuple, list] = {}
+        for level, start in buckets:
+            combos = self._levels[level].get(start)
+            if not combos:
+                continue
+            for combo, counters in combos.items():
+                if filters and not self._matches(combo, filters):
+                    continue
+                group = tuple(combo[p] for p in positions)
+                total = groups.get(group)
+                if total is None:
+                    groups[group] = list(counters)
+                else:
+                    for i, value in enumerate(counters):
+                        total[i] += value
+        return groups
+
+    @staticmethod
+    def _validate(filters: Optional[Dict[str, object]], group_by: Sequence[str]) -> Dict[str, object]:
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        for name in list(filters) + list(group_by):
+            if name not in DIMENSIONS:
+                raise ValueError(f"بُعد غير معروف: {name} (المسموح: {', '.join(DIMENSIONS)})")
+        return filters
+
+    @staticmethod
+    def _row(group_by: Sequence[str], group: tuple, counters: list) -> dict:
+        calculated, executed, successful, expected_sum = counters
+        row = dict(zip(group_by, group))
+        row.update({
+            "calculated": int(calculated),
+            "executed": int(executed),
+            "successful": int(successful),
+            "success_rate": round(successful / executed * 100, 2) if executed else None,
+            "expected_success_rate": round(expected_sum / calculated, 2) if calculated else None,
+        })
+        return row
+
+    def query(self, start: datetime, end: datetime, filters: Optional[Dict[str, object]] = None,
+              group_by: Sequence[str] = ()) -> dict:
+        """
+        مجاميع فترة زمنية
+
+        Args:
+            start: بداية الفترة (ضمنها)
+            end: نهاية الفترة (خارجها)
+            filters: تصفية حسب الأبعاد مثل {"rails": 2}
+            group_by: أبعاد التجميع مثل ("rails", "difficulty")
+
+        Returns:
+            {"start", "end": الفترة بعد توسيع الأطراف الأقدم من الاحتفاظ،
+             "buckets": عدد الخانات المدموجة، "groups": [صف لكل مجموعة]}
+
+        Raises:
+            ValueError: إذا كانت الفترة أو الأبعاد غير صحيحة
+        """
+        start, end = _naive(start), _naive(end)
+        if end <= start:
+            raise ValueError("نهاية الفترة يجب أن تكون بعد بدايتها")
+        filters = self._validate(filters, group_by)
+        with self._lock:
+            start, end = self._widen(start, end)
+            buckets = cover(start, end)
+            groups = self._merge(buckets, filters, group_by)
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets": len(buckets),
+            "groups": [self._row(group_by, g, c) for g, c in sorted(groups.items())],
+        }
+
+    def series(self, start: datetime, end: datetime, level: str,
+               filters: Optional[Dict[str, object]] = None, group_by: Sequence[str] = ()) -> List[dict]:
+        """
+        سلسلة زمنية بخانات من مستوى واحد (مثل معدل النجاح لكل يوم)
+
+        الخانات الفارغة والمحذوفة بعد مدة الاحتفاظ لا تظهر في النتيجة.
+
+        Returns:
+            قائمة {"start", "groups"} بالترتيب الزمني
+        """
+        if level not in LEVELS:
+            raise ValueError(f"مستوى غير معروف: {level}")
+        start, end = _naive(start), _naive(end)
+        if end <= start:
+            raise ValueError("نهاية الفترة يجب أن تكون بعد بدايتها")
+        filters = self._validate(filters, group_by)
+        first = truncate(start, level)
+        with self._lock:
+            starts = sorted(s for s in self._levels[level] if first <= s < end)
+            points = []
+            for bucket_start in starts:
+                groups = self._merge([(level, bucket_start)], filters, group_by)
+                if groups:
+                    points.append({
+                        "start": bucket_start.isoformat(),
+                        "groups": [self._row(group_by, g, c) for g, c in sorted(groups.items())],
+                    })
+        return points
+
+    def bucket_count(self, level: str) -> int:
+        """عدد الخانات غير الفارغة في مستوى"""
+        return len(self._levels[level])
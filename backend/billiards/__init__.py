@@ -3,11 +3,26 @@
 """
 
 from .calculator import ShotCalculator
-from .engine import BilliardsEngine
+from .calculation_cache import CalculationCache
+from .engine import BilliardsEngine, EngineSnapshot
+from .inverse import InverseSolver, ShotSetup
 from .rail_system import RailPositionsSystem
+from .shot_index import ShotIndex
+from .simulator import MonteCarloSimulator, NoiseModel, ShotParameters
+from .sweep import SweepGrid, SweepService
 
 __all__ = [
     'ShotCalculator',
+    'CalculationCache',
     'BilliardsEngine',
+    'EngineSnapshot',
+    'InverseSolver',
+    'ShotSetup',
+    'ShotIndex',
     'RailPositionsSystem',
+    'MonteCarloSimulator',
+    'NoiseModel',
+    'ShotParameters',
+    'SweepGrid',
+    'SweepService',
 ]
@@ -0,0 +1,117 @@
+"""
+ذاكرة الحسابات المتكررة لنقطة /calculate
+
+عدة أجهزة على نفس الطاولة تطلب غالباً نفس المعاملات في نفس اللحظة.
+الجزء الحسابي (create_shot و get_calculation_summary) دالة نقية في
+(جدران، عصا، بيضاء، هدف، جيب)، فيُحسب مرة واحدة:
+- الطلبات المتزامنة على نفس المفتاح تنتظر حساباً واحداً (SingleFlight)
+- النتائج محفوظة في ذاكرة LRU محدودة
+
+كل طلب يحصل مع ذلك على تسديقة جديدة (بوقتها الخاص)، وحفظها في المحرك
+خطوة منفصلة يستدعيها المستخدم صراحة (BilliardsEngine.add_shot).
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import threading
+
+try:
+    from backend.billiards.calculator import ShotCalculator
+    from backend.models.shot import Difficulty, Shot
+    from backend.services.singleflight import SingleFlight
+except ImportError:
+    from .calculator import ShotCalculator
+    from ..models.shot import Difficulty, Shot
+    from ..services.singleflight import SingleFlight
+
+Key = Tuple[int, float, float, float, int]
+
+
+class CalculationCache:
+    """
+    حساب التسديقة وملخصها مع دمج الطلبات المتزامنة وذاكرة LRU
+    """
+
+    def __init__(self, calculator: Optional[ShotCalculator] = None, max_entries: int = 4096):
+        """
+        Args:
+            calculator: الحاسبة المستخدمة (جديدة إذا لم تُحدد)
+            max_entries: أقصى عدد نتائج محفوظة (0 = دمج المتزامن فقط)
+        """
+        self.calculator = calculator or ShotCalculator()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Key, Tuple[Difficulty, float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.requests = 0
+        self.hits = 0
+        self.computed = 0
+        self.coalesced = 0
+
+    def calculate(self, rails: int, cue_position: float, white_ball: float,
+                  target: float, pocket: int) -> Tuple[Shot, dict]:
+        """
+        تسديقة جديدة غير محفوظة وملخص حساباتها
+
+        Args:
+            rails: عدد الجدران (1-4)
+            cue_position: موضع العصا (0-10)
+            white_ball: موضع الكرة البيضاء (0-10)
+            target: موضع الهدف (0-10)
+            pocket: موضع الجيب (0-5)
+
+        Returns:
+            (التسديقة، نسخة من الملخص)
+
+        Raises:
+            ValueError: إذا كانت المدخلات غير صحيحة (لا تُحفظ الأخطاء)
+        """
+        key = (rails, cue_position, white_ball, target, pocket)
+        with self._lock:
+            self.requests += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            computed = []
+            entry = self._flight.do(key, lambda: computed.append(True) or self._compute(key))
+            if not computed:
+                # انتظر حساب طلب آخر متزامن على نفس المفتاح
+                with self._lock:
+                    self.coalesced += 1
+
+        difficulty, success_rate, summary = entry
+        shot = Shot(
+            rails=rails,
+            cue_position=cue_position,
+            white_ball=white_ball,
+            target=target,
+            pocket=pocket,
+            difficulty=difficulty,
+            success_rate=success_rate,
+        )
+        return shot, dict(summary)
+
+    def _compute(self, key: Key) -> Tuple[Difficulty, float, dict]:
+        shot = self.calculator.create_shot(*key)
+        entry = (shot.difficulty, shot.success_rate, self.calculator.get_calculation_summary(shot))
+        with self._lock:
+            self.computed += 1
+            if self.max_entries > 0:
+                self._entries[key] = entry
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def get_stats(self) -> dict:
+        """عدد الطلبات والإصابات والحسابات الفعلية والطلبات المدموجة"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "requests": self.requests,
+                "hits": self.hits,
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+            }
@@ -2,30 +2,85 @@
 محرك البلياردو الرئيسي المحسّن
 
 يجمع جميع أنظمة البلياردو الفرعية ويوفر واجهة موحدة
+
+التزامن: الكتابة (حساب، تسجيل نتيجة، استبدال التسديقات) تمر بقفل واحد،
+وبعد كل كتابة تُنشر لقطة EngineSnapshot غير قابلة للتعديل. القراءة
+(engine.shots، get_statistics، التصدير ...) تستخدم آخر لقطة بدون قفل،
+فلا تنتظر الكتابة ولا ترى حالة نصف محدثة، والكاتب لا ينتظر القراء.
 """
 
-from typing import List, Optional, Dict
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Dict, Tuple
+import copy
 import json
 from pathlib import Path
 import logging
 import sys
+import threading
 
 # إضافة مسار المشروع
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 try:
+    from backend.analytics.rollups import RollupStore
     from backend.billiards.calculator import ShotCalculator
     from backend.billiards.rail_system import RailPositionsSystem
-    from backend.models.shot import Shot
+    from backend.billiards.shot_index import Neighbor, ShotIndex, neighborhood_statistics
+    from backend.models.shot import Shot, ShotResult
     from backend.models.statistics import Statistics
+    from leaderboard import Leaderboard
+    from quantile_sketch import QuantileSketch
+    from rolling_analytics import RollingAnalytics
 except ImportError:
+    from ..analytics.rollups import RollupStore
     from .calculator import ShotCalculator
     from .rail_system import RailPositionsSystem
-    from ..models.shot import Shot
+    from .shot_index import Neighbor, ShotIndex, neighborhood_statistics
+    from ..models.shot import Shot, ShotResult
     from ..models.statistics import Statistics
+    from leaderboard import Leaderboard
+    from quantile_sketch import QuantileSketch
+    from rolling_analytics import RollingAnalytics
 
 logger = logging.getLogger(__name__)
 
+# المقاييس التي يُحفظ ملخص توزيعها لكل تسديقة
+DISTRIBUTION_METRICS = ("success_rate", "power", "angle")
+# أقصى عدد في قوائم الأفضل والأسوأ
+LEADERBOARD_SIZE = 25
+
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """
+    حالة المحرك المنشورة بعد كل كتابة - للقراءة فقط
+
+    التسديقات والإحصائيات نسخ منفصلة عن كائنات الكاتب، فتبقى اللقطة
+    متسقة مهما حدث بعدها. النسخ على الكتابة: كل كتابة تنسخ التسديقة
+    المتغيرة فقط وتشارك الباقي مع اللقطة السابقة.
+
+    نوافذ الاتجاه وملخصات التوزيع وقوائم الأفضل نسخ صغيرة (O(K)) تُنسخ
+    فقط عند تغيرها؛ الكاتب يحدّث كائناته ولا يلمس المنشور.
+    """
+    version: int
+    shots: Tuple[Shot, ...]
+    statistics: Statistics
+    trends: RollingAnalytics
+    distributions: Dict[str, QuantileSketch]
+    leaderboard: Leaderboard
+
+    def get_statistics(self) -> Dict:
+        """الإحصائيات كما كانت عند نشر اللقطة"""
+        return self.statistics.to_dict()
+
+    def shots_by_rails(self, rails: int) -> List[Shot]:
+        """التسديقات حسب عدد الجدران"""
+        return [s for s in self.shots if s.rails == rails]
+
+    def shots_by_difficulty(self, difficulty: str) -> List[Shot]:
+        """التسديقات حسب مستوى الصعوبة"""
+        return [s for s in self.shots if s.difficulty.value == difficulty]
+
 
 class BilliardsEngine:
     """
@@ -41,24 +96,112 @@ class BilliardsEngine:
         """
         self.calculator = ShotCalculator()
         self.rail_system = RailPositionsSystem()
-        self.shots: List[Shot] = []
+        # حالة الكاتب (تُعدّل تحت _write_lock فقط)؛ القراء يستخدمون snapshot()
+        self._write_lock = threading.RLock()
+        self._shots: List[Shot] = []
+        self._positions: Dict[int, int] = {}  # id(التسديقة) ← موضعها
         self.statistics = Statistics()
+        # فهرس مكاني للتسديقات المشابهة (يُحدّث مع كل تسديقة)
+        self.index = ShotIndex()
+        # نوافذ متحركة لنتائج التنفيذ (آخر 10/50/500، آخر ساعة ويوم)
+        self.trends = RollingAnalytics(time_windows=(3600, 86400))
+        # ملخصات توزيع معدل النجاح والقوة والزاوية المطلوبة (ذاكرة محدودة)
+        self.distributions = self._new_distributions()
+        # أفضل وأسوأ التسديقات حسب معدل النجاح (كلياً وحسب الجدران والصعوبة)
+        self.leaderboard = self._new_leaderboard()
+        self._snapshot = EngineSnapshot(
+            0, (), copy.deepcopy(self.statistics),
+            self.trends.copy(), self._copy_distributions(), self.leaderboard.copy(),
+        )
         
         # إعداد مسار البيانات
         if data_dir:
             self.data_dir = Path(data_dir)
         else:
             self.data_dir = Path.home() / ".billiards_pro"
-        
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # المجلد يُنشأ عند أول حفظ فيه بيانات: القراءة وحدها (مستأجر جديد) لا تنشئه
         
         self.shots_file = self.data_dir / "shots.json"
         self.stats_file = self.data_dir / "statistics.json"
+        # عدادات مجمعة لكل دقيقة/ساعة/يوم/شهر (تُحدّث مع كل كتابة)
+        self.rollups = RollupStore(self.data_dir / "rollups.json")
         
         # تحميل البيانات الموجودة
         self.load_from_storage()
         logger.info("✅ محرك البلياردو تم تهيئته")
     
+    # ---------- اللقطات ----------
+    
+    def snapshot(self) -> EngineSnapshot:
+        """
+        آخر لقطة منشورة (بدون قفل)
+        
+        استخدم نفس اللقطة لكل أجزاء الرد حتى تتسق التسديقات والإحصائيات.
+        """
+        return self._snapshot
+    
+    @property
+    def shots(self) -> Tuple[Shot, ...]:
+        """التسديقات في آخر لقطة (نسخ للقراءة فقط)"""
+        return self._snapshot.shots
+    
+    @shots.setter
+    def shots(self, shots: Iterable[Shot]) -> None:
+        self.replace_shots(shots)
+    
+    def _copy_distributions(self) -> Dict[str, QuantileSketch]:
+        return {metric: sketch.copy() for metric, sketch in self.distributions.items()}
+    
+    def _publish(self, changed: Optional[int] = None, trends: bool = False,
+                 rankings: bool = False) -> None:
+        """
+        نشر لقطة جديدة بعد كتابة - يُستدعى مع القفل
+        
+        Args:
+            changed: موضع التسديقة المضافة أو المعدلة (None = نسخ الكل)
+            trends: تغيرت نوافذ الاتجاه
+            rankings: تغيرت ملخصات التوزيع وقوائم الأفضل
+        """
+        current = self._snapshot
+        if changed is None:
+            trends = rankings = True
+        previous = current.shots
+        if changed is None:
+            shots = tuple(self._copy(s) for s in self._shots)
+        elif changed == len(previous):
+            shots = previous + (self._copy(self._shots[changed]),)
+        else:
+            shots = previous[:changed] + (self._copy(self._shots[changed]),) + previous[changed + 1:]
+        # إسناد واحد: القارئ يرى اللقطة السابقة أو الجديدة كاملة
+        self._snapshot = EngineSnapshot(
+            current.version + 1, shots, copy.deepcopy(self.statistics),
+            self.trends.copy() if trends else current.trends,
+            self._copy_distributions() if rankings else current.distributions,
+            self.leaderboard.copy() if rankings else current.leaderboard,
+        )
+    
+    @staticmethod
+    def _copy(shot: Shot) -> Shot:
+        """نسخة للقطة تحمل تسديقة الكاتب التي نُسخت منها"""
+        snapshot_copy = copy.copy(shot)
+        snapshot_copy._origin = shot
+        return snapshot_copy
+    
+    def _position(self, shot: Shot) -> int:
+        """
+        موضع تسديقة الكاتب، أو نسختها من لقطة - يُستدعى مع القفل
+        
+        الهوية فقط: تسديقات متساوية القيم (نفس المعاملات والوقت) تبقى منفصلة.
+        
+        Raises:
+            ValueError: إذا لم تكن التسديقة أو أصلها من تسديقات المحرك الحالية
+        """
+        for candidate in (shot, getattr(shot, "_origin", None)):
+            position = self._positions.get(id(candidate))
+            if position is not None and self._shots[position] is candidate:
+                return position
+        raise ValueError("التسديقة غير موجودة في المحرك")
+    
     def calculate_shot(self, rails: int, cue_position: float, white_ball: float,
                       target: float, pocket: int) -> Shot:
         """
@@ -78,33 +221,111 @@ class BilliardsEngine:
             ValueError: إذا كانت المدخلات غير صحيحة
         """
         try:
+            # الحساب نفسه لا يحتاج القفل
             shot = self.calculator.create_shot(
                 rails, cue_position, white_ball, target, pocket
             )
-            self.shots.append(shot)
-            self.statistics.total_calculations += 1
-            self.save_to_storage()
-            return shot
+            return self.add_shot(shot)
         except Exception as e:
             logger.error(f"❌ خطأ في حساب التسديقة: {e}")
             raise
     
+    def add_shot(self, shot: Shot) -> Shot:
+        """
+        حفظ تسديقة محسوبة مسبقاً (مثل نتيجة CalculationCache)
+        
+        Args:
+            shot: تسديقة جديدة لم تُضف من قبل
+        
+        Returns:
+            نفس التسديقة بعد إضافتها للفهارس والإحصائيات والتخزين
+        """
+        with self._write_lock:
+            shot_id = len(self._shots)
+            self._shots.append(shot)
+            self._positions[id(shot)] = shot_id
+            self.index.add(shot_id, shot)
+            self.rollups.add_shot(shot)
+            self._add_to_distributions(shot)
+            self._add_to_leaderboard(shot_id, shot)
+            self.statistics.total_calculations += 1
+            self._publish(shot_id, rankings=True)
+            self._save_after_write()
+        return shot
+    
+    def shot_id(self, shot: Shot) -> int:
+        """
+        رقم التسديقة (موضعها في engine.shots)
+        
+        Raises:
+            ValueError: إذا لم تكن التسديقة من هذا المحرك
+        """
+        with self._write_lock:
+            return self._position(shot)
+    
+    def record_result(self, shot_id: int, successful: bool) -> Shot:
+        """
+        تسجيل نتيجة تنفيذ التسديقة برقمها
+        
+        Args:
+            shot_id: رقم التسديقة (موضعها في engine.shots)
+            successful: هل كانت ناجحة؟
+        
+        Returns:
+            نسخة التسديقة بعد التسجيل
+        
+        Raises:
+            ValueError: إذا كانت التسديقة غير موجودة
+        """
+        with self._write_lock:
+            if not (0 <= shot_id < len(self._shots)):
+                raise ValueError("التسديقة غير موجودة")
+            self.record_execution(self._shots[shot_id], successful)
+            return self._snapshot.shots[shot_id]
+    
+    def replace_shots(self, shots: Iterable[Shot]) -> None:
+        """
+        استبدال كل التسديقات (الاستيراد) وإعادة بناء الفهارس والحفظ
+        
+        القراء يرون التسديقات القديمة حتى تُنشر اللقطة الجديدة كاملة.
+        
+        Args:
+            shots: التسديقات الجديدة
+        """
+        shots = list(shots)
+        with self._write_lock:
+            self._shots = shots
+            self._positions = {id(s): i for i, s in enumerate(shots)}
+            self.rebuild_indexes()
+            self.save_to_storage()
+    
     def record_execution(self, shot: Shot, successful: bool) -> None:
         """
         تسجيل نتيجة تنفيذ التسديقة
         
         Args:
-            shot: التسديقة
+            shot: التسديقة (المعادة من calculate_shot أو نسختها من engine.shots)
             successful: هل كانت ناجحة؟
+        
+        Raises:
+            ValueError: إذا لم تكن التسديقة من هذا المحرك
         """
         try:
-            shot.executed = True
-            self.statistics.total_shots_attempted += 1
-            
-            if successful:
-                self.statistics.total_shots_successful += 1
-            
-            self.save_to_storage()
+            with self._write_lock:
+                position = self._position(shot)
+                shot = self._shots[position]
+                previous = shot.result if shot.executed else None
+                shot.executed = True
+                shot.result = ShotResult.SUCCESSFUL if successful else ShotResult.FAILED
+                self.rollups.record_result(shot, previous)
+                self.statistics.total_shots_attempted += 1
+                
+                if successful:
+                    self.statistics.total_shots_successful += 1
+                self.trends.push(100.0 if successful else 0.0)
+                
+                self._publish(position, trends=True)
+                self._save_after_write()
             logger.info(f"✅ تم تسجيل النتيجة: {'نجاح' if successful else 'فشل'}")
         except Exception as e:
             logger.error(f"❌ خطأ في تسجيل النتيجة: {e}")
@@ -120,7 +341,7 @@ class BilliardsEngine:
         Returns:
             قائمة التسديقات
         """
-        return [s for s in self.shots if s.difficulty.value == difficulty]
+        return self._snapshot.shots_by_difficulty(difficulty)
     
     def get_shots_by_rails(self, rails: int) -> List[Shot]:
         """
@@ -132,7 +353,7 @@ class BilliardsEngine:
         Returns:
             قائمة التسديقات
         """
-        return [s for s in self.shots if s.rails == rails]
+        return self._snapshot.shots_by_rails(rails)
     
     def get_statistics(self) -> Dict:
         """
@@ -141,20 +362,225 @@ class BilliardsEngine:
         Returns:
             قاموس بالإحصائيات
         """
-        return self.statistics.to_dict()
+        return self._snapshot.get_statistics()
+    
+    def get_trends(self) -> Dict:
+        """
+        اتجاه الأداء من النوافذ المتحركة (بدون المرور على التسديقات)
+        
+        Returns:
+            قاموس بمتوسطات النوافذ و EWMA والاتجاه
+        """
+        return self._snapshot.trends.snapshot()
+    
+    @staticmethod
+    def _new_distributions() -> Dict[str, QuantileSketch]:
+        return {metric: QuantileSketch() for metric in DISTRIBUTION_METRICS}
+    
+    def _add_to_distributions(self, shot: Shot,
+                              distributions: Optional[Dict[str, QuantileSketch]] = None) -> None:
+        """تحديث ملخصات التوزيع بتسديقة واحدة"""
+        distributions = self.distributions if distributions is None else distributions
+        cue = self.calculator.calculate_cue(shot.target, shot.white_ball)
+        distributions["success_rate"].update(shot.success_rate)
+        distributions["power"].update(
+            self.calculator.calculate_power_required(shot.rails, shot.white_ball, shot.target)
+        )
+        distributions["angle"].update(
+            self.calculator.calculate_angle_required(cue, shot.white_ball)
+        )
+    
+    def _distribution(self, metric: str) -> QuantileSketch:
+        """ملخص المقياس من آخر لقطة (للقراءة فقط)"""
+        distributions = self._snapshot.distributions
+        if metric not in distributions:
+            raise ValueError(f"مقياس غير معروف: {metric} (المتاح: {', '.join(DISTRIBUTION_METRICS)})")
+        return distributions[metric]
+    
+    def get_distribution(self, metric: str, percentiles=(10, 25, 50, 75, 90)) -> Dict:
+        """
+        مئينات توزيع مقياس من ملخصه (بدون المرور على التسديقات)
+        
+        Args:
+            metric: success_rate أو power أو angle
+            percentiles: المئينات المطلوبة (0-100)
+        
+        Returns:
+            قاموس بالعدد والمدى والمئينات
+        
+        Raises:
+            ValueError: إذا كان المقياس أو المئين غير صحيح
+        """
+        for p in percentiles:
+            if not (0 <= p <= 100):
+                raise ValueError("المئين يجب أن يكون بين 0 و 100")
+        return {"metric": metric, **self._distribution(metric).summary(percentiles)}
+    
+    def get_histogram(self, metric: str, bins: int = 10, low: Optional[float] = None,
+                      high: Optional[float] = None) -> Dict:
+        """
+        مدرج تكراري تقريبي لمقياس
+        
+        Args:
+            metric: success_rate أو power أو angle
+            bins: عدد الفترات
+            low: بداية المدى (افتراضياً أصغر قيمة)
+            high: نهاية المدى (افتراضياً أكبر قيمة)
+        
+        Returns:
+            قاموس {"metric", "count", "bins"}
+        
+        Raises:
+            ValueError: إذا كان المقياس أو المدى غير صحيح
+        """
+        sketch = self._distribution(metric)
+        return {
+            "metric": metric,
+            "count": sketch.count,
+            "bins": [
+                {"low": round(b["low"], 4), "high": round(b["high"], 4), "count": b["count"]}
+                for b in sketch.histogram(bins, low, high)
+            ],
+        }
+    
+    @staticmethod
+    def _new_leaderboard() -> Leaderboard:
+        return Leaderboard(k=LEADERBOARD_SIZE, partitions=("rails", "difficulty"))
+    
+    def _add_to_leaderboard(self, shot_id: int, shot: Shot,
+                            leaderboard: Optional[Leaderboard] = None) -> None:
+        (self.leaderboard if leaderboard is None else leaderboard).add(
+            shot_id, shot.success_rate, shot, rails=shot.rails, difficulty=shot.difficulty.value,
+        )
+    
+    def get_leaderboard(self, k: int = 10, worst: bool = False, rails: Optional[int] = None,
+                        difficulty: Optional[str] = None) -> List[Dict]:
+        """
+        أفضل (أو أسوأ) k تسديقات حسب معدل النجاح بدون المرور على التسديقات
+        
+        التعادل: الأسبق حساباً أولاً.
+        
+        Args:
+            k: عدد التسديقات (1-LEADERBOARD_SIZE)
+            worst: True لأسوأ التسديقات
+            rails: تصفية حسب الجدران
+            difficulty: تصفية حسب الصعوبة
+        
+        Returns:
+            قائمة {"shot_id", "shot"}
+        
+        Raises:
+            ValueError: إذا كان k خارج النطاق أو طُلبت التصفية ببعدين
+        """
+        snapshot = self._snapshot
+        shots = snapshot.shots
+        select = snapshot.leaderboard.worst if worst else snapshot.leaderboard.best
+        # العرض من اللقطة (القائمة تحمل تسديقات الكاتب)
+        return [
+            {"shot_id": shot_id, "shot": shots[shot_id].to_dict()}
+            for _, shot_id, _ in select(k, rails=rails, difficulty=difficulty)
+            if shot_id < len(shots)
+        ]
+    
+    def export_distributions(self) -> Dict[str, dict]:
+        """الملخصات بصيغة JSON لدمجها مع ملخصات عمليات أو أجهزة أخرى"""
+        return {metric: sketch.to_dict() for metric, sketch in self._snapshot.distributions.items()}
+    
+    def rebuild_indexes(self, rollups: bool = True) -> None:
+        """
+        إعادة بناء الفهرس المكاني ونوافذ الاتجاه وملخصات التوزيع وقوائم الأفضل وجداول التجميع بعد استبدال التسديقات
+        
+        وقت التنفيذ غير محفوظ في التسديقة، فتُرتب النتائج حسب وقت الحساب.
+        كل بنية تُبنى جديدة ثم تُستبدل بإسناد واحد، فلا يرى القراء بنية نصف مبنية.
+        
+        Args:
+            rollups: إعادة بناء جداول التجميع أيضاً (False إذا حُملت من الملف)
+        """
+        with self._write_lock:
+            self.index.rebuild(self._shots)
+            if rollups:
+                self.rollups.rebuild(self._shots)
+            distributions = self._new_distributions()
+            leaderboard = self._new_leaderboard()
+            for shot_id, shot in enumerate(self._shots):
+                self._add_to_distributions(shot, distributions)
+                self._add_to_leaderboard(shot_id, shot, leaderboard)
+            self.distributions, self.leaderboard = distributions, leaderboard
+            trends = RollingAnalytics(time_windows=(3600, 86400))
+            executed = sorted(
+                (s for s in self._shots if s.executed and s.result is not None),
+                key=lambda s: s.timestamp,
+            )
+            for shot in executed:
+                trends.push(
+                    100.0 if shot.result == ShotResult.SUCCESSFUL else 0.0,
+                    timestamp=shot.timestamp.timestamp(),
+                )
+            self.trends = trends
+            self._publish()
+    
+    def find_similar(self, white_ball: float, target: float, cue_position: float,
+                     rails: Optional[int] = None, k: int = 10,
+                     radius: Optional[float] = None) -> Dict:
+        """
+        التسديقات السابقة المشابهة وإحصائيات نتائجها
+        
+        Args:
+            white_ball: موضع الكرة البيضاء (0-10)
+            target: موضع الهدف (0-10)
+            cue_position: موضع العصا (0-10)
+            rails: عدد الجدران (None = كل الجدران)
+            k: أقصى عدد للجيران المعادين
+            radius: نصف قطر البحث (None = أقرب k بدون حد للمسافة)
+        
+        Returns:
+            قاموس {"neighbors", "statistics"}
+        
+        Raises:
+            ValueError: إذا كانت المدخلات غير صحيحة
+        """
+        if radius is None:
+            neighbors = self.index.knn(white_ball, target, cue_position, rails, k)
+        else:
+            # الإحصائيات لكل الجوار، والقائمة المعادة لأقرب k فقط
+            neighbors = self.index.radius(white_ball, target, cue_position, radius, rails)
+        # الفهرس يحمل تسديقات الكاتب؛ النتائج والإحصائيات من اللقطة
+        shots = self._snapshot.shots
+        neighbors = [
+            Neighbor(n.shot_id, n.distance, shots[n.shot_id])
+            for n in neighbors if n.shot_id < len(shots)
+        ]
+        return {
+            "neighbors": [n.to_dict() for n in neighbors[:k]],
+            "statistics": neighborhood_statistics(neighbors),
+        }
     
     def save_to_storage(self) -> None:
-        """حفظ البيانات في التخزين المحلي"""
+        """حفظ البيانات في التخزين المحلي (كل الجداول، عند الطرد أو الإيقاف)"""
+        self._save(self.rollups.flush)
+    
+    def _save_after_write(self) -> None:
+        """الحفظ بعد كتابة واحدة: جداول التجميع بعد دفعة من الكتابات أو مهلة فقط"""
+        self._save(self.rollups.maybe_save)
+    
+    def _save(self, save_rollups) -> None:
         try:
+            # من آخر لقطة: التسديقات والإحصائيات متسقة حتى لو استُدعي بدون القفل
+            snapshot = self._snapshot
+            if not snapshot.shots and not self.data_dir.exists():
+                return
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            
             # حفظ التسديقات
-            shots_data = [s.to_dict() for s in self.shots]
+            shots_data = [s.to_dict() for s in snapshot.shots]
             with open(self.shots_file, 'w', encoding='utf-8') as f:
                 json.dump(shots_data, f, ensure_ascii=False, indent=2)
             
             # حفظ الإحصائيات
             with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.statistics.to_dict(), f, ensure_ascii=False, indent=2)
+                json.dump(snapshot.get_statistics(), f, ensure_ascii=False, indent=2)
             
+            save_rollups()
             logger.debug("✅ تم حفظ البيانات")
         except Exception as e:
             logger.error(f"❌ خطأ في حفظ البيانات: {e}")
@@ -168,11 +594,14 @@ class BilliardsEngine:
                 with open(self.shots_file, 'r', encoding='utf-8') as f:
                     try:
                         shots_data = json.load(f)
-                        self.shots = [Shot.from_dict(s) for s in shots_data]
-                        logger.info(f"✅ تم تحميل {len(self.shots)} تسديقة")
+                        shots = [Shot.from_dict(s) for s in shots_data]
+                        with self._write_lock:
+                            self._shots = shots
+                            self._positions = {id(s): i for i, s in enumerate(shots)}
+                            self.rebuild_indexes(rollups=not self.rollups.load(len(shots)))
+                        logger.info(f"✅ تم تحميل {len(shots)} تسديقة")
                     except json.JSONDecodeError as e:
                         logger.warning(f"⚠️ خطأ في قراءة ملف التسديقات: {e}")
-                        self.shots = []
             
             # تحميل الإحصائيات
             if self.stats_file.exists():
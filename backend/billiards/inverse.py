@@ -0,0 +1,276 @@
+"""
+الحل العكسي للتسديقات (Inverse Solver)
+
+ShotCalculator يحسب التسديقة من المدخلات؛ هذا الملف يجيب على السؤال
+المعاكس: من موضع الكرة البيضاء والهدف، ما هو عدد الجدران وموضع العصا
+اللذان يصلان للجيب بأعلى معدل نجاح؟
+
+بدلاً من تجربة كل (جدران، موضع) عبر create_shot، يُبنى فهرس عكسي مرة
+واحدة لكل حاسبة:
+- لكل عدد جدران: مصفوفة الزوايا على شبكة الدايمند مرتبة (الزاوية دالة
+  متزايدة في الموضع)، فموضع العصا المطلوب لزاوية معينة = بحث ثنائي
+  ثم استيفاء خطي داخل القطعة
+- حدود الصعوبة كدالة في المسافة: تُستخرج بالتنصيف على calculate_difficulty
+  نفسها حتى دقة float، فيصبح تصنيف الصعوبة بحثاً ثنائياً متطابقاً تماماً
+  مع الحاسبة
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+
+try:
+    from backend.models.shot import Difficulty, Shot
+    from backend.billiards.calculator import ShotCalculator
+except ImportError:
+    from ..models.shot import Difficulty, Shot
+    from .calculator import ShotCalculator
+
+logger = logging.getLogger(__name__)
+
+RAILS_RANGE = (1, 2, 3, 4)
+DIFFICULTY_LEVELS = (
+    Difficulty.EASY,
+    Difficulty.MEDIUM,
+    Difficulty.HARD,
+    Difficulty.VERY_HARD,
+    Difficulty.EXTREME,
+)
+
+
+@dataclass(frozen=True)
+class ShotSetup:
+    """إعداد مقترح للوصول إلى الجيب"""
+    rails: int
+    cue_position: float  # الموضع الدقيق على الدايمند الذي يعطي الزاوية المطلوبة
+    diamond: float  # أقرب علامة على شبكة الدايمند
+    angle: float  # الزاوية المطلوبة بالدرجات
+    angle_error: float  # فرق الزاوية عند التصويب على العلامة بدلاً من الموضع الدقيق
+    difficulty: str
+    success_rate: float
+    power: float
+    white_ball: float
+    target: float
+    pocket: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_shot(self) -> Shot:
+        """تحويل الإعداد إلى تسديقة (نفس نتيجة create_shot)"""
+        return Shot(
+            rails=self.rails,
+            cue_position=self.cue_position,
+            white_ball=self.white_ball,
+            target=self.target,
+            pocket=self.pocket,
+            difficulty=Difficulty(self.difficulty),
+            success_rate=self.success_rate,
+        )
+
+
+def _bisect_threshold(predicate, low: float, high: float) -> float:
+    """
+    أصغر قيمة float في [low, high] تحقق predicate (دالة رتيبة)
+
+    التنصيف يستمر حتى تتجاور القيمتان في تمثيل float، فالحد الناتج
+    مطابق تماماً لمقارنات الصيغة الأصلية.
+    """
+    if not predicate(high):
+        return math.inf
+    if predicate(low):
+        return low
+    while math.nextafter(low, high) < high:
+        middle = low + (high - low) / 2
+        if predicate(middle):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+class InverseSolver:
+    """
+    فهرس عكسي فوق شبكة الدايمند للإجابة على استعلامات "أفضل K إعدادات"
+
+    الفهرس يُبنى من الحاسبة ونظام الجدران المعطيين؛ المواضع المخصصة
+    التي تُضاف لاحقاً تتطلب بناء فهرس جديد.
+    """
+
+    def __init__(self, calculator: Optional[ShotCalculator] = None, resolution: float = 0.1):
+        """
+        Args:
+            calculator: الحاسبة المستخدمة (افتراضياً ShotCalculator جديدة)
+            resolution: المسافة بين علامات شبكة الدايمند
+
+        Raises:
+            ValueError: إذا كانت الدقة غير صحيحة أو الزوايا غير رتيبة
+        """
+        if not (0 < resolution <= 10):
+            raise ValueError("دقة الشبكة يجب أن تكون بين 0 و 10")
+        self.calculator = calculator or ShotCalculator()
+        self.resolution = resolution
+        self.grid: List[float] = [
+            round(i * resolution, 6) for i in range(int(round(10 / resolution)) + 1)
+        ]
+        if self.grid[-1] < 10:
+            self.grid.append(10.0)
+
+        self._positions: Dict[int, List[float]] = {}
+        self._angles: Dict[int, List[float]] = {}
+        self._grid_angles: Dict[int, List[float]] = {}
+        self._difficulty_breaks: Dict[int, List[float]] = {}
+        self._rates: Dict[int, List[float]] = {}
+        for rails in RAILS_RANGE:
+            self._index_angles(rails)
+            self._index_difficulty(rails)
+        logger.info(f"✅ الفهرس العكسي تم بناؤه: {len(self.grid)} علامة لكل عدد جدران")
+
+    def _index_angles(self, rails: int) -> None:
+        """الزاوية عند كل علامة وعند نقاط الجدول الأصلية (فالاستيفاء دقيق)"""
+        rail_system = self.calculator.rail_system
+        knots = set(self.grid) | set(rail_system.RAIL_POSITIONS[rails])
+        knots |= set(rail_system.custom_positions.get(rails, {}))
+        positions = sorted(p for p in knots if 0 <= p <= 10)
+        angles = [float(rail_system.get_position(rails, p).angle) for p in positions]
+        if any(b < a for a, b in zip(angles, angles[1:])):
+            raise ValueError(f"زوايا {rails} جدران غير رتيبة؛ لا يمكن بناء فهرس عكسي")
+        self._positions[rails] = positions
+        self._angles[rails] = angles
+        self._grid_angles[rails] = [angles[bisect_left(positions, p)] for p in self.grid]
+
+    def _index_difficulty(self, rails: int) -> None:
+        """حدود المسافة التي تتغير عندها الصعوبة، بالتنصيف على الحاسبة"""
+        calculate = self.calculator.calculate_difficulty
+        breaks = []
+        for level in range(1, len(DIFFICULTY_LEVELS)):
+            reached = DIFFICULTY_LEVELS[level:]
+            breaks.append(_bisect_threshold(
+                lambda d: calculate(rails, d, 0.0) in reached, 0.0, 10.0,
+            ))
+        self._difficulty_breaks[rails] = breaks
+        self._rates[rails] = [
+            self.calculator.calculate_success_rate(rails, level) for level in DIFFICULTY_LEVELS
+        ]
+
+    def required_angle(self, white_ball: float, target: float) -> float:
+        """الزاوية المطلوبة حسب صيغة الحاسبة (Cue = Target + White Ball)"""
+        cue = self.calculator.calculate_cue(target, white_ball)
+        return self.calculator.calculate_angle_required(cue, white_ball)
+
+    def cue_position_for(self, rails: int, angle: float) -> Tuple[float, float, float]:
+        """
+        موضع العصا الذي يعطي الزاوية على عدد جدران معين
+
+        Args:
+            rails: عدد الجدران (1-4)
+            angle: الزاوية المطلوبة (0-180)
+
+        Returns:
+            (الموضع الدقيق، أقرب علامة على الشبكة، فرق الزاوية عند العلامة)
+        """
+        positions, angles = self._positions[rails], self._angles[rails]
+        index = bisect_left(angles, angle)
+        if index == 0:
+            position = positions[0]
+        elif index == len(angles):
+            position = positions[-1]
+        else:
+            a0, a1 = angles[index - 1], angles[index]
+            p0, p1 = positions[index - 1], positions[index]
+            position = p1 if a1 == a0 else p0 + (p1 - p0) * (angle - a0) / (a1 - a0)
+
+        grid_angles = self._grid_angles[rails]
+        mark = bisect_left(grid_angles, angle)
+        if mark == len(grid_angles) or (mark > 0 and angle - grid_angles[mark - 1] <= grid_angles[mark] - angle):
+            mark -= 1
+        return position, self.grid[mark], abs(grid_angles[mark] - angle)
+
+    def difficulty_for(self, rails: int, white_ball: float, target: float) -> Tuple[Difficulty, float]:
+        """
+        الصعوبة ومعدل النجاح (مطابقان لـ calculate_difficulty و calculate_success_rate)
+
+        Returns:
+            (الصعوبة، معدل النجاح)
+        """
+        level = bisect_right(self._difficulty_breaks[rails], max(target, white_ball))
+        return DIFFICULTY_LEVELS[level], self._rates[rails][level]
+
+    def best_setups(self, white_ball: float, target: float, pocket: int, k: int = 3,
+                    max_rails: int = 4, min_success_rate: float = 0.0) -> List[ShotSetup]:
+        """
+        أفضل K إعدادات للوصول للجيب
+
+        الترتيب: معدل النجاح تنازلياً، ثم الأقل جدراناً، ثم الأقل خطأ زاوية.
+
+        Args:
+            white_ball: موضع الكرة البيضاء (0-10)
+            target: موضع الهدف (0-10)
+            pocket: موضع الجيب (0-5)
+            k: عدد الإعدادات المطلوبة
+            max_rails: أقصى عدد جدران مقبول (1-4)
+            min_success_rate: استبعاد الإعدادات الأقل من هذا المعدل
+
+        Returns:
+            قائمة ShotSetup مرتبة من الأفضل
+
+        Raises:
+            ValueError: إذا كانت المدخلات خارج النطاق المسموح
+        """
+        if not (0 <= pocket <= 5):
+            raise ValueError("موضع الجيب يجب أن يكون بين 0 و 5")
+        if not (1 <= max_rails <= 4):
+            raise ValueError("عدد الجدران يجب أن يكون بين 1 و 4")
+        if k < 1:
+            raise ValueError("عدد الإعدادات يجب أن يكون 1 على الأقل")
+
+        angle = self.required_angle(white_ball, target)
+        setups = []
+        for rails in RAILS_RANGE[:max_rails]:
+            difficulty, rate = self.difficulty_for(rails, white_ball, target)
+            if rate < min_success_rate:
+                continue
+            position, diamond, error = self.cue_position_for(rails, angle)
+            setups.append(ShotSetup(
+                rails=rails,
+                cue_position=round(position, 4),
+                diamond=diamond,
+                angle=angle,
+                angle_error=round(error, 4),
+                difficulty=difficulty.value,
+                success_rate=rate,
+                power=round(self.calculator.calculate_power_required(rails, white_ball, target), 1),
+                white_ball=white_ball,
+                target=target,
+                pocket=pocket,
+            ))
+
+        setups.sort(key=lambda s: (-s.success_rate, s.rails, s.angle_error))
+        return setups[:k]
+
+
+def brute_force_setups(calculator: ShotCalculator, white_ball: float, target: float, pocket: int,
+                       k: int = 3, resolution: float = 0.1) -> List[Tuple[int, float, float]]:
+    """
+    المرجع البطيء: تجربة كل (جدران، علامة) عبر create_shot
+
+    تُستخدم في الاختبارات والقياسات للتحقق من الفهرس.
+
+    Returns:
+        قائمة (الجدران، أقرب علامة، معدل النجاح) مرتبة مثل best_setups
+    """
+    angle = calculator.calculate_angle_required(calculator.calculate_cue(target, white_ball), white_ball)
+    marks = [round(i * resolution, 6) for i in range(int(round(10 / resolution)) + 1)]
+    candidates = []
+    for rails in RAILS_RANGE:
+        best = None
+        for mark in marks:
+            shot = calculator.create_shot(rails, mark, white_ball, target, pocket)
+            error = abs(calculator.rail_system.get_position(rails, mark).angle - angle)
+            if best is None or error < best[0]:
+                best = (error, mark, shot.success_rate)
+        candidates.append((rails, best[1], best[2], best[0]))
+    candidates.sort(key=lambda c: (-c[2], c[0], c[3]))
+    return [(rails, mark, rate) for rails, mark, rate, _ in candidates[:k]]
@@ -0,0 +1,257 @@
+"""
+سجل المحركات متعدد المستأجرين (لاعب أو طاولة)
+
+محرك واحد لكل مستأجر، يُحمّل من مجلده عند أول طلب ويبقى في ذاكرة LRU
+محدودة بعدد المحركات وبميزانية ذاكرة تقديرية:
+- الاستخدام داخل acquire() يثبّت المحرك فلا يُطرد أثناء الطلب
+- عند تجاوز الميزانية يُطرد الأقدم استخداماً من غير المثبتين بعد حفظه
+- طلب يصل أثناء حفظ محرك مطرود يستعيد نفس الكائن بدلاً من قراءة ملف
+  لم يكتمل حفظه، والتحميل المتزامن لنفس المستأجر يتم مرة واحدة
+  (SingleFlight)
+
+فتبقى الذاكرة ثابتة تقريباً مهما زاد عدد المستأجرين.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import logging
+import re
+import threading
+
+try:
+    from backend.billiards.engine import BilliardsEngine
+    from backend.services.singleflight import SingleFlight
+except ImportError:
+    from .engine import BilliardsEngine
+    from ..services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+TENANT_PREFIX = "/api/v1/tenants/"
+TENANT_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# تقدير الذاكرة: محرك فارغ (شبكة الفهرس المكاني أساساً) + كلفة كل تسديقة
+# (التسديقة ونسختها في اللقطة وفهارسها)، مقاسة بـ tracemalloc
+ENGINE_BASE_BYTES = 2_500_000
+SHOT_BYTES = 1_000
+
+
+def validate_tenant(tenant: str) -> str:
+    """
+    التحقق من معرف المستأجر (يُستخدم كاسم مجلد)
+
+    Raises:
+        ValueError: إذا احتوى على غير الحروف والأرقام و _ و -
+    """
+    if not TENANT_PATTERN.match(tenant or ""):
+        raise ValueError("معرف المستأجر يجب أن يكون 1-64 حرفاً من A-Z و 0-9 و _ و -")
+    return tenant
+
+
+def split_tenant_path(path: str) -> Tuple[str, str]:
+    """
+    فصل المستأجر عن المسار: /api/v1/tenants/<t>/shots ← (t، /api/v1/shots)
+
+    المسارات بدون البادئة تعود للمستأجر الافتراضي.
+
+    Raises:
+        ValueError: إذا كان معرف المستأجر غير صحيح
+    """
+    if not path.startswith(TENANT_PREFIX):
+        return DEFAULT_TENANT, path
+    tenant, _, rest = path[len(TENANT_PREFIX):].partition("/")
+    return validate_tenant(tenant), "/api/v1/" + rest
+
+
+def estimated_bytes(engine: BilliardsEngine) -> int:
+    """الذاكرة التقديرية لمحرك محمّل"""
+    return ENGINE_BASE_BYTES + len(engine.shots) * SHOT_BYTES
+
+
+class EngineRegistry:
+    """
+    محركات المستأجرين مع تحميل كسول وطرد LRU
+
+    المستأجر الافتراضي يستخدم default_dir (مجلد المحرك الوحيد سابقاً)،
+    والباقي base_dir/<المستأجر>.
+    """
+
+    def __init__(self, base_dir: str, max_engines: int = 32, memory_budget_mb: float = 256,
+                 default_dir: Optional[str] = None,
+                 factory: Optional[Callable[[str], BilliardsEngine]] = None):
+        """
+        Args:
+            base_dir: مجلد بيانات المستأجرين
+            max_engines: أقصى عدد محركات في الذاكرة
+            memory_budget_mb: ميزانية الذاكرة التقديرية بالميغابايت
+            default_dir: مجلد المستأجر الافتراضي (افتراضياً base_dir/default)
+            factory: إنشاء محرك من مسار مجلده (افتراضياً BilliardsEngine)
+
+        Raises:
+            ValueError: إذا كانت الحدود غير صحيحة
+        """
+        if max_engines < 1 or memory_budget_mb <= 0:
+            raise ValueError("حدود السجل يجب أن تكون موجبة")
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.default_dir = Path(default_dir) if default_dir else self.base_dir / DEFAULT_TENANT
+        self.max_engines = max_engines
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._factory = factory or (lambda data_dir: BilliardsEngine(data_dir=data_dir))
+
+        self._lock = threading.Lock()
+        self._engines: "OrderedDict[str, BilliardsEngine]" = OrderedDict()  # الأقدم أولاً
+        self._pins: Dict[str, int] = {}
+        self._evicting: Dict[str, BilliardsEngine] = {}  # مطرودة قيد الحفظ
+        self._loads = SingleFlight()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def data_dir(self, tenant: str) -> Path:
+        """مجلد بيانات المستأجر"""
+        if tenant == DEFAULT_TENANT:
+            return self.default_dir
+        return self.base_dir / validate_tenant(tenant)
+
+    # ---------- التثبيت ----------
+
+    def _lookup(self, tenant: str) -> Optional[BilliardsEngine]:
+        """محرك في الذاكرة أو قيد الحفظ (يُستعاد) - يُستدعى مع القفل"""
+        engine = self._engines.get(tenant)
+        if engine is None:
+            engine = self._evicting.pop(tenant, None)
+            if engine is None:
+                return None
+            self._engines[tenant] = engine
+        self._engines.move_to_end(tenant)
+        return engine
+
+    def _load(self, tenant: str) -> None:
+        with self._lock:
+            if self._lookup(tenant) is not None:
+                return
+        # القراءة من القرص خارج القفل: المستأجرون الآخرون لا ينتظرون
+        engine = self._factory(str(self.data_dir(tenant)))
+        with self._lock:
+            if self._lookup(tenant) is None:
+                self._engines[tenant] = engine
+                self.loads += 1
+        logger.info(f"✅ تم تحميل محرك المستأجر {tenant}: {len(engine.shots)} تسديقة")
+
+    def _pin(self, tenant: str) -> BilliardsEngine:
+        validate_tenant(tenant)
+        loaded = False
+        while True:
+            with self._lock:
+                engine = self._lookup(tenant)
+                if engine is not None:
+                    self._pins[tenant] = self._pins.get(tenant, 0) + 1
+                    if not loaded:
+                        self.hits += 1
+                    return engine
+            # قد يُطرد قبل التثبيت إذا امتلأت الميزانية؛ المحاولة التالية تستعيده
+            self._loads.do(tenant, lambda: self._load(tenant))
+            loaded = True
+
+    def _unpin(self, tenant: str) -> None:
+        with self._lock:
+            remaining = self._pins[tenant] - 1
+            if remaining:
+                self._pins[tenant] = remaining
+            else:
+                del self._pins[tenant]
+
+    @contextmanager
+    def acquire(self, tenant: str = DEFAULT_TENANT) -> Iterator[BilliardsEngine]:
+        """
+        محرك المستأجر مثبتاً طوال الكتلة
+
+        Args:
+            tenant: معرف المستأجر
+
+        Raises:
+            ValueError: إذا كان معرف المستأجر غير صحيح
+        """
+        engine = self._pin(tenant)
+        try:
+            yield engine
+        finally:
+            self._unpin(tenant)
+            self._enforce_budget()
+
+    # ---------- الطرد ----------
+
+    def _over_budget(self) -> bool:
+        if len(self._engines) <= 1:
+            return False  # الأحدث يبقى دائماً حتى لو تجاوز الميزانية وحده
+        if len(self._engines) > self.max_engines:
+            return True
+        return sum(estimated_bytes(e) for e in self._engines.values()) > self.memory_budget
+
+    def _enforce_budget(self) -> None:
+        """طرد الأقدم استخداماً من غير المثبتين حتى العودة تحت الحدود"""
+        victims = []
+        with self._lock:
+            for tenant in list(self._engines):
+                if not self._over_budget():
+                    break
+                if tenant in self._pins:
+                    continue
+                engine = self._engines.pop(tenant)
+                self._evicting[tenant] = engine
+                victims.append((tenant, engine))
+        for tenant, engine in victims:
+            self._flush(tenant, engine)
+
+    def _flush(self, tenant: str, engine: BilliardsEngine) -> None:
+        try:
+            engine.save_to_storage()
+            logger.info(f"✅ تم طرد محرك المستأجر {tenant} بعد حفظه")
+        except Exception as e:
+            logger.error(f"❌ فشل حفظ محرك المستأجر {tenant}: {e}")
+        finally:
+            with self._lock:
+                if self._evicting.get(tenant) is engine:
+                    del self._evicting[tenant]
+                self.evictions += 1
+
+    def flush_all(self) -> None:
+        """حفظ كل المحركات في الذاكرة (عند الإيقاف)"""
+        with self._lock:
+            engines = list(self._engines.items())
+        saved = 0
+        for tenant, engine in engines:
+            try:
+                engine.save_to_storage()
+                saved += 1
+            except Exception as e:
+                logger.error(f"❌ فشل حفظ محرك المستأجر {tenant}: {e}")
+        logger.info(f"✅ تم حفظ {saved} محرك من {len(engines)}")
+
+    # ---------- المراقبة ----------
+
+    def __contains__(self, tenant: str) -> bool:
+        with self._lock:
+            return tenant in self._engines
+
+    def get_stats(self) -> dict:
+        """إحصائيات السجل (المحركات المقيمة والذاكرة والطرد)"""
+        with self._lock:
+            resident = {tenant: len(e.shots) for tenant, e in self._engines.items()}
+            memory = sum(estimated_bytes(e) for e in self._engines.values())
+            pinned = len(self._pins)
+        return {
+            "resident": len(resident),
+            "pinned": pinned,
+            "max_engines": self.max_engines,
+            "estimated_mb": round(memory / 1024 / 1024, 2),
+            "memory_budget_mb": round(self.memory_budget / 1024 / 1024, 2),
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "tenants": resident,
+        }
@@ -0,0 +1,263 @@
+"""
+فهرس مكاني للتسديقات المسجلة (أقرب الجيران)
+
+عند إعداد تسديقة نعرض التسديقات السابقة المشابهة ونتائجها. بدلاً من
+المرور على engine.shots كاملة، تُوزع التسديقات على شبكة منتظمة منفصلة
+لكل عدد جدران فوق فضاء (الكرة البيضاء، الهدف، موضع العصا):
+- الإضافة O(1): التسديقة تُلحق بخليتها عند حسابها
+- k أقرب جيران: البحث يتوسع حلقة بعد حلقة حول خلية الاستعلام ويتوقف
+  عندما تصبح أقرب نقطة ممكنة في الحلقة التالية أبعد من الجار رقم k
+- البحث بنصف قطر: فقط الخلايا التي يتقاطع معها المكعب المحيط بالكرة
+
+القراءة آمنة مع الإضافة المتزامنة: الخلايا تنمو بالإلحاق فقط، وإعادة
+البناء تستبدل الشبكة كاملة دفعة واحدة.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import logging
+import math
+
+try:
+    from backend.models.shot import Shot, ShotResult
+except ImportError:
+    from ..models.shot import Shot, ShotResult
+
+logger = logging.getLogger(__name__)
+
+RAILS_RANGE = (1, 2, 3, 4)
+AXIS_MAX = 10.0
+
+
+@dataclass
+class Neighbor:
+    """جار واحد في نتيجة البحث"""
+    shot_id: int
+    distance: float
+    shot: Shot
+
+    def to_dict(self) -> dict:
+        return {
+            "shot_id": self.shot_id,
+            "distance": round(self.distance, 4),
+            "shot": self.shot.to_dict(),
+        }
+
+
+def neighborhood_statistics(neighbors: List[Neighbor]) -> dict:
+    """
+    إحصائيات نجاح الجوار
+
+    Args:
+        neighbors: نتيجة knn أو radius
+
+    Returns:
+        قاموس بالعدد والمنفذ والناجح ومعدل النجاح الفعلي والمتوقع
+    """
+    executed = [n.shot for n in neighbors if n.shot.executed and n.shot.result is not None]
+    successful = sum(1 for s in executed if s.result == ShotResult.SUCCESSFUL)
+    count = len(neighbors)
+    return {
+        "count": count,
+        "executed": len(executed),
+        "successful": successful,
+        "success_rate": round(successful / len(executed) * 100, 2) if executed else None,
+        "expected_success_rate": (
+            round(sum(n.shot.success_rate for n in neighbors) / count, 2) if count else None
+        ),
+        "mean_distance": round(sum(n.distance for n in neighbors) / count, 4) if count else None,
+    }
+
+
+class ShotIndex:
+    """
+    شبكة منتظمة لكل عدد جدران فوق (white_ball، target، cue_position)
+
+    المسافة إقليدية في الأبعاد الثلاثة؛ عدد الجدران يُطابق تماماً
+    (أو يُبحث في كل الشبكات عند rails=None).
+    """
+
+    def __init__(self, cell_size: float = 0.25):
+        """
+        Args:
+            cell_size: طول ضلع الخلية (أصغر = خلايا أقل ازدحاماً وأكثر عدداً)
+
+        Raises:
+            ValueError: إذا كان حجم الخلية غير صحيح
+        """
+        if not (0 < cell_size <= AXIS_MAX):
+            raise ValueError("حجم الخلية يجب أن يكون بين 0 و 10")
+        self.cell_size = cell_size
+        self.cells_per_axis = int(math.ceil(AXIS_MAX / cell_size)) + 1
+        self._grids: Dict[int, List[Optional[list]]] = {}
+        self._size = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        total = self.cells_per_axis ** 3
+        self._grids = {rails: [None] * total for rails in RAILS_RANGE}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _axis_cell(self, value: float) -> int:
+        return min(int(value / self.cell_size), self.cells_per_axis - 1)
+
+    def _cell_key(self, i: int, j: int, k: int) -> int:
+        n = self.cells_per_axis
+        return (i * n + j) * n + k
+
+    def add(self, shot_id: int, shot: Shot) -> None:
+        """
+        إضافة تسديقة للفهرس
+
+        Args:
+            shot_id: رقم التسديقة (موضعها في engine.shots)
+            shot: التسديقة (يُحتفظ بالمرجع فتظهر نتيجة التنفيذ لاحقاً)
+        """
+        key = self._cell_key(
+            self._axis_cell(shot.white_ball),
+            self._axis_cell(shot.target),
+            self._axis_cell(shot.cue_position),
+        )
+        grid = self._grids[shot.rails]
+        cell = grid[key]
+        if cell is None:
+            cell = grid[key] = []
+        cell.append((shot.white_ball, shot.target, shot.cue_position, shot_id, shot))
+        self._size += 1
+
+    def rebuild(self, shots: Iterable[Shot]) -> None:
+        """
+        إعادة بناء الفهرس بالكامل (بعد التحميل أو الاستيراد)
+
+        Args:
+            shots: التسديقات بترتيب أرقامها
+        """
+        fresh = ShotIndex(self.cell_size)
+        for shot_id, shot in enumerate(shots):
+            fresh.add(shot_id, shot)
+        self._grids, self._size = fresh._grids, fresh._size
+        logger.info(f"✅ فهرس التسديقات المشابهة: {self._size} تسديقة")
+
+    def _ring(self, center: Tuple[int, int, int], radius: int):
+        """مفاتيح الخلايا على بعد (Chebyshev) يساوي radius بالضبط داخل الشبكة"""
+        n = self.cells_per_axis
+        ci, cj, ck = center
+        for i in range(max(ci - radius, 0), min(ci + radius, n - 1) + 1):
+            edge_i = abs(i - ci) == radius
+            for j in range(max(cj - radius, 0), min(cj + radius, n - 1) + 1):
+                if edge_i or abs(j - cj) == radius:
+                    for k in range(max(ck - radius, 0), min(ck + radius, n - 1) + 1):
+                        yield (i * n + j) * n + k
+                else:
+                    # داخل الحلقة: الوجهان فقط على محور k
+                    for k in (ck - radius, ck + radius):
+                        if 0 <= k < n:
+                            yield (i * n + j) * n + k
+
+    def _knn(self, grids: List[List[Optional[list]]], point: Tuple[float, float, float],
+             k: int) -> List[Tuple[float, int, Shot]]:
+        x, y, z = point
+        center = (self._axis_cell(x), self._axis_cell(y), self._axis_cell(z))
+        # أقرب مسافة من نقطة الاستعلام لحدود خليتها
+        edge = min(
+            min(v - c * self.cell_size, (c + 1) * self.cell_size - v)
+            for v, c in zip(point, center)
+        )
+        edge = max(edge, 0.0)
+
+        best: List[Tuple[float, int, Shot]] = []  # (المسافة²، الرقم، التسديقة)
+        for radius in range(self.cells_per_axis):
+            found = []
+            for key in self._ring(center, radius):
+                for grid in grids:
+                    cell = grid[key]
+                    if cell is not None:
+                        found.extend([
+                            ((wx - x) ** 2 + (ty - y) ** 2 + (cz - z) ** 2, shot_id, shot)
+                            for wx, ty, cz, shot_id, shot in cell
+                        ])
+            if found:
+                best = heapq.nsmallest(k, best + found)
+            # كل نقطة خارج الحلقات المفحوصة أبعد من هذا الحد
+            bound = radius * self.cell_size + edge
+            if len(best) == k and best[-1][0] <= bound * bound:
+                break
+        return best
+
+    def knn(self, white_ball: float, target: float, cue_position: float,
+            rails: Optional[int] = None, k: int = 10) -> List[Neighbor]:
+        """
+        أقرب k تسديقات
+
+        Args:
+            white_ball: موضع الكرة البيضاء (0-10)
+            target: موضع الهدف (0-10)
+            cue_position: موضع العصا (0-10)
+            rails: عدد الجدران (None = كل الجدران)
+            k: عدد الجيران
+
+        Returns:
+            قائمة Neighbor مرتبة من الأقرب (التعادل حسب الرقم)
+
+        Raises:
+            ValueError: إذا كانت المدخلات خارج النطاق المسموح
+        """
+        point = self._validate(white_ball, target, cue_position, rails)
+        if k < 1:
+            raise ValueError("عدد الجيران يجب أن يكون 1 على الأقل")
+        grids = [self._grids[r] for r in ([rails] if rails else RAILS_RANGE)]
+        return [
+            Neighbor(shot_id, math.sqrt(d2), shot)
+            for d2, shot_id, shot in self._knn(grids, point, k)
+        ]
+
+    def radius(self, white_ball: float, target: float, cue_position: float,
+               radius: float, rails: Optional[int] = None, limit: Optional[int] = None) -> List[Neighbor]:
+        """
+        كل التسديقات ضمن مسافة radius
+
+        Args:
+            radius: نصف القطر
+            limit: أقصى عدد (الأقرب أولاً)
+
+        Returns:
+            قائمة Neighbor مرتبة من الأقرب
+        """
+        x, y, z = self._validate(white_ball, target, cue_position, rails)
+        if radius < 0:
+            raise ValueError("نصف القطر يجب أن يكون موجباً")
+        low = [self._axis_cell(max(v - radius, 0.0)) for v in (x, y, z)]
+        high = [self._axis_cell(min(v + radius, AXIS_MAX)) for v in (x, y, z)]
+        r2 = radius * radius
+
+        found = []
+        for r in ([rails] if rails else RAILS_RANGE):
+            grid = self._grids[r]
+            for i in range(low[0], high[0] + 1):
+                for j in range(low[1], high[1] + 1):
+                    for k in range(low[2], high[2] + 1):
+                        cell = grid[self._cell_key(i, j, k)]
+                        if cell is None:
+                            continue
+                        for wx, ty, cz, shot_id, shot in cell:
+                            d2 = (wx - x) ** 2 + (ty - y) ** 2 + (cz - z) ** 2
+                            if d2 <= r2:
+                                found.append((d2, shot_id, shot))
+        found.sort(key=lambda c: (c[0], c[1]))
+        if limit is not None:
+            found = found[:limit]
+        return [Neighbor(shot_id, math.sqrt(d2), shot) for d2, shot_id, shot in found]
+
+    @staticmethod
+    def _validate(white_ball: float, target: float, cue_position: float,
+                  rails: Optional[int]) -> Tuple[float, float, float]:
+        for value in (white_ball, target, cue_position):
+            if not (0 <= value <= AXIS_MAX):
+                raise ValueError("القيم يجب أن تكون بين 0 و 10")
+        if rails is not None and rails not in RAILS_RANGE:
+            raise ValueError("عدد الجدران يجب أن يكون بين 1 و 4")
+        return float(white_ball), float(target), float(cue_position)
@@ -0,0 +1,395 @@
+"""
+محاكي مونت كارلو لنتائج التسديقات
+
+الحاسبات تعطي معدل نجاح ثابتاً لكل تسديقة. المحاكي يضيف ضوضاء
+قابلة للضبط إلى الزاوية والقوة والمسافة وموضع العصا، ويقيّم معادلة
+النجاح (نفس معادلة AdvancedCalculator في Pythonista و BilliardsCalculator
+في 5A) على ملايين العينات، ثم يعيد توزيع النتائج وفترة الثقة:
+- العينات تُولد وتُقيّم دفعة واحدة بـ NumPy (مع بديل بايثون بطيء بدونها)
+- العينات مقسمة إلى قطع ذات بذور مستقلة؛ القطع يمكن توزيعها على مجمع
+  عمليات والنتيجة لا تتغير بعدد العمال
+- النتائج تُخزن حسب بصمة المعاملات فيصبح تكرار نفس الاستعلام مجانياً
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from statistics import NormalDist
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# محاولة استيراد NumPy (اختياري)
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+
+# أنواع العصا كما في AdvancedCalculator
+CUE_TYPES = {
+    'عادي': {'spin_factor': 1.0, 'accuracy': 1.0},
+    'بدوران إمامي': {'spin_factor': 1.3, 'accuracy': 0.9},
+    'بدوران خلفي': {'spin_factor': 1.1, 'accuracy': 0.95},
+    'دقيق': {'spin_factor': 0.9, 'accuracy': 1.2},
+}
+
+# معامل الصعوبة (0 سهل جداً ← 5 احترافي) كما في DIFFICULTY_LEVELS
+DIFFICULTY_FACTORS = [150.0, 120.0, 100.0, 80.0, 60.0, 40.0]
+
+# انحراف الزاوية (درجات) لكل وحدة خطأ في موضع العصا، مضروباً في spin_factor
+CUE_DEFLECTION_DEGREES = 1.5
+
+NOISE_DISTRIBUTIONS = ("normal", "uniform", "none")
+# المدرج الداخلي دقيق (لحساب المئينات) ويُجمّع في الاستجابة إلى HISTOGRAM_BINS
+PERCENTILE_BINS = 1000
+HISTOGRAM_BINS = 20
+DEFAULT_CHUNK_SIZE = 1_000_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class ShotParameters:
+    """معاملات التسديقة المقصودة"""
+    angle: float
+    power: float
+    distance: float
+    difficulty: int = 2
+    cue_type: str = 'عادي'
+    cue_position: float = 5.0
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: إذا كانت أي معاملة غير صحيحة
+        """
+        if not (-90 <= self.angle <= 90):
+            raise ValueError("الزاوية يجب أن تكون بين -90 و 90")
+        if not (0 <= self.power <= 100):
+            raise ValueError("القوة يجب أن تكون بين 0 و 100")
+        if self.distance < 0:
+            raise ValueError("المسافة يجب أن تكون موجبة")
+        if not (0 <= self.difficulty < len(DIFFICULTY_FACTORS)):
+            raise ValueError(f"الصعوبة يجب أن تكون بين 0 و {len(DIFFICULTY_FACTORS) - 1}")
+        if self.cue_type not in CUE_TYPES:
+            raise ValueError(f"نوع العصا غير معروف: {self.cue_type}")
+        if not (0 <= self.cue_position <= 10):
+            raise ValueError("موضع العصا يجب أن يكون بين 0 و 10")
+
+
+@dataclass(frozen=True)
+class NoiseModel:
+    """
+    نموذج الضوضاء لكل معاملة
+
+    normal: انحراف معياري = scale، uniform: ضمن [-scale, +scale]
+    """
+    angle: float = 2.0
+    power: float = 5.0
+    distance: float = 5.0
+    cue_position: float = 0.3
+    distribution: str = "normal"
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: إذا كان التوزيع غير معروف أو أي مقياس سالب
+        """
+        if self.distribution not in NOISE_DISTRIBUTIONS:
+            raise ValueError(f"توزيع الضوضاء يجب أن يكون أحد {NOISE_DISTRIBUTIONS}")
+        if min(self.angle, self.power, self.distance, self.cue_position) < 0:
+            raise ValueError("مقاييس الضوضاء يجب أن تكون موجبة")
+
+
+def success_rate(angle: float, power: float, distance: float, difficulty: int,
+                 cue_type: str = 'عادي') -> float:
+    """
+    معادلة النجاح الحتمية (نسخة عددية من المعادلة الموجهة)
+
+    Success = (Angle + Power + Distance + Difficulty) × 0.25 × accuracy
+
+    Returns:
+        معدل النجاح (0-100)
+    """
+    angle_factor = 100 - (abs(angle) / 90 * 50)
+
+    if power < 0 or power > 100:
+        power_factor = 0
+    elif 40 <= power <= 70:
+        power_factor = 100
+    elif 20 <= power < 40:
+        power_factor = 60 + (power - 20) * 2
+    elif power > 70:
+        power_factor = 100 - (power - 70) * 1.5
+    else:
+        power_factor = power
+
+    if distance <= 50:
+        distance_factor = 100
+    elif distance <= 200:
+        distance_factor = 100 - (distance - 50) * 0.25
+    else:
+        distance_factor = 100 - (distance - 200) * 0.1
+
+    rate = (angle_factor + power_factor + distance_factor + DIFFICULTY_FACTORS[difficulty]) * 0.25
+    return min(100.0, max(0.0, rate * CUE_TYPES[cue_type]['accuracy']))
+
+
+def _success_rate_vectorized(angle, power, distance, difficulty: int, accuracy: float):
+    """نفس success_rate على مصفوفات NumPy"""
+    angle_factor = 100 - np.abs(angle) * (50 / 90)
+    power_factor = np.select(
+        [(power < 0) | (power > 100), (power >= 40) & (power <= 70), (power >= 20) & (power < 40), power > 70],
+        [0.0, 100.0, 60 + (power - 20) * 2, 100 - (power - 70) * 1.5],
+        default=power,
+    )
+    distance_factor = np.where(
+        distance <= 50, 100.0,
+        np.where(distance <= 200, 100 - (distance - 50) * 0.25, 100 - (distance - 200) * 0.1),
+    )
+    rate = (angle_factor + power_factor + distance_factor + DIFFICULTY_FACTORS[difficulty]) * (0.25 * accuracy)
+    return np.clip(rate, 0.0, 100.0)
+
+
+# ==========================================
+# تقييم قطعة واحدة (دالة على مستوى الوحدة لتعمل في مجمع العمليات)
+# ==========================================
+
+# (عدد النجاحات، مجموع الاحتمالات، مجموع مربعاتها، عدادات المدرج)
+ChunkResult = Tuple[int, float, float, List[int]]
+
+
+def _simulate_chunk(params: ShotParameters, noise: NoiseModel, size: int,
+                    seed: int, chunk_index: int) -> ChunkResult:
+    if NUMPY_AVAILABLE:
+        return _simulate_chunk_numpy(params, noise, size, seed, chunk_index)
+    return _simulate_chunk_python(params, noise, size, seed, chunk_index)
+
+
+def _simulate_chunk_numpy(params, noise, size, seed, chunk_index) -> ChunkResult:
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+    def perturb(value, scale):
+        if noise.distribution == "none" or scale == 0:
+            return np.full(size, float(value))
+        if noise.distribution == "uniform":
+            return value + rng.uniform(-scale, scale, size)
+        return value + rng.normal(0.0, scale, size)
+
+    cue = CUE_TYPES[params.cue_type]
+    cue_error = perturb(0.0, noise.cue_position)
+    angle = perturb(params.angle, noise.angle) + cue_error * (CUE_DEFLECTION_DEGREES * cue['spin_factor'])
+    power = perturb(params.power, noise.power)
+    distance = np.maximum(perturb(params.distance, noise.distance), 0.0)
+
+    probability = _success_rate_vectorized(angle, power, distance, params.difficulty, cue['accuracy']) / 100
+    successes = int(np.count_nonzero(rng.random(size) < probability))
+    bins = np.minimum((probability * PERCENTILE_BINS).astype(np.int64), PERCENTILE_BINS - 1)
+    histogram = np.bincount(bins, minlength=PERCENTILE_BINS)
+    return successes, float(probability.sum()), float(np.square(probability).sum()), histogram.tolist()
+
+
+def _simulate_chunk_python(params, noise, size, seed, chunk_index) -> ChunkResult:
+    rng = random.Random(f"{seed}:{chunk_index}")
+
+    def perturb(value, scale):
+        if noise.distribution == "none" or scale == 0:
+            return value
+        if noise.distribution == "uniform":
+            return value + rng.uniform(-scale, scale)
+        return rng.gauss(value, scale)
+
+    cue = CUE_TYPES[params.cue_type]
+    successes, total, total_sq = 0, 0.0, 0.0
+    histogram = [0] * PERCENTILE_BINS
+    for _ in range(size):
+        angle = perturb(params.angle, noise.angle) + perturb(0.0, noise.cue_position) * (
+            CUE_DEFLECTION_DEGREES * cue['spin_factor']
+        )
+        probability = success_rate(
+            angle, perturb(params.power, noise.power), max(perturb(params.distance, noise.distance), 0.0),
+            params.difficulty, params.cue_type,
+        ) / 100
+        successes += rng.random() < probability
+        total += probability
+        total_sq += probability * probability
+        histogram[min(int(probability * PERCENTILE_BINS), PERCENTILE_BINS - 1)] += 1
+    return successes, total, total_sq, histogram
+
+
+def wilson_interval(successes: int, samples: int, level: float = 0.95) -> Tuple[float, float]:
+    """
+    فترة ثقة Wilson لنسبة نجاح
+
+    Returns:
+        (الحد الأدنى، الحد الأعلى) كنسب بين 0 و 1
+    """
+    if samples == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - level) / 2)
+    phat = successes / samples
+    denominator = 1 + z * z / samples
+    center = (phat + z * z / (2 * samples)) / denominator
+    half = z * math.sqrt(phat * (1 - phat) / samples + z * z / (4 * samples * samples)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _histogram_percentile(histogram: List[int], samples: int, q: float) -> float:
+    target = q / 100 * samples
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= target:
+            return (index + 0.5) / PERCENTILE_BINS
+    return 1.0
+
+
+class MonteCarloSimulator:
+    """
+    محاكاة نتائج التسديقة مع تخزين النتائج حسب بصمة المعاملات
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_samples: int = 10_000_000, max_cached: int = 256):
+        """
+        Args:
+            workers: عدد عمليات المجمع (0 أو 1 = داخل العملية الحالية)
+            chunk_size: عدد العينات في كل قطعة (يحدد استهلاك الذاكرة)
+            max_samples: الحد الأقصى للعينات في طلب واحد
+            max_cached: عدد النتائج في ذاكرة LRU داخل العملية
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_samples = max_samples
+        self.max_cached = max_cached
+        self._results: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def cache_key(params: ShotParameters, noise: NoiseModel, samples: int,
+                  seed: int, confidence: float) -> str:
+        """بصمة SHA-256 للمعاملات (مفتاح التخزين)"""
+        canonical = json.dumps(
+            {"params": asdict(params), "noise": asdict(noise), "samples": samples,
+             "seed": seed, "confidence": confidence, "numpy": NUMPY_AVAILABLE},
+            sort_keys=True, ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def simulate(self, params: ShotParameters, noise: Optional[NoiseModel] = None,
+                 samples: int = 1_000_000, seed: int = 0, confidence: float = 0.95) -> dict:
+        """
+        محاكاة تسديقة (من الذاكرة إذا سبق حسابها بنفس المعاملات)
+
+        Args:
+            params: معاملات التسديقة المقصودة
+            noise: نموذج الضوضاء (افتراضياً NoiseModel())
+            samples: عدد العينات
+            seed: البذرة (نفس البذرة = نفس النتيجة)
+            confidence: مستوى الثقة لفترة معدل النجاح
+
+        Returns:
+            قاموس يحتوي معدل النجاح وفترة الثقة وتوزيع احتمال النجاح
+
+        Raises:
+            ValueError: إذا كانت المعاملات أو عدد العينات غير صحيحة
+        """
+        noise = noise or NoiseModel()
+        params.validate()
+        noise.validate()
+        if not (1 <= samples <= self.max_samples):
+            raise ValueError(f"عدد العينات يجب أن يكون بين 1 و {self.max_samples}")
+        if not (0 < confidence < 1):
+            raise ValueError("مستوى الثقة يجب أن يكون بين 0 و 1")
+
+        key = self.cache_key(params, noise, samples, seed, confidence)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        result = self._run(params, noise, samples, seed, confidence)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+        return result
+
+    def _chunks(self, samples: int) -> List[int]:
+        full, rest = divmod(samples, self.chunk_size)
+        return [self.chunk_size] * full + ([rest] if rest else [])
+
+    def _run(self, params: ShotParameters, noise: NoiseModel, samples: int,
+             seed: int, confidence: float) -> dict:
+        sizes = self._chunks(samples)
+        if self.workers > 1 and len(sizes) > 1:
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_simulate_chunk, params, noise, size, seed, index)
+                for index, size in enumerate(sizes)
+            ]
+            chunks = [future.result() for future in futures]
+        else:
+            chunks = [_simulate_chunk(params, noise, size, seed, index) for index, size in enumerate(sizes)]
+
+        successes = sum(c[0] for c in chunks)
+        total = sum(c[1] for c in chunks)
+        total_sq = sum(c[2] for c in chunks)
+        histogram = [sum(counts) for counts in zip(*(c[3] for c in chunks))]
+        group = PERCENTILE_BINS // HISTOGRAM_BINS
+
+        mean = total / samples
+        std = math.sqrt(max(total_sq / samples - mean * mean, 0.0))
+        low, high = wilson_interval(successes, samples, confidence)
+        return {
+            "samples": samples,
+            "seed": seed,
+            "engine": "numpy" if NUMPY_AVAILABLE else "python",
+            "deterministic_rate": round(success_rate(
+                params.angle, params.power, params.distance, params.difficulty, params.cue_type
+            ), 2),
+            "success_rate": round(successes / samples * 100, 3),
+            "confidence_interval": {
+                "level": confidence,
+                "low": round(low * 100, 3),
+                "high": round(high * 100, 3),
+            },
+            "probability": {
+                "mean": round(mean * 100, 3),
+                "std": round(std * 100, 3),
+                "percentiles": {
+                    f"p{q}": round(_histogram_percentile(histogram, samples, q) * 100, 2)
+                    for q in PERCENTILES
+                },
+            },
+            "histogram": {"bin_width": 100 / HISTOGRAM_BINS, "counts": [
+                sum(histogram[i:i + group]) for i in range(0, PERCENTILE_BINS, group)
+            ]},
+            "parameters": asdict(params),
+            "noise": asdict(noise),
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: الخادم متعدد الخيوط و fork قد ينسخ أقفالاً محجوزة
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"✅ مجمع عمليات المحاكاة: {self.workers} عامل")
+            return self._executor
+
+    def close(self) -> None:
+        """إيقاف مجمع العمليات"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
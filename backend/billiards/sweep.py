@@ -0,0 +1,472 @@
+"""
+مسح شبكة المعاملات لتوليد جداول التدريب
+
+يحسب كل تركيبة (جدران × عصا × بيضاء × هدف × جيب) بنفس معادلات
+ShotCalculator، مثل ReferenceTables في pythonista_examples.py لكن على
+نطاق أكبر:
+- الشبكة مقسمة إلى قطع متتالية تُقيّم على مجمع عمليات (أو داخل العملية
+  عند workers <= 1)، وتُكتب بالترتيب كأسطر JSON في ملف
+- التقدم يُحدّث بعد كل قطعة، والإلغاء يوقف القطع المتبقية ويحذف الملف الجزئي
+- النتيجة تُحفظ باسم بصمة الشبكة، فتكرار نفس المسح (حتى بعد إعادة
+  التشغيل) يُقرأ من الملف بدون إعادة حساب، والمسح المتطابق الجاري يُشارك
+"""
+
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+try:
+    from backend.billiards.calculator import ShotCalculator
+except ImportError:
+    from .calculator import ShotCalculator
+
+logger = logging.getLogger(__name__)
+
+# يُرفع عند تغيير معادلات الحاسبة أو صيغة الصف (يبطل النتائج المحفوظة)
+SWEEP_VERSION = 1
+DEFAULT_CHUNK_SIZE = 5_000
+# أقصى عدد قيم في محور واحد (حماية من نطاق بخطوة صغيرة جداً)
+MAX_AXIS_VALUES = 1_001
+
+AXIS_LIMITS = {
+    "rails": (1, 4),
+    "cue_position": (0, 10),
+    "white_ball": (0, 10),
+    "target": (0, 10),
+    "pocket": (0, 5),
+}
+INTEGER_AXES = ("rails", "pocket")
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+
+
+def _axis_values(name: str, spec) -> tuple:
+    """
+    قيم محور من قائمة أو نطاق {"start", "stop", "step"} شامل للنهاية
+
+    Raises:
+        ValueError: إذا كان المحور فارغاً أو خارج الحدود
+    """
+    if isinstance(spec, dict):
+        unknown = set(spec) - {"start", "stop", "step"}
+        if unknown or "start" not in spec or "stop" not in spec:
+            raise ValueError(f"نطاق {name} يجب أن يحتوي start و stop و step اختيارياً")
+        start, stop, step = float(spec["start"]), float(spec["stop"]), float(spec.get("step", 1))
+        if step <= 0 or stop < start:
+            raise ValueError(f"نطاق {name} غير صحيح")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_AXIS_VALUES:
+            raise ValueError(f"عدد قيم {name} يتجاوز {MAX_AXIS_VALUES}")
+        values = [round(start + i * step, 6) for i in range(count)]
+    elif isinstance(spec, (list, tuple)):
+        values = list(spec)
+    else:
+        values = [spec]
+
+    if not values:
+        raise ValueError(f"المحور {name} فارغ")
+    low, high = AXIS_LIMITS[name]
+    result = []
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"قيمة غير رقمية في {name}: {value!r}")
+        if not (low <= value <= high):
+            raise ValueError(f"قيم {name} يجب أن تكون بين {low} و {high}")
+        if name in INTEGER_AXES:
+            if value != int(value):
+                raise ValueError(f"قيم {name} يجب أن تكون أعداداً صحيحة")
+            value = int(value)
+        else:
+            value = float(value)
+        result.append(value)
+    # التكرار لا يضيف صفوفاً جديدة
+    return tuple(dict.fromkeys(result))
+
+
+@dataclass(frozen=True)
+class SweepGrid:
+    """
+    شبكة المعاملات؛ الترتيب كترتيب itertools.product (الجيب الأسرع تغيراً)
+    """
+    rails: Tuple[int, ...] = (1, 2, 3, 4)
+    cue_position: Tuple[float, ...] = (5.0,)
+    white_ball: Tuple[float, ...] = tuple(float(v) for v in range(11))
+    target: Tuple[float, ...] = tuple(float(v) for v in range(11))
+    pocket: Tuple[int, ...] = (0, 1, 2, 3, 4, 5)
+
+    def __post_init__(self):
+        for field in fields(self):
+            object.__setattr__(self, field.name, _axis_values(field.name, getattr(self, field.name)))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SweepGrid":
+        """
+        إنشاء شبكة من JSON؛ المحاور غير المذكورة تأخذ القيم الافتراضية
+
+        مثال: {"rails": [1, 2], "white_ball": {"start": 0, "stop": 10, "step": 0.5}}
+
+        Raises:
+            ValueError: إذا احتوت محاور غير معروفة أو قيماً غير صحيحة
+        """
+        if not isinstance(data, dict):
+            raise ValueError("الشبكة يجب أن تكون كائن JSON")
+        unknown = set(data) - set(AXIS_LIMITS)
+        if unknown:
+            raise ValueError(f"محاور غير معروفة: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    @property
+    def axes(self) -> Tuple[tuple, ...]:
+        return (self.rails, self.cue_position, self.white_ball, self.target, self.pocket)
+
+    @property
+    def size(self) -> int:
+        """عدد التركيبات"""
+        return math.prod(len(axis) for axis in self.axes)
+
+    def point(self, index: int) -> tuple:
+        """التركيبة رقم index (بدون المرور على ما قبلها)"""
+        values = []
+        for axis in reversed(self.axes):
+            index, position = divmod(index, len(axis))
+            values.append(axis[position])
+        return tuple(reversed(values))
+
+    def to_dict(self) -> dict:
+        return {field.name: list(getattr(self, field.name)) for field in fields(self)}
+
+    def cache_key(self) -> str:
+        """بصمة SHA-256 للشبكة (اسم ملف النتيجة)"""
+        canonical = json.dumps({"grid": self.to_dict(), "version": SWEEP_VERSION}, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def evaluate_point(calculator: ShotCalculator, rails: int, cue_position: float,
+                   white_ball: float, target: float, pocket: int) -> dict:
+    """
+    صف واحد: نفس قيم create_shot و get_calculation_summary بدون إنشاء Shot أو تسجيل
+    """
+    cue = calculator.calculate_cue(target, white_ball)
+    difficulty = calculator.calculate_difficulty(rails, target, white_ball)
+    return {
+        "rails": rails,
+        "cue_position": cue_position,
+        "white_ball": white_ball,
+        "target": target,
+        "pocket": pocket,
+        "cue_value": cue,
+        "difficulty": difficulty.value,
+        "success_rate": round(calculator.calculate_success_rate(rails, difficulty), 1),
+        "power_required": round(calculator.calculate_power_required(rails, white_ball, target), 1),
+        "angle_required": round(calculator.calculate_angle_required(cue, white_ball), 1),
+    }
+
+
+# حقول الصف المحسوبة (بعد حقول التركيبة نفسها)
+DERIVED_FIELDS = ("cue_value", "difficulty", "success_rate", "power_required", "angle_required")
+
+
+# ==========================================
+# تقييم قطعة (دالة على مستوى الوحدة لتعمل في مجمع العمليات)
+# ==========================================
+
+_calculator: Optional[ShotCalculator] = None
+
+
+def _evaluate_chunk(grid: SweepGrid, start: int, stop: int) -> str:
+    """
+    أسطر JSON للتركيبات [start, stop) - نص واحد بدلاً من قواميس لتقليل كلفة النقل
+
+    القيم المحسوبة لا تعتمد على موضع العصا والجيب، فتُحسب وتُحوّل إلى JSON
+    مرة واحدة لكل (جدران، بيضاء، هدف) في القطعة.
+    """
+    global _calculator
+    if _calculator is None:
+        _calculator = ShotCalculator()
+    derived = {}
+    lines = []
+    for index in range(start, stop):
+        rails, cue_position, white_ball, target, pocket = grid.point(index)
+        tail = derived.get((rails, white_ball, target))
+        if tail is None:
+            row = evaluate_point(_calculator, rails, cue_position, white_ball, target, pocket)
+            tail = json.dumps({name: row[name] for name in DERIVED_FIELDS}, ensure_ascii=False)[1:]
+            derived[(rails, white_ball, target)] = tail
+        # repr للأعداد يطابق json.dumps
+        lines.append(
+            f'{{"rails": {rails}, "cue_position": {cue_position!r}, "white_ball": {white_ball!r}, '
+            f'"target": {target!r}, "pocket": {pocket}, {tail}'
+        )
+    return "\n".join(lines) + "\n"
+
+
+class SweepJob:
+    """حالة مسح واحد وتقدمه"""
+
+    def __init__(self, grid: SweepGrid, path: Path):
+        self.id = uuid.uuid4().hex
+        self.grid = grid
+        self.key = grid.cache_key()
+        self.path = path
+        self.partial_path = path.with_suffix(".part")
+        self.total = grid.size
+        self.completed = 0
+        self.state = PENDING
+        self.cached = False
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, CANCELLED, FAILED)
+
+    @property
+    def progress(self) -> float:
+        return self.completed / self.total if self.total else 1.0
+
+    def cancel(self) -> bool:
+        """
+        طلب إلغاء المسح
+
+        Returns:
+            False إذا كان قد انتهى بالفعل
+        """
+        if self.finished:
+            return False
+        self._cancel.set()
+        return True
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def _advance(self, points: int) -> None:
+        with self._changed:
+            self.completed += points
+            self._changed.notify_all()
+
+    def _start(self) -> None:
+        with self._changed:
+            self.state = RUNNING
+            self._changed.notify_all()
+
+    def _finish(self, state: str, error: Optional[str] = None) -> None:
+        with self._changed:
+            self.state = state
+            self.error = error
+            self.finished_at = time.time()
+            self._changed.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """انتظار انتهاء المسح؛ يعيد True إذا انتهى"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.finished, timeout)
+
+    def _wait_progress(self, completed: int, timeout: float) -> None:
+        with self._changed:
+            self._changed.wait_for(lambda: self.finished or self.completed != completed, timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "cached": self.cached,
+            "total": self.total,
+            "completed": self.completed,
+            "progress": round(self.progress * 100, 2),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "grid": self.grid.to_dict(),
+        }
+
+
+class SweepService:
+    """
+    تنفيذ المسوحات في الخلفية مع التخزين حسب بصمة الشبكة
+    """
+
+    def __init__(self, results_dir: str, workers: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_points: int = 5_000_000, max_jobs: int = 100):
+        """
+        Args:
+            results_dir: مجلد ملفات النتائج (<البصمة>.jsonl)
+            workers: عدد عمليات المجمع (0 أو 1 = داخل العملية الحالية)
+            chunk_size: عدد التركيبات في كل قطعة
+            max_points: أقصى عدد تركيبات في مسح واحد
+            max_jobs: عدد المسوحات المنتهية المحفوظة حالتها في الذاكرة
+        """
+        self.results_dir = Path(results_dir)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_points = max_points
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, SweepJob]" = OrderedDict()
+        self._active: dict = {}  # البصمة ← المسح الجاري
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, grid: SweepGrid) -> SweepJob:
+        """
+        بدء مسح (أو إعادة نتيجة محفوظة أو مسح متطابق جارٍ)
+
+        Raises:
+            ValueError: إذا تجاوزت الشبكة max_points
+        """
+        if grid.size > self.max_points:
+            raise ValueError(f"عدد التركيبات {grid.size} يتجاوز الحد {self.max_points}")
+        key = grid.cache_key()
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                return active
+            job = SweepJob(grid, self.results_dir / f"{key}.jsonl")
+            self._jobs[job.id] = job
+            self._trim()
+            if job.path.exists():
+                job.cached = True
+                job.completed = job.total
+                job._finish(DONE)
+                return job
+            self._active[key] = job
+        threading.Thread(target=self._run, args=(job,), name=f"sweep-{job.id[:8]}", daemon=True).start()
+        logger.info(f"✅ بدأ مسح {job.id}: {job.total} تركيبة")
+        return job
+
+    def _trim(self) -> None:
+        """حذف أقدم المسوحات المنتهية من الذاكرة (ملفاتها تبقى) - مع القفل"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[SweepJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[SweepJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _ranges(self, total: int):
+        for start in range(0, total, self.chunk_size):
+            yield start, min(start + self.chunk_size, total)
+
+    def _run(self, job: SweepJob) -> None:
+        job._start()
+        try:
+            with open(job.partial_path, "w", encoding="utf-8") as out:
+                if self.workers > 1 and job.total > self.chunk_size:
+                    self._run_pooled(job, out)
+                else:
+                    for start, stop in self._ranges(job.total):
+                        if job.cancel_requested:
+                            break
+                        out.write(_evaluate_chunk(job.grid, start, stop))
+                        out.flush()
+                        job._advance(stop - start)
+            if job.cancel_requested:
+                job.partial_path.unlink(missing_ok=True)
+                job._finish(CANCELLED)
+                logger.info(f"⚠️ أُلغي المسح {job.id} عند {job.completed}/{job.total}")
+            else:
+                os.replace(job.partial_path, job.path)
+                job._finish(DONE)
+                logger.info(f"✅ انتهى المسح {job.id}: {job.total} تركيبة")
+        except Exception as e:
+            job.partial_path.unlink(missing_ok=True)
+            job._finish(FAILED, str(e))
+            logger.error(f"❌ فشل المسح {job.id}: {e}")
+        finally:
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def _run_pooled(self, job: SweepJob, out) -> None:
+        """قطع على مجمع العمليات؛ نافذة محدودة من القطع الجارية تحفظ الترتيب والذاكرة"""
+        executor = self._get_executor()
+        pending = deque()
+        ranges = self._ranges(job.total)
+        try:
+            for start, stop in ranges:
+                pending.append((stop - start, executor.submit(_evaluate_chunk, job.grid, start, stop)))
+                if len(pending) < self.workers * 2:
+                    continue
+                self._drain_one(job, pending, out)
+                if job.cancel_requested:
+                    return
+            while pending and not job.cancel_requested:
+                self._drain_one(job, pending, out)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _drain_one(job: SweepJob, pending: deque, out) -> None:
+        points, future = pending.popleft()
+        out.write(future.result())
+        out.flush()
+        job._advance(points)
+
+    def stream(self, job: SweepJob, block_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        أسطر JSON للنتيجة، أثناء التنفيذ أيضاً (تتبع الملف الجزئي حتى الانتهاء)
+
+        ينتهي البث عند الإلغاء أو الفشل بعد آخر قطعة مكتوبة.
+        """
+        handle = None
+        try:
+            while handle is None:
+                path = job.path if job.state == DONE else job.partial_path
+                try:
+                    handle = open(path, "rb")
+                except FileNotFoundError:
+                    if job.finished and (job.state != DONE or path == job.path):
+                        return
+                    job._wait_progress(job.completed, 0.5)
+            while True:
+                completed, finished = job.completed, job.finished
+                block = handle.read(block_size)
+                if block:
+                    yield block
+                    continue
+                if finished:
+                    return
+                # الملف الجزئي يُعاد تسميته عند الانتهاء؛ المقبض المفتوح يبقى صالحاً
+                job._wait_progress(completed, 0.5)
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: الخادم متعدد الخيوط و fork قد ينسخ أقفالاً محجوزة
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"✅ مجمع عمليات المسح: {self.workers} عامل")
+            return self._executor
+
+    def close(self) -> None:
+        """إلغاء المسوحات الجارية وإيقاف مجمع العمليات"""
+        for job in self.jobs():
+            job.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
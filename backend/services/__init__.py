@@ -0,0 +1,23 @@
+"""
+خدمات البنية التحتية المشتركة بين الخوادم
+"""
+
+from .admission import AdmissionASGIMiddleware, AsyncConcurrencyLimiter, ConcurrencyLimiter, RateLimiter
+from .cache import SharedCache, create_backend
+from .events import EventHub
+from .jobs import JobQueue
+from .profiler import RequestProfiler
+from .singleflight import SingleFlight
+
+__all__ = [
+    'AdmissionASGIMiddleware',
+    'AsyncConcurrencyLimiter',
+    'ConcurrencyLimiter',
+    'EventHub',
+    'JobQueue',
+    'RateLimiter',
+    'RequestProfiler',
+    'SharedCache',
+    'SingleFlight',
+    'create_backend',
+]
@@ -0,0 +1,325 @@
+"""
+التحكم في قبول الطلبات (Admission Control)
+
+طبقتان أمام المعالجات حتى لا يقبل الخادم عملاً بلا حد:
+- حد المعدل لكل عميل (مفتاح API أو عنوان IP) بدلو رموز (token bucket):
+  الطلب الزائد يُرفض فوراً بـ 429 مع Retry-After بالوقت اللازم لرمز جديد
+- حد تزامن عام: عدد محدود من الطلبات يُنفذ في نفس الوقت، وطابور محدود
+  ينتظر لمدة قصيرة؛ ما يزيد عن الطابور أو ينتهي انتظاره يُرفض بـ 503
+
+ConcurrencyLimiter للخوادم ذات الخيوط (run_server.py)، و
+AsyncConcurrencyLimiter لحلقة الأحداث (api.py عبر AdmissionASGIMiddleware).
+"""
+
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Iterable, Optional, Tuple
+import asyncio
+import json
+import math
+import threading
+import time
+
+RATE_LIMITED_MESSAGE = "تم تجاوز حد الطلبات، حاول لاحقاً"
+OVERLOADED_MESSAGE = "الخادم مشغول، حاول لاحقاً"
+
+
+def retry_after_header(seconds: float) -> str:
+    """قيمة Retry-After بالثواني الصحيحة (ثانية واحدة على الأقل)"""
+    return str(max(1, math.ceil(seconds)))
+
+
+def client_key(get_header: Callable[[str], Optional[str]], address: Optional[str],
+               header: str = "X-API-Key") -> str:
+    """
+    هوية العميل لحد المعدل: مفتاح API إذا أُرسل وإلا عنوان IP
+
+    Args:
+        get_header: دالة قراءة الترويسة
+        address: عنوان العميل
+        header: ترويسة مفتاح API
+    """
+    api_key = get_header(header)
+    if api_key:
+        return f"key:{api_key}"
+    return f"ip:{address or 'unknown'}"
+
+
+class RateLimiter:
+    """
+    دلو رموز لكل عميل
+
+    الدلاء محفوظة في ذاكرة LRU محدودة؛ العميل المطرود يبدأ بدلو ممتلئ.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, max_clients: int = 10_000):
+        """
+        Args:
+            rate: الطلبات المسموحة في الثانية لكل عميل (0 = معطل)
+            burst: أقصى عدد طلبات متتالية (سعة الدلو، افتراضياً ضعف rate)
+            max_clients: أقصى عدد دلاء محفوظة
+
+        Raises:
+            ValueError: إذا كانت القيم سالبة
+        """
+        if rate < 0 or (burst is not None and burst < 1):
+            raise ValueError("حد المعدل يجب أن يكون موجباً")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, math.ceil(rate * 2))
+        self.max_clients = max_clients
+        self.allowed = 0
+        self.limited = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        أخذ رمز من دلو العميل
+
+        Args:
+            key: هوية العميل
+            now: الوقت الحالي (للاختبار)
+
+        Returns:
+            0 إذا قُبل الطلب، وإلا عدد الثواني حتى يتوفر رمز
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+class _Limits:
+    """الحدود والعدادات المشتركة بين محددي التزامن"""
+
+    def __init__(self, max_active: int, max_queue: int = 0, queue_timeout: float = 1.0):
+        """
+        Args:
+            max_active: أقصى عدد طلبات تُنفذ في نفس الوقت (0 = بلا حد)
+            max_queue: أقصى عدد طلبات منتظرة
+            queue_timeout: أقصى مدة انتظار في الطابور بالثواني
+
+        Raises:
+            ValueError: إذا كانت القيم سالبة
+        """
+        if max_active < 0 or max_queue < 0 or queue_timeout < 0:
+            raise ValueError("حدود التزامن يجب ألا تكون سالبة")
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0  # منتظرون في الطابور الآن
+        self.admitted = 0
+        self.rejected = 0  # الطابور ممتلئ
+        self.timed_out = 0  # انتهى الانتظار في الطابور
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_active > 0
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.queue_timeout, 1.0)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_active": self.max_active,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class ConcurrencyLimiter(_Limits):
+    """حد التزامن لخيوط الطلبات"""
+
+    def __init__(self, max_active: int, max_queue: int = 0, queue_timeout: float = 1.0):
+        super().__init__(max_active, max_queue, queue_timeout)
+        self._changed = threading.Condition()
+
+    def acquire(self) -> bool:
+        """
+        حجز مكان للتنفيذ (مع الانتظار في الطابور إذا كان فيه مكان)
+
+        Returns:
+            False إذا رُفض الطلب
+        """
+        if not self.enabled:
+            return True
+        with self._changed:
+            if self.active >= self.max_active or self.queued:
+                if self.queued >= self.max_queue:
+                    self.rejected += 1
+                    return False
+                self.queued += 1
+                try:
+                    ready = self._changed.wait_for(lambda: self.active < self.max_active, self.queue_timeout)
+                finally:
+                    self.queued -= 1
+                if not ready:
+                    self.timed_out += 1
+                    return False
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        with self._changed:
+            self.active -= 1
+            self._changed.notify()
+
+
+class AsyncConcurrencyLimiter(_Limits):
+    """
+    حد التزامن لحلقة الأحداث
+
+    المكان المحرر يُسلّم مباشرة لأول منتظر بالترتيب.
+    """
+
+    def __init__(self, max_active: int, max_queue: int = 0, queue_timeout: float = 1.0):
+        super().__init__(max_active, max_queue, queue_timeout)
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> bool:
+        """
+        حجز مكان للتنفيذ (مع الانتظار في الطابور إذا كان فيه مكان)
+
+        Returns:
+            False إذا رُفض الطلب
+        """
+        if not self.enabled:
+            return True
+        if self.active < self.max_active and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # سُلّم المكان في نفس لحظة انتهاء المهلة
+                self.admitted += 1
+                return True
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self.queued -= 1
+            self.timed_out += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            self.queued -= 1
+            if not waiter.done():
+                # المكان ينتقل للمنتظر فيبقى active كما هو
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionASGIMiddleware:
+    """
+    غلاف ASGI: حد المعدل ثم حد التزامن قبل التطبيق
+
+    المسارات في exempt لا تخضع لأي حد (فحوصات الجاهزية والمقاييس)، و
+    المسارات في unbounded تخضع لحد المعدل فقط (البث الطويل لا يحجز مكاناً).
+    """
+
+    def __init__(self, app, rate_limiter: RateLimiter, limiter: AsyncConcurrencyLimiter,
+                 key_header: str = "X-API-Key", exempt: Iterable[str] = (),
+                 unbounded: Iterable[str] = ()):
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.limiter = limiter
+        self.key_header = key_header.lower().encode("latin-1")
+        self.exempt = frozenset(exempt)
+        self.unbounded = frozenset(unbounded)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        client = scope.get("client")
+        key = client_key(
+            lambda _: (headers.get(self.key_header) or b"").decode("latin-1"),
+            client[0] if client else None,
+        )
+        wait = self.rate_limiter.acquire(key)
+        if wait:
+            await self._reject(scope, send, 429, RATE_LIMITED_MESSAGE, wait)
+            return
+
+        if scope["type"] == "websocket" or scope["path"] in self.unbounded:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            await self._reject(scope, send, 503, OVERLOADED_MESSAGE, self.limiter.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    @staticmethod
+    async def _reject(scope, send, status: int, message: str, retry_after: float) -> None:
+        if scope["type"] == "websocket":
+            # 1013 = حاول لاحقاً
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        body = json.dumps({"detail": message}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", retry_after_header(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
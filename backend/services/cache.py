@@ -0,0 +1,331 @@
+"""
+طبقة التخزين المؤقت المشتركة (Shared Cache)
+
+تخزن الإحصائيات المحسوبة وعدادات التصفية والصفحات المسلسلة في
+خلفية مشتركة بين العمال (Redis أو ذاكرة Django المؤقتة)، مع:
+- إبطال بالإصدار: كل كتابة تزيد رقم إصدار النطاق فتصبح المفاتيح القديمة غير مستخدمة
+- حماية من التدافع (Stampede): حساب واحد لكل مفتاح داخل العملية (SingleFlight)
+  وقفل قصير في الخلفية بين العمال
+- خلفية داخل العملية (memory://) للتطوير والاختبارات
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+import itertools
+import json
+import logging
+import threading
+import time
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# محاولة استيراد Redis (اختياري)
+REDIS_AVAILABLE = False
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+
+
+class MemoryCacheBackend:
+    """
+    خلفية داخل العملية مع صلاحية زمنية - للتطوير والاختبارات
+
+    الإبطال بالإصدار يترك مفاتيح الإصدارات القديمة بدون قراءة، فتُزال
+    المنتهية دورياً عند الكتابة، وعند تجاوز max_entries يُطرد الأقدم
+    استخداماً. العدادات بدون صلاحية (أرقام الإصدارات) لا تُطرد: طردها
+    يعيد الإصدار لرقم قد تكون مفاتيحه القديمة ما زالت محفوظة.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        """
+        Args:
+            max_entries: أقصى عدد مفاتيح محفوظة
+        """
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _alive(self, key: str, now: float) -> bool:
+        item = self._data.get(key)
+        if item is None:
+            return False
+        if item[1] is not None and item[1] <= now:
+            del self._data[key]
+            return False
+        return True
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl if ttl else None
+
+    def _store(self, key: str, value: Any, expiry: Optional[float]) -> None:
+        """حفظ مفتاح مع إزالة المنتهي والطرد - يُستدعى مع القفل"""
+        self._data[key] = (value, expiry)
+        self._data.move_to_end(key)
+        self._writes += 1
+        # مسح كامل كل عُشر السعة من الكتابات: كلفة O(1) موزعة
+        if self._writes >= max(1, self.max_entries // 10) or len(self._data) > self.max_entries:
+            self._writes = 0
+            now = time.monotonic()
+            for expired in [k for k, (_, at) in self._data.items() if at is not None and at <= now]:
+                del self._data[expired]
+        excess = len(self._data) - self.max_entries
+        if excess > 0:
+            oldest = itertools.islice((k for k, (_, at) in self._data.items() if at is not None), excess)
+            for evicted in list(oldest):
+                del self._data[evicted]
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if self._alive(key, time.monotonic()):
+                self._data.move_to_end(key)
+                return self._data[key][0]
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, self._expiry(ttl))
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._alive(key, time.monotonic()):
+                return False
+            self._store(key, value, self._expiry(ttl))
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._data[key][0] + 1 if self._alive(key, time.monotonic()) else 1
+            self._store(key, value, None)
+            return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCacheBackend:
+    """خلفية Redis مشتركة بين العمال والخوادم"""
+
+    def __init__(self, url: str):
+        """
+        Args:
+            url: عنوان Redis (redis://host:port/db)
+
+        Raises:
+            RuntimeError: إذا لم تكن مكتبة redis مثبتة
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("مكتبة redis غير مثبتة: pip install redis")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        value = self._client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self._client.set(key, value, ex=int(ttl) if ttl else None, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def clear(self) -> None:
+        self._client.flushdb()
+
+
+class DjangoCacheBackend:
+    """غلاف حول django.core.cache لاستخدام CACHES المعرفة في الإعدادات"""
+
+    def __init__(self, alias: str = "default"):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+
+    def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, timeout=ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return self._cache.add(key, value, timeout=ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def incr(self, key: str) -> int:
+        self._cache.add(key, 0, timeout=None)
+        return self._cache.incr(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def create_backend(url: str = "memory://"):
+    """
+    إنشاء خلفية التخزين المؤقت من عنوان
+
+    Args:
+        url: memory:// أو redis://... أو django://<alias>
+
+    Returns:
+        كائن الخلفية (يعود إلى الذاكرة إذا لم تكن redis مثبتة)
+
+    Raises:
+        ValueError: إذا كان نوع العنوان غير مدعوم
+    """
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if not REDIS_AVAILABLE:
+            logger.warning("⚠️ مكتبة redis غير مثبتة - استخدام ذاكرة داخل العملية")
+            return MemoryCacheBackend()
+        return RedisCacheBackend(url)
+    if url.startswith("django://"):
+        return DjangoCacheBackend(url[len("django://"):] or "default")
+    raise ValueError(f"نوع التخزين المؤقت غير مدعوم: {url}")
+
+
+class SharedCache:
+    """
+    ذاكرة مؤقتة بنطاقات ذات إصدار وحماية من التدافع
+
+    القيم تُحفظ كنص JSON، فيمكن إرسال الصفحات المسلسلة مباشرة
+    عبر get_or_compute_json بدون إعادة تسلسل.
+    """
+
+    def __init__(self, backend=None, prefix: str = "billiards", ttl: float = 300,
+                 enabled: bool = True, lock_timeout: float = 10, poll_interval: float = 0.02):
+        """
+        Args:
+            backend: خلفية التخزين (افتراضياً MemoryCacheBackend)
+            prefix: بادئة المفاتيح
+            ttl: مدة الصلاحية الافتراضية بالثواني
+            enabled: عند التعطيل تُحسب القيم مباشرة بدون تخزين
+            lock_timeout: أقصى مدة لقفل الحساب بين العمال
+            poll_interval: فترة انتظار العامل الذي لم يحصل على القفل
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.prefix = prefix
+        self.ttl = ttl
+        self.enabled = enabled
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:version"
+
+    def version(self, namespace: str) -> int:
+        """رقم الإصدار الحالي للنطاق"""
+        value = self.backend.get(self._version_key(namespace))
+        return int(value) if value is not None else 0
+
+    def invalidate(self, namespace: str) -> int:
+        """
+        إبطال كل مفاتيح النطاق بزيادة رقم الإصدار (تُستدعى بعد كل كتابة)
+
+        Returns:
+            رقم الإصدار الجديد
+        """
+        if not self.enabled:
+            return 0
+        try:
+            return self.backend.incr(self._version_key(namespace))
+        except Exception as e:
+            logger.error(f"❌ خطأ في إبطال التخزين المؤقت ({namespace}): {e}")
+            return 0
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:v{self.version(namespace)}:{key}"
+
+    def get_or_compute_json(self, namespace: str, key: str, compute: Callable[[], Any],
+                            ttl: Optional[float] = None) -> str:
+        """
+        الحصول على القيمة كنص JSON أو حسابها مرة واحدة
+
+        Args:
+            namespace: النطاق (يُبطل كاملاً عبر invalidate)
+            key: المفتاح داخل النطاق
+            compute: دالة الحساب عند عدم وجود القيمة
+            ttl: مدة الصلاحية (افتراضياً self.ttl)
+
+        Returns:
+            القيمة مسلسلة بصيغة JSON
+        """
+        if not self.enabled:
+            return json.dumps(compute(), ensure_ascii=False)
+
+        try:
+            full_key = self._key(namespace, key)
+            cached = self.backend.get(full_key)
+        except Exception as e:
+            logger.error(f"❌ خطأ في قراءة التخزين المؤقت: {e}")
+            return json.dumps(compute(), ensure_ascii=False)
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        return self._flight.do(
+            full_key, lambda: self._compute_locked(full_key, compute, ttl or self.ttl)
+        )
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any],
+                       ttl: Optional[float] = None) -> Any:
+        """مثل get_or_compute_json لكن تعيد القيمة بعد فك التسلسل"""
+        return json.loads(self.get_or_compute_json(namespace, key, compute, ttl))
+
+    def _compute_locked(self, full_key: str, compute: Callable[[], Any], ttl: float) -> str:
+        """حساب القيمة تحت قفل الخلفية، أو انتظار العامل الذي يحسبها"""
+        lock_key = f"{full_key}:lock"
+        deadline = time.monotonic() + self.lock_timeout
+
+        while not self.backend.add(lock_key, "1", self.lock_timeout):
+            time.sleep(self.poll_interval)
+            cached = self.backend.get(full_key)
+            if cached is not None:
+                return cached
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ انتهت مهلة انتظار قفل التخزين المؤقت: {full_key}")
+                return json.dumps(compute(), ensure_ascii=False)
+
+        try:
+            # ربما انتهى عامل آخر قبل حصولنا على القفل
+            cached = self.backend.get(full_key)
+            if cached is not None:
+                return cached
+            value = json.dumps(compute(), ensure_ascii=False)
+            self.backend.set(full_key, value, ttl)
+            return value
+        finally:
+            self.backend.delete(lock_key)
+
+    def get_stats(self) -> dict:
+        """إحصائيات الإصابة في هذه العملية"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total else 0,
+        }
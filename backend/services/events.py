@@ -0,0 +1,290 @@
+"""
+بث الأحداث المباشرة (Live Event Feed)
+
+بدلاً من أن يستطلع كل عميل الإحصائيات وقائمة التسديقات دورياً، تنشر
+نقاط الكتابة أحداثاً صغيرة (تسديقة جديدة، تسجيل تنفيذ، تغيّر الإحصائيات)
+في EventHub، ويقرأها كل مشترك (WebSocket أو SSE) من نفس المخزن الدائري:
+- إطارات محدودة المعدل: أحداث الدفعة الواحدة تُدمج في إطار واحد
+  وتغيّرات الإحصائيات المتتالية تُدمج في فرق واحد
+- الاستئناف: معرف الحدث "<epoch>:<seq>" يسمح للعميل بالمتابعة من آخر حدث
+  استلمه؛ إذا لم يعد الحدث في المخزن (أو أُعيد تشغيل الخادم) يُرسل reset
+  ليعيد العميل تحميل الحالة كاملة
+- لا طوابير لكل مشترك: المشترك البطيء يحمل مؤشراً فقط، فالذاكرة محدودة
+  بحجم المخزن مهما كان عدد العملاء
+
+المخزن داخل العملية، مثل حالة المحرك نفسها.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+STATISTICS_EVENT = "statistics"
+
+
+@dataclass
+class Event:
+    """حدث واحد في البث"""
+    seq: int
+    type: str
+    data: Dict[str, Any]
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self, epoch: str) -> dict:
+        return {
+            "id": f"{epoch}:{self.seq}",
+            "type": self.type,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+
+def coalesce(events: List[Event]) -> List[Event]:
+    """
+    دمج أحداث الإطار الواحد
+
+    أحداث الإحصائيات (فروق) تُدمج في حدث واحد يحمل آخر قيمة لكل حقل
+    ويأخذ موضع آخرها؛ باقي الأحداث تبقى بترتيبها.
+
+    Args:
+        events: أحداث مرتبة حسب seq
+
+    Returns:
+        قائمة الأحداث بعد الدمج
+    """
+    merged: Dict[str, Any] = {}
+    last_stats: Optional[Event] = None
+    for event in events:
+        if event.type == STATISTICS_EVENT:
+            merged.update(event.data)
+            last_stats = event
+
+    if last_stats is None:
+        return events
+
+    result = []
+    for event in events:
+        if event.type != STATISTICS_EVENT:
+            result.append(event)
+        elif event is last_stats:
+            result.append(Event(event.seq, STATISTICS_EVENT, merged, event.timestamp))
+    return result
+
+
+class EventHub:
+    """
+    مخزن دائري للأحداث مع إيقاظ المشتركين
+
+    publish آمنة من أي خيط (نقاط FastAPI المتزامنة تعمل في مجمع الخيوط).
+    """
+
+    def __init__(self, history: int = 1000, frame_interval: float = 0.25):
+        """
+        Args:
+            history: عدد الأحداث المحفوظة للاستئناف
+            frame_interval: أقل مدة بين إطارين لنفس المشترك بالثواني
+        """
+        self.history = history
+        self.frame_interval = frame_interval
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events: Deque[Event] = deque(maxlen=history)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._subscribers: Set["Subscription"] = set()
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """
+        نشر حدث وإيقاظ المشتركين
+
+        Args:
+            event_type: نوع الحدث (shot_created، execution_recorded، ...)
+            data: محتوى الحدث (قابل للتسلسل بصيغة JSON)
+
+        Returns:
+            الحدث المنشور
+        """
+        with self._lock:
+            event = self._append(event_type, data)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription._notify()
+        return event
+
+    def _append(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """إضافة حدث للمخزن - يُستدعى مع القفل"""
+        self._seq += 1
+        event = Event(self._seq, event_type, data)
+        self._events.append(event)
+        return event
+
+    def publish_delta(self, event_type: str, snapshot: Dict[str, Any]) -> Optional[Event]:
+        """
+        نشر الحقول التي تغيرت فقط منذ آخر لقطة من نفس النوع
+
+        الفرق يُحسب ويُضاف للمخزن تحت نفس القفل، فترتيب الأحداث يطابق
+        ترتيب اللقطات. على المستدعي أن يقرأ اللقطات بنفس ترتيب النشر.
+
+        Args:
+            event_type: نوع الحدث (عادة STATISTICS_EVENT)
+            snapshot: القيم الحالية كاملة
+
+        Returns:
+            الحدث المنشور، أو None إذا لم يتغير شيء
+        """
+        with self._lock:
+            previous = self._snapshots.get(event_type, {})
+            delta = {k: v for k, v in snapshot.items() if previous.get(k) != v}
+            self._snapshots[event_type] = dict(snapshot)
+            if not delta:
+                return None
+            event = self._append(event_type, delta)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription._notify()
+        return event
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """
+        تحويل معرف الحدث الذي أرسله العميل إلى رقم تسلسلي
+
+        Returns:
+            الرقم التسلسلي، أو None للمشترك الجديد، أو -1 إذا كان المعرف
+            من تشغيل سابق للخادم أو غير صالح (يتطلب reset)
+        """
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return -1
+        return int(seq)
+
+    def since(self, cursor: int) -> Tuple[List[Event], bool, int]:
+        """
+        الأحداث بعد المؤشر
+
+        Args:
+            cursor: آخر رقم تسلسلي استلمه المشترك
+
+        Returns:
+            (الأحداث، هل هي متصلة بالمؤشر؟، آخر رقم تسلسلي)
+            عندما تكون غير متصلة تُعاد كل الأحداث المحفوظة ويجب إرسال reset
+        """
+        with self._lock:
+            last = self._seq
+            if cursor < 0 or cursor > last:
+                return list(self._events), False, last
+            if not self._events or cursor >= self._events[-1].seq:
+                return [], True, last
+            first = self._events[0].seq
+            if cursor < first - 1:
+                return list(self._events), False, last
+            return list(itertools.islice(self._events, cursor - first + 1, None)), True, last
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> "Subscription":
+        """
+        اشتراك جديد داخل حلقة الأحداث الحالية
+
+        Args:
+            last_event_id: آخر معرف استلمه العميل (للاستئناف)
+        """
+        cursor = self.parse_event_id(last_event_id)
+        with self._lock:
+            if cursor is None:
+                cursor = self._seq
+            subscription = Subscription(self, cursor)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: "Subscription") -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        """عدد المشتركين الحاليين"""
+        with self._lock:
+            return len(self._subscribers)
+
+
+class Subscription:
+    """مؤشر مشترك واحد في EventHub (يُستخدم كـ async context manager)"""
+
+    def __init__(self, hub: EventHub, cursor: int):
+        self.hub = hub
+        self.cursor = cursor
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._last_frame = 0.0
+
+    def _notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # الحلقة أُغلقت قبل إلغاء الاشتراك
+            self.hub._unsubscribe(self)
+
+    async def next_frame(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        انتظار الإطار التالي
+
+        Args:
+            timeout: أقصى مدة انتظار بدون أحداث (لإرسال نبضة keep-alive)
+
+        Returns:
+            {"id", "reset", "events"} أو None عند انتهاء المهلة
+        """
+        delay = self._last_frame + self.hub.frame_interval - self._loop.time()
+        if delay > 0:
+            # الأحداث التي تصل خلال هذه المدة تخرج معاً في إطار واحد
+            await asyncio.sleep(delay)
+
+        while True:
+            self._wakeup.clear()
+            events, contiguous, last = self.hub.since(self.cursor)
+            if events or not contiguous:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        self.cursor = events[-1].seq if events else last
+        self._last_frame = self._loop.time()
+        epoch = self.hub.epoch
+        return {
+            "id": f"{epoch}:{self.cursor}",
+            "reset": not contiguous,
+            "events": [event.to_dict(epoch) for event in coalesce(events)],
+        }
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+def sse_message(frame: Optional[dict]) -> str:
+    """
+    تنسيق إطار بصيغة Server-Sent Events
+
+    Args:
+        frame: ناتج Subscription.next_frame (None = نبضة keep-alive)
+    """
+    if frame is None:
+        return ": ping\n\n"
+    return f"id: {frame['id']}\nevent: frame\ndata: {json.dumps(frame, ensure_ascii=False)}\n\n"
@@ -0,0 +1,168 @@
+"""
+فحوصات الصحة (Liveness / Readiness)
+
+- الحيوية (/livez): استجابة ثابتة تُرسل قبل أي طبقة وسيطة ولا تلمس
+  حالة المحرك، عبر غلاف ASGI أو WSGI حول التطبيق
+- الجاهزية (/readyz): فحص التخزين والذاكرة المؤقتة وقاعدة البيانات
+  مع تخزين النتيجة لمدة قصيرة حتى لا يُكرر الفحص العميق مع كل طلب
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LIVE_PATH = "/livez"
+READY_PATH = "/readyz"
+
+LIVENESS_BODY = b'{"status":"alive"}'
+_JSON_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(LIVENESS_BODY)).encode()),
+    (b"cache-control", b"no-store"),
+]
+
+
+class ProbeASGIMiddleware:
+    """
+    غلاف ASGI يجيب على /livez مباشرة بدون المرور بالتطبيق
+
+    يعمل مع FastAPI (app.add_middleware) ومع ASGI الخاص بـ Django.
+    """
+
+    def __init__(self, app, path: str = LIVE_PATH):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == self.path:
+            await send({"type": "http.response.start", "status": 200, "headers": _JSON_HEADERS})
+            await send({"type": "http.response.body", "body": LIVENESS_BODY})
+            return
+        await self.app(scope, receive, send)
+
+
+class ProbeWSGIMiddleware:
+    """غلاف WSGI يجيب على /livez مباشرة بدون بناء طلب Django"""
+
+    _headers = [(k.decode(), v.decode()) for k, v in _JSON_HEADERS]
+
+    def __init__(self, app, path: str = LIVE_PATH):
+        self.app = app
+        self.path = path
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") == self.path:
+            start_response("200 OK", self._headers)
+            return [LIVENESS_BODY]
+        return self.app(environ, start_response)
+
+
+# ==========================================
+# فحوصات الجاهزية
+# ==========================================
+
+def check_writable_dir(path, create: bool = False) -> Callable[[], None]:
+    """
+    فحص أن المجلد موجود وقابل للكتابة
+
+    Args:
+        path: مسار المجلد
+        create: إنشاء المجلد إذا لم يكن موجوداً (مثل MEDIA_ROOT)
+
+    Returns:
+        دالة فحص ترفع استثناء عند الفشل
+    """
+    def check():
+        if create:
+            os.makedirs(path, exist_ok=True)
+        if not os.path.isdir(path):
+            raise RuntimeError(f"المجلد غير موجود: {path}")
+        if not os.access(path, os.W_OK):
+            raise RuntimeError(f"المجلد غير قابل للكتابة: {path}")
+    return check
+
+
+def check_cache_backend(backend) -> Callable[[], None]:
+    """
+    فحص ذهاب وإياب للذاكرة المؤقتة (set ثم get)
+
+    Args:
+        backend: أي كائن يوفر set(key, value, ttl) و get(key)
+    """
+    def check():
+        key = f"readyz:{uuid.uuid4().hex}"
+        backend.set(key, "1", 5)
+        if backend.get(key) is None:
+            raise RuntimeError("القيمة لم تُقرأ من الذاكرة المؤقتة")
+        backend.delete(key)
+    return check
+
+
+class ReadinessProbe:
+    """
+    فحص جاهزية مركب مع نتيجة مخزنة لمدة ttl
+
+    طلب واحد فقط ينفذ الفحوصات عند انتهاء الصلاحية؛ الطلبات المتزامنة
+    تعيد النتيجة السابقة بدلاً من الانتظار.
+    """
+
+    def __init__(self, checks: Dict[str, Callable[[], None]], ttl: float = 5.0):
+        """
+        Args:
+            checks: قاموس اسم الفحص ← دالة ترفع استثناء عند الفشل
+            ttl: مدة صلاحية النتيجة بالثواني
+        """
+        self.checks = dict(checks)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result: Optional[Tuple[bool, bytes]] = None
+        self._expires = 0.0
+
+    def _run_checks(self) -> Tuple[bool, bytes]:
+        results = {}
+        ready = True
+        for name, check in self.checks.items():
+            started = time.perf_counter()
+            try:
+                check()
+                results[name] = {"ok": True}
+            except Exception as e:
+                ready = False
+                results[name] = {"ok": False, "error": str(e)}
+                logger.warning(f"⚠️ فشل فحص الجاهزية ({name}): {e}")
+            results[name]["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        body = json.dumps({
+            "status": "ready" if ready else "not_ready",
+            "checks": results,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }, ensure_ascii=False).encode("utf-8")
+        return ready, body
+
+    def check(self) -> Tuple[bool, bytes]:
+        """
+        نتيجة الجاهزية (من الذاكرة إذا لم تنتهِ صلاحيتها)
+
+        Returns:
+            (جاهز؟، جسم JSON مسلسل)
+        """
+        now = time.monotonic()
+        if self._result is not None and now < self._expires:
+            return self._result
+
+        if not self._lock.acquire(blocking=self._result is None):
+            return self._result
+        try:
+            if self._result is None or time.monotonic() >= self._expires:
+                self._result = self._run_checks()
+                self._expires = time.monotonic() + self.ttl
+            return self._result
+        finally:
+            self._lock.release()
@@ -0,0 +1,458 @@
+"""
+طابور المهام الخلفية (Background Jobs)
+
+العمليات الثقيلة (الاستيراد والتصدير والإحصائيات الكاملة والمسوحات) لا
+تُنفذ داخل الطلب: الطلب يسجل مهمة في جدول SQLite ويعيد معرفها فوراً،
+ومجمع خيوط داخل العملية ينفذها:
+- الأولوية: الأعلى أولاً ثم بترتيب التسجيل، مع حد تزامن لكل نوع
+- النتيجة تُكتب في ملف (<المعرف>.json أو .jsonl) للتحميل لاحقاً؛ الملف
+  الجزئي لا يُنشر إلا بعد نجاح المهمة
+- المهلة: كل مهمة لها موعد نهائي، والمعالج يتحقق منه مع الإلغاء عبر
+  context.check()
+- النجاة من إعادة التشغيل: المهمة الجارية تحمل عقداً (lease) يُجدد
+  دورياً؛ إذا توقفت العملية ينتهي العقد وتأخذها أي عملية أخرى (أو نفس
+  الخادم بعد إعادة تشغيله) حتى max_attempts محاولة
+
+لا وسيط خارجي: الجدول ملف SQLite واحد يمكن أن تتشاركه عمليات الخادم.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+TIMEOUT_REASON = "timeout"
+SHUTDOWN_REASON = "shutdown"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    result TEXT,
+    result_file TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority DESC, seq);
+"""
+
+COLUMNS = ("id", "kind", "params", "priority", "state", "attempts", "progress",
+           "result", "result_file", "error", "created_at", "started_at", "finished_at")
+
+
+class JobCancelled(Exception):
+    """أُلغيت المهمة أو تجاوزت مهلتها (يرفعها context.check)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class JobContext:
+    """
+    ما يراه معالج المهمة: المعاملات وملف النتيجة والتحقق من الإلغاء
+    """
+
+    def __init__(self, job_id: str, kind: str, params: dict, output: Path, deadline: float):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.output = output
+        self.deadline = deadline
+        self.progress = 0.0
+        self.reason: Optional[str] = None
+        self._cancel = threading.Event()
+
+    def cancel(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self, progress: Optional[float] = None) -> None:
+        """
+        تحديث التقدم والتوقف إذا أُلغيت المهمة أو انتهت مهلتها
+
+        Args:
+            progress: نسبة الإنجاز بين 0 و 1
+
+        Raises:
+            JobCancelled: عند الإلغاء أو تجاوز المهلة
+        """
+        if progress is not None:
+            self.progress = min(max(progress, 0.0), 1.0)
+        if not self.cancelled and time.time() > self.deadline:
+            self.cancel(TIMEOUT_REASON)
+        if self.cancelled:
+            raise JobCancelled(self.reason)
+
+
+class JobQueue:
+    """
+    طابور مهام مخزن في SQLite مع مجمع خيوط للتنفيذ
+    """
+
+    def __init__(self, db_path: str, results_dir: str, workers: int = 2, timeout: float = 600.0,
+                 lease: float = 30.0, max_attempts: int = 3, poll_interval: float = 1.0):
+        """
+        Args:
+            db_path: ملف قاعدة بيانات المهام
+            results_dir: مجلد ملفات النتائج
+            workers: عدد المهام المنفذة في نفس الوقت داخل هذه العملية
+            timeout: أقصى مدة لتنفيذ مهمة واحدة بالثواني
+            lease: مدة العقد؛ المهمة الجارية التي لم يُجدد عقدها تُعاد للطابور
+            max_attempts: أقصى عدد محاولات للمهمة التي انقطع تنفيذها
+            poll_interval: فترة البحث عن مهام سجلتها عمليات أخرى
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.results_dir = Path(results_dir)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        # معرف هذه النسخة من الطابور: يميز عقودها عن عقود العمليات الأخرى
+        self.owner = uuid.uuid4().hex
+        self._handlers: Dict[str, Callable[[JobContext], Optional[dict]]] = {}
+        self._suffixes: Dict[str, str] = {}
+        self._limits: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._active: Dict[str, JobContext] = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self._db = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    # ==========================================
+    # التسجيل والتشغيل
+    # ==========================================
+
+    def register(self, kind: str, handler: Callable[[JobContext], Optional[dict]],
+                 suffix: str = ".json", concurrency: Optional[int] = None) -> None:
+        """
+        تسجيل معالج لنوع مهمة
+
+        المعالج يكتب نتيجته في context.output ويعيد ملخصاً صغيراً (أو None)
+        يُحفظ في الجدول.
+
+        Args:
+            kind: اسم النوع
+            handler: الدالة المنفذة
+            suffix: امتداد ملف النتيجة
+            concurrency: أقصى عدد مهام من هذا النوع في نفس الوقت (None = بلا حد)
+        """
+        with self._lock:
+            self._handlers[kind] = handler
+            self._suffixes[kind] = suffix
+            self._running.setdefault(kind, 0)
+            if concurrency:
+                self._limits[kind] = concurrency
+
+    def start(self) -> None:
+        """بدء خيوط التنفيذ وخيط تجديد العقود"""
+        if self._threads:
+            return
+        self._stopped.clear()
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(
+                target=self._work, name=f"job-worker-{i}", daemon=True,
+            ))
+        self._threads.append(threading.Thread(target=self._renew, name="job-lease", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"✅ طابور المهام يعمل ({self.workers} عامل)")
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        إيقاف التنفيذ؛ المهام المقطوعة تعود للطابور لتكمل بعد إعادة التشغيل
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        with self._lock:
+            for context in self._active.values():
+                context.cancel(SHUTDOWN_REASON)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # ==========================================
+    # واجهة المهام
+    # ==========================================
+
+    def submit(self, kind: str, params: Optional[dict] = None, priority: int = 0) -> dict:
+        """
+        تسجيل مهمة جديدة
+
+        Args:
+            kind: نوع مسجل
+            params: معاملات قابلة للتحويل إلى JSON
+            priority: الأعلى ينفذ أولاً
+
+        Returns:
+            حالة المهمة
+
+        Raises:
+            ValueError: نوع غير مسجل أو معاملات غير قابلة للتحويل
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"نوع مهمة غير معروف: {kind}")
+        try:
+            encoded = json.dumps(params or {}, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"معاملات المهمة غير صالحة: {e}")
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, priority, state, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, encoded, int(priority), PENDING, time.time()),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """حالة المهمة (None إذا لم توجد)"""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,),
+            ).fetchone()
+            context = self._active.get(job_id)
+        if row is None:
+            return None
+        # التقدم في الجدول يُحدّث مع العقد؛ المهمة المحلية تعطي القيمة الحالية
+        return self._to_dict(row, context.progress if context is not None else None)
+
+    def jobs(self, limit: int = 50, state: Optional[str] = None) -> List[dict]:
+        """آخر المهام المسجلة (الأحدث أولاً)"""
+        query = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        args: tuple = ()
+        if state is not None:
+            query += " WHERE state = ?"
+            args = (state,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY seq DESC LIMIT ?", args + (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        إلغاء مهمة منتظرة أو جارية
+
+        المهمة الجارية في عملية أخرى تتوقف عند تجديد عقدها التالي.
+
+        Returns:
+            حالة المهمة (None إذا لم توجد)
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, owner = NULL WHERE id = ? AND state IN (?, ?)",
+                (CANCELLED, time.time(), job_id, PENDING, RUNNING),
+            )
+            context = self._active.get(job_id)
+        if context is not None:
+            context.cancel(CANCELLED)
+        return self.get(job_id)
+
+    def result_path(self, job_id: str) -> Optional[Path]:
+        """ملف نتيجة المهمة المنتهية بنجاح"""
+        job = self.get(job_id)
+        if job is None or job["state"] != DONE or not job["result_file"]:
+            return None
+        return self.results_dir / job["result_file"]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.05) -> Optional[dict]:
+        """انتظار انتهاء المهمة (أو انتهاء timeout) وإعادة حالتها"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["state"] in FINISHED:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def get_stats(self) -> dict:
+        """عدد المهام حسب الحالة والمهام الجارية في هذه العملية"""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+            running = dict(self._running)
+        return {
+            "workers": self.workers,
+            "states": {state: count for state, count in rows},
+            "running_here": running,
+            "limits": dict(self._limits),
+        }
+
+    # ==========================================
+    # التنفيذ
+    # ==========================================
+
+    def _work(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                logger.error(f"❌ خطأ في قراءة طابور المهام: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """
+        أخذ المهمة التالية: منتظرة، أو جارية انتهى عقدها (عملية متوقفة)
+
+        الاختيار والتحديث في معاملة واحدة (BEGIN IMMEDIATE) حتى لا تأخذ
+        عمليتان نفس المهمة.
+        """
+        now = time.time()
+        with self._lock:
+            kinds = [
+                kind for kind in self._handlers
+                if kind not in self._limits or self._running[kind] < self._limits[kind]
+            ]
+            if not kinds:
+                return None
+            marks = ", ".join("?" * len(kinds))
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET state = ?, error = ?, finished_at = ?, owner = NULL "
+                    "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, "انقطع التنفيذ في كل المحاولات", now, RUNNING, now, self.max_attempts),
+                )
+                row = self._db.execute(
+                    f"SELECT id, kind, params, attempts FROM jobs WHERE kind IN ({marks}) "
+                    "AND (state = ? OR (state = ? AND lease_until < ?)) "
+                    "ORDER BY priority DESC, seq LIMIT 1",
+                    (*kinds, PENDING, RUNNING, now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET state = ?, owner = ?, lease_until = ?, started_at = ?, "
+                        "attempts = attempts + 1, progress = 0, error = NULL WHERE id = ?",
+                        (RUNNING, self.owner, now + self.lease, now, row["id"]),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            if row is None:
+                return None
+            if row["attempts"]:
+                logger.warning(f"⚠️ استئناف مهمة منقطعة {row['id']} (محاولة {row['attempts'] + 1})")
+            self._running[row["kind"]] += 1
+            self._active[row["id"]] = JobContext(
+                row["id"], row["kind"], json.loads(row["params"]),
+                self.results_dir / f"{row['id']}.part", now + self.timeout,
+            )
+            return row
+
+    def _run(self, row: sqlite3.Row) -> None:
+        job_id, kind = row["id"], row["kind"]
+        context = self._active[job_id]
+        final = self.results_dir / f"{job_id}{self._suffixes[kind]}"
+        state, error, summary = DONE, None, None
+        try:
+            summary = self._handlers[kind](context)
+            # المعالج الذي لا يستدعي check() يُحاسب على مهلته عند انتهائه
+            context.check(1.0)
+            context.output.replace(final)
+        except JobCancelled as e:
+            state = FAILED if e.reason == TIMEOUT_REASON else CANCELLED
+            error = "تجاوزت المهمة المهلة" if e.reason == TIMEOUT_REASON else None
+        except Exception as e:
+            logger.error(f"❌ فشلت المهمة {kind} {job_id}: {e}")
+            state, error = FAILED, str(e)
+        finally:
+            context.output.unlink(missing_ok=True)
+
+        with self._lock:
+            self._running[kind] -= 1
+            del self._active[job_id]
+            if context.reason == SHUTDOWN_REASON:
+                # إيقاف الخادم: تعود المهمة للطابور دون احتساب المحاولة
+                cursor = self._db.execute(
+                    "UPDATE jobs SET state = ?, owner = NULL, lease_until = NULL, "
+                    "attempts = attempts - 1, progress = 0 WHERE id = ? AND owner = ? AND state = ?",
+                    (PENDING, job_id, self.owner, RUNNING),
+                )
+            else:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET state = ?, error = ?, result = ?, result_file = ?, progress = ?, "
+                    "finished_at = ?, owner = NULL WHERE id = ? AND owner = ? AND state = ?",
+                    (state, error, json.dumps(summary, ensure_ascii=False) if summary is not None else None,
+                     final.name if state == DONE else None, context.progress,
+                     time.time(), job_id, self.owner, RUNNING),
+                )
+        if state == DONE and cursor.rowcount == 0:
+            # أُلغيت أثناء التنفيذ أو أخذتها عملية أخرى بعد انتهاء العقد
+            final.unlink(missing_ok=True)
+        elif state == DONE:
+            logger.info(f"✅ انتهت المهمة {kind} {job_id}")
+        self._wakeup.set()
+
+    def _renew(self) -> None:
+        """تجديد عقود المهام الجارية ونقل تقدمها؛ المهمة المفقودة تُلغى محلياً"""
+        while not self._stopped.wait(self.lease / 3):
+            with self._lock:
+                contexts = list(self._active.values())
+                try:
+                    lost = []
+                    now = time.time()
+                    for context in contexts:
+                        cursor = self._db.execute(
+                            "UPDATE jobs SET lease_until = ?, progress = ? "
+                            "WHERE id = ? AND owner = ? AND state = ?",
+                            (now + self.lease, context.progress, context.id, self.owner, RUNNING),
+                        )
+                        if cursor.rowcount == 0:
+                            lost.append(context)
+                except sqlite3.Error as e:
+                    logger.error(f"❌ خطأ في تجديد عقود المهام: {e}")
+                    continue
+            for context in lost:
+                context.cancel(CANCELLED)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, progress: Optional[float] = None) -> dict:
+        job = {name: row[name] for name in COLUMNS}
+        job["job_id"] = job.pop("id")
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["progress"] = round((job["progress"] if progress is None else progress) * 100, 2)
+        return job
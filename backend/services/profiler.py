@@ -0,0 +1,311 @@
+"""
+محلل أداء الطلبات (Request Profiler)
+
+يوفر تحليلاً اختيارياً للطلبات باستخدام cProfile و tracemalloc
+لعينة قابلة للضبط من الطلبات أو لأي طلب يحمل ترويسة التصحيح،
+ويكتب التقارير في logs/profiles/ مع تجميع أكثر الدوال استهلاكاً لكل مسار
+
+مع FastAPI يُحلل الطلب داخل دالة المسار نفسها (profiled_route_class):
+دوال def تعمل في مجمع الخيوط، وتحليل حلقة الأحداث حول call_next لا يرى
+عملها ويحسب على الطلب coroutines أخرى متداخلة.
+"""
+
+from typing import Callable, Dict, Optional
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+FASTAPI_AVAILABLE = False
+try:
+    from fastapi.routing import APIRoute
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    APIRoute = object
+
+# الطلب الحالي ضمن العينة: يُضبط في الطبقة الوسيطة ويُقرأ في خيط دالة المسار
+_sampled: contextvars.ContextVar = contextvars.ContextVar("profile_sampled", default=False)
+
+
+class RequestProfiler:
+    """
+    محلل أداء الطلبات - يعمل فقط عند التفعيل
+
+    عند التعطيل لا تُركَّب أي طبقة وسيطة، لذلك لا توجد أي تكلفة
+    على مسار الطلب العادي.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.01,
+                 header: str = "X-Debug-Profile",
+                 output_dir: Optional[str] = None,
+                 trace_memory: bool = False, top_n: int = 20):
+        """
+        تهيئة محلل الأداء
+
+        Args:
+            enabled: تفعيل التحليل
+            sample_rate: نسبة الطلبات المحللة (0-1)
+            header: اسم ترويسة التصحيح التي تفرض التحليل
+            output_dir: مجلد التقارير (افتراضياً logs/profiles)
+            trace_memory: تفعيل tracemalloc لتتبع الذاكرة
+            top_n: عدد الدوال في ملخص كل مسار
+
+        Raises:
+            ValueError: إذا كانت نسبة العينة خارج النطاق
+        """
+        if not (0 <= sample_rate <= 1):
+            raise ValueError("نسبة العينة يجب أن تكون بين 0 و 1")
+
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.header = header
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+
+        if output_dir:
+            self.output_dir = Path(output_dir)
+        else:
+            self.output_dir = Path(__file__).parent.parent.parent / "logs" / "profiles"
+
+        # cProfile لا يدعم أكثر من محلل نشط في نفس الوقت
+        self._active = threading.Lock()
+        self._aggregate_lock = threading.Lock()
+        self._aggregates: Dict[str, dict] = {}
+
+        if self.enabled:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            logger.info(f"✅ محلل الأداء مفعّل (عينة {sample_rate:.2%})")
+
+    def should_profile(self, get_header: Callable[[str], Optional[str]]) -> bool:
+        """
+        تحديد ما إذا كان يجب تحليل الطلب
+
+        Args:
+            get_header: دالة تعيد قيمة ترويسة حسب اسمها
+
+        Returns:
+            True إذا كان الطلب ضمن العينة أو يحمل ترويسة التصحيح
+        """
+        if not self.enabled:
+            return False
+        if get_header(self.header):
+            return True
+        return random.random() < self.sample_rate
+
+    @contextmanager
+    def sampling(self, get_header: Callable[[str], Optional[str]]):
+        """
+        اختيار الطلب للعينة مرة واحدة لكل ما ينفذه (بما فيه خيوط المجمع)
+
+        Args:
+            get_header: دالة تعيد قيمة ترويسة حسب اسمها
+        """
+        token = _sampled.set(self.should_profile(get_header))
+        try:
+            yield
+        finally:
+            _sampled.reset(token)
+
+    def wrap(self, func: Callable, endpoint: str) -> Callable:
+        """
+        تغليف دالة المسار لتُحلل في الخيط الذي ينفذها إذا كان الطلب ضمن العينة
+
+        الدوال async تُحلل على حلقة الأحداث، فقد تدخل في تقريرها coroutines
+        أخرى تنفذ أثناء انتظارها.
+
+        Args:
+            func: دالة المسار (def أو async def)
+            endpoint: اسم المسار في التقارير
+
+        Returns:
+            دالة بنفس التوقيع
+        """
+        func = getattr(func, "__unprofiled__", func)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def profiled(*args, **kwargs):
+                if not _sampled.get():
+                    return await func(*args, **kwargs)
+                with self.profile(endpoint):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def profiled(*args, **kwargs):
+                if not _sampled.get():
+                    return func(*args, **kwargs)
+                with self.profile(endpoint):
+                    return func(*args, **kwargs)
+
+        profiled.__unprofiled__ = func
+        return profiled
+
+    @staticmethod
+    def endpoint_name(method: str, path: str) -> str:
+        """
+        توحيد اسم المسار باستبدال المعرفات الرقمية بـ {id}
+
+        Args:
+            method: طريقة HTTP
+            path: مسار الطلب
+
+        Returns:
+            اسم المسار الموحد (مثل "POST /api/v1/shots/{id}/record")
+        """
+        normalized = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+        return f"{method} {normalized}"
+
+    @contextmanager
+    def profile(self, endpoint: str):
+        """
+        تحليل كتلة من الكود وتسجيل النتيجة باسم المسار
+
+        إذا كان هناك طلب آخر قيد التحليل يتم تنفيذ الكتلة بدون تحليل.
+        يعيد قاموساً يمكن تعديل مفتاح "endpoint" فيه بعد التوجيه.
+
+        Args:
+            endpoint: اسم المسار (مثل "POST /api/v1/calculate")
+        """
+        context = {"endpoint": endpoint}
+        if not self._active.acquire(blocking=False):
+            yield context
+            return
+
+        started_tracing = False
+        memory_before = None
+        profiler = cProfile.Profile()
+        try:
+            if self.trace_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    started_tracing = True
+                memory_before = tracemalloc.take_snapshot()
+
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                yield context
+            finally:
+                profiler.disable()
+                duration = time.perf_counter() - start
+
+                memory_after = tracemalloc.take_snapshot() if memory_before else None
+                try:
+                    self._record(context["endpoint"], profiler, duration,
+                                 memory_before, memory_after)
+                except Exception as e:
+                    logger.warning(f"⚠️ تعذر حفظ تقرير التحليل: {e}")
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._active.release()
+
+    def _record(self, endpoint: str, profiler: cProfile.Profile, duration: float,
+                memory_before, memory_after) -> None:
+        """كتابة تقرير الطلب وتحديث التجميع حسب المسار"""
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+        endpoint_dir = self.output_dir / slug
+        endpoint_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+        profiler.dump_stats(str(endpoint_dir / f"{stamp}.prof"))
+
+        report = io.StringIO()
+        report.write(f"{endpoint} - {duration * 1000:.2f} ms\n\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(self.top_n)
+
+        if memory_after is not None:
+            report.write("\nأكبر التخصيصات في الذاكرة:\n")
+            for stat in memory_after.compare_to(memory_before, "lineno")[:self.top_n]:
+                report.write(f"{stat}\n")
+
+        with open(endpoint_dir / f"{stamp}.txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+
+        with self._aggregate_lock:
+            entry = self._aggregates.get(endpoint)
+            if entry is None:
+                entry = {"count": 0, "total_time": 0.0, "max_time": 0.0, "stats": None}
+                self._aggregates[endpoint] = entry
+
+            entry["count"] += 1
+            entry["total_time"] += duration
+            entry["max_time"] = max(entry["max_time"], duration)
+            if entry["stats"] is None:
+                entry["stats"] = pstats.Stats(profiler, stream=io.StringIO())
+            else:
+                entry["stats"].add(profiler)
+
+            summary = self._build_summary()
+
+        with open(self.output_dir / "summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"✅ تم تحليل الطلب {endpoint} ({duration * 1000:.2f} ms)")
+
+    def _build_summary(self) -> dict:
+        """بناء ملخص أكثر الدوال استهلاكاً لكل مسار"""
+        summary = {}
+        for endpoint, entry in self._aggregates.items():
+            rows = []
+            for func, (cc, nc, tt, ct, _) in entry["stats"].stats.items():
+                filename, line, name = func
+                rows.append({
+                    "function": f"{filename}:{line}({name})",
+                    "calls": nc,
+                    "total_time": round(tt, 6),
+                    "cumulative_time": round(ct, 6),
+                })
+            rows.sort(key=lambda r: r["cumulative_time"], reverse=True)
+
+            summary[endpoint] = {
+                "profiled_requests": entry["count"],
+                "avg_ms": round(entry["total_time"] / entry["count"] * 1000, 3),
+                "max_ms": round(entry["max_time"] * 1000, 3),
+                "top_functions": rows[:self.top_n],
+            }
+        return summary
+
+    def get_summary(self) -> dict:
+        """
+        الحصول على ملخص التحليل المجمع حسب المسار
+
+        Returns:
+            قاموس المسارات مع أكثر الدوال استهلاكاً
+        """
+        with self._aggregate_lock:
+            return self._build_summary()
+
+
+def profiled_route_class(profiler: RequestProfiler) -> type:
+    """
+    فئة مسار FastAPI تحلل دالة كل مسار باسم "METHOD /path/{param}"
+
+    تُستخدم مع profiler.sampling في طبقة وسيطة تختار العينة.
+
+    Raises:
+        RuntimeError: إذا لم تكن FastAPI مثبتة
+    """
+    if not FASTAPI_AVAILABLE:
+        raise RuntimeError("FastAPI غير مثبت")
+
+    class ProfiledRoute(APIRoute):
+        def __init__(self, path: str, endpoint: Callable, **kwargs):
+            methods = ",".join(sorted(kwargs.get("methods") or ["GET"]))
+            super().__init__(path, profiler.wrap(endpoint, f"{methods} {path}"), **kwargs)
+
+    return ProfiledRoute
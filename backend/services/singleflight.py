@@ -0,0 +1,75 @@
+"""
+دمج الحسابات المتزامنة لنفس المفتاح (Single-Flight)
+
+إذا طلبت عدة خيوط نفس المفتاح في نفس الوقت ينفذ الأول (القائد)
+الحساب وينتظر الباقون نتيجته بدلاً من تكرار العمل.
+"""
+
+from typing import Any, Callable, Dict, Hashable
+import threading
+
+
+class _Call:
+    """حساب جارٍ لمفتاح واحد"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    مجموعة حسابات مدموجة حسب المفتاح (داخل العملية فقط)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        تنفيذ fn مرة واحدة لكل مجموعة طلبات متزامنة على نفس المفتاح
+
+        Args:
+            key: مفتاح الحساب
+            fn: دالة الحساب (بدون معاملات)
+
+        Returns:
+            نتيجة fn (نفس الكائن لكل المنتظرين)
+
+        Raises:
+            أي استثناء ترفعه fn يُعاد رفعه لكل المنتظرين
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """عدد الحسابات الجارية حالياً"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+📈 مقاييس أداء استدعاءات API داخل العملية
+
+- FastAPI عبر TestClient (يتم التخطي إذا لم تكن FastAPI مثبتة)
+- الخادم البديل run_server.py عبر HTTPServer على منفذ حر
+"""
+
+import json
+import os
+import tempfile
+import threading
+import urllib.request
+from http.server import HTTPServer
+
+import pytest
+
+CALCULATE_QUERY = "rails=2&cue_position=5&white_ball=3.5&target=2&pocket=3"
+
+# مجلدات البيانات مؤقتة قبل تحميل الإعدادات حتى لا يكتب import api داخل المشروع
+_TMP = tempfile.TemporaryDirectory(prefix="billiards-bench-")
+os.environ.setdefault("TENANTS_DIR", os.path.join(_TMP.name, "tenants"))
+os.environ.setdefault("SWEEPS_DIR", os.path.join(_TMP.name, "sweeps"))
+os.environ.setdefault("JOBS_DIR", os.path.join(_TMP.name, "jobs"))
+os.environ.setdefault("JOBS_DB", os.path.join(_TMP.name, "jobs.sqlite3"))
+
+
+def _registry(engine):
+    """سجل يعيد المحرك المعزول للمستأجر الافتراضي"""
+    from backend.billiards.registry import EngineRegistry
+
+    return EngineRegistry(engine.data_dir, factory=lambda data_dir: engine)
+
+
+@pytest.fixture
+def fastapi_client(monkeypatch, engine, shots_factory):
+    """عميل FastAPI مع محرك معزول يحتوي 1000 تسديقة"""
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import api
+
+    engine.shots = list(shots_factory(1_000))
+    monkeypatch.setattr(api, "registry", _registry(engine))
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def stdlib_server(monkeypatch, engine, shots_factory):
+    """خادم run_server.py على منفذ حر مع محرك معزول"""
+    import run_server
+
+    engine.shots = list(shots_factory(1_000))
+    monkeypatch.setattr(run_server, "registry", _registry(engine))
+
+    server = HTTPServer(("127.0.0.1", 0), run_server.BilliardsAPIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _request(url: str, method: str = "GET") -> dict:
+    req = urllib.request.Request(url, method=method)
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())
+
+
+def bench_fastapi_calculate(benchmark, fastapi_client):
+    """POST /api/v1/calculate (FastAPI)"""
+    response = benchmark(fastapi_client.post, f"/api/v1/calculate?{CALCULATE_QUERY}")
+    assert response.status_code == 200
+
+
+def bench_fastapi_list_shots(benchmark, fastapi_client):
+    """GET /api/v1/shots (FastAPI)"""
+    response = benchmark(fastapi_client.get, "/api/v1/shots?limit=100")
+    assert response.status_code == 200
+
+
+def bench_fastapi_statistics_by_rails(benchmark, fastapi_client):
+    """GET /api/v1/statistics/by-rails (FastAPI)"""
+    response = benchmark(fastapi_client.get, "/api/v1/statistics/by-rails")
+    assert response.status_code == 200
+
+
+def bench_stdlib_calculate(benchmark, stdlib_server):
+    """POST /api/v1/calculate (run_server.py)"""
+    data = benchmark(_request, f"{stdlib_server}/api/v1/calculate?{CALCULATE_QUERY}", "POST")
+    assert data["success"]
+
+
+def bench_stdlib_statistics(benchmark, stdlib_server):
+    """GET /api/v1/statistics (run_server.py)"""
+    data = benchmark(_request, f"{stdlib_server}/api/v1/statistics")
+    assert "total_calculations" in data
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+🔁 حساب /calculate: create_shot و get_calculation_summary لكل طلب مقابل CalculationCache
+
+المزيج: 64 تركيبة مختلفة تتكرر (أجهزة على نفس الطاولة).
+"""
+
+import logging
+
+from backend.billiards.calculation_cache import CalculationCache
+from backend.billiards.calculator import ShotCalculator
+
+POINTS = [(1 + i % 4, 5.0, float(i % 8), float(i // 8), i % 6) for i in range(64)]
+REQUESTS = POINTS * 32
+
+
+def _quiet():
+    logging.getLogger("backend.billiards.calculator").setLevel(logging.WARNING)
+
+
+def bench_calculate_each_request(benchmark):
+    """الطريقة السابقة: الحساب كاملاً لكل طلب"""
+    _quiet()
+    calculator = ShotCalculator()
+
+    def run():
+        for point in REQUESTS:
+            calculator.get_calculation_summary(calculator.create_shot(*point))
+
+    benchmark(run)
+
+
+def bench_calculation_cache(benchmark):
+    _quiet()
+    calculations = CalculationCache()
+
+    def run():
+        for point in REQUESTS:
+            calculations.calculate(*point)
+
+    benchmark(run)
+    assert calculations.get_stats()["computed"] == len(POINTS)
+
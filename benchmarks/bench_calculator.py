@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+📈 مقاييس أداء الحاسبة ونظام الجدران
+"""
+
+import pytest
+
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.rail_system import RailPositionsSystem
+
+
+@pytest.fixture(scope="module")
+def calculator():
+    return ShotCalculator()
+
+
+@pytest.fixture(scope="module")
+def rail_system():
+    return RailPositionsSystem()
+
+
+def bench_create_shot(benchmark, calculator):
+    """ShotCalculator.create_shot"""
+    shot = benchmark(calculator.create_shot, 3, 5.0, 4.5, 3.5, 2)
+    assert shot.rails == 3
+
+
+def bench_calculation_summary(benchmark, calculator):
+    """ShotCalculator.get_calculation_summary"""
+    shot = calculator.create_shot(2, 5.0, 4.5, 3.5, 2)
+    summary = benchmark(calculator.get_calculation_summary, shot)
+    assert summary['rails'] == 2
+
+
+@pytest.mark.parametrize("rails,position", [
+    (1, 5.0),    # موضع معروف
+    (1, 5.5),    # استيفاء
+    (3, 4.2),    # استيفاء بين مواضع غير منتظمة
+])
+def bench_rail_position(benchmark, rail_system, rails, position):
+    """RailPositionsSystem.get_position (مباشر واستيفاء)"""
+    result = benchmark(rail_system.get_position, rails, position)
+    assert result.rail == rails
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+📈 الحل العكسي: الفهرس المبني مسبقاً مقابل تجربة كل (جدران، علامة)
+"""
+
+import logging
+
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.inverse import InverseSolver, brute_force_setups
+
+
+def bench_brute_force(benchmark):
+    """4 جدران × 101 علامة عبر create_shot"""
+    calculator = ShotCalculator()
+    logging.disable(logging.INFO)  # create_shot يسجل كل تسديقة
+    try:
+        benchmark.pedantic(brute_force_setups, args=(calculator, 3.5, 6.2, 2), rounds=5, iterations=1)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def bench_inverse_index(benchmark):
+    solver = InverseSolver()
+    setups = benchmark(solver.best_setups, 3.5, 6.2, 2)
+    assert setups
+
+
+def bench_build_index(benchmark):
+    """كلفة البناء مرة واحدة عند التشغيل"""
+    calculator = ShotCalculator()
+    benchmark.pedantic(InverseSolver, args=(calculator,), rounds=3, iterations=1)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+🏆 أفضل وأسوأ التسديدات: كومة Top-K مقابل max()/min() على كل التسديدات
+"""
+
+import random
+
+import pytest
+
+from leaderboard import Leaderboard
+
+SIZES = [1_000, 100_000]
+
+
+def _rows(count):
+    rng = random.Random(21)
+    return [(i, rng.uniform(0, 100), rng.randint(1, 4)) for i in range(count)]
+
+
+def _scan(rows):
+    """الطريقة السابقة: مرور كامل لكل من الأفضل والأسوأ"""
+    return max(rows, key=lambda r: r[1]), min(rows, key=lambda r: r[1])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_scan_best_worst(benchmark, size):
+    rows = _rows(size)
+    benchmark(_scan, rows)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_leaderboard_best_worst(benchmark, size):
+    board = Leaderboard(k=5, partitions=("rails",))
+    for item_id, value, rails in _rows(size):
+        board.add(item_id, value, None, rails=rails)
+    benchmark(lambda: (board.best(1), board.worst(1)))
+
+
+def bench_leaderboard_add(benchmark):
+    rows = _rows(10_000)
+
+    def fill():
+        board = Leaderboard(k=10, partitions=("rails",))
+        for item_id, value, rails in rows:
+            board.add(item_id, value, None, rails=rails)
+        return board
+
+    benchmark(fill)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+📈 مقاييس أداء تحويل نموذج التسديقة
+"""
+
+from backend.models.shot import Shot
+
+
+def bench_shot_to_dict(benchmark, shots_factory):
+    """Shot.to_dict"""
+    shot = shots_factory(1)[0]
+    data = benchmark(shot.to_dict)
+    assert data['rails'] == shot.rails
+
+
+def bench_shot_from_dict(benchmark, shots_factory):
+    """Shot.from_dict"""
+    data = shots_factory(1)[0].to_dict()
+    shot = benchmark(Shot.from_dict, data)
+    assert shot.rails == data['rails']
+
+
+def bench_shot_round_trip_1k(benchmark, shots_factory):
+    """to_dict ثم from_dict لـ 1000 تسديقة"""
+    shots = shots_factory(1_000)
+
+    def round_trip():
+        return [Shot.from_dict(s.to_dict()) for s in shots]
+
+    result = benchmark(round_trip)
+    assert len(result) == len(shots)
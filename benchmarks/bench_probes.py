@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+📈 زمن فحوصات الحيوية والجاهزية
+
+/livez يُجاب من الغلاف قبل التطبيق، و /readyz يعيد نتيجة مخزنة؛
+كلاهما يجب أن يبقى أقل من 1ms حتى تحت الحمل.
+"""
+
+import asyncio
+
+from backend.services.cache import MemoryCacheBackend
+from backend.services.health import (
+    ProbeASGIMiddleware, ProbeWSGIMiddleware, ReadinessProbe,
+    check_cache_backend, check_writable_dir,
+)
+
+BUDGET_SECONDS = 0.001
+
+
+def _unreachable(*args):
+    raise AssertionError("التطبيق يجب ألا يُستدعى")
+
+
+def _assert_within_budget(benchmark):
+    """بدون قياس (--benchmark-disable) لا توجد إحصائيات للمقارنة"""
+    if benchmark.stats:
+        assert benchmark.stats.stats.mean < BUDGET_SECONDS
+
+
+def bench_livez_wsgi(benchmark):
+    middleware = ProbeWSGIMiddleware(_unreachable)
+    environ = {"PATH_INFO": "/livez"}
+    benchmark(middleware, environ, lambda status, headers: None)
+    _assert_within_budget(benchmark)
+
+
+def bench_livez_asgi(benchmark):
+    middleware = ProbeASGIMiddleware(_unreachable)
+    scope = {"type": "http", "path": "/livez"}
+    loop = asyncio.new_event_loop()
+
+    async def send(message):
+        pass
+
+    try:
+        benchmark(lambda: loop.run_until_complete(middleware(scope, None, send)))
+    finally:
+        loop.close()
+    _assert_within_budget(benchmark)
+
+
+def bench_readyz_cached(benchmark, tmp_path):
+    probe = ReadinessProbe({
+        "storage": check_writable_dir(tmp_path),
+        "cache": check_cache_backend(MemoryCacheBackend()),
+    }, ttl=60)
+    probe.check()
+    benchmark(probe.check)
+    _assert_within_budget(benchmark)
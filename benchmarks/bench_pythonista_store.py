@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+📈 زمن حفظ تسديدة في تطبيقات Pythonista عند وجود 10k تسديدة
+
+يقارن إعادة كتابة shots.json كاملاً (السلوك القديم) مع
+الإضافة إلى سجل JSON Lines في AppendOnlyShotStore.
+"""
+
+import json
+
+import pytest
+
+from pythonista_storage import AppendOnlyShotStore, ShotStatsSummary
+
+EXISTING_SHOTS = 10_000
+
+
+def _shot(i):
+    return {'id': i, 'angle': 15.0, 'power': 55.0, 'distance': 120.0,
+            'difficulty': 2, 'cue_type': 'عادي', 'success': 62.5,
+            'timestamp': '2026-01-01T10:00:00'}
+
+
+@pytest.fixture
+def existing_shots():
+    return [_shot(i) for i in range(EXISTING_SHOTS)]
+
+
+def bench_save_shot_rewrite_json(benchmark, tmp_path, existing_shots):
+    """السلوك القديم: قراءة الملف كاملاً ثم إعادة كتابته مع indent=2"""
+    shots_file = tmp_path / 'shots.json'
+    with open(shots_file, 'w', encoding='utf-8') as f:
+        json.dump(existing_shots, f, ensure_ascii=False, indent=2)
+
+    def save_shot():
+        with open(shots_file, 'r', encoding='utf-8') as f:
+            shots = json.load(f)
+        shots.append(_shot(len(shots)))
+        with open(shots_file, 'w', encoding='utf-8') as f:
+            json.dump(shots, f, ensure_ascii=False, indent=2)
+
+    benchmark.pedantic(save_shot, rounds=20, iterations=1)
+
+
+def bench_save_shot_append_only(benchmark, tmp_path, existing_shots):
+    """AppendOnlyShotStore.append (بدون ضغط خلفي أثناء القياس)"""
+    store = AppendOnlyShotStore(tmp_path / 'shots.jsonl', compact_every=None)
+    for shot in existing_shots:
+        store.append(shot)
+
+    benchmark.pedantic(store.append, args=(_shot(EXISTING_SHOTS),), rounds=500, iterations=1)
+
+
+def bench_save_shot_append_with_summary(benchmark, tmp_path, existing_shots):
+    """مسار AdvancedDataManager.save_shot: إضافة + تحديث الملخص التراكمي"""
+    store = AppendOnlyShotStore(tmp_path / 'shots.jsonl', compact_every=None)
+    for shot in existing_shots:
+        store.append(shot)
+    summary = ShotStatsSummary(tmp_path / 'stats_summary.json')
+    summary.rebuild(store.load(), store.size())
+
+    def save_shot():
+        shot = _shot(EXISTING_SHOTS)
+        summary.add(shot, store.append(shot))
+
+    benchmark.pedantic(save_shot, rounds=500, iterations=1)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+📊 مئينات التوزيع: ملخص KLL مقابل ترتيب كل القيم عند كل طلب
+"""
+
+import random
+
+import pytest
+
+from quantile_sketch import QuantileSketch
+
+SIZES = [1_000, 100_000]
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _values(count):
+    rng = random.Random(13)
+    return [rng.uniform(0, 100) for _ in range(count)]
+
+
+def _sorted_percentiles(values):
+    """الطريقة المباشرة: ترتيب القائمة كاملة"""
+    ordered = sorted(values)
+    return {p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] for p in PERCENTILES}
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_sorted_percentiles(benchmark, size):
+    values = _values(size)
+    benchmark(_sorted_percentiles, values)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_sketch_percentiles(benchmark, size):
+    sketch = QuantileSketch(seed=1)
+    sketch.extend(_values(size))
+
+    def query():
+        sketch._sorted = None  # قياس الاستعلام بدون الذاكرة المؤقتة
+        return sketch.percentiles(PERCENTILES)
+
+    benchmark(query)
+
+
+def bench_sketch_update(benchmark):
+    values = _values(10_000)
+
+    def fill():
+        sketch = QuantileSketch(seed=1)
+        sketch.extend(values)
+        return sketch
+
+    benchmark(fill)
+
+
+def bench_sketch_merge(benchmark):
+    """دمج ملخصات 8 عمليات في ملخص واحد"""
+    values = _values(80_000)
+    parts = [QuantileSketch(seed=i) for i in range(8)]
+    for index, value in enumerate(values):
+        parts[index % 8].update(value)
+    benchmark(QuantileSketch.merged, parts)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+🗂️ سجل المحركات: ذاكرة ثابتة مع عدد متزايد من المستأجرين
+
+كل طلب لمستأجر جديد يحمّل محركه ويطرد الأقدم استخداماً، فعدد المحركات
+المقيمة لا يتجاوز max_engines مهما زاد عدد المستأجرين.
+"""
+
+import tracemalloc
+
+import pytest
+
+from backend.billiards.registry import EngineRegistry
+
+MAX_ENGINES = 4
+
+
+@pytest.mark.parametrize("tenants", [8, 32])
+def bench_registry_round_robin(benchmark, tmp_path, tenants):
+    """طلب لكل مستأجر بالتناوب (أسوأ حالة: تحميل وطرد في كل طلب)"""
+    registry = EngineRegistry(str(tmp_path), max_engines=MAX_ENGINES)
+    names = [f"table-{i}" for i in range(tenants)]
+
+    def visit_all():
+        for name in names:
+            with registry.acquire(name) as engine:
+                engine.get_statistics()
+
+    tracemalloc.start()
+    benchmark.pedantic(visit_all, rounds=3, iterations=1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info["peak_mb"] = round(peak / 1024 / 1024, 2)
+    benchmark.extra_info["evictions"] = registry.evictions
+    assert registry.get_stats()["resident"] <= MAX_ENGINES
+
+
+def bench_registry_hit(benchmark, tmp_path):
+    """طلب لمحرك مقيم: تكلفة التثبيت فقط"""
+    registry = EngineRegistry(str(tmp_path))
+
+    def visit():
+        with registry.acquire("table-1") as engine:
+            return engine
+
+    visit()
+    benchmark(visit)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+📈 اتجاه الأداء: المجاميع المتحركة مقابل اقتطاع آخر 20 تسديدة عند كل عرض
+"""
+
+import itertools
+import random
+
+import pytest
+
+from rolling_analytics import RollingAnalytics
+
+SIZES = [1_000, 100_000]
+
+
+def _values(count):
+    rng = random.Random(9)
+    return [rng.uniform(0, 100) for _ in range(count)]
+
+
+def _sliced_trend(values):
+    """الطريقة السابقة: إعادة حساب النافذتين من القائمة"""
+    recent = values[-10:]
+    older = values[-20:-10]
+    avg_recent = sum(recent) / len(recent)
+    avg_older = sum(older) / len(older) if older else 50
+    return avg_recent - avg_older
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_sliced_trend(benchmark, size):
+    values = _values(size)
+    benchmark(_sliced_trend, values)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_rolling_trend(benchmark, size):
+    analytics = RollingAnalytics()
+    analytics.extend(_values(size))
+    benchmark(analytics.trend)
+
+
+def bench_rolling_push(benchmark):
+    """كلفة تحديث كل النوافذ و EWMA بتسديدة واحدة"""
+    analytics = RollingAnalytics(time_windows=(3600, 86400))
+    values = itertools.cycle(_values(1_000))
+    benchmark(lambda: analytics.push(next(values)))
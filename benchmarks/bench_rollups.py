@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+📈 إحصائيات فترة زمنية: جداول التجميع مقابل المرور على كل التسديقات
+
+سنة من البيانات؛ الاستعلام عن السنة كاملة لكل عدد جدران.
+"""
+
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from backend.analytics.rollups import RollupStore
+
+START = datetime(2025, 1, 1)
+END = datetime(2026, 1, 1)
+
+SIZES = [
+    100_000,
+    pytest.param(1_000_000, marks=pytest.mark.slow),
+]
+
+
+@pytest.fixture(scope="module")
+def dated_shots(shots_factory):
+    """نفس التسديقات الاصطناعية موزعة على سنة"""
+    def factory(count):
+        rng = random.Random(1)
+        shots = shots_factory(count)
+        for shot in shots:
+            shot.timestamp = START + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        return shots
+    return factory
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_full_scan(benchmark, dated_shots, size):
+    shots = dated_shots(size)
+
+    def scan():
+        counts = {}
+        for shot in shots:
+            if START <= shot.timestamp < END:
+                counts[shot.rails] = counts.get(shot.rails, 0) + 1
+        return counts
+
+    benchmark.pedantic(scan, rounds=3, iterations=1)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_rollup_year(benchmark, dated_shots, size):
+    store = RollupStore()
+    store.rebuild(dated_shots(size))
+    result = benchmark(store.query, START, END, group_by=["rails"])
+    assert sum(g["calculated"] for g in result["groups"]) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_rollup_ragged_range(benchmark, dated_shots, size):
+    """فترة غير محاذاة: دقائق وساعات وأيام عند الطرفين"""
+    store = RollupStore()
+    store.rebuild(dated_shots(size))
+    benchmark(store.query, datetime(2025, 2, 3, 5, 17), datetime(2025, 11, 28, 19, 41), group_by=["rails"])
+
+
+def bench_daily_series(benchmark, dated_shots):
+    store = RollupStore()
+    store.rebuild(dated_shots(100_000))
+    benchmark(store.series, START, END, "day", group_by=["rails"])
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+📈 التسديقات المشابهة: فهرس الشبكة مقابل المرور الخطي على engine.shots
+
+الهدف: استعلام k=10 أقل من ميلي ثانية عند 1M تسديقة.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from backend.billiards.shot_index import ShotIndex
+
+SIZES = [
+    100_000,
+    pytest.param(1_000_000, marks=pytest.mark.slow),
+]
+
+_INDEXES = {}
+
+
+def _index(shots):
+    if len(shots) not in _INDEXES:
+        index = ShotIndex()
+        index.rebuild(shots)
+        _INDEXES[len(shots)] = index
+    return _INDEXES[len(shots)]
+
+
+def _queries():
+    rng = random.Random(3)
+    return itertools.cycle([tuple(rng.uniform(0, 10) for _ in range(3)) for _ in range(500)])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_linear_scan_knn(benchmark, shots_factory, size):
+    """المرجع: ترتيب كل تسديقات نفس الجدران حسب المسافة"""
+    shots = shots_factory(size)
+    queries = _queries()
+
+    def scan():
+        x, y, z = next(queries)
+        return sorted(
+            ((s.white_ball - x) ** 2 + (s.target - y) ** 2 + (s.cue_position - z) ** 2, i)
+            for i, s in enumerate(shots) if s.rails == 2
+        )[:10]
+
+    benchmark.pedantic(scan, rounds=3, iterations=1)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_grid_knn(benchmark, shots_factory, size):
+    index = _index(shots_factory(size))
+    queries = _queries()
+    result = benchmark(lambda: index.knn(*next(queries), rails=2, k=10))
+    assert len(result) == 10
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_grid_knn_all_rails(benchmark, shots_factory, size):
+    index = _index(shots_factory(size))
+    queries = _queries()
+    benchmark(lambda: index.knn(*next(queries), k=10))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_grid_radius(benchmark, shots_factory, size):
+    index = _index(shots_factory(size))
+    queries = _queries()
+    benchmark(lambda: index.radius(*next(queries), radius=0.3, rails=2))
+
+
+def bench_incremental_add(benchmark, shots_factory):
+    shots = shots_factory(100_000)
+    index = ShotIndex()
+    ids = itertools.count()
+    benchmark(lambda: index.add(next(ids), shots[len(index) % len(shots)]))
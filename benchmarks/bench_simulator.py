@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+📈 محاكاة مونت كارلو: NumPy الموجه مقابل حلقة بايثون لكل عينة
+
+كل قياس يستخدم بذرة مختلفة حتى لا تُقاس ذاكرة النتائج.
+"""
+
+import itertools
+
+import pytest
+
+from backend.billiards import simulator as simulator_module
+from backend.billiards.simulator import MonteCarloSimulator, NoiseModel, ShotParameters
+
+SHOT = ShotParameters(angle=20, power=55, distance=120, difficulty=3)
+NOISE = NoiseModel()
+
+
+def bench_python_loop_100k(benchmark):
+    """حلقة بايثون لكل عينة (البديل بدون NumPy)"""
+    seeds = itertools.count()
+    benchmark.pedantic(
+        lambda: simulator_module._simulate_chunk_python(SHOT, NOISE, 100_000, next(seeds), 0),
+        rounds=3, iterations=1,
+    )
+
+
+@pytest.mark.skipif(not simulator_module.NUMPY_AVAILABLE, reason="NumPy غير مثبت")
+def bench_numpy_100k(benchmark):
+    seeds = itertools.count()
+    benchmark(lambda: simulator_module._simulate_chunk_numpy(SHOT, NOISE, 100_000, next(seeds), 0))
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not simulator_module.NUMPY_AVAILABLE, reason="NumPy غير مثبت")
+def bench_simulate_5m_samples(benchmark):
+    simulator = MonteCarloSimulator()
+    seeds = itertools.count()
+    result = benchmark.pedantic(
+        lambda: simulator.simulate(SHOT, NOISE, samples=5_000_000, seed=next(seeds)),
+        rounds=3, iterations=1,
+    )
+    assert result["samples"] == 5_000_000
+
+
+def bench_cached_repeat(benchmark):
+    """تكرار نفس الاستعلام: من ذاكرة النتائج"""
+    simulator = MonteCarloSimulator()
+    simulator.simulate(SHOT, NOISE, samples=10_000)
+    benchmark(simulator.simulate, SHOT, NOISE, samples=10_000)
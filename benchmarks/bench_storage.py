@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+📈 مقاييس أداء التخزين (save_to_storage / load_from_storage)
+"""
+
+import pytest
+
+SIZES = [
+    1_000,
+    100_000,
+    pytest.param(1_000_000, marks=pytest.mark.slow),
+]
+
+
+def _rounds(size: int) -> int:
+    """عدد الجولات حسب الحجم لإبقاء مدة التشغيل معقولة"""
+    return 10 if size <= 1_000 else 3 if size <= 100_000 else 1
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_save_to_storage(benchmark, engine, shots_factory, size):
+    """BilliardsEngine.save_to_storage"""
+    engine.shots = list(shots_factory(size))
+    benchmark.pedantic(engine.save_to_storage, rounds=_rounds(size), iterations=1)
+    assert engine.shots_file.exists()
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_load_from_storage(benchmark, engine, shots_factory, size):
+    """BilliardsEngine.load_from_storage"""
+    engine.shots = list(shots_factory(size))  # يحفظ أيضاً
+    benchmark.pedantic(engine.load_from_storage, rounds=_rounds(size), iterations=1)
+    assert len(engine.shots) == size
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+🧮 مسح شبكة المعاملات: create_shot لكل تركيبة مقابل القطع داخل العملية ومجمع العمليات
+
+الشبكة: 4 جدران × 3 عصا × 21 بيضاء × 21 هدف × 6 جيوب = 31,752 تركيبة.
+كل قياس يستخدم مجلداً جديداً حتى لا تُقرأ النتيجة من الملف المحفوظ.
+"""
+
+import itertools
+import logging
+import os
+
+import pytest
+
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.sweep import SweepGrid, SweepService
+
+STEP = {"start": 0, "stop": 10, "step": 0.5}
+GRID = SweepGrid.from_dict({"cue_position": [2, 5, 8], "white_ball": STEP, "target": STEP})
+
+
+def bench_create_shot_loop(benchmark):
+    """الطريقة اليدوية: create_shot و get_calculation_summary لكل تركيبة"""
+    calculator = ShotCalculator()
+    logging.getLogger("backend.billiards.calculator").setLevel(logging.WARNING)
+
+    def run():
+        return [
+            calculator.get_calculation_summary(calculator.create_shot(*point))
+            for point in itertools.product(*GRID.axes)
+        ]
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+
+@pytest.mark.parametrize("workers", [0, 4])
+def bench_sweep_service(benchmark, tmp_path, workers):
+    if workers > (os.cpu_count() or 1):
+        pytest.skip("عدد المعالجات أقل من العمال")
+    service = SweepService(str(tmp_path / "warmup"), workers=workers)
+    # تشغيل أولي لبدء عمليات المجمع خارج القياس
+    service.submit(SweepGrid(rails=(1,), pocket=(0,))).wait()
+    runs = itertools.count()
+
+    def run():
+        service.results_dir = tmp_path / str(next(runs))
+        service.results_dir.mkdir()
+        job = service.submit(GRID)
+        assert job.wait(120)
+        return job
+
+    try:
+        job = benchmark.pedantic(run, rounds=3, iterations=1)
+    finally:
+        service.close()
+    assert job.completed == GRID.size
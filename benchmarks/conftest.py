@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+إعدادات مشتركة لمقاييس الأداء (pytest-benchmark)
+
+النتائج تُحفظ تلقائياً بصيغة JSON في benchmarks/.results/
+لمقارنتها بين الالتزامات عبر --benchmark-compare
+"""
+
+import sys
+import random
+import logging
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / ".results"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.engine import BilliardsEngine
+
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+# سجلات INFO لكل تسديقة تشوّه القياس
+logging.getLogger("backend").setLevel(logging.WARNING)
+
+
+def pytest_configure(config):
+    """توجيه نتائج المقاييس إلى benchmarks/.results بغض النظر عن مجلد التشغيل"""
+    if config.getoption("benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{RESULTS_DIR}"
+
+
+def make_shots(count: int, seed: int = 42) -> list:
+    """
+    إنشاء تسديقات اصطناعية حتمية
+
+    Args:
+        count: عدد التسديقات
+        seed: بذرة المولد العشوائي
+
+    Returns:
+        قائمة كائنات Shot
+    """
+    rng = random.Random(seed)
+    calculator = ShotCalculator()
+    shots = []
+    for _ in range(count):
+        shots.append(calculator.create_shot(
+            rails=rng.randint(1, 4),
+            cue_position=round(rng.uniform(0, 10), 1),
+            white_ball=round(rng.uniform(0, 10), 1),
+            target=round(rng.uniform(0, 10), 1),
+            pocket=rng.randint(0, 5),
+        ))
+    return shots
+
+
+_SHOTS_CACHE = {}
+
+
+@pytest.fixture(scope="session")
+def shots_factory():
+    """مولد تسديقات مع ذاكرة مؤقتة لكل حجم (لتقليل وقت التحضير)"""
+    def factory(count: int) -> list:
+        if count not in _SHOTS_CACHE:
+            _SHOTS_CACHE[count] = make_shots(count)
+        return _SHOTS_CACHE[count]
+    return factory
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """محرك بلياردو معزول في مجلد مؤقت"""
+    return BilliardsEngine(data_dir=str(tmp_path / "data"))
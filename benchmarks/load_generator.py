@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مولد الأحمال لواجهات البلياردو (asyncio + sockets فقط)
+
+يعيد تشغيل مزيج واقعي من طلبات الحساب والقوائم والإحصائيات
+والتسجيل والتصدير ويقيس زمن الاستجابة ومعدل الأخطاء.
+
+الاستخدام:
+  # خادم يعمل مسبقاً
+  python benchmarks/load_generator.py --url http://127.0.0.1:8001 -c 20 -d 30
+
+  # تشغيل الخادم داخل العملية على منفذ حر
+  python benchmarks/load_generator.py --serve stdlib -c 10 -d 15
+  python benchmarks/load_generator.py --serve fastapi --rate 200 -d 20
+  python benchmarks/load_generator.py --serve django --mix django -d 10
+
+  # معدل وصول ثابت (حلقة مفتوحة) مع حفظ النتائج
+  python benchmarks/load_generator.py --url http://127.0.0.1:8001 --rate 100 --json result.json
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urlparse
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# ==========================================
+# مزيج الطلبات
+# ==========================================
+
+# (الاسم، الوزن)
+MIXES: Dict[str, List[Tuple[str, int]]] = {
+    "api": [
+        ("calculate", 40),
+        ("list", 25),
+        ("stats", 20),
+        ("record", 10),
+        ("export", 5),
+    ],
+    "django": [
+        ("health", 50),
+        ("info", 30),
+        ("index", 20),
+    ],
+}
+
+
+class RequestFactory:
+    """بناء الطلبات حسب النوع بمعاملات عشوائية واقعية"""
+
+    def __init__(self, rng: random.Random, known_shots: int = 0):
+        self.rng = rng
+        self.known_shots = known_shots
+
+    def build(self, kind: str) -> Tuple[str, str]:
+        """
+        بناء طلب
+
+        Args:
+            kind: نوع الطلب
+
+        Returns:
+            (الطريقة، المسار)
+        """
+        rng = self.rng
+        if kind == "calculate":
+            query = (
+                f"rails={rng.randint(1, 4)}"
+                f"&cue_position={rng.uniform(0, 10):.1f}"
+                f"&white_ball={rng.uniform(0, 10):.1f}"
+                f"&target={rng.uniform(0, 10):.1f}"
+                f"&pocket={rng.randint(0, 5)}"
+            )
+            return "POST", f"/api/v1/calculate?{query}"
+        if kind == "list":
+            if rng.random() < 0.5:
+                return "GET", f"/api/v1/shots?rails={rng.randint(1, 4)}&limit=50"
+            return "GET", "/api/v1/shots?limit=50"
+        if kind == "stats":
+            return "GET", rng.choice(["/api/v1/statistics", "/api/v1/statistics/by-rails"])
+        if kind == "record":
+            shot_id = rng.randrange(max(self.known_shots, 1))
+            successful = "true" if rng.random() < 0.6 else "false"
+            return "POST", f"/api/v1/shots/{shot_id}/record?successful={successful}"
+        if kind == "export":
+            return "POST", "/api/v1/export"
+        if kind == "health":
+            return "GET", "/health/"
+        if kind == "info":
+            return "GET", "/api/info/"
+        if kind == "index":
+            return "GET", "/"
+        raise ValueError(f"نوع طلب غير معروف: {kind}")
+
+
+# ==========================================
+# عميل HTTP بسيط فوق asyncio
+# ==========================================
+
+async def http_request(host: str, port: int, method: str, path: str,
+                       timeout: float) -> Tuple[int, bytes]:
+    """
+    إرسال طلب HTTP/1.1 واحد وقراءة الرد كاملاً
+
+    Returns:
+        (رمز الحالة، جسم الرد)
+    """
+    async def _do():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            request = (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                "Accept: application/json\r\n"
+                "Content-Length: 0\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(request.encode("ascii"))
+            await writer.drain()
+            data = await reader.read()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+        head, _, body = data.partition(b"\r\n\r\n")
+        status_line = head.split(b"\r\n", 1)[0]
+        parts = status_line.split()
+        if len(parts) < 2:
+            raise ConnectionError("رد HTTP غير صالح")
+        return int(parts[1]), body
+
+    return await asyncio.wait_for(_do(), timeout)
+
+
+# ==========================================
+# تجميع النتائج
+# ==========================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """النسبة المئوية بطريقة أقرب رتبة"""
+    if not sorted_values:
+        return 0.0
+    # الرتبة ceil(p × n / 100)؛ الضرب قبل القسمة يتجنب خطأ الفاصلة (0.999 × 1000)
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+class LoadStats:
+    """تجميع زمن الاستجابة والأخطاء حسب نوع الطلب"""
+
+    PERCENTILES = (50, 90, 95, 99, 99.9)
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[int, int] = {}
+        self.dropped = 0
+
+    def add(self, kind: str, latency: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(kind, []).append(latency)
+        if status is None or status >= 400:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+        key = status if status is not None else 0
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    def _summarize(self, values: List[float], errors: int) -> dict:
+        ordered = sorted(values)
+        count = len(ordered)
+        summary = {
+            "requests": count,
+            "errors": errors,
+            "error_rate": round(errors / count * 100, 3) if count else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+        }
+        for pct in self.PERCENTILES:
+            summary[f"p{pct:g}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+        return summary
+
+    def report(self, elapsed: float) -> dict:
+        """
+        بناء تقرير النتائج
+
+        Args:
+            elapsed: مدة الاختبار الفعلية بالثواني
+
+        Returns:
+            قاموس يحتوي الإجمالي والتفصيل حسب النوع
+        """
+        all_values = [v for values in self.latencies.values() for v in values]
+        total_errors = sum(self.errors.values())
+        overall = self._summarize(all_values, total_errors)
+        overall["throughput_rps"] = round(len(all_values) / elapsed, 2) if elapsed else 0.0
+        overall["dropped"] = self.dropped
+        return {
+            "duration_s": round(elapsed, 3),
+            "overall": overall,
+            "by_type": {
+                kind: self._summarize(values, self.errors.get(kind, 0))
+                for kind, values in sorted(self.latencies.items())
+            },
+            "status_codes": {str(k): v for k, v in sorted(self.status_codes.items())},
+        }
+
+
+# ==========================================
+# مولد الأحمال
+# ==========================================
+
+class LoadGenerator:
+    """
+    مولد أحمال بنمطين:
+
+    - حلقة مغلقة (بدون rate): عدد ثابت من العمال يرسل كل منهم الطلب التالي فور انتهاء السابق
+    - حلقة مفتوحة (مع rate): وصول بتوزيع بواسون بالمعدل المحدد، والتزامن حد أعلى؛
+      الزمن يُقاس من موعد الإرسال المخطط لتجنب إخفاء التأخير
+    """
+
+    def __init__(self, url: str, mix: List[Tuple[str, int]], concurrency: int = 10,
+                 duration: float = 10.0, rate: Optional[float] = None,
+                 timeout: float = 10.0, seed: Optional[int] = None):
+        parsed = urlparse(url)
+        if parsed.scheme != "http":
+            raise ValueError("يدعم المولد http فقط")
+        if concurrency < 1:
+            raise ValueError("التزامن يجب أن يكون 1 على الأقل")
+        if rate is not None and rate <= 0:
+            raise ValueError("معدل الوصول يجب أن يكون موجباً")
+
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.kinds = [kind for kind, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.rate = rate
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.factory = RequestFactory(self.rng)
+        self.stats = LoadStats()
+
+    async def _discover_shots(self) -> None:
+        """معرفة عدد التسديقات الموجودة لاختيار معرفات صحيحة للتسجيل"""
+        if "record" not in self.kinds:
+            return
+        try:
+            status, body = await http_request(self.host, self.port, "GET",
+                                               "/api/v1/shots?limit=1", self.timeout)
+            if status == 200:
+                self.factory.known_shots = int(json.loads(body).get("total", 0))
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"⚠️ تعذر معرفة عدد التسديقات: {e}")
+
+    async def _fire(self, kind: str, scheduled: float) -> None:
+        method, path = self.factory.build(kind)
+        status = None
+        try:
+            status, _ = await http_request(self.host, self.port, method, path, self.timeout)
+            if kind == "calculate" and status == 200:
+                self.factory.known_shots += 1
+        except (OSError, asyncio.TimeoutError, ConnectionError):
+            status = None
+        self.stats.add(kind, time.perf_counter() - scheduled, status)
+
+    def _pick(self) -> str:
+        return self.rng.choices(self.kinds, weights=self.weights)[0]
+
+    async def _closed_loop(self, deadline: float) -> None:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._fire(self._pick(), time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _open_loop(self, deadline: float) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        next_at = time.perf_counter()
+
+        async def run(kind, scheduled):
+            async with semaphore:
+                await self._fire(kind, scheduled)
+
+        while next_at < deadline:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.concurrency * 10:
+                # العميل نفسه مشبع - نسجل الطلب كمُسقط بدلاً من تضخيم الطابور
+                self.stats.dropped += 1
+            else:
+                task = asyncio.ensure_future(run(self._pick(), next_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_at += self.rng.expovariate(self.rate)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def run(self) -> dict:
+        """
+        تشغيل الاختبار
+
+        Returns:
+            تقرير النتائج
+        """
+        await self._discover_shots()
+        start = time.perf_counter()
+        deadline = start + self.duration
+        if self.rate:
+            await self._open_loop(deadline)
+        else:
+            await self._closed_loop(deadline)
+        return self.stats.report(time.perf_counter() - start)
+
+
+# ==========================================
+# تشغيل الخادم داخل العملية
+# ==========================================
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _isolated_registry():
+    """سجل محركات في مجلد مؤقت حتى لا يلوث الاختبار بيانات المستخدم"""
+    from backend.billiards.registry import EngineRegistry
+    return EngineRegistry(tempfile.mkdtemp(prefix="billiards-load-"))
+
+
+def start_stdlib_server() -> Tuple[str, Callable[[], None]]:
+    """تشغيل run_server.py في خيط خلفي"""
+    from http.server import ThreadingHTTPServer
+    import run_server
+
+    run_server.registry = _isolated_registry()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), run_server.BilliardsAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+
+    return f"http://127.0.0.1:{server.server_address[1]}", stop
+
+
+def start_fastapi_server() -> Tuple[str, Callable[[], None]]:
+    """تشغيل api.py عبر uvicorn في خيط خلفي"""
+    import uvicorn
+    import api
+
+    if not api.FASTAPI_AVAILABLE:
+        raise RuntimeError("FastAPI غير مثبت")
+
+    api.registry = _isolated_registry()
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("فشل بدء خادم FastAPI")
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+def start_django_server() -> Tuple[str, Callable[[], None]]:
+    """تشغيل تطبيق Django عبر wsgiref في خيط خلفي"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hello_world.settings")
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    server = make_server("127.0.0.1", 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+
+    return f"http://127.0.0.1:{server.server_address[1]}", stop
+
+
+SERVERS = {
+    "stdlib": start_stdlib_server,
+    "fastapi": start_fastapi_server,
+    "django": start_django_server,
+}
+
+
+# ==========================================
+# واجهة سطر الأوامر
+# ==========================================
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    """
+    تحليل مزيج مخصص بصيغة calculate=50,stats=30,list=20
+    أو اسم مزيج معرف مسبقاً (api, django)
+    """
+    if value in MIXES:
+        return MIXES[value]
+    mix = []
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        mix.append((kind.strip(), int(weight or 1)))
+    return mix
+
+
+def print_report(report: dict) -> None:
+    """طباعة التقرير بشكل مقروء"""
+    overall = report["overall"]
+    print("=" * 70)
+    print(f"📊 المدة: {report['duration_s']}s | الطلبات: {overall['requests']} | "
+          f"الإنتاجية: {overall['throughput_rps']} طلب/ث")
+    print(f"❌ الأخطاء: {overall['errors']} ({overall['error_rate']}%) | "
+          f"المُسقط: {overall['dropped']}")
+    print("=" * 70)
+    header = f"{'النوع':<12}{'عدد':>8}{'أخطاء%':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    rows = list(report["by_type"].items()) + [("الإجمالي", overall)]
+    for kind, s in rows:
+        print(f"{kind:<12}{s['requests']:>8}{s['error_rate']:>9}"
+              f"{s['p50_ms']:>9}{s['p90_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+    print("(الأزمنة بالملّي ثانية)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """تشغيل مولد الأحمال من سطر الأوامر"""
+    parser = argparse.ArgumentParser(description="مولد الأحمال لواجهات البلياردو")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="عنوان الخادم (مثل http://127.0.0.1:8001)")
+    target.add_argument("--serve", choices=sorted(SERVERS), help="تشغيل الخادم داخل العملية")
+    parser.add_argument("--mix", default=None,
+                        help="api أو django أو مزيج مخصص: calculate=50,stats=50")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="عدد الطلبات المتزامنة")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="المدة بالثواني")
+    parser.add_argument("-r", "--rate", type=float, default=None,
+                        help="معدل الوصول (طلب/ث) - بدونه تعمل الحلقة المغلقة")
+    parser.add_argument("--timeout", type=float, default=10.0, help="مهلة الطلب بالثواني")
+    parser.add_argument("--seed", type=int, default=None, help="بذرة المولد العشوائي")
+    parser.add_argument("--json", dest="json_path", help="حفظ التقرير بصيغة JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    stop = None
+    url = args.url
+    if args.serve:
+        url, stop = SERVERS[args.serve]()
+        print(f"🚀 الخادم ({args.serve}) يعمل على {url}")
+
+    mix_name = args.mix or ("django" if args.serve == "django" else "api")
+    try:
+        generator = LoadGenerator(
+            url, parse_mix(mix_name), concurrency=args.concurrency,
+            duration=args.duration, rate=args.rate, timeout=args.timeout, seed=args.seed,
+        )
+        report = asyncio.run(generator.run())
+    finally:
+        if stop:
+            stop()
+
+    report["target"] = {"url": url, "server": args.serve, "mix": mix_name,
+                        "concurrency": args.concurrency, "rate": args.rate}
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ تم حفظ التقرير في {args.json_path}")
+
+    return 0 if report["overall"]["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
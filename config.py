@@ -122,7 +122,54 @@ TEST_DEBUG = True
 
 CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
 CACHE_TTL = int(os.getenv("CACHE_TTL", 300))  # 5 دقائق
+CACHE_URL = os.getenv("CACHE_URL", "memory://")  # memory:// أو redis://host:6379/1
 MAX_SHOTS = int(os.getenv("MAX_SHOTS", 10000))
+# نتائج /calculate المحفوظة حسب المعاملات (الطلبات المتطابقة المتزامنة تُدمج دائماً)
+CALCULATION_CACHE_SIZE = int(os.getenv("CALCULATION_CACHE_SIZE", 4096))
+READINESS_TTL = float(os.getenv("READINESS_TTL", 5))  # صلاحية نتيجة /readyz بالثواني
+
+# محاكاة مونت كارلو
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", 0))  # 0 = داخل عملية الخادم
+SIMULATION_MAX_SAMPLES = int(os.getenv("SIMULATION_MAX_SAMPLES", 5_000_000))
+
+# مسح شبكة المعاملات (جداول التدريب)
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", 0))  # 0 = خيط داخل عملية الخادم
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", 5_000_000))
+SWEEPS_DIR = Path(os.getenv("SWEEPS_DIR") or DATA_DIR / "sweeps")  # نتائج محفوظة حسب البصمة
+
+# طابور المهام الخلفية (استيراد وتصدير وإحصائيات كاملة ومسوحات)
+JOBS_DB = Path(os.getenv("JOBS_DB") or DATA_DIR / "jobs.sqlite3")  # جدول المهام (يبقى بعد إعادة التشغيل)
+JOBS_DIR = Path(os.getenv("JOBS_DIR") or DATA_DIR / "jobs")  # ملفات النتائج للتحميل
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # مهام متزامنة في كل عملية
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", 600))  # أقصى مدة لمهمة واحدة بالثواني
+
+# البث المباشر (WebSocket / SSE)
+EVENTS_HISTORY = int(os.getenv("EVENTS_HISTORY", 1000))  # أحداث محفوظة للاستئناف
+EVENTS_FRAME_INTERVAL = float(os.getenv("EVENTS_FRAME_INTERVAL", 0.25))  # أقل مدة بين إطارين
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", 15))  # نبضة keep-alive بالثواني
+
+# المستأجرون (لاعبون أو طاولات): محرك لكل مستأجر في ذاكرة LRU
+TENANTS_DIR = Path(os.getenv("TENANTS_DIR") or DATA_DIR / "tenants")
+ENGINE_CACHE_SIZE = int(os.getenv("ENGINE_CACHE_SIZE", 32))  # أقصى عدد محركات في الذاكرة
+ENGINE_MEMORY_BUDGET_MB = float(os.getenv("ENGINE_MEMORY_BUDGET_MB", 256))  # ميزانية تقديرية
+
+# التحكم في القبول: حد المعدل لكل عميل (429) وحد التزامن العام مع طابور محدود (503)
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", 0))  # طلبات/ثانية لكل عميل (0 = معطل)
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 0)) or None  # 0 = ضعف RATE_LIMIT_RPS
+RATE_LIMIT_KEY_HEADER = os.getenv("RATE_LIMIT_KEY_HEADER", "X-API-Key")  # وإلا عنوان IP
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 64))  # 0 = بلا حد
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 128))
+QUEUE_TIMEOUT = float(os.getenv("QUEUE_TIMEOUT", 5))  # أقصى انتظار في الطابور بالثواني
+
+# ==========================================
+# إعدادات تحليل الأداء (Profiling)
+# ==========================================
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.01))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Debug-Profile")
+PROFILING_TRACE_MEMORY = os.getenv("PROFILING_TRACE_MEMORY", "False").lower() == "true"
+PROFILES_DIR = LOGS_DIR / "profiles"
 
 # ==========================================
 # إعدادات التصدير والاستيراد
@@ -11,6 +11,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from backend.services.health import ProbeASGIMiddleware
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hello_world.settings")
 
-application = get_asgi_application()
+# /livez يُجاب قبل Django (بدون طبقات وسيطة أو جلسات)
+application = ProbeASGIMiddleware(get_asgi_application())
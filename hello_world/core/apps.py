@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    """الصفحات الأساسية وخط الملفات الثابتة"""
+
+    name = "hello_world.core"
+    label = "core"
@@ -0,0 +1,40 @@
+"""
+معلومات البناء المنشور (Build) لمفاتيح التخزين المؤقت و ETag
+
+BUILD_ID و DEPLOY_TIME يأتيان من الإعدادات (متغيرات البيئة عند النشر).
+إذا لم يُحددا يُستخدم وقت بدء العملية، فيتغيران مع كل إعادة تشغيل
+ولا تبقى نسخ قديمة في الذاكرة المؤقتة أو في متصفح الـ iPad بعد النشر.
+"""
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+_PROCESS_START = datetime.now(timezone.utc).replace(microsecond=0)
+
+_UNSET = ("", "unknown", None)
+
+
+def _parse_deploy_time(value):
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def build_id() -> str:
+    """معرف البناء الحالي (يدخل في مفاتيح التخزين المؤقت و ETag)"""
+    value = getattr(settings, "BUILD_ID", None)
+    if value in _UNSET:
+        return f"{getattr(settings, 'VERSION', '0')}-{int(_PROCESS_START.timestamp())}"
+    return str(value)
+
+
+def build_time() -> datetime:
+    """وقت النشر (يُستخدم كـ Last-Modified للصفحات الثابتة)"""
+    value = getattr(settings, "DEPLOY_TIME", None)
+    parsed = None if value in _UNSET else _parse_deploy_time(value)
+    return parsed or _PROCESS_START
@@ -0,0 +1,46 @@
+"""
+باحث الملفات الثابتة لملفات الواجهة في جذر المشروع
+
+ملفات الـ PWA (script.js، unified-app.html، ...) موجودة في جذر المشروع
+بجانب ملفات Python، فلا يمكن إضافة الجذر كاملاً إلى STATICFILES_DIRS.
+هذا الباحث يعرض فقط الملفات المذكورة في ROOT_STATIC_ASSETS.
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.checks import Error
+from django.core.files.storage import FileSystemStorage
+
+
+class RootAssetsFinder(BaseFinder):
+    """يعرض ملفات محددة من BASE_DIR كملفات ثابتة بنفس أسمائها"""
+
+    def __init__(self, app_names=None, *args, **kwargs):
+        self.root = str(settings.BASE_DIR)
+        self.names = list(getattr(settings, "ROOT_STATIC_ASSETS", []))
+        self.storage = FileSystemStorage(location=self.root)
+        super().__init__(*args, **kwargs)
+
+    def check(self, **kwargs):
+        return [
+            Error(f"ROOT_STATIC_ASSETS: الملف '{name}' غير موجود", id="core.E001")
+            for name in self.names
+            if not os.path.isfile(os.path.join(self.root, name))
+        ]
+
+    def find(self, path, find_all=False, **kwargs):
+        matches = []
+        if path in self.names:
+            full_path = os.path.join(self.root, path)
+            if os.path.isfile(full_path):
+                if not find_all:
+                    return full_path
+                matches.append(full_path)
+        return matches
+
+    def list(self, ignore_patterns):
+        for name in self.names:
+            if os.path.isfile(os.path.join(self.root, name)):
+                yield name, self.storage
@@ -0,0 +1,62 @@
+"""
+بناء الملفات الثابتة للنشر
+
+python manage.py build_assets [--clear]
+
+يشغل collectstatic (البصمات + إعادة كتابة صفحات HTML + الضغط المسبق)
+ثم يطبع حجم كل ملف قبل الضغط وبعده.
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.checks import Tags
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from hello_world.core.storage import BROTLI_AVAILABLE
+
+
+class Command(BaseCommand):
+    help = "جمع الملفات الثابتة مع البصمات والنسخ المضغوطة (.gz/.br) وطباعة تقرير الأحجام"
+    requires_system_checks = [Tags.staticfiles]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="حذف STATIC_ROOT قبل الجمع")
+
+    def handle(self, *args, **options):
+        if not hasattr(staticfiles_storage, "hashed_files"):
+            raise CommandError(
+                "STORAGES['staticfiles'] يجب أن يكون "
+                "hello_world.core.storage.CompressedManifestStaticFilesStorage"
+            )
+
+        call_command("collectstatic", interactive=False, clear=options["clear"], verbosity=0)
+        staticfiles_storage.load_manifest()
+
+        root = str(settings.STATIC_ROOT)
+        totals = [0, 0, 0]
+        self.stdout.write(f"{'الملف':<60} {'الأصلي':>10} {'gzip':>10} {'brotli':>10}")
+        for name, hashed_name in sorted(staticfiles_storage.hashed_files.items()):
+            sizes = [self._size(root, hashed_name + suffix) for suffix in ("", ".gz", ".br")]
+            if not sizes[1]:
+                continue
+            for i, size in enumerate(sizes):
+                totals[i] += size or sizes[0]
+            self.stdout.write(
+                f"{hashed_name:<60} {sizes[0]:>10} {sizes[1]:>10} {sizes[2] or '-':>10}"
+            )
+
+        brotli_total = totals[2] if BROTLI_AVAILABLE else "-"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ تم بناء الملفات الثابتة في {root} "
+            f"({totals[0]} → gzip {totals[1]} / brotli {brotli_total} بايت)"
+        ))
+        if not BROTLI_AVAILABLE:
+            self.stdout.write(self.style.WARNING("⚠️ مكتبة brotli غير مثبتة - تم إنشاء نسخ .gz فقط"))
+
+    @staticmethod
+    def _size(root, name):
+        path = os.path.join(root, name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from backend.services.profiler import RequestProfiler
+
+
+class ProfilingMiddleware:
+    """
+    تحليل عينة من الطلبات باستخدام cProfile
+
+    عند تعطيل PROFILING_ENABLED يُزال من السلسلة عند بدء التشغيل
+    (MiddlewareNotUsed) فلا تكون له أي تكلفة.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.profiler = RequestProfiler(
+            enabled=True,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            header=settings.PROFILING_HEADER,
+            output_dir=str(settings.PROFILES_DIR),
+            trace_memory=settings.PROFILING_TRACE_MEMORY,
+        )
+
+    def __call__(self, request):
+        if not self.profiler.should_profile(request.headers.get):
+            return self.get_response(request)
+
+        endpoint = self.profiler.endpoint_name(request.method, request.path)
+        with self.profiler.profile(endpoint) as context:
+            response = self.get_response(request)
+            match = getattr(request, "resolver_match", None)
+            if match is not None and match.route:
+                context["endpoint"] = f"{request.method} /{match.route}"
+        return response
@@ -0,0 +1,122 @@
+"""
+تخزين الملفات الثابتة مع البصمات والضغط المسبق
+
+يبني على ManifestStaticFilesStorage (أسماء ملفات تحتوي بصمة المحتوى)
+ويضيف عند collectstatic:
+- إعادة كتابة مراجع <script src> و <link href> و <img src> في صفحات HTML
+  إلى الأسماء المبصومة، ونسخ النتيجة إلى الاسم الأصلي للصفحة حتى يبقى
+  رابطها ثابتاً
+- نسخ مضغوطة مسبقاً .gz (و .br إذا كانت مكتبة brotli مثبتة) لكل ملف نصي
+"""
+
+import gzip
+import logging
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+# محاولة استيراد brotli (اختياري)
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".js", ".css", ".html", ".json", ".svg", ".txt", ".xml", ".map")
+MIN_COMPRESS_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ملفات مبصومة + صفحات HTML معاد كتابتها + نسخ .gz/.br"""
+
+    patterns = ManifestStaticFilesStorage.patterns + (
+        (
+            "*.html",
+            (
+                (
+                    r"""(?P<matched>(?P<attr>\bsrc=)["'](?P<url>[^"'{}<>]+)["'])""",
+                    '%(attr)s"%(url)s"',
+                ),
+                (
+                    r"""(?P<matched>(?P<attr><link\b[^>]*?\bhref=)["'](?P<url>[^"'{}<>]+)["'])""",
+                    '%(attr)s"%(url)s"',
+                ),
+            ),
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._missing_refs = set()
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+        if not name.endswith(".html"):
+            return converter
+
+        def lenient_converter(matchobj):
+            # صفحات HTML تحتوي مراجع قديمة لملفات غير موجودة؛ تُترك كما هي
+            try:
+                return converter(matchobj)
+            except (ValueError, SuspiciousFileOperation):
+                missing = (name, matchobj.group("url"))
+                if missing not in self._missing_refs:
+                    self._missing_refs.add(missing)
+                    logger.warning(f"⚠️ مرجع غير موجود في {name}: {missing[1]}")
+                return matchobj.group("matched")
+
+        return lenient_converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        for name in paths:
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if not hashed_name:
+                continue
+            if name.endswith(".html"):
+                self._replace(name, self._read(hashed_name))
+            self.compress(name)
+            self.compress(hashed_name)
+
+    def _read(self, name):
+        with self.open(name) as f:
+            return f.read()
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def compress(self, name):
+        """
+        كتابة النسخ المضغوطة لملف واحد (إذا كان نصياً وتقلص حجمه)
+
+        Args:
+            name: اسم الملف داخل STATIC_ROOT
+
+        Returns:
+            قائمة أسماء الملفات المضغوطة المكتوبة
+        """
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+        data = self._read(name)
+        if len(data) < MIN_COMPRESS_SIZE:
+            return []
+
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if BROTLI_AVAILABLE:
+            variants.append((".br", brotli.compress(data, quality=11)))
+
+        written = []
+        for suffix, compressed in variants:
+            if len(compressed) < len(data):
+                self._replace(name + suffix, compressed)
+                written.append(name + suffix)
+        return written
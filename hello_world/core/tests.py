@@ -0,0 +1,127 @@
+"""
+🧪 اختبارات الصفحة الرئيسية و api_info
+
+python manage.py test hello_world.core
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from hello_world.core.views import static_asset
+
+
+class ConditionalViewsTests(TestCase):
+    """التخزين المؤقت والطلبات الشرطية (ETag / Last-Modified)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_served_from_cache_and_revalidated(self):
+        """الصفحة تُعرض مرة واحدة ثم تعيد 304 عند تطابق ETag"""
+        first = self.client.get("/")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertTemplateNotUsed("index.html"):
+            second = self.client.get("/")
+        self.assertEqual(second.content, first.content)
+
+        not_modified = self.client.get("/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_api_info_etag_tied_to_build(self):
+        """تغيير BUILD_ID يغير ETag ومحتوى api_info"""
+        with override_settings(BUILD_ID="build-1"):
+            old = self.client.get("/api/info/")
+            self.assertEqual(old.json()["build_id"], "build-1")
+            self.assertEqual(
+                self.client.get("/api/info/", HTTP_IF_NONE_MATCH=old["ETag"]).status_code, 304
+            )
+
+        with override_settings(BUILD_ID="build-2"):
+            new = self.client.get("/api/info/", HTTP_IF_NONE_MATCH=old["ETag"])
+            self.assertEqual(new.status_code, 200)
+            self.assertNotEqual(new["ETag"], old["ETag"])
+
+
+class StaticAssetPipelineTests(TestCase):
+    """البصمات وإعادة كتابة صفحات HTML والنسخ المضغوطة"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.source = base / "src"
+        self.static_root = base / "static_root"
+        self.source.mkdir()
+        (self.source / "app.js").write_text("console.log('billiards');\n" * 40)
+        (self.source / "shell.html").write_text(
+            '<script src="app.js"></script>\n'
+            '<script src="../missing.js"></script>\n'
+            '<a href="other.html">link</a>\n' + "<p>5A Diamond</p>\n" * 40
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _collect(self):
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "hello_world.core.storage.CompressedManifestStaticFilesStorage"},
+        }
+        with override_settings(STATIC_ROOT=self.static_root, STATICFILES_DIRS=[self.source],
+                               STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+                               STORAGES=storages):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            with open(self.static_root / "staticfiles.json", encoding="utf-8") as f:
+                return json.load(f)["paths"]
+
+    def test_collectstatic_hashes_rewrites_and_compresses(self):
+        paths = self._collect()
+        hashed_js = paths["app.js"]
+        self.assertNotEqual(hashed_js, "app.js")
+        self.assertTrue((self.static_root / (hashed_js + ".gz")).exists())
+
+        # الصفحة بالاسم الثابت تشير إلى النسخة المبصومة
+        shell = (self.static_root / "shell.html").read_text()
+        self.assertIn(f'src="{hashed_js}"', shell)
+        self.assertIn('src="../missing.js"', shell)
+        self.assertIn('href="other.html"', shell)
+
+    def test_static_asset_view_headers(self):
+        paths = self._collect()
+        factory = RequestFactory()
+        with override_settings(STATIC_ROOT=self.static_root):
+            hashed = static_asset(factory.get("/", HTTP_ACCEPT_ENCODING="gzip, br"), paths["app.js"])
+            self.assertEqual(hashed["Content-Encoding"], "gzip")
+            self.assertIn("immutable", hashed["Cache-Control"])
+            hashed.close()
+
+            shell = static_asset(factory.get("/"), "shell.html")
+            self.assertNotIn("Content-Encoding", shell)
+            self.assertIn("no-cache", shell["Cache-Control"])
+            shell.close()
+
+
+class ProbeTests(TestCase):
+    """فحوصات الحيوية والجاهزية"""
+
+    def test_livez_answered_by_wsgi_wrapper(self):
+        from hello_world.wsgi import application
+
+        statuses = []
+        body = application({"PATH_INFO": "/livez", "REQUEST_METHOD": "GET"},
+                           lambda status, headers: statuses.append(status))
+        self.assertEqual(statuses, ["200 OK"])
+        self.assertEqual(json.loads(b"".join(body)), {"status": "alive"})
+
+    def test_readyz_reports_checks(self):
+        response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertEqual(set(response.json()["checks"]), {"database", "cache", "storage"})
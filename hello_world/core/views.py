@@ -1,25 +1,86 @@
-from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.template.loader import render_to_string
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from functools import lru_cache
+import hashlib
+import json
+import mimetypes
+import os
 import platform
+import re
 import sys
 
-def index(request):
-    """الصفحة الرئيسية"""
-    context = {
-        "title": "نظام البلياردو المتقدم 5A Diamond System Pro",
-        "version": "2.0.0",
-        "debug": settings.DEBUG,
+from backend.services.health import ReadinessProbe, check_cache_backend, check_writable_dir
+
+from .build import build_id, build_time
+
+
+@lru_cache(maxsize=1)
+def _runtime_info():
+    """معلومات البيئة الثابتة طوال عمر العملية"""
+    return {
         "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
+        "python_short": f"{sys.version_info.major}.{sys.version_info.minor}",
         "platform": platform.system(),
     }
-    return render(request, "index.html", context)
 
-def api_info(request):
-    """نقطة نهاية API للحصول على معلومات التطبيق"""
-    return JsonResponse({
+
+def _build_last_modified(request):
+    return build_time()
+
+
+def _revalidate(response):
+    """السماح للمتصفح بالتخزين مع التحقق (ETag) عند كل فتح للتطبيق"""
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _index_etag(request):
+    return f"index-{build_id()}-{int(settings.DEBUG)}"
+
+
+@condition(etag_func=_index_etag, last_modified_func=_build_last_modified)
+def index(request):
+    """
+    الصفحة الرئيسية
+
+    تُعرض مرة واحدة لكل بناء وتُخدم من الذاكرة المؤقتة بدون محرك القوالب؛
+    المتصفح يتحقق عبر ETag/Last-Modified ويحصل على 304 إذا لم يتغير البناء.
+    """
+    key = f"core:index:{_index_etag(request)}"
+    content = cache.get(key)
+    if content is None:
+        runtime = _runtime_info()
+        context = {
+            "title": "نظام البلياردو المتقدم 5A Diamond System Pro",
+            "version": "2.0.0",
+            "debug": settings.DEBUG,
+            "python_version": runtime["python_version"],
+            "platform": runtime["platform"],
+            "build_id": build_id(),
+            "page_cache_ttl": settings.PAGE_CACHE_TTL,
+        }
+        # بدون request: الصفحة مشتركة بين كل الزوار فلا يدخلها أي سياق خاص بالمستخدم
+        content = render_to_string("index.html", context)
+        cache.set(key, content, settings.PAGE_CACHE_TTL)
+    return _revalidate(HttpResponse(content))
+
+
+@lru_cache(maxsize=4)
+def _api_info_payload(build, debug):
+    """محتوى api_info مسلسلاً مسبقاً لكل بناء"""
+    runtime = _runtime_info()
+    payload = json.dumps({
         'app_name': 'نظام البلياردو المتقدم',
         'version': '2.0.0',
+        'build_id': build,
         'status': 'active',
         'features': [
             'حاسبة الضربات',
@@ -27,8 +88,80 @@ def api_info(request):
             'نظام السكة الحديدية',
         ],
         'environment': {
-            'debug': settings.DEBUG,
+            'debug': debug,
             'database': settings.DATABASES['default']['ENGINE'],
-            'python_version': f"{sys.version_info.major}.{sys.version_info.minor}",
+            'python_version': runtime["python_short"],
         }
-    })
+    }, cls=DjangoJSONEncoder).encode('utf-8')
+    return payload, hashlib.md5(payload).hexdigest()
+
+
+def _api_info_etag(request):
+    return _api_info_payload(build_id(), settings.DEBUG)[1]
+
+
+@condition(etag_func=_api_info_etag, last_modified_func=_build_last_modified)
+def api_info(request):
+    """نقطة نهاية API للحصول على معلومات التطبيق"""
+    payload, _ = _api_info_payload(build_id(), settings.DEBUG)
+    return _revalidate(HttpResponse(payload, content_type="application/json"))
+
+
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def static_asset(request, path):
+    """
+    خدمة الملفات الثابتة المبنية (بدون nginx)
+
+    - الملفات المبصومة: تخزين دائم (immutable) لأن اسمها يتغير مع محتواها
+    - غيرها (صفحات HTML الثابتة الاسم): no-cache مع التحقق
+    - النسخة .br أو .gz حسب Accept-Encoding إذا كانت موجودة
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = request.headers.get("Accept-Encoding", "")
+    encoding = None
+    for name, suffix in _ENCODINGS:
+        if name in accepted and os.path.isfile(full_path + suffix):
+            full_path, encoding = full_path + suffix, name
+            break
+
+    response = FileResponse(open(full_path, "rb"), content_type=content_type or "application/octet-stream")
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if _HASHED_NAME.search(path):
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+        return response
+    return _revalidate(response)
+
+
+def _check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+readiness = ReadinessProbe(
+    {
+        "database": _check_database,
+        "cache": check_cache_backend(cache),
+        "storage": check_writable_dir(settings.MEDIA_ROOT, create=True),
+    },
+    ttl=getattr(settings, "READINESS_TTL", 5),
+)
+
+
+def readyz(request):
+    """فحص الجاهزية: قاعدة البيانات والذاكرة المؤقتة والتخزين (نتيجة مخزنة لثوانٍ)"""
+    ready, body = readiness.check()
+    response = HttpResponse(body, content_type="application/json", status=200 if ready else 503)
+    patch_cache_control(response, no_store=True)
+    return response
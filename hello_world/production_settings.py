@@ -96,6 +96,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "hello_world.core",
+    "hello_world.shots",
 ]
 
 # ==========================================
@@ -103,6 +105,7 @@ INSTALLED_APPS = [
 # ==========================================
 
 MIDDLEWARE = [
+    "hello_world.core.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.middleware.gzip.GZipMiddleware",  # ضغط المحتوى
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -145,6 +148,10 @@ CACHES = {
     }
 }
 
+# الإحصائيات والصفحات المخزنة لواجهة /api/v1/ (تُبطل تلقائياً مع كل كتابة)
+SHOTS_CACHE_ENABLED = config('SHOTS_CACHE_ENABLED', default=True, cast=bool)
+SHOTS_CACHE_TTL = config('SHOTS_CACHE_TTL', default=300, cast=int)
+
 # ==========================================
 # الملفات الثابتة والوسائط
 # ==========================================
@@ -158,6 +165,39 @@ MEDIA_ROOT = BASE_DIR / "media"
 # CDN
 STATIC_URL = config('CDN_URL', default='/static/')
 
+STATICFILES_DIRS = [
+    BASE_DIR / "hello_world" / "static",
+    ("frontend", BASE_DIR / "frontend"),
+]
+
+STATICFILES_FINDERS = [
+    "django.contrib.staticfiles.finders.FileSystemFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+    "hello_world.core.finders.RootAssetsFinder",
+]
+
+# ملفات الـ PWA في جذر المشروع
+ROOT_STATIC_ASSETS = [
+    "unified-app.html",
+    "script.js",
+    "billiards-engine.js",
+    "system-services.js",
+    "style-pwa.css",
+]
+
+# بصمات المحتوى + إعادة كتابة صفحات HTML + نسخ .gz/.br (python manage.py build_assets)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "hello_world.core.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# خدمة /static/ من Django نفسه عند عدم وجود nginx أمامه
+SERVE_STATIC_ASSETS = config('SERVE_STATIC_ASSETS', default=False, cast=bool)
+
 # ==========================================
 # السجلات (Logging)
 # ==========================================
@@ -250,6 +290,13 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@billiards.exa
 # مراقبة الأداء
 # ==========================================
 
+# تحليل أداء الطلبات (معطل افتراضياً)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+PROFILING_HEADER = config('PROFILING_HEADER', default='X-Debug-Profile')
+PROFILING_TRACE_MEMORY = config('PROFILING_TRACE_MEMORY', default=False, cast=bool)
+PROFILES_DIR = LOG_DIR / 'profiles'
+
 # Sentry (Error Tracking)
 SENTRY_DSN = config('SENTRY_DSN', default=None)
 if SENTRY_DSN:
@@ -294,6 +341,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 VERSION = '2.0.0'
 BUILD_ID = config('BUILD_ID', default='unknown')
 DEPLOY_TIME = config('DEPLOY_TIME', default='unknown')
+PAGE_CACHE_TTL = config('PAGE_CACHE_TTL', default=3600, cast=int)
+
+# /livez يُجاب في wsgi.py قبل Django؛ /readyz يخزن نتيجته لثوانٍ
+READINESS_TTL = config('READINESS_TTL', default=5, cast=float)
 
 # ==========================================
 # جودة الكود
@@ -68,9 +68,12 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django_browser_reload",
+    "hello_world.core",
+    "hello_world.shots",
 ]
 
 MIDDLEWARE = [
+    "hello_world.core.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -156,6 +159,22 @@ USE_TZ = True
 
 STATICFILES_DIRS = [
     BASE_DIR / "hello_world" / "static",
+    ("frontend", BASE_DIR / "frontend"),
+]
+
+STATICFILES_FINDERS = [
+    "django.contrib.staticfiles.finders.FileSystemFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+    "hello_world.core.finders.RootAssetsFinder",
+]
+
+# PWA files that live in the project root next to the Python modules
+ROOT_STATIC_ASSETS = [
+    "unified-app.html",
+    "script.js",
+    "billiards-engine.js",
+    "system-services.js",
+    "style-pwa.css",
 ]
 
 STATIC_URL = "static/"
@@ -165,6 +184,28 @@ MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "hello_world" / "media"
 
 
+# Request profiling (cProfile / tracemalloc), disabled by default
+
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.01, cast=float)
+PROFILING_HEADER = config("PROFILING_HEADER", default="X-Debug-Profile")
+PROFILING_TRACE_MEMORY = config("PROFILING_TRACE_MEMORY", default=False, cast=bool)
+PROFILES_DIR = BASE_DIR / "logs" / "profiles"
+
+
+# Deployed build, used in page cache keys and ETags (falls back to process start time)
+
+VERSION = "2.0.0"
+BUILD_ID = config("BUILD_ID", default="unknown")
+DEPLOY_TIME = config("DEPLOY_TIME", default="unknown")
+PAGE_CACHE_TTL = config("PAGE_CACHE_TTL", default=3600, cast=int)
+
+
+# Health probes: /livez is answered in wsgi.py/asgi.py, /readyz caches its result for READINESS_TTL seconds
+
+READINESS_TTL = config("READINESS_TTL", default=5, cast=float)
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,3 @@
+"""
+تطبيق التسديقات - Shots API على قاعدة بيانات Django
+"""
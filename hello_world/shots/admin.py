@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import ShotRecord
+
+
+@admin.register(ShotRecord)
+class ShotRecordAdmin(admin.ModelAdmin):
+    list_display = ("id", "rails", "difficulty", "success_rate", "executed", "result", "created_at")
+    list_filter = ("rails", "difficulty", "executed", "result")
+    date_hierarchy = "created_at"
+    list_per_page = 100
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ShotsConfig(AppConfig):
+    """إعدادات تطبيق التسديقات"""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "hello_world.shots"
+    label = "shots"
+    verbose_name = "التسديقات"
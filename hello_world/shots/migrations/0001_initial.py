@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShotRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rails', models.PositiveSmallIntegerField()),
+                ('cue_position', models.FloatField()),
+                ('white_ball', models.FloatField()),
+                ('target', models.FloatField()),
+                ('pocket', models.PositiveSmallIntegerField()),
+                ('difficulty', models.CharField(choices=[('سهلة', 'EASY'), ('متوسطة', 'MEDIUM'), ('صعبة', 'HARD'), ('جداً صعبة', 'VERY_HARD'), ('قصوى', 'EXTREME')], default='متوسطة', max_length=16)),
+                ('success_rate', models.FloatField(default=50.0)),
+                ('executed', models.BooleanField(default=False)),
+                ('result', models.CharField(blank=True, choices=[('نجاح', 'SUCCESSFUL'), ('فشل', 'FAILED'), ('جزئي', 'PARTIAL'), ('معلق', 'PENDING')], max_length=8, null=True)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'تسديقة',
+                'verbose_name_plural': 'التسديقات',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['rails', 'difficulty', '-created_at'], name='shot_rails_diff_time_idx'), models.Index(fields=['difficulty', '-created_at'], name='shot_diff_time_idx'), models.Index(fields=['-created_at'], name='shot_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:17
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def backfill_sync_fields(apps, schema_editor):
+    """معرف فريد لكل تسديقة موجودة ورقم مراجعة = المعرف"""
+    ShotRecord = apps.get_model("shots", "ShotRecord")
+    SyncState = apps.get_model("shots", "SyncState")
+    last_revision = 0
+    for record in ShotRecord.objects.order_by("id").only("id", "created_at").iterator():
+        ShotRecord.objects.filter(pk=record.pk).update(
+            sync_id=uuid.uuid4(), revision=record.pk, updated_at=record.created_at,
+        )
+        last_revision = record.pk
+    SyncState.objects.update_or_create(pk=1, defaults={"revision": last_revision})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shots', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=128, unique=True)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'طلب مزامنة',
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveBigIntegerField(default=0)),
+                ('reset_floor', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'حالة المزامنة',
+            },
+        ),
+        migrations.AddField(
+            model_name='shotrecord',
+            name='origin',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='shotrecord',
+            name='revision',
+            field=models.PositiveBigIntegerField(db_index=True, default=0),
+        ),
+        # بدون unique أولاً: AddField يعطي كل الصفوف الموجودة نفس القيمة الافتراضية
+        migrations.AddField(
+            model_name='shotrecord',
+            name='sync_id',
+            field=models.UUIDField(null=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shotrecord',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_sync_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='shotrecord',
+            name='sync_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
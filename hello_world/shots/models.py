@@ -0,0 +1,141 @@
+"""
+نماذج قاعدة البيانات للتسديقات
+
+نفس حقول backend.models.Shot مع فهارس مركبة لمسارات التصفية
+الشائعة (الجدران/الصعوبة/الوقت) بدلاً من المسح الكامل للقائمة.
+
+حقول المزامنة (sync_id / revision / updated_at / origin) تسمح للأجهزة
+بسحب التغييرات فقط منذ آخر رقم مراجعة رأته (انظر sync.py).
+"""
+
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+from backend.models.shot import Difficulty, Shot, ShotResult
+
+
+class ShotRecord(models.Model):
+    """تسديقة محفوظة في قاعدة البيانات"""
+
+    DIFFICULTY_CHOICES = [(d.value, d.name) for d in Difficulty]
+    RESULT_CHOICES = [(r.value, r.name) for r in ShotResult]
+
+    rails = models.PositiveSmallIntegerField()
+    cue_position = models.FloatField()
+    white_ball = models.FloatField()
+    target = models.FloatField()
+    pocket = models.PositiveSmallIntegerField()
+    difficulty = models.CharField(max_length=16, choices=DIFFICULTY_CHOICES,
+                                  default=Difficulty.MEDIUM.value)
+    success_rate = models.FloatField(default=50.0)
+    executed = models.BooleanField(default=False)
+    result = models.CharField(max_length=8, choices=RESULT_CHOICES, null=True, blank=True)
+    notes = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    # المزامنة: معرف ثابت بين الأجهزة، ورقم مراجعة فريد يزيد مع كل تعديل
+    sync_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    revision = models.PositiveBigIntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+    origin = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # GET /shots?rails=&difficulty= مرتبة بالأحدث
+            models.Index(fields=["rails", "difficulty", "-created_at"], name="shot_rails_diff_time_idx"),
+            # GET /shots?difficulty= بدون الجدران
+            models.Index(fields=["difficulty", "-created_at"], name="shot_diff_time_idx"),
+            # القائمة بدون تصفية ونطاقات الوقت (since/until)
+            models.Index(fields=["-created_at"], name="shot_time_idx"),
+        ]
+        verbose_name = "تسديقة"
+        verbose_name_plural = "التسديقات"
+
+    def __str__(self):
+        return f"{self.rails} جدران - {self.difficulty} ({self.success_rate:.1f}%)"
+
+    @classmethod
+    def from_shot(cls, shot: Shot) -> "ShotRecord":
+        """
+        إنشاء سجل (غير محفوظ) من كائن Shot - للاستخدام مع bulk_create
+
+        Args:
+            shot: كائن التسديقة المحسوب
+
+        Returns:
+            كائن ShotRecord غير محفوظ
+        """
+        created_at = shot.timestamp
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+        return cls(
+            rails=shot.rails,
+            cue_position=shot.cue_position,
+            white_ball=shot.white_ball,
+            target=shot.target,
+            pocket=shot.pocket,
+            difficulty=shot.difficulty.value,
+            success_rate=shot.success_rate,
+            executed=shot.executed,
+            result=shot.result.value if shot.result else None,
+            notes=shot.notes,
+            created_at=created_at,
+        )
+
+    def to_dict(self) -> dict:
+        """تحويل السجل إلى قاموس بنفس صيغة Shot.to_dict مع المعرف"""
+        return {
+            "id": self.id,
+            "rails": self.rails,
+            "cue_position": self.cue_position,
+            "white_ball": self.white_ball,
+            "target": self.target,
+            "pocket": self.pocket,
+            "difficulty": self.difficulty,
+            "success_rate": self.success_rate,
+            "executed": self.executed,
+            "result": self.result,
+            "timestamp": self.created_at.isoformat(),
+            "notes": self.notes,
+        }
+
+    def to_sync_dict(self) -> dict:
+        """صيغة المزامنة: to_dict مع حقول المراجعة"""
+        data = self.to_dict()
+        data.update({
+            "sync_id": str(self.sync_id),
+            "revision": self.revision,
+            "updated_at": self.updated_at.isoformat(),
+            "origin": self.origin,
+        })
+        return data
+
+
+class SyncState(models.Model):
+    """
+    عداد المراجعات (صف واحد)
+
+    revision: آخر رقم مراجعة مخصص
+    reset_floor: الأجهزة التي آخر مراجعة لديها أقل من هذا الرقم يجب أن تعيد
+    التحميل الكامل (بعد استيراد يستبدل كل البيانات)
+    """
+
+    revision = models.PositiveBigIntegerField(default=0)
+    reset_floor = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "حالة المزامنة"
+
+
+class SyncRequest(models.Model):
+    """استجابة دفعة مزامنة محفوظة حسب مفتاح عدم التكرار (Idempotency-Key)"""
+
+    idempotency_key = models.CharField(max_length=128, unique=True)
+    response = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "طلب مزامنة"
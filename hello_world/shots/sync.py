@@ -0,0 +1,233 @@
+"""
+مزامنة التسديقات بالفروق (Delta Sync)
+
+بدلاً من إرسال واستقبال البيانات كاملة، يحتفظ كل جهاز بآخر رقم مراجعة
+رآه ويسحب فقط التسديقات التي تغيرت بعده:
+- كل كتابة تحصل على رقم مراجعة فريد من عداد SyncState مقفل حتى نهاية
+  المعاملة، فلا يمكن أن تظهر مراجعة أقدم بعد أن يسحب جهاز مراجعة أحدث
+- دفعات الأجهزة (upsert) تحمل مفتاح عدم تكرار؛ إعادة إرسال نفس الدفعة
+  بعد انقطاع الاتصال تعيد نفس الاستجابة بدون تطبيقها مرتين
+- التعارض يُحل بشكل حتمي: آخر كتابة تفوز حسب (updated_at، origin)،
+  فتصل كل الأجهزة لنفس النتيجة بغض النظر عن ترتيب وصول الدفعات
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+from typing import Iterable, List, Optional, Tuple
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from backend.models.shot import Shot
+
+from .models import ShotRecord, SyncRequest, SyncState
+
+SERVER_ORIGIN = "server"
+IDEMPOTENCY_RETENTION = timedelta(days=7)
+
+# الحقول التي يستطيع الجهاز تعديلها (الباقي يديره الخادم)
+SYNCED_FIELDS = (
+    "rails", "cue_position", "white_ball", "target", "pocket", "difficulty",
+    "success_rate", "executed", "result", "notes", "created_at",
+    "revision", "updated_at", "origin",
+)
+
+
+def lock_state() -> SyncState:
+    """
+    قفل صف العداد حتى نهاية المعاملة الحالية
+
+    كل الكتّاب يأخذون هذا القفل أولاً (قبل أي صف تسديقة) فتتسلسل
+    الكتابات بدون حلقات انتظار بين المعاملات.
+    """
+    state, _ = SyncState.objects.select_for_update().get_or_create(pk=1)
+    return state
+
+
+def allocate_revisions(count: int) -> range:
+    """
+    حجز أرقام مراجعة متتالية
+
+    يجب استدعاؤها داخل transaction.atomic: قفل صف العداد يبقى حتى نهاية
+    المعاملة فتظهر المراجعات للقراء بنفس ترتيب أرقامها.
+
+    Args:
+        count: عدد الأرقام المطلوبة
+
+    Returns:
+        نطاق الأرقام المحجوزة
+    """
+    state = lock_state()
+    start = state.revision + 1
+    state.revision += count
+    state.save(update_fields=["revision"])
+    return range(start, state.revision + 1)
+
+
+def stamp(records: Iterable[ShotRecord], origin: str = SERVER_ORIGIN) -> List[ShotRecord]:
+    """
+    تعيين رقم مراجعة ووقت تعديل لسجلات ستُحفظ (داخل معاملة)
+
+    Returns:
+        نفس السجلات كقائمة
+    """
+    records = list(records)
+    now = timezone.now()
+    for record, revision in zip(records, allocate_revisions(len(records))):
+        record.revision = revision
+        record.updated_at = now
+        record.origin = origin
+    return records
+
+
+def mark_reset() -> None:
+    """بعد استبدال كل البيانات: أي جهاز لم يرَ المراجعة التالية يعيد التحميل"""
+    state = lock_state()
+    state.reset_floor = state.revision + 1
+    state.save(update_fields=["reset_floor"])
+
+
+def pull(since: int, limit: int) -> dict:
+    """
+    التسديقات التي تغيرت بعد المراجعة since
+
+    Args:
+        since: آخر مراجعة لدى الجهاز (0 للتحميل الكامل)
+        limit: الحد الأقصى للتسديقات في الصفحة
+
+    Returns:
+        {"reset", "revision", "has_more", "shots"}؛ الجهاز يرسل revision
+        كقيمة since في الطلب التالي
+    """
+    state = SyncState.objects.filter(pk=1).first()
+    current = state.revision if state else 0
+    reset = bool(state) and since < state.reset_floor
+    if reset:
+        since = 0
+
+    records = list(
+        ShotRecord.objects.filter(revision__gt=since).order_by("revision")[:limit + 1]
+    )
+    has_more = len(records) > limit
+    records = records[:limit]
+    last_seen = records[-1].revision if records else 0
+    return {
+        "reset": reset,
+        "revision": last_seen if has_more else max(current, since, last_seen),
+        "has_more": has_more,
+        "shots": [r.to_sync_dict() for r in records],
+    }
+
+
+def _change_key(updated_at, origin: str) -> Tuple:
+    return (updated_at, origin or "")
+
+
+def _parse_change(change: dict) -> Tuple[uuid.UUID, ShotRecord]:
+    """
+    تحويل تغيير من الجهاز إلى سجل غير محفوظ
+
+    Raises:
+        ValueError: إذا كان sync_id أو updated_at أو حقول التسديقة غير صحيحة
+    """
+    if not isinstance(change, dict):
+        raise ValueError("التغيير يجب أن يكون كائن JSON")
+    sync_id = uuid.UUID(str(change.get("sync_id")))
+    updated_at = parse_datetime(str(change.get("updated_at", "")))
+    if updated_at is None:
+        raise ValueError("updated_at مطلوب بصيغة ISO 8601")
+    if timezone.is_naive(updated_at):
+        updated_at = timezone.make_aware(updated_at, dt_timezone.utc)
+
+    shot_fields = {k: change[k] for k in Shot.__dataclass_fields__ if k in change}
+    record = ShotRecord.from_shot(Shot.from_dict(shot_fields))
+    record.sync_id = sync_id
+    record.updated_at = updated_at
+    return sync_id, record
+
+
+def apply_changes(changes: list, origin: str) -> dict:
+    """
+    تطبيق دفعة تغييرات من جهاز (إنشاء أو تحديث حسب sync_id)
+
+    Args:
+        changes: قائمة التسديقات بصيغة Shot.to_dict مع sync_id و updated_at
+        origin: معرف الجهاز (يكسر التعادل عند تساوي updated_at)
+
+    Returns:
+        {"revision", "applied", "conflicts", "rejected"}؛ التعارض يعيد
+        نسخة الخادم الفائزة ليستبدل بها الجهاز نسخته
+    """
+    parsed = {}
+    rejected = []
+    for index, change in enumerate(changes):
+        try:
+            sync_id, record = _parse_change(change)
+        except (TypeError, ValueError, KeyError) as e:
+            rejected.append({"index": index, "error": str(e)})
+            continue
+        record.origin = origin
+        previous = parsed.get(sync_id)
+        # نفس التسديقة مكررة في الدفعة: تُطبق نفس قاعدة الفوز
+        if previous is None or _change_key(record.updated_at, origin) > _change_key(previous.updated_at, origin):
+            parsed[sync_id] = record
+
+    with transaction.atomic():
+        lock_state()
+        existing = {r.sync_id: r for r in ShotRecord.objects.filter(sync_id__in=list(parsed))}
+        created, updated, conflicts, applied = [], [], [], []
+        for sync_id, incoming in parsed.items():
+            current = existing.get(sync_id)
+            if current is None:
+                created.append(incoming)
+            elif _change_key(incoming.updated_at, origin) > _change_key(current.updated_at, current.origin):
+                incoming.pk = current.pk
+                incoming.created_at = current.created_at
+                updated.append(incoming)
+            elif _change_key(incoming.updated_at, origin) == _change_key(current.updated_at, current.origin):
+                applied.append(str(sync_id))  # نفس النسخة وصلت من قبل
+            else:
+                conflicts.append({"sync_id": str(sync_id), "server": current.to_sync_dict()})
+
+        # updated_at يبقى وقت الجهاز لأنه جزء من قاعدة حل التعارض
+        revisions = iter(allocate_revisions(len(created) + len(updated)))
+        for record in created + updated:
+            record.revision = next(revisions)
+        ShotRecord.objects.bulk_create(created)
+        ShotRecord.objects.bulk_update(updated, SYNCED_FIELDS)
+        applied.extend(str(r.sync_id) for r in created + updated)
+        revision = SyncState.objects.get(pk=1).revision
+
+    return {
+        "revision": revision,
+        "applied": applied,
+        "conflicts": conflicts,
+        "rejected": rejected,
+    }
+
+
+def push(changes: list, origin: str, idempotency_key: Optional[str]) -> Tuple[dict, bool]:
+    """
+    تطبيق دفعة مرة واحدة فقط لكل مفتاح عدم تكرار
+
+    Returns:
+        (الاستجابة، هل هي إعادة لاستجابة محفوظة؟)
+    """
+    if not idempotency_key:
+        return apply_changes(changes, origin), False
+
+    stored = SyncRequest.objects.filter(idempotency_key=idempotency_key).first()
+    if stored:
+        return stored.response, True
+
+    try:
+        with transaction.atomic():
+            response = apply_changes(changes, origin)
+            SyncRequest.objects.create(idempotency_key=idempotency_key, response=response)
+    except IntegrityError:
+        # نفس الدفعة وصلت في طلب متزامن وسبقنا إلى الحفظ
+        return SyncRequest.objects.get(idempotency_key=idempotency_key).response, True
+
+    SyncRequest.objects.filter(created_at__lt=timezone.now() - IDEMPOTENCY_RETENTION).delete()
+    return response, False
@@ -0,0 +1,165 @@
+"""
+🧪 اختبارات تطبيق التسديقات
+
+python manage.py test hello_world.shots
+"""
+
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import ShotRecord
+from .views import cache
+
+SHOT = {"rails": 2, "cue_position": 5, "white_ball": 3.5, "target": 2, "pocket": 3}
+
+
+class ShotsAPITests(TestCase):
+    """اختبارات واجهة /api/v1/ على قاعدة البيانات"""
+
+    def setUp(self):
+        # قاعدة البيانات تُعاد لكل اختبار لكن الذاكرة المؤقتة لا
+        cache.backend.clear()
+
+    def _batch(self, shots):
+        return self.client.post("/api/v1/calculate/batch", data=json.dumps({"shots": shots}),
+                                content_type="application/json")
+
+    def test_calculate_batch_uses_single_insert(self):
+        """الحساب الجماعي يحفظ كل التسديقات بعملية bulk_create واحدة"""
+        shots = [dict(SHOT, rails=rails) for rails in (1, 2, 3, 4)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self._batch(shots)
+        # إدخال واحد للتسديقات (إضافة إلى حجز أرقام المراجعة للمزامنة)
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 4)
+        self.assertEqual(ShotRecord.objects.count(), 4)
+
+    def test_calculate_batch_rejects_invalid_shot(self):
+        """تسديقة غير صحيحة ترفض الدفعة كاملة"""
+        response = self._batch([SHOT, dict(SHOT, rails=9)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ShotRecord.objects.count(), 0)
+
+    def test_list_filters_and_statistics(self):
+        """التصفية حسب الجدران وتجميع الإحصائيات في SQL"""
+        self._batch([SHOT, SHOT, dict(SHOT, rails=4)])
+        shot_id = ShotRecord.objects.filter(rails=2).first().id
+        self.client.post(f"/api/v1/shots/{shot_id}/record?successful=true")
+
+        data = self.client.get("/api/v1/shots?rails=2&limit=1").json()
+        self.assertEqual((data["total"], data["count"]), (2, 1))
+
+        stats = self.client.get("/api/v1/statistics").json()
+        self.assertEqual(stats["total_calculations"], 3)
+        self.assertEqual(stats["total_shots_successful"], 1)
+        self.assertEqual(stats["stats_by_rails"]["2"]["successful"], 1)
+
+        by_rails = self.client.get("/api/v1/statistics/by-rails").json()
+        self.assertEqual(by_rails["rails_4"]["total"], 1)
+
+    def test_cached_statistics_invalidated_on_write(self):
+        """الإحصائيات تُقرأ من الذاكرة المؤقتة حتى الكتابة التالية"""
+        self._batch([SHOT])
+        self.assertEqual(self.client.get("/api/v1/statistics").json()["total_calculations"], 1)
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/statistics")
+
+        self._batch([SHOT])
+        self.assertEqual(self.client.get("/api/v1/statistics").json()["total_calculations"], 2)
+
+    def test_export_import_round_trip(self):
+        """التصدير المتدفق قابل للاستيراد مباشرة"""
+        self._batch([SHOT, dict(SHOT, rails=3)])
+        response = self.client.get("/api/v1/export")
+        exported = b"".join(response.streaming_content)
+
+        response = self.client.post("/api/v1/import", data=exported, content_type="application/json")
+        self.assertEqual(response.json()["imported_count"], 2)
+        self.assertEqual(sorted(ShotRecord.objects.values_list("rails", flat=True)), [2, 3])
+
+
+class ShotsSyncTests(TestCase):
+    """المزامنة بالفروق: السحب منذ مراجعة، عدم التكرار، حل التعارض"""
+
+    SYNC_ID = "7f3c8a52-41f4-4a3e-9a39-0f6f0b6b2d11"
+
+    def setUp(self):
+        cache.backend.clear()
+
+    def _push(self, changes, device="tablet-a", key=None):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post("/api/v1/sync/shots",
+                                data=json.dumps({"device_id": device, "changes": changes}),
+                                content_type="application/json", **headers)
+
+    def _change(self, updated_at, notes=""):
+        return dict(SHOT, sync_id=self.SYNC_ID, updated_at=updated_at, notes=notes)
+
+    def test_pull_returns_only_changes_since_revision(self):
+        """السحب يعيد ما تغير بعد آخر مراجعة فقط (مع الكتابات من الخادم)"""
+        self.client.post("/api/v1/calculate", QUERY_STRING="rails=2&cue_position=5&white_ball=3.5&target=2&pocket=3")
+        first = self.client.get("/api/v1/sync/shots?since=0").json()
+        self.assertEqual(len(first["shots"]), 1)
+
+        shot_id = first["shots"][0]["id"]
+        self.client.post(f"/api/v1/shots/{shot_id}/record?successful=true")
+        self.client.post("/api/v1/calculate", QUERY_STRING="rails=3&cue_position=5&white_ball=3.5&target=2&pocket=3")
+
+        delta = self.client.get(f"/api/v1/sync/shots?since={first['revision']}").json()
+        self.assertFalse(delta["reset"])
+        self.assertEqual(sorted(s["rails"] for s in delta["shots"]), [2, 3])
+        self.assertTrue(all(s["revision"] > first["revision"] for s in delta["shots"]))
+        self.assertEqual(self.client.get(f"/api/v1/sync/shots?since={delta['revision']}").json()["shots"], [])
+
+    def test_pull_pages_by_revision(self):
+        self._push([dict(SHOT, sync_id=f"00000000-0000-0000-0000-00000000000{i}",
+                         updated_at="2026-01-01T10:00:00+00:00") for i in range(5)])
+        page = self.client.get("/api/v1/sync/shots?since=0&limit=3").json()
+        self.assertTrue(page["has_more"])
+        rest = self.client.get(f"/api/v1/sync/shots?since={page['revision']}&limit=3").json()
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(len(page["shots"]) + len(rest["shots"]), 5)
+
+    def test_push_with_idempotency_key_applied_once(self):
+        change = self._change("2026-01-01T10:00:00+00:00")
+        first = self._push([change], key="batch-1")
+        replay = self._push([change], key="batch-1")
+
+        self.assertEqual(first.json()["applied"], [self.SYNC_ID])
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(ShotRecord.objects.count(), 1)
+
+    def test_conflicts_resolved_last_writer_wins(self):
+        """نفس النتيجة بغض النظر عن ترتيب وصول الدفعات"""
+        self._push([self._change("2026-01-01T10:00:05+00:00", notes="من الجهاز ب")], device="tablet-b")
+        stale = self._push([self._change("2026-01-01T10:00:00+00:00", notes="من الجهاز أ")]).json()
+
+        self.assertEqual(stale["applied"], [])
+        self.assertEqual(stale["conflicts"][0]["server"]["notes"], "من الجهاز ب")
+
+        # تساوي الوقت: معرف الجهاز يكسر التعادل
+        tie = self._push([self._change("2026-01-01T10:00:05+00:00", notes="من الجهاز ج")], device="tablet-c")
+        self.assertEqual(tie.json()["applied"], [self.SYNC_ID])
+        self.assertEqual(ShotRecord.objects.get().notes, "من الجهاز ج")
+
+    def test_invalid_changes_rejected_individually(self):
+        response = self._push([{"sync_id": "not-a-uuid"}, self._change("2026-01-01T10:00:00+00:00")]).json()
+        self.assertEqual(response["applied"], [self.SYNC_ID])
+        self.assertEqual(response["rejected"][0]["index"], 0)
+
+    def test_import_forces_reset(self):
+        self._push([self._change("2026-01-01T10:00:00+00:00")])
+        seen = self.client.get("/api/v1/sync/shots?since=0").json()["revision"]
+
+        self.client.post("/api/v1/import", data=json.dumps({"shots": [dict(SHOT, rails=4)]}),
+                         content_type="application/json")
+        delta = self.client.get(f"/api/v1/sync/shots?since={seen}").json()
+        self.assertTrue(delta["reset"])
+        self.assertEqual([s["rails"] for s in delta["shots"]], [4])
+        self.assertFalse(self.client.get(f"/api/v1/sync/shots?since={delta['revision']}").json()["reset"])
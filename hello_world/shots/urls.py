@@ -0,0 +1,19 @@
+from django.urls import path
+
+from . import views
+
+app_name = "shots"
+
+urlpatterns = [
+    path("calculate", views.calculate_shot, name="calculate"),
+    path("calculate/batch", views.calculate_batch, name="calculate_batch"),
+    path("shots", views.list_shots, name="list"),
+    path("shots/<int:shot_id>", views.shot_detail, name="detail"),
+    path("shots/<int:shot_id>/record", views.record_shot_execution, name="record"),
+    path("statistics", views.statistics, name="statistics"),
+    path("statistics/by-rails", views.statistics_by_rails, name="statistics_by_rails"),
+    path("statistics/by-difficulty", views.statistics_by_difficulty, name="statistics_by_difficulty"),
+    path("export", views.export_data, name="export"),
+    path("import", views.import_data, name="import"),
+    path("sync/shots", views.sync_shots, name="sync"),
+]
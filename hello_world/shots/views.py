@@ -0,0 +1,434 @@
+"""
+واجهة API للتسديقات على قاعدة بيانات Django
+
+نفس مسارات api.py (FastAPI) لكن البيانات في قاعدة البيانات:
+- التصفية والترقيم تتم في SQL على الفهارس المركبة
+- الحساب الجماعي والاستيراد عبر bulk_create
+- التصدير متدفق عبر iterator() بدون تحميل كل السجلات في الذاكرة
+- الإحصائيات عبر aggregate/annotate في استعلامات قليلة
+- الإحصائيات وعدادات التصفية والصفحات تُخزن في CACHES (Redis في الإنتاج)
+  وتُبطل بالإصدار مع كل كتابة
+- كل كتابة تحصل على رقم مراجعة لمزامنة الأجهزة بالفروق (sync.py)
+"""
+
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from backend.billiards.calculator import ShotCalculator
+from backend.models.shot import Difficulty, Shot, ShotResult
+from backend.services.cache import DjangoCacheBackend, SharedCache
+
+from . import sync
+from .models import ShotRecord
+
+logger = logging.getLogger(__name__)
+
+calculator = ShotCalculator()
+cache = SharedCache(
+    DjangoCacheBackend(),
+    prefix="shots_api",
+    ttl=getattr(settings, "SHOTS_CACHE_TTL", 300),
+    enabled=getattr(settings, "SHOTS_CACHE_ENABLED", True),
+)
+CACHE_NAMESPACE = "shots"
+
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+BULK_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _error(message: str, status: int) -> JsonResponse:
+    return JsonResponse({"success": False, "error": message}, status=status)
+
+
+def _int_param(request, name: str, default=None, minimum=None, maximum=None):
+    """
+    قراءة معامل رقمي من الاستعلام مع التحقق من حدوده
+
+    Raises:
+        ValueError: إذا كانت القيمة غير رقمية أو خارج الحدود
+    """
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    value = int(raw)
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise ValueError(f"{name} يجب أن يكون بين {minimum} و {maximum}")
+    return value
+
+
+def _datetime_param(request, name: str):
+    """
+    قراءة معامل وقت بصيغة ISO 8601
+
+    Raises:
+        ValueError: إذا كانت الصيغة غير صحيحة
+    """
+    raw = request.GET.get(name)
+    if not raw:
+        return None
+    value = parse_datetime(raw)
+    if value is None:
+        raise ValueError(f"{name} يجب أن يكون بصيغة ISO 8601")
+    return value
+
+
+def _shot_params(data) -> tuple:
+    """استخراج معاملات التسديقة من قاموس أو QueryDict"""
+    return (
+        int(data["rails"]),
+        float(data["cue_position"]),
+        float(data["white_ball"]),
+        float(data["target"]),
+        int(data["pocket"]),
+    )
+
+
+def _rate(successful: int, total: int) -> float:
+    return round((successful / total) * 100, 2) if total else 0
+
+
+def _cached_json(key: str, compute) -> HttpResponse:
+    """استجابة JSON من الذاكرة المؤقتة المشتركة (نص مسلسل مسبقاً)"""
+    body = cache.get_or_compute_json(CACHE_NAMESPACE, key, compute)
+    return HttpResponse(body, content_type="application/json")
+
+
+# ==========================================
+# حساب التسديقات
+# ==========================================
+
+@csrf_exempt
+@require_POST
+def calculate_shot(request):
+    """حساب تسديقة جديدة وحفظها"""
+    try:
+        shot = calculator.create_shot(*_shot_params(request.GET))
+    except KeyError as e:
+        return _error(f"المعامل {e} مطلوب", 400)
+    except ValueError as e:
+        logger.warning(f"⚠️ خطأ في المدخلات: {e}")
+        return _error(str(e), 400)
+
+    record = ShotRecord.from_shot(shot)
+    with transaction.atomic():
+        sync.stamp([record])
+        record.save()
+    cache.invalidate(CACHE_NAMESPACE)
+    return JsonResponse({
+        "success": True,
+        "shot": record.to_dict(),
+        "summary": calculator.get_calculation_summary(shot),
+    })
+
+
+@csrf_exempt
+@require_POST
+def calculate_batch(request):
+    """
+    حساب مجموعة تسديقات وحفظها بعملية bulk_create واحدة
+
+    الجسم: {"shots": [{"rails": 2, "cue_position": 5, ...}, ...]}
+    """
+    try:
+        items = json.loads(request.body.decode("utf-8"))["shots"]
+    except (ValueError, KeyError, TypeError):
+        return _error("الجسم يجب أن يكون JSON يحتوي على 'shots'", 400)
+    if not isinstance(items, list) or not items:
+        return _error("'shots' يجب أن تكون قائمة غير فارغة", 400)
+    if len(items) > MAX_BATCH_SIZE:
+        return _error(f"الحد الأقصى {MAX_BATCH_SIZE} تسديقة في الطلب", 400)
+
+    records = []
+    for index, item in enumerate(items):
+        try:
+            records.append(ShotRecord.from_shot(calculator.create_shot(*_shot_params(item))))
+        except (KeyError, TypeError, ValueError) as e:
+            return _error(f"تسديقة رقم {index} غير صحيحة: {e}", 400)
+
+    with transaction.atomic():
+        records = ShotRecord.objects.bulk_create(sync.stamp(records), batch_size=BULK_BATCH_SIZE)
+    cache.invalidate(CACHE_NAMESPACE)
+    logger.info(f"✅ تم حساب {len(records)} تسديقة دفعة واحدة")
+    return JsonResponse({
+        "success": True,
+        "count": len(records),
+        "shots": [r.to_dict() for r in records],
+    })
+
+
+# ==========================================
+# إدارة التسديقات
+# ==========================================
+
+@require_GET
+def list_shots(request):
+    """
+    قائمة التسديقات مع التصفية والترقيم (الأحدث أولاً)
+
+    المعاملات: rails, difficulty, since, until, skip, limit
+    """
+    try:
+        rails = _int_param(request, "rails", minimum=1, maximum=4)
+        since = _datetime_param(request, "since")
+        until = _datetime_param(request, "until")
+        skip = _int_param(request, "skip", default=0, minimum=0)
+        limit = _int_param(request, "limit", default=100, minimum=1, maximum=MAX_PAGE_SIZE)
+    except ValueError as e:
+        return _error(str(e), 400)
+
+    queryset = ShotRecord.objects.all()
+    if rails:
+        queryset = queryset.filter(rails=rails)
+    difficulty = request.GET.get("difficulty")
+    if difficulty:
+        queryset = queryset.filter(difficulty=difficulty)
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    if until:
+        queryset = queryset.filter(created_at__lt=until)
+
+    filters = f"{rails}:{difficulty}:{since and since.isoformat()}:{until and until.isoformat()}"
+
+    def compute_page():
+        shots = [s.to_dict() for s in queryset[skip:skip + limit]]
+        return {
+            # العداد مخزن لكل تصفية فيُشارك بين كل صفحاتها
+            "total": cache.get_or_compute(CACHE_NAMESPACE, f"count:{filters}", queryset.count),
+            "count": len(shots),
+            "skip": skip,
+            "limit": limit,
+            "shots": shots,
+        }
+
+    return _cached_json(f"page:{filters}:{skip}:{limit}", compute_page)
+
+
+@require_GET
+def shot_detail(request, shot_id):
+    """الحصول على تسديقة محددة"""
+    try:
+        return JsonResponse(ShotRecord.objects.get(pk=shot_id).to_dict())
+    except ShotRecord.DoesNotExist:
+        return _error("التسديقة غير موجودة", 404)
+
+
+@csrf_exempt
+@require_POST
+def record_shot_execution(request, shot_id):
+    """تسجيل نتيجة تنفيذ تسديقة (?successful=true|false)"""
+    successful = request.GET.get("successful", "").lower() in ("1", "true", "yes")
+    result = ShotResult.SUCCESSFUL if successful else ShotResult.FAILED
+
+    with transaction.atomic():
+        revision = sync.allocate_revisions(1)[0]
+        updated = ShotRecord.objects.filter(pk=shot_id).update(
+            executed=True, result=result.value,
+            revision=revision, updated_at=timezone.now(), origin=sync.SERVER_ORIGIN,
+        )
+    if not updated:
+        return _error("التسديقة غير موجودة", 404)
+    cache.invalidate(CACHE_NAMESPACE)
+
+    logger.info(f"✅ تم تسجيل النتيجة: {result.value}")
+    return JsonResponse({
+        "success": True,
+        "message": "تم تسجيل النتيجة بنجاح",
+        "shot": ShotRecord.objects.get(pk=shot_id).to_dict(),
+    })
+
+
+# ==========================================
+# الإحصائيات
+# ==========================================
+
+_SUCCESSFUL = Q(result=ShotResult.SUCCESSFUL.value)
+
+
+def _grouped_statistics(field: str) -> dict:
+    """إحصائيات مجمعة حسب حقل واحد في استعلام GROUP BY واحد"""
+    rows = (
+        ShotRecord.objects.order_by()
+        .values(field)
+        .annotate(total=Count("id"), successful=Count("id", filter=_SUCCESSFUL))
+    )
+    return {
+        row[field]: {
+            "total": row["total"],
+            "successful": row["successful"],
+            "success_rate": _rate(row["successful"], row["total"]),
+        }
+        for row in rows
+    }
+
+
+@require_GET
+def statistics(request):
+    """الإحصائيات الكاملة"""
+    return _cached_json("statistics", _compute_statistics)
+
+
+def _compute_statistics() -> dict:
+    totals = ShotRecord.objects.aggregate(
+        total=Count("id"),
+        attempted=Count("id", filter=Q(executed=True)),
+        successful=Count("id", filter=_SUCCESSFUL),
+        average_success_rate=Avg("success_rate"),
+    )
+    by_difficulty = _grouped_statistics("difficulty")
+    return {
+        "total_calculations": totals["total"],
+        "total_shots_attempted": totals["attempted"],
+        "total_shots_successful": totals["successful"],
+        "success_rate": _rate(totals["successful"], totals["attempted"]),
+        "average_success_rate": round(totals["average_success_rate"] or 0, 2),
+        "stats_by_rails": {
+            str(rails): stats for rails, stats in _grouped_statistics("rails").items()
+        },
+        "stats_by_difficulty": {
+            difficulty: stats["total"] for difficulty, stats in by_difficulty.items()
+        },
+    }
+
+
+@require_GET
+def statistics_by_rails(request):
+    """الإحصائيات حسب عدد الجدران"""
+    def compute():
+        stats = _grouped_statistics("rails")
+        return {f"rails_{rails}": stats[rails] for rails in sorted(stats)}
+
+    return _cached_json("statistics:by-rails", compute)
+
+
+@require_GET
+def statistics_by_difficulty(request):
+    """الإحصائيات حسب مستوى الصعوبة"""
+    def compute():
+        stats = _grouped_statistics("difficulty")
+        return {d.value: stats[d.value] for d in Difficulty if d.value in stats}
+
+    return _cached_json("statistics:by-difficulty", compute)
+
+
+# ==========================================
+# استيراد وتصدير البيانات
+# ==========================================
+
+def _export_chunks():
+    """توليد ملف التصدير قطعة بقطعة ({"shots": [...]}) من iterator()"""
+    yield '{"shots": ['
+    queryset = ShotRecord.objects.order_by("created_at", "id")
+    for index, record in enumerate(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+        prefix = "," if index else ""
+        yield prefix + json.dumps(record.to_dict(), ensure_ascii=False)
+    yield "]}"
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def export_data(request):
+    """تصدير جميع التسديقات (استجابة متدفقة بنفس صيغة الاستيراد)"""
+    response = StreamingHttpResponse(_export_chunks(), content_type="application/json; charset=utf-8")
+    response["Content-Disposition"] = 'attachment; filename="shots_export.json"'
+    return response
+
+
+@csrf_exempt
+@require_POST
+def import_data(request):
+    """
+    استيراد التسديقات من ملف JSON (حقل file) أو من جسم الطلب
+
+    تُستبدل البيانات الحالية داخل معاملة واحدة، والتسديقات غير الصحيحة تُتخطى.
+    """
+    upload = request.FILES.get("file")
+    try:
+        content = upload.read() if upload else request.body
+        data = json.loads(content.decode("utf-8"))
+    except ValueError:
+        return _error("الملف يجب أن يكون بصيغة JSON صحيحة", 400)
+    if not isinstance(data, dict) or "shots" not in data:
+        return _error("الملف يجب أن يحتوي على 'shots'", 400)
+
+    records = []
+    for shot_data in data["shots"]:
+        try:
+            shot_data = {k: v for k, v in shot_data.items() if k != "id"}
+            records.append(ShotRecord.from_shot(Shot.from_dict(shot_data)))
+        except Exception as e:
+            logger.warning(f"⚠️ تم تخطي تسديقة غير صحيحة: {e}")
+
+    with transaction.atomic():
+        # الأجهزة تحمل نسخاً من التسديقات المحذوفة: يجب أن تعيد التحميل الكامل
+        sync.mark_reset()
+        ShotRecord.objects.all().delete()
+        ShotRecord.objects.bulk_create(sync.stamp(records), batch_size=BULK_BATCH_SIZE)
+    cache.invalidate(CACHE_NAMESPACE)
+
+    logger.info(f"✅ تم استيراد {len(records)} تسديقة")
+    return JsonResponse({
+        "success": True,
+        "message": f"تم استيراد {len(records)} تسديقة بنجاح",
+        "imported_count": len(records),
+    })
+
+
+# ==========================================
+# المزامنة بالفروق
+# ==========================================
+
+MAX_SYNC_PAGE = 500
+MAX_SYNC_BATCH = 500
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def sync_shots(request):
+    """
+    مزامنة الأجهزة بالفروق
+
+    GET ?since=<revision>&limit=: التسديقات التي تغيرت بعد المراجعة
+    POST: {"device_id", "changes": [...]} مع ترويسة Idempotency-Key
+    """
+    if request.method == "GET":
+        try:
+            since = _int_param(request, "since", default=0, minimum=0)
+            limit = _int_param(request, "limit", default=MAX_SYNC_PAGE, minimum=1, maximum=MAX_SYNC_PAGE)
+        except ValueError as e:
+            return _error(str(e), 400)
+        return JsonResponse(sync.pull(since, limit))
+
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+        changes = data["changes"]
+        device_id = str(data["device_id"])[:64]
+    except (ValueError, KeyError, TypeError):
+        return _error("الجسم يجب أن يكون JSON يحتوي على 'device_id' و 'changes'", 400)
+    if not isinstance(changes, list):
+        return _error("'changes' يجب أن تكون قائمة", 400)
+    if len(changes) > MAX_SYNC_BATCH:
+        return _error(f"الحد الأقصى {MAX_SYNC_BATCH} تغيير في الطلب", 400)
+    if not device_id or device_id == sync.SERVER_ORIGIN:
+        return _error("device_id غير صالح", 400)
+
+    key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    result, replayed = sync.push(changes, device_id, key)
+    if result["applied"] and not replayed:
+        cache.invalidate(CACHE_NAMESPACE)
+        logger.info(f"✅ مزامنة {len(result['applied'])} تسديقة من {device_id}")
+
+    response = JsonResponse(dict(result, success=True))
+    if replayed:
+        response["Idempotent-Replayed"] = "true"
+    return response
@@ -16,7 +16,7 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
@@ -38,10 +38,18 @@ urlpatterns = [
     path("", core_views.index),
     path("health/", health_check, name="health"),
     path("api/health/", health_check, name="api_health"),
+    # /livez يُجاب في hello_world/wsgi.py قبل Django
+    path("readyz", core_views.readyz, name="readyz"),
     path("api/info/", core_views.api_info, name="api_info"),
+    path("api/v1/", include("hello_world.shots.urls")),
     path("admin/", admin.site.urls),
     path("__reload__/", include("django_browser_reload.urls")),
 ]
+if getattr(settings, "SERVE_STATIC_ASSETS", False) and not settings.DEBUG:
+    # الملفات المبنية عبر build_assets مع ترويسات التخزين الدائم والنسخ المضغوطة
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.+)$" % settings.STATIC_URL.lstrip("/"), core_views.static_asset),
+    ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
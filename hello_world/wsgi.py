@@ -11,6 +11,9 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from backend.services.health import ProbeWSGIMiddleware
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hello_world.settings")
 
-application = get_wsgi_application()
+# /livez يُجاب قبل Django (بدون طبقات وسيطة أو جلسات)
+application = ProbeWSGIMiddleware(get_wsgi_application())
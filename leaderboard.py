@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+أفضل وأسوأ K تسديدات (Top-K Leaderboard)
+Top-K / Bottom-K Shot Tracking
+
+لا يعتمد إلا على مكتبة Python القياسية، ويستخدمه محرك الخادم
+(backend/billiards/engine.py) وتطبيقات Pythonista؛ يجب نسخه بجانب
+pythonista_advanced_billiards.py
+
+بدلاً من max()/min() على كل التسديدات عند كل طلب:
+- كومة (heap) صغرى بحجم K + احتياطي تحتفظ بأفضل القيم؛ جذرها أضعف
+  قيمة محفوظة، فالإضافة O(log K) والقراءة O(K log K) بدون لمس السجل
+- الحذف يُزيل العنصر من الكومة إن كان محفوظاً؛ الاحتياطي يمتص عدة
+  حذوفات، وإذا نقص المحفوظ عن K مع وجود عناصر أخرى تصبح القائمة
+  stale ويعيد المالك بناءها من المصدر مرة واحدة
+- التعادل: الأسبق إضافةً يأتي أولاً
+- تقسيمات اختيارية (حسب الجدران، الصعوبة ...) بكومة لكل قيمة
+"""
+
+import heapq
+
+
+class TopK:
+    """
+    أفضل K عناصر حسب قيمة رقمية (أو أصغرها عند largest=False)
+
+    العنصر في الكومة: [القيمة بالإشارة، -الترتيب، المعرف، العنصر]
+    """
+
+    def __init__(self, k=5, largest=True, reserve=None):
+        """
+        Args:
+            k: عدد العناصر المطلوبة
+            largest: True لأكبر القيم، False لأصغرها
+            reserve: عناصر إضافية محفوظة لامتصاص الحذف (افتراضياً k)
+
+        Raises:
+            ValueError: إذا كانت k أقل من 1
+        """
+        if k < 1:
+            raise ValueError('عدد العناصر يجب أن يكون 1 على الأقل')
+        self.k = int(k)
+        self.largest = largest
+        self.capacity = self.k + (self.k if reserve is None else int(reserve))
+        self._sign = 1.0 if largest else -1.0
+        self._heap = []
+        self._kept = {}  # المعرف ← عنصر الكومة
+        self._sequence = 0  # ترتيب الإضافة التالية
+        self.size = 0  # عدد العناصر الحية (المحفوظة وغير المحفوظة)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, item_id, value, item=None):
+        """
+        إضافة عنصر - O(log K)
+
+        Args:
+            item_id: معرف فريد (للحذف لاحقاً)
+            value: القيمة المرتب عليها
+            item: البيانات المعادة مع النتيجة
+        """
+        entry = [self._sign * float(value), -self._sequence, item_id, item]
+        self._sequence += 1
+        self.size += 1
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, entry)
+            self._kept[item_id] = entry
+        elif entry[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            del self._kept[evicted[2]]
+            self._kept[item_id] = entry
+
+    def discard(self, item_id):
+        """
+        حذف عنصر سبقت إضافته
+
+        Returns:
+            True إذا كان العنصر ضمن المحفوظ
+        """
+        self.size = max(0, self.size - 1)
+        entry = self._kept.pop(item_id, None)
+        if entry is None:
+            return False
+        # الكومة صغيرة (K + احتياطي)، فإعادة ترتيبها أبسط من الحذف الكسول
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        return True
+
+    @property
+    def stale(self):
+        """هل توجد عناصر غير محفوظة كان يجب أن تظهر بعد الحذف؟"""
+        return len(self._heap) < min(self.k, self.size)
+
+    def rebuild(self, entries):
+        """
+        إعادة البناء من المصدر (بعد التحميل أو عندما تصبح stale)
+
+        Args:
+            entries: (المعرف، القيمة، العنصر) بترتيب الإضافة
+        """
+        self._heap = []
+        self._kept = {}
+        self._sequence = 0
+        self.size = 0
+        for item_id, value, item in entries:
+            self.push(item_id, value, item)
+
+    def top(self, k=None):
+        """
+        أفضل k عناصر (افتراضياً K)
+
+        Returns:
+            قائمة (القيمة، المعرف، العنصر) من الأفضل
+
+        Raises:
+            ValueError: إذا كان k أكبر من K المحفوظة
+        """
+        k = self.k if k is None else k
+        if not (1 <= k <= self.k):
+            raise ValueError(f'عدد العناصر يجب أن يكون بين 1 و {self.k}')
+        best = heapq.nlargest(k, self._heap, key=lambda e: (e[0], e[1]))
+        return [(self._sign * e[0], e[2], e[3]) for e in best]
+
+    def to_dict(self):
+        """الحالة بصيغة JSON (العناصر يجب أن تكون قابلة للتحويل)"""
+        return {
+            'k': self.k,
+            'capacity': self.capacity,
+            'largest': self.largest,
+            'size': self.size,
+            'entries': [
+                [self._sign * e[0], -e[1], e[2], e[3]] for e in sorted(self._heap, key=lambda e: -e[1])
+            ],
+        }
+
+    def load_dict(self, data):
+        """
+        استعادة حالة محفوظة بنفس الإعدادات
+
+        Raises:
+            ValueError: إذا كانت الحالة بإعدادات مختلفة
+        """
+        if (data.get('k'), data.get('capacity'), data.get('largest')) != (self.k, self.capacity, self.largest):
+            raise ValueError('حالة القائمة غير متوافقة مع الإعدادات الحالية')
+        self._heap = [[self._sign * value, -seq, item_id, item] for value, seq, item_id, item in data['entries']]
+        heapq.heapify(self._heap)
+        self._kept = {e[2]: e for e in self._heap}
+        last = max((seq for _, seq, _, _ in data['entries']), default=-1)
+        self._sequence = last + 1
+        self.size = data['size']
+
+    def copy(self):
+        """نسخة مستقلة - O(K) (عناصر الكومة لا تتغير بعد إضافتها فتُشارك)"""
+        clone = TopK.__new__(TopK)
+        clone.__dict__.update(self.__dict__)
+        clone._heap = list(self._heap)
+        clone._kept = dict(self._kept)
+        return clone
+
+
+class Leaderboard:
+    """
+    أفضل وأسوأ K مع تقسيمات اختيارية
+
+    مثال: Leaderboard(k=5, partitions=('rails', 'difficulty')) ثم
+    add(shot_id, rate, shot, rails=2, difficulty='صعبة') و
+    best(rails=2) أو worst(difficulty='صعبة').
+    """
+
+    def __init__(self, k=5, partitions=(), reserve=None):
+        """
+        Args:
+            k: عدد العناصر في كل قائمة
+            partitions: أسماء أبعاد التقسيم
+            reserve: عناصر احتياطية لكل قائمة لامتصاص الحذف
+        """
+        self.k = k
+        self.reserve = reserve
+        self.partitions = tuple(partitions)
+        self._boards = {}  # (البعد، القيمة) ← (الأفضل، الأسوأ)؛ (None, None) للكل
+        self._board(None, None)
+
+    def _board(self, dimension, key):
+        boards = self._boards.get((dimension, key))
+        if boards is None:
+            boards = self._boards[(dimension, key)] = (
+                TopK(self.k, largest=True, reserve=self.reserve),
+                TopK(self.k, largest=False, reserve=self.reserve),
+            )
+        return boards
+
+    def _targets(self, keys):
+        unknown = set(keys) - set(self.partitions)
+        if unknown:
+            raise ValueError(f'أبعاد تقسيم غير معرفة: {", ".join(sorted(unknown))}')
+        missing = set(self.partitions) - set(keys)
+        if missing:
+            raise ValueError(f'قيم تقسيم مفقودة: {", ".join(sorted(missing))}')
+        yield self._boards[(None, None)]
+        for dimension in self.partitions:
+            yield self._board(dimension, keys[dimension])
+
+    def add(self, item_id, value, item=None, **keys):
+        """
+        إضافة عنصر لكل القوائم المناسبة
+
+        Args:
+            item_id: معرف فريد
+            value: القيمة (معدل النجاح مثلاً)
+            item: البيانات المعادة
+            **keys: قيمة كل بعد تقسيم
+
+        Raises:
+            ValueError: إذا نقصت أو زادت أبعاد التقسيم
+        """
+        for best, worst in self._targets(keys):
+            best.push(item_id, value, item)
+            worst.push(item_id, value, item)
+
+    def remove(self, item_id, **keys):
+        """حذف عنصر بنفس قيم التقسيم التي أُضيف بها"""
+        for best, worst in self._targets(keys):
+            best.discard(item_id)
+            worst.discard(item_id)
+
+    @property
+    def stale(self):
+        """هل تحتاج إحدى القوائم لإعادة بناء من المصدر؟"""
+        return any(best.stale or worst.stale for best, worst in self._boards.values())
+
+    def rebuild(self, entries):
+        """
+        إعادة بناء كل القوائم
+
+        Args:
+            entries: (المعرف، القيمة، العنصر، قاموس قيم التقسيم) بترتيب الإضافة
+        """
+        self._boards = {}
+        self._board(None, None)
+        for item_id, value, item, keys in entries:
+            self.add(item_id, value, item, **keys)
+
+    def _select(self, filters, index, k):
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if len(filters) > 1:
+            raise ValueError('يمكن التصفية ببعد واحد فقط')
+        if filters:
+            (dimension, key), = filters.items()
+            if dimension not in self.partitions:
+                raise ValueError(f'بعد تقسيم غير معرف: {dimension}')
+            boards = self._boards.get((dimension, key))
+            if boards is None:
+                return []
+        else:
+            boards = self._boards[(None, None)]
+        return boards[index].top(k)
+
+    def best(self, k=None, **filters):
+        """
+        أفضل k عناصر (الكل أو تقسيم واحد)
+
+        Returns:
+            قائمة (القيمة، المعرف، العنصر) من الأفضل
+        """
+        return self._select(filters, 0, k)
+
+    def worst(self, k=None, **filters):
+        """أسوأ k عناصر (الكل أو تقسيم واحد)"""
+        return self._select(filters, 1, k)
+
+    def to_dict(self):
+        """الحالة بصيغة JSON؛ قيم التقسيم تُحفظ كما هي"""
+        return {
+            'k': self.k,
+            'partitions': list(self.partitions),
+            'boards': [
+                [dimension, key, best.to_dict(), worst.to_dict()]
+                for (dimension, key), (best, worst) in self._boards.items()
+            ],
+        }
+
+    def load_dict(self, data):
+        """
+        استعادة حالة محفوظة بنفس الإعدادات
+
+        Raises:
+            ValueError: إذا كانت الحالة بإعدادات مختلفة
+        """
+        if data.get('k') != self.k or tuple(data.get('partitions', ())) != self.partitions:
+            raise ValueError('حالة القائمة غير متوافقة مع الإعدادات الحالية')
+        self._boards = {}
+        for dimension, key, best, worst in data['boards']:
+            boards = self._board(dimension, key)
+            boards[0].load_dict(best)
+            boards[1].load_dict(worst)
+        self._board(None, None)
+
+    def copy(self):
+        """نسخة مستقلة (لنشرها للقراء بينما يستمر الكاتب في التحديث)"""
+        clone = Leaderboard.__new__(Leaderboard)
+        clone.__dict__.update(self.__dict__)
+        clone._boards = {key: (best.copy(), worst.copy()) for key, (best, worst) in self._boards.items()}
+        return clone
@@ -27,6 +27,10 @@ def create_installation_package():
     files_to_copy = [
         'pythonista_billiards_app.py',
         'pythonista_advanced_billiards.py',
+        'pythonista_storage.py',
+        'rolling_analytics.py',
+        'quantile_sketch.py',
+        'leaderboard.py',
         'PYTHONISTA_SETUP_GUIDE.md'
     ]
     
@@ -14,13 +14,15 @@ Advanced Billiards App - Complete Pythonista Edition
 """
 
 import ui
-import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict
 import math
 
+from pythonista_storage import AppendOnlyShotStore, ShotStatsSummary
+from rolling_analytics import DOWN, FLAT, UP, RollingAnalytics
+
 # ==================== ثوابت التطبيق ====================
 
 # الألوان
@@ -182,32 +184,19 @@ class AdvancedCalculator:
         if len(shots) < 3:
             return {'trend': 'محدود', 'improvement': 0}
         
-        # حساب متوسط النجاح
-        recent = shots[-10:] if len(shots) > 10 else shots
-        success_rates = [s.success for s in recent if s.success is not None]
-        
-        if not success_rates:
-            return {'trend': 'محدود', 'improvement': 0}
-        
-        avg_recent = sum(success_rates) / len(success_rates)
-        
-        if len(shots) > 10:
-            older = shots[-20:-10]
-            older_rates = [s.success for s in older if s.success is not None]
-            avg_older = sum(older_rates) / len(older_rates) if older_rates else 50
-        else:
-            avg_older = 50
-        
-        improvement = avg_recent - avg_older
-        
-        if improvement > 5:
-            trend = 'تحسن ملحوظ ⬆️'
-        elif improvement < -5:
-            trend = 'تراجع ملحوظ ⬇️'
-        else:
-            trend = 'مستقر ➡️'
-        
-        return {'trend': trend, 'improvement': improvement}
+        # نافذتا الاتجاه تحتاجان آخر 20 تسديدة فقط
+        analytics = RollingAnalytics(windows=(10,), ewma_spans=())
+        analytics.extend(s.success for s in shots[-20:])
+        return trend_summary(analytics.trend())
+
+
+def trend_summary(trend):
+    """تحويل نتيجة RollingAnalytics.trend إلى نص العرض"""
+    if trend is None:
+        return {'trend': 'محدود', 'improvement': 0}
+    
+    labels = {UP: 'تحسن ملحوظ ⬆️', DOWN: 'تراجع ملحوظ ⬇️', FLAT: 'مستقر ➡️'}
+    return {'trend': labels[trend['direction']], 'improvement': trend['improvement']}
 
 class AdvancedDataManager:
     """مدير البيانات المتقدم"""
@@ -215,16 +204,25 @@ class AdvancedDataManager:
     def __init__(self):
         self.data_dir = Path(os.path.expanduser('~/Documents/5A-Diamond-System'))
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.shots_file = self.data_dir / 'shots.json'
+        self.shots_file = self.data_dir / 'shots.jsonl'
         self.sessions_file = self.data_dir / 'sessions.json'
+        # ملخص تراكمي يُحدَّث مع كل حفظ - تبويب الإحصائيات لا يقرأ السجل كاملاً
+        self.summary = ShotStatsSummary(self.data_dir / 'stats_summary.json')
+        # سجل إضافة فقط - حفظ التسديدة لا يعيد كتابة الملف كاملاً
+        self.store = AppendOnlyShotStore(
+            self.shots_file,
+            legacy_path=self.data_dir / 'shots.json',
+            on_compact=self.summary.source_resized,
+        )
     
     def save_shot(self, shot):
         """حفظ التسديدة"""
         try:
-            shots = self.load_shots()
-            shots.append(shot.to_dict())
-            with open(self.shots_file, 'w', encoding='utf-8') as f:
-                json.dump(shots, f, ensure_ascii=False, indent=2)
+            shot_dict = shot.to_dict()
+            if self.summary.is_stale(self.store.size()):
+                self.summary.rebuild(self.store.load(), self.store.size())
+            size = self.store.append(shot_dict)
+            self.summary.add(shot_dict, size)
             return True
         except Exception as e:
             print(f'Error saving shot: {e}')
@@ -232,13 +230,7 @@ class AdvancedDataManager:
     
     def load_shots(self):
         """تحميل التسديدات"""
-        try:
-            if self.shots_file.exists():
-                with open(self.shots_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return []
+        return self.store.load()
     
     def get_shots_list(self):
         """الحصول على قائمة التسديدات"""
@@ -247,9 +239,12 @@ class AdvancedDataManager:
     
     def get_statistics(self):
         """الحصول على الإحصائيات الشاملة"""
-        shots = self.get_shots_list()
+        size = self.store.size()
+        if self.summary.is_stale(size):
+            self.summary.rebuild(self.load_shots(), size)
+        summary = self.summary
         
-        if not shots:
+        if not summary.total_shots:
             return {
                 'total_shots': 0,
                 'successful_shots': 0,
@@ -257,42 +252,44 @@ class AdvancedDataManager:
                 'avg_success': 0,
                 'best_shot': None,
                 'worst_shot': None,
+                'last_10_avg': 0,
+                'trend': trend_summary(None),
+                'distributions': {},
                 'favorite_difficulty': 'لا توجد بيانات'
             }
         
-        # إحصائيات أساسية
-        total = len(shots)
-        with_success = [s for s in shots if s.success is not None]
-        
-        if with_success:
-            success_rates = [s.success for s in with_success]
-            avg_success = sum(success_rates) / len(success_rates)
-            best_shot = max(with_success, key=lambda s: s.success)
-            worst_shot = min(with_success, key=lambda s: s.success)
-        else:
-            avg_success = 0
-            best_shot = None
-            worst_shot = None
+        total = summary.total_shots
+        best_shot = Shot.from_dict(summary.best_shot) if summary.best_shot else None
+        worst_shot = Shot.from_dict(summary.worst_shot) if summary.worst_shot else None
         
         return {
             'total_shots': total,
-            'with_success_data': len(with_success),
-            'success_rate': (len(with_success) / total * 100) if total > 0 else 0,
-            'avg_success': avg_success,
+            'with_success_data': summary.with_success,
+            'success_rate': summary.with_success / total * 100,
+            'avg_success': summary.avg_success,
             'best_shot': best_shot,
             'worst_shot': worst_shot,
-            'last_10_avg': sum([s.success for s in shots[-10:] if s.success]) / 
-                          len([s for s in shots[-10:] if s.success]) 
-                          if any(s.success for s in shots[-10:]) else 0
+            'last_10_avg': summary.recent_avg,
+            'trend': trend_summary(summary.trend),
+            'distributions': {
+                name: summary.distribution(name) for name in ('success', 'power', 'angle')
+            }
         }
     
+    def get_leaderboard(self, k=5, difficulty=None, worst=False):
+        """أفضل (أو أسوأ) التسديدات من الملخص المحفوظ"""
+        size = self.store.size()
+        if self.summary.is_stale(size):
+            self.summary.rebuild(self.load_shots(), size)
+        return [Shot.from_dict(s) for s in self.summary.top_shots(k, difficulty, worst)]
+    
     def clear_data(self):
         """حذف جميع البيانات"""
         try:
-            if self.shots_file.exists():
-                self.shots_file.unlink()
+            self.store.clear()
             if self.sessions_file.exists():
                 self.sessions_file.unlink()
+            self.summary.reset()
             return True
         except Exception:
             return False
@@ -496,7 +493,12 @@ class TabViewController(ui.ViewController):
             f'إجمالي التسديدات: {stats["total_shots"]}',
             f'متوسط النجاح: {stats["avg_success"]:.1f}%',
             f'آخر 10: {stats["last_10_avg"]:.1f}%',
+            f'الاتجاه: {stats["trend"]["trend"]}',
         ]
+        success = stats['distributions'].get('success')
+        if success and success['count']:
+            p = success['percentiles']
+            stat_texts.append(f'الوسيط: {p["p50"]:.1f}% (p10 {p["p10"]:.1f} - p90 {p["p90"]:.1f})')
         
         for text in stat_texts:
             label = ui.Label()
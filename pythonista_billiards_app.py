@@ -13,12 +13,13 @@ Complete Billiards Calculator App for Pythonista
 """
 
 import ui
-import json
 import os
 from datetime import datetime
 from pathlib import Path
 import math
 
+from pythonista_storage import AppendOnlyShotStore
+
 # ==================== نموذج البيانات ====================
 
 class Shot:
@@ -133,16 +134,17 @@ class DataManager:
         # استخدام مجلد Documents في Pythonista
         self.data_dir = Path(os.path.expanduser('~/Documents/BilliardsApp'))
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.shots_file = self.data_dir / 'shots.json'
+        self.shots_file = self.data_dir / 'shots.jsonl'
         self.stats_file = self.data_dir / 'statistics.json'
+        # سجل إضافة فقط مع ترحيل تلقائي من shots.json القديم
+        self.store = AppendOnlyShotStore(
+            self.shots_file, legacy_path=self.data_dir / 'shots.json'
+        )
     
     def save_shot(self, shot: Shot) -> bool:
         """حفظ التسديقة"""
         try:
-            shots = self.load_shots()
-            shots.append(shot.to_dict())
-            with open(self.shots_file, 'w', encoding='utf-8') as f:
-                json.dump(shots, f, ensure_ascii=False, indent=2)
+            self.store.append(shot.to_dict())
             return True
         except Exception as e:
             print(f'خطأ في حفظ التسديقة: {e}')
@@ -150,19 +152,12 @@ class DataManager:
     
     def load_shots(self) -> list:
         """تحميل جميع التسديقات"""
-        try:
-            if self.shots_file.exists():
-                with open(self.shots_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f'خطأ في تحميل التسديقات: {e}')
-        return []
+        return self.store.load()
     
     def clear_all_shots(self) -> bool:
         """حذف جميع التسديقات"""
         try:
-            if self.shots_file.exists():
-                self.shots_file.unlink()
+            self.store.clear()
             return True
         except Exception as e:
             print(f'خطأ في حذف البيانات: {e}')
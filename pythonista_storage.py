@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+أدوات التخزين المشتركة لتطبيقات Pythonista
+Shared Storage Helpers for the Pythonista Apps
+
+لا يعتمد إلا على مكتبة Python القياسية، ويجب نسخه مع rolling_analytics.py
+و quantile_sketch.py و leaderboard.py بجانب pythonista_billiards_app.py و pythonista_advanced_billiards.py
+
+المحتويات:
+- AppendOnlyShotStore: سجل تسديدات بسطر JSON لكل تسديدة (إضافة فقط) مع ضغط في الخلفية
+- ShotStatsSummary: ملخص إحصائي تراكمي محفوظ على القرص يُحدَّث مع كل تسديدة
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+from leaderboard import Leaderboard
+from quantile_sketch import QuantileSketch
+from rolling_analytics import RollingAnalytics
+
+# الحقول التي يُحفظ ملخص توزيعها (المئينات والمدرج التكراري)
+DISTRIBUTION_FIELDS = ('success', 'power', 'angle')
+
+
+def _atomic_write_json(path, data):
+    """كتابة JSON بشكل ذري (ملف مؤقت ثم استبدال)"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class AppendOnlyShotStore:
+    """
+    سجل تسديدات بصيغة JSON Lines (سطر لكل تسديدة)
+
+    - الحفظ يضيف سطراً واحداً في نهاية الملف: O(1) بدلاً من إعادة كتابة الملف كاملاً
+    - يُرحَّل ملف shots.json القديم تلقائياً عند أول استخدام
+    - الأسطر التالفة (مثل سطر مقطوع بعد انقطاع البطارية) تُتجاهل عند القراءة
+    - كل compact_every إضافة يُفحص الملف في الخلفية ويُعاد كتابته بدون
+      الأسطر التالفة إن وجدت، بدون إيقاف الإضافات
+    """
+
+    def __init__(self, path, legacy_path=None, compact_every=1000, on_compact=None):
+        """
+        Args:
+            path: مسار ملف JSON Lines
+            legacy_path: مسار ملف JSON القديم للترحيل (اختياري)
+            compact_every: عدد الإضافات بين عمليات الضغط (None للتعطيل)
+            on_compact: دالة تُستدعى بـ (الحجم القديم، الحجم الجديد) بعد الضغط
+        """
+        self.path = Path(path)
+        self.compact_every = compact_every
+        self.on_compact = on_compact
+        self._lock = threading.Lock()
+        self._appends_since_compact = 0
+        self._compacting = False
+
+        if legacy_path is not None:
+            self._migrate(Path(legacy_path))
+
+    def _migrate(self, legacy_path):
+        """ترحيل ملف JSON القديم (قائمة واحدة) إلى JSON Lines"""
+        if self.path.exists() or not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(self._encode(record))
+            os.replace(tmp_path, self.path)
+            legacy_path.rename(legacy_path.with_name(legacy_path.name + '.migrated'))
+        except Exception as e:
+            print(f'Error migrating {legacy_path}: {e}')
+
+    @staticmethod
+    def _encode(record):
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def append(self, record):
+        """
+        إضافة تسديدة في نهاية السجل
+
+        Returns:
+            حجم الملف بعد الإضافة (بالبايت)
+        """
+        line = self._encode(record).encode('utf-8')
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    # سطر أخير مقطوع (انقطاع أثناء الكتابة) لا يجب أن يلتصق بالسطر الجديد
+                    f.seek(end - 1)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+                f.flush()
+                size = f.tell()
+            self._appends_since_compact += 1
+            should_compact = (self.compact_every is not None
+                              and self._appends_since_compact >= self.compact_every
+                              and not self._compacting)
+            if should_compact:
+                self._compacting = True
+        if should_compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+        return size
+
+    @staticmethod
+    def _parse_lines(lines, records):
+        """تحليل الأسطر وتجاهل التالف منها"""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+        return records
+
+    def load(self):
+        """تحميل جميع التسديدات"""
+        try:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return self._parse_lines(f, [])
+        except Exception as e:
+            print(f'Error loading shots: {e}')
+        return []
+
+    def size(self):
+        """حجم ملف السجل (0 إذا لم يكن موجوداً)"""
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def compact(self):
+        """
+        إعادة كتابة السجل بدون الأسطر التالفة
+
+        القراءة والكتابة تتم خارج القفل؛ الأسطر التي أضيفت أثناء
+        الضغط تُنسخ في النهاية تحت القفل قبل استبدال الملف.
+        """
+        try:
+            with self._lock:
+                self._compacting = True
+                offset = self.size()
+                self._appends_since_compact = 0
+            if offset == 0:
+                return
+
+            with open(self.path, 'rb') as f:
+                data = f.read(offset)
+            lines = data.decode('utf-8', errors='ignore').splitlines()
+            records = self._parse_lines(lines, [])
+            if len(records) == sum(1 for line in lines if line.strip()):
+                return  # لا توجد أسطر تالفة - لا حاجة لإعادة الكتابة
+
+            tmp_path = self.path.with_name(self.path.name + '.compact')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(self._encode(record))
+
+            with self._lock:
+                old_size = self.size()
+                with open(self.path, 'rb') as src, open(tmp_path, 'ab') as dst:
+                    src.seek(offset)
+                    dst.write(src.read())
+                os.replace(tmp_path, self.path)
+                new_size = self.size()
+                if self.on_compact is not None:
+                    self.on_compact(old_size, new_size)
+        except Exception as e:
+            print(f'Error compacting shots: {e}')
+        finally:
+            self._compacting = False
+
+    def clear(self):
+        """حذف جميع التسديدات"""
+        with self._lock:
+            if self.path.exists():
+                self.path.unlink()
+            self._appends_since_compact = 0
+
+
+class ShotStatsSummary:
+    """
+    ملخص إحصائي تراكمي للتسديدات
+
+    يحفظ المجاميع (العدد، مجموع النجاح، أفضل وأسوأ K) وحلقة
+    لآخر التسديدات ونوافذ الاتجاه المتحركة وملخصات التوزيع، فتُحسب
+    الإحصائيات بدون قراءة سجل التسديدات.
+    يُعاد بناؤه تلقائياً إذا تغير حجم ملف التسديدات خارج التطبيق.
+    """
+
+    VERSION = 4
+
+    def __init__(self, path, recent_size=10, top_k=5):
+        self.path = Path(path)
+        self.recent_size = recent_size
+        self.top_k = top_k
+        # التحديث والحفظ قد يأتيان من خيط الضغط في الخلفية (source_resized)
+        self._lock = threading.RLock()
+        self._reset_state()
+        self._load()
+
+    def _reset_state(self):
+        self.total_shots = 0
+        self.with_success = 0
+        self.success_sum = 0.0
+        self.leaderboard = Leaderboard(k=self.top_k, partitions=('difficulty',))
+        self.recent = deque(maxlen=self.recent_size)
+        self.analytics = RollingAnalytics()
+        self.distributions = {name: QuantileSketch() for name in DISTRIBUTION_FIELDS}
+        self.source_size = 0
+
+    def _load(self):
+        """تحميل الملخص المحفوظ إن وجد"""
+        try:
+            if not self.path.exists():
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                return
+            self.total_shots = data['total_shots']
+            self.with_success = data['with_success']
+            self.success_sum = data['success_sum']
+            self.leaderboard.load_dict(data['leaderboard'])
+            self.recent = deque(data['recent'], maxlen=self.recent_size)
+            self.analytics.load_dict(data['analytics'])
+            self.distributions = {
+                name: QuantileSketch.from_dict(data['distributions'][name])
+                for name in DISTRIBUTION_FIELDS
+            }
+            self.source_size = data['source_size']
+        except Exception as e:
+            print(f'Error loading stats summary: {e}')
+            self._reset_state()
+            self.source_size = -1  # فرض إعادة البناء
+
+    def save(self):
+        """حفظ الملخص على القرص"""
+        with self._lock:
+            self._write()
+
+    def _write(self):
+        _atomic_write_json(self.path, {
+            'version': self.VERSION,
+            'total_shots': self.total_shots,
+            'with_success': self.with_success,
+            'success_sum': self.success_sum,
+            'leaderboard': self.leaderboard.to_dict(),
+            'recent': list(self.recent),
+            'analytics': self.analytics.to_dict(),
+            'distributions': {
+                name: sketch.to_dict() for name, sketch in self.distributions.items()
+            },
+            'source_size': self.source_size,
+        })
+
+    def _apply(self, shot_dict):
+        """تحديث المجاميع بتسديدة واحدة - O(1)"""
+        self.total_shots += 1
+        success = shot_dict.get('success')
+        self.recent.append(success)
+        self.analytics.push(success)
+        for name, sketch in self.distributions.items():
+            sketch.update(shot_dict.get(name))
+        if success is None:
+            return
+        self.with_success += 1
+        self.success_sum += success
+        # ترتيب التسديدة في السجل معرف فريد (معرفات التطبيق بالميلي ثانية قد تتكرر)
+        self.leaderboard.add(
+            self.total_shots, success, shot_dict, difficulty=shot_dict.get('difficulty'),
+        )
+
+    def add(self, shot_dict, source_size):
+        """
+        إضافة تسديدة جديدة وحفظ الملخص
+
+        Args:
+            shot_dict: قاموس التسديدة
+            source_size: حجم ملف التسديدات بعد الحفظ (بالبايت)
+        """
+        with self._lock:
+            self._apply(shot_dict)
+            self.source_size = source_size
+            self.save()
+
+    def source_resized(self, old_size, new_size):
+        """
+        تحديث الحجم المرجعي بعد ضغط السجل (نفس المحتوى بحجم مختلف)
+
+        إذا لم يكن الملخص متطابقاً مع الحجم القديم يبقى غير متطابق
+        وسيُعاد بناؤه عند الحاجة.
+        """
+        with self._lock:
+            if self.source_size == old_size:
+                self.source_size = new_size
+                self.save()
+
+    def is_stale(self, source_size):
+        """هل الملخص غير متطابق مع ملف التسديدات؟"""
+        return self.source_size != source_size
+
+    def rebuild(self, shot_dicts, source_size):
+        """
+        إعادة بناء الملخص من جميع التسديدات (مرة واحدة عند عدم التطابق)
+
+        Args:
+            shot_dicts: قائمة قواميس التسديدات
+            source_size: حجم ملف التسديدات الحالي
+        """
+        with self._lock:
+            self._reset_state()
+            for shot_dict in shot_dicts:
+                self._apply(shot_dict)
+            self.source_size = source_size
+            self.save()
+
+    def reset(self):
+        """مسح الملخص"""
+        with self._lock:
+            self._reset_state()
+            if self.path.exists():
+                self.path.unlink()
+
+    @property
+    def avg_success(self):
+        """متوسط النجاح لكل التسديدات التي لها قيمة نجاح"""
+        return self.success_sum / self.with_success if self.with_success else 0
+
+    @property
+    def best_shot(self):
+        """أفضل تسديدة (قاموس) أو None"""
+        best = self.leaderboard.best(1)
+        return best[0][2] if best else None
+
+    @property
+    def worst_shot(self):
+        """أسوأ تسديدة (قاموس) أو None"""
+        worst = self.leaderboard.worst(1)
+        return worst[0][2] if worst else None
+
+    def top_shots(self, k=None, difficulty=None, worst=False):
+        """
+        أفضل (أو أسوأ) k تسديدات بدون قراءة السجل
+
+        Args:
+            k: عدد التسديدات (افتراضياً top_k)
+            difficulty: تصفية حسب الصعوبة
+            worst: True لأسوأ التسديدات
+
+        Returns:
+            قائمة قواميس التسديدات
+        """
+        select = self.leaderboard.worst if worst else self.leaderboard.best
+        return [shot for _, _, shot in select(k, difficulty=difficulty)]
+
+    def distribution(self, name, percentiles=(10, 50, 90)):
+        """
+        مئينات حقل من ملخص توزيعه
+
+        Args:
+            name: success أو power أو angle
+            percentiles: المئينات المطلوبة (0-100)
+
+        Returns:
+            قاموس {"count", "min", "max", "percentiles"}
+        """
+        return self.distributions[name].summary(percentiles, digits=1)
+
+    @property
+    def trend(self):
+        """اتجاه الأداء (آخر 10 مقابل الـ 10 قبلها) أو None بدون بيانات"""
+        return self.analytics.trend()
+
+    @property
+    def recent_avg(self):
+        """متوسط النجاح لآخر التسديدات (القيم غير الصفرية فقط)"""
+        values = [s for s in self.recent if s]
+        return sum(values) / len(values) if values else 0
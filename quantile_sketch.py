@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ملخصات التوزيع المتدفقة (KLL Quantile Sketch)
+Streaming Quantile Sketches
+
+لا يعتمد إلا على مكتبة Python القياسية، ويستخدمه محرك الخادم
+(backend/billiards/engine.py) وتطبيقات Pythonista؛ يجب نسخه بجانب
+pythonista_advanced_billiards.py
+
+المتوسط والأفضل والأسوأ لا تصف شكل التوزيع. الملخص يجيب عن المئينات
+(الوسيط، p90 ...) والمدرجات التكرارية بذاكرة محدودة:
+- سلم من المستويات؛ كل عنصر في المستوى h يمثل 2^h قيمة
+- عندما يمتلئ مستوى يُرتب ويُرفع نصف عناصره (الفردية أو الزوجية
+  عشوائياً) للمستوى التالي، فيبقى الوزن الكلي مساوياً لعدد القيم
+- سعة المستويات تتناقص هندسياً (2/3) نحو الأسفل، فالحجم الكلي
+  O(k) تقريباً مهما كان عدد القيم، وخطأ الرتبة حوالي 1.7% عند k=200
+- الدمج: إلحاق المستويات المتناظرة ثم الضغط، فيمكن جمع ملخصات عدة
+  عمليات أو عدة أجهزة (to_dict / from_dict) في ملخص واحد
+"""
+
+import math
+import random
+
+_CAPACITY_DECAY = 2.0 / 3.0
+_MIN_CAPACITY = 2
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class QuantileSketch:
+    """
+    ملخص KLL لتوزيع قيم رقمية
+
+    القيم المطابقة (أقل من سعة المستوى الأول) تعطي مئينات دقيقة؛ بعد
+    ذلك تكون الرتبة تقريبية بخطأ يتناقص مع k.
+    """
+
+    VERSION = 1
+
+    def __init__(self, k=200, seed=None):
+        """
+        Args:
+            k: سعة المستوى الأعلى (أكبر = دقة أعلى وذاكرة أكبر)
+            seed: بذرة اختيار النصف المرفوع (لنتائج قابلة للتكرار)
+
+        Raises:
+            ValueError: إذا كانت k أقل من 8
+        """
+        if k < 8:
+            raise ValueError('سعة الملخص يجب أن تكون 8 على الأقل')
+        self.k = int(k)
+        self._rng = random.Random(seed)
+        self._levels = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._sorted = None  # (القيم، الأوزان التراكمية) حتى التحديث التالي
+
+    # ---------- التحديث ----------
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _update_max_size(self):
+        self._max_size = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def update(self, value):
+        """
+        إضافة قيمة واحدة - O(1) موزعة
+
+        Args:
+            value: القيمة (None تُتجاهل)
+        """
+        if value is None:
+            return
+        value = float(value)
+        if value != value:  # NaN لا رتبة لها
+            return
+        self._levels[0].append(value)
+        self._size += 1
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._sorted = None
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values):
+        """إضافة عدة قيم"""
+        for value in values:
+            self.update(value)
+
+    def _compress(self):
+        """ضغط أول مستوى ممتلئ حتى يعود الحجم تحت السعة"""
+        while self._size >= self._max_size:
+            for level, items in enumerate(self._levels):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                    self._update_max_size()
+                items.sort()
+                # العدد الفردي: يبقى عنصر واحد في مكانه فيحافظ الوزن على دقته
+                kept = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.getrandbits(1)
+                self._levels[level + 1].extend(items[offset::2])
+                self._levels[level] = kept
+                self._size -= len(items) // 2
+                break
+
+    def merge(self, other):
+        """
+        دمج ملخص آخر في هذا الملخص (مثل إضافة كل قيمه)
+
+        Args:
+            other: QuantileSketch من عملية أو جهاز آخر
+
+        Returns:
+            هذا الملخص (للتسلسل)
+        """
+        if not other.count:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self._size += other._size
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._sorted = None
+        self._update_max_size()
+        self._compress()
+        return self
+
+    def copy(self):
+        """
+        نسخة مستقلة - O(k)
+
+        المئينات المرتبة تُحسب قبل النسخ، فقراءة النسخة من عدة خيوط لا تعدلها.
+        """
+        self._weighted()
+        clone = QuantileSketch.__new__(QuantileSketch)
+        clone.__dict__.update(self.__dict__)
+        clone._levels = [list(items) for items in self._levels]
+        clone._rng = random.Random()
+        clone._rng.setstate(self._rng.getstate())
+        return clone
+
+    @classmethod
+    def merged(cls, sketches, k=200, seed=None):
+        """ملخص جديد يجمع عدة ملخصات (بدون تعديلها)"""
+        result = cls(k=k, seed=seed)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    # ---------- القراءة ----------
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def retained(self):
+        """عدد القيم المحفوظة فعلياً في الذاكرة"""
+        return self._size
+
+    def _weighted(self):
+        """القيم مرتبة مع أوزانها التراكمية (تُحسب مرة حتى التحديث التالي)"""
+        if self._sorted is None:
+            pairs = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self._levels)
+                for value in items
+            )
+            values, cumulative, total = [], [], 0
+            for value, weight in pairs:
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._sorted = (values, cumulative)
+        return self._sorted
+
+    def quantile(self, q):
+        """
+        القيمة عند الكسر q
+
+        Args:
+            q: بين 0 و 1 (0.5 = الوسيط)
+
+        Returns:
+            القيمة أو None إذا كان الملخص فارغاً
+
+        Raises:
+            ValueError: إذا كانت q خارج [0, 1]
+        """
+        if not (0.0 <= q <= 1.0):
+            raise ValueError('الكسر يجب أن يكون بين 0 و 1')
+        if not self.count:
+            return None
+        if q == 0.0:
+            return self.min
+        if q == 1.0:
+            return self.max
+        values, cumulative = self._weighted()
+        target = q * self.count
+        low, high = 0, len(cumulative) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if cumulative[middle] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return values[low]
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """المئينات (0-100) في قاموس {المئين: القيمة}"""
+        return {p: self.quantile(p / 100.0) for p in percentiles}
+
+    def rank(self, value):
+        """نسبة القيم الأقل من أو تساوي value (0-1)"""
+        if not self.count:
+            return None
+        values, cumulative = self._weighted()
+        low, high = 0, len(values)
+        while low < high:
+            middle = (low + high) // 2
+            if values[middle] <= value:
+                low = middle + 1
+            else:
+                high = middle
+        return cumulative[low - 1] / self.count if low else 0.0
+
+    def histogram(self, bins=10, low=None, high=None):
+        """
+        مدرج تكراري تقريبي بفترات متساوية
+
+        Args:
+            bins: عدد الفترات
+            low: بداية المدى (افتراضياً أصغر قيمة)
+            high: نهاية المدى (افتراضياً أكبر قيمة، والفترة الأخيرة تشملها)
+
+        Returns:
+            قائمة {"low", "high", "count"}؛ القيم خارج المدى لا تُحسب
+
+        Raises:
+            ValueError: إذا كان عدد الفترات أو المدى غير صحيح
+        """
+        if bins < 1:
+            raise ValueError('عدد الفترات يجب أن يكون 1 على الأقل')
+        if not self.count:
+            return []
+        low = self.min if low is None else float(low)
+        high = self.max if high is None else float(high)
+        if high < low:
+            raise ValueError('نهاية المدى يجب أن تكون أكبر من بدايته')
+        width = (high - low) / bins
+        counts = [0] * bins
+        for level, items in enumerate(self._levels):
+            weight = 1 << level
+            for value in items:
+                if low <= value <= high:
+                    index = int((value - low) / width) if width else 0
+                    counts[min(index, bins - 1)] += weight
+        return [
+            {'low': low + i * width, 'high': high if i == bins - 1 else low + (i + 1) * width,
+             'count': count}
+            for i, count in enumerate(counts)
+        ]
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES, digits=2):
+        """
+        العدد والمدى والمئينات في قاموس واحد (للعرض أو API)
+
+        Args:
+            percentiles: المئينات المطلوبة (0-100)
+            digits: عدد الخانات العشرية
+        """
+        def _round(value):
+            return None if value is None else round(value, digits)
+
+        return {
+            'count': self.count,
+            'min': _round(self.min),
+            'max': _round(self.max),
+            'percentiles': {
+                _label(p): _round(value) for p, value in self.percentiles(percentiles).items()
+            },
+        }
+
+    # ---------- الحفظ ----------
+
+    def to_dict(self):
+        """الحالة الكاملة بصيغة JSON (للحفظ أو الإرسال للدمج)"""
+        return {
+            'version': self.VERSION,
+            'k': self.k,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'levels': [list(items) for items in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data, seed=None):
+        """
+        استعادة ملخص محفوظ
+
+        Raises:
+            ValueError: إذا كان الإصدار مختلفاً أو الأوزان لا تطابق العدد
+        """
+        if data.get('version') != cls.VERSION:
+            raise ValueError('إصدار الملخص غير متوافق')
+        sketch = cls(k=data['k'], seed=seed)
+        levels = [[float(v) for v in items] for items in data['levels']] or [[]]
+        if sum(len(items) << level for level, items in enumerate(levels)) != data['count']:
+            raise ValueError('أوزان الملخص لا تطابق عدد القيم')
+        sketch._levels = levels
+        sketch._size = sum(len(items) for items in levels)
+        sketch.count = data['count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch._update_max_size()
+        if sketch._size >= sketch._max_size:
+            sketch._compress()
+        return sketch
+
+
+def _label(percentile):
+    """مفتاح المئين للعرض: p50 أو p99.9"""
+    return f'p{percentile:g}'
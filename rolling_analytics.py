@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تحليلات النوافذ المتحركة المشتركة
+Shared Rolling-Window Analytics
+
+لا يعتمد إلا على مكتبة Python القياسية، ويستخدمه محرك الخادم
+(backend/billiards/engine.py) وتطبيقات Pythonista؛ يجب نسخه بجانب
+pythonista_advanced_billiards.py و billiards_app_advanced.py
+
+بدلاً من اقتطاع آخر 10 تسديدات وإعادة حساب المتوسط عند كل عرض، تُحدَّث
+مجاميع كل نافذة مع كل تسديدة جديدة بكلفة O(1):
+- نوافذ بعدد التسديدات (10، 50، 500 ...) فوق مخزن دائري واحد
+- نوافذ زمنية (آخر ساعة، آخر يوم ...)
+- متوسطات متحركة أسية (EWMA)
+- اكتشاف الاتجاه: النافذة الأخيرة مقابل النافذة التي قبلها، وزخم
+  EWMA السريع مقابل البطيء
+"""
+
+from collections import deque
+import math
+import time
+
+UP = 'up'
+DOWN = 'down'
+FLAT = 'flat'
+
+
+class TimeWindow:
+    """نافذة زمنية: القيم خلال آخر seconds ثانية"""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError('مدة النافذة يجب أن تكون موجبة')
+        self.seconds = seconds
+        self._entries = deque()  # (الوقت، القيمة)
+        self.sum = 0.0
+        self.count = 0
+
+    def _evict(self, now):
+        cutoff = now - self.seconds
+        while self._entries and self._entries[0][0] <= cutoff:
+            _, value = self._entries.popleft()
+            self.sum -= value
+            self.count -= 1
+        if not self.count:
+            self.sum = 0.0  # إزالة انحراف الفاصلة العائمة
+
+    def push(self, value, timestamp):
+        self._entries.append((timestamp, value))
+        self.sum += value
+        self.count += 1
+        self._evict(timestamp)
+
+    def mean(self, now=None):
+        """
+        المتوسط حتى الوقت now (افتراضياً الآن)
+
+        القراءة لا تعدّل النافذة (الإزالة عند push فقط)، فيمكن قراءة نسخة
+        منشورة من عدة خيوط؛ القيم المنتهية منذ آخر إضافة تُطرح هنا.
+        """
+        cutoff = (time.time() if now is None else now) - self.seconds
+        total, count = self.sum, self.count
+        for timestamp, value in self._entries:
+            if timestamp > cutoff:
+                break
+            total -= value
+            count -= 1
+        return total / count if count else None
+
+    def entries(self):
+        return list(self._entries)
+
+    def copy(self):
+        clone = TimeWindow.__new__(TimeWindow)
+        clone.__dict__.update(self.__dict__)
+        clone._entries = deque(self._entries)
+        return clone
+
+
+class RollingAnalytics:
+    """
+    مجاميع متحركة لقيم النجاح (0-100) مع تحديث O(1) لكل تسديدة
+
+    القيمة None تشغل مكاناً في نوافذ العدد (تسديدة بدون نتيجة) ولا تدخل
+    في المتوسطات، مثل التصفية التي كانت تُجرى على آخر 10 تسديدات.
+    """
+
+    VERSION = 1
+
+    def __init__(self, windows=(10, 50, 500), time_windows=(), ewma_spans=(10, 50),
+                 trend_window=10, trend_threshold=5.0, neutral=50.0):
+        """
+        Args:
+            windows: أحجام نوافذ العدد
+            time_windows: مدد النوافذ الزمنية بالثواني
+            ewma_spans: امتدادات المتوسطات الأسية (alpha = 2 / (span + 1))
+            trend_window: حجم نافذة الاتجاه (تُقارن بالنافذة التي قبلها)
+            trend_threshold: أقل فرق يُعتبر تحسناً أو تراجعاً
+            neutral: المتوسط المرجعي عندما لا توجد نافذة سابقة
+        """
+        if not windows or min(windows) < 1 or trend_window < 1:
+            raise ValueError('أحجام النوافذ يجب أن تكون 1 على الأقل')
+        self.windows = tuple(sorted(set(windows)))
+        self.trend_window = trend_window
+        self.trend_threshold = trend_threshold
+        self.neutral = neutral
+        self.ewma_spans = tuple(ewma_spans)
+
+        sizes = set(self.windows) | {trend_window, 2 * trend_window}
+        self._capacity = max(sizes)
+        self._ring = [None] * self._capacity
+        self._pushed = 0
+        # الحجم ← [المجموع، مجموع المربعات، عدد القيم، عمليات الإخراج منذ آخر مزامنة]
+        self._sums = {size: [0.0, 0.0, 0, 0] for size in sorted(sizes)}
+        self._time_windows = {seconds: TimeWindow(seconds) for seconds in time_windows}
+        self._ewma = {span: None for span in self.ewma_spans}
+
+    # ---------- التحديث ----------
+
+    def _push_slot(self, value):
+        """إضافة قيمة للمخزن الدائري وتحديث مجاميع نوافذ العدد"""
+        position = self._pushed % self._capacity
+        for size, totals in self._sums.items():
+            if self._pushed >= size:
+                old = self._ring[(self._pushed - size) % self._capacity]
+                if old is not None:
+                    totals[0] -= old
+                    totals[1] -= old * old
+                    totals[2] -= 1
+                totals[3] += 1
+            if value is not None:
+                totals[0] += value
+                totals[1] += value * value
+                totals[2] += 1
+        self._ring[position] = value
+        self._pushed += 1
+
+        # إعادة الجمع من المخزن مرة كل size إخراج: كلفة O(1) موزعة
+        # تمنع تراكم أخطاء الطرح في الفاصلة العائمة
+        for size, totals in self._sums.items():
+            if totals[3] >= size:
+                values = [v for v in self._values(size) if v is not None]
+                totals[:] = [math.fsum(values), math.fsum(v * v for v in values), len(values), 0]
+
+    def push(self, value, timestamp=None):
+        """
+        إضافة نتيجة تسديدة
+
+        Args:
+            value: قيمة النجاح (0-100) أو None لتسديدة بدون نتيجة
+            timestamp: وقت التسديدة بالثواني (افتراضياً الآن) للنوافذ الزمنية
+        """
+        if value is not None:
+            value = float(value)
+        self._push_slot(value)
+        if value is None:
+            return
+        if self._time_windows:
+            timestamp = time.time() if timestamp is None else timestamp
+            for window in self._time_windows.values():
+                window.push(value, timestamp)
+        for span, current in self._ewma.items():
+            alpha = 2.0 / (span + 1)
+            self._ewma[span] = value if current is None else current + alpha * (value - current)
+
+    def extend(self, values):
+        """إضافة عدة قيم بالترتيب (بدون أوقات)"""
+        for value in values:
+            self.push(value)
+
+    def copy(self):
+        """نسخة مستقلة (لنشرها للقراء بينما يستمر الكاتب في التحديث)"""
+        clone = RollingAnalytics.__new__(RollingAnalytics)
+        clone.__dict__.update(self.__dict__)
+        clone._ring = list(self._ring)
+        clone._sums = {size: list(totals) for size, totals in self._sums.items()}
+        clone._time_windows = {seconds: window.copy() for seconds, window in self._time_windows.items()}
+        clone._ewma = dict(self._ewma)
+        return clone
+
+    # ---------- القراءة ----------
+
+    def __len__(self):
+        return self._pushed
+
+    def _values(self, size):
+        """آخر size خانة من المخزن بالترتيب"""
+        size = min(size, self._pushed, self._capacity)
+        start = self._pushed - size
+        return [self._ring[i % self._capacity] for i in range(start, self._pushed)]
+
+    def _totals(self, size):
+        if size not in self._sums:
+            raise ValueError(f'نافذة غير معرفة: {size}')
+        return self._sums[size]
+
+    def mean(self, size):
+        """متوسط نافذة العدد (None إذا لم توجد قيم)"""
+        total, _, count, _ = self._totals(size)
+        return total / count if count else None
+
+    def stdev(self, size):
+        """الانحراف المعياري للعينة في نافذة العدد"""
+        total, total_sq, count, _ = self._totals(size)
+        if count < 2:
+            return None
+        variance = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def count(self, size):
+        """عدد القيم (غير None) في نافذة العدد"""
+        return self._totals(size)[2]
+
+    def time_mean(self, seconds, now=None):
+        """متوسط النافذة الزمنية"""
+        if seconds not in self._time_windows:
+            raise ValueError(f'نافذة زمنية غير معرفة: {seconds}')
+        return self._time_windows[seconds].mean(now)
+
+    def ewma(self, span):
+        """المتوسط المتحرك الأسي (None قبل أول قيمة)"""
+        return self._ewma[span]
+
+    def trend(self):
+        """
+        الاتجاه: متوسط آخر trend_window خانة مقابل الخانات التي قبلها
+
+        Returns:
+            قاموس {"recent", "previous", "improvement", "direction", "momentum"}
+            أو None إذا لم توجد قيم في النافذة الأخيرة
+        """
+        recent = self.mean(self.trend_window)
+        if recent is None:
+            return None
+        previous = self.neutral
+        if self._pushed > self.trend_window:
+            total, _, count, _ = self._sums[self.trend_window]
+            total2, _, count2, _ = self._sums[2 * self.trend_window]
+            if count2 > count:
+                previous = (total2 - total) / (count2 - count)
+        improvement = recent - previous
+        if improvement > self.trend_threshold:
+            direction = UP
+        elif improvement < -self.trend_threshold:
+            direction = DOWN
+        else:
+            direction = FLAT
+
+        momentum = None
+        if len(self.ewma_spans) >= 2:
+            fast, slow = self._ewma[min(self.ewma_spans)], self._ewma[max(self.ewma_spans)]
+            if fast is not None and slow is not None:
+                momentum = fast - slow
+        return {
+            'recent': recent,
+            'previous': previous,
+            'improvement': improvement,
+            'direction': direction,
+            'momentum': momentum,
+        }
+
+    def snapshot(self, now=None, digits=2):
+        """
+        كل المؤشرات في قاموس واحد (للعرض أو API)
+
+        Args:
+            now: الوقت المرجعي للنوافذ الزمنية
+            digits: عدد الخانات العشرية
+        """
+        def _round(value):
+            return None if value is None else round(value, digits)
+
+        trend = self.trend()
+        return {
+            'count': self._pushed,
+            'windows': {
+                str(size): {
+                    'count': self.count(size),
+                    'mean': _round(self.mean(size)),
+                    'stdev': _round(self.stdev(size)),
+                }
+                for size in self.windows
+            },
+            'time_windows': {
+                str(seconds): _round(self.time_mean(seconds, now)) for seconds in self._time_windows
+            },
+            'ewma': {str(span): _round(value) for span, value in self._ewma.items()},
+            'trend': None if trend is None else {
+                k: (_round(v) if isinstance(v, float) else v) for k, v in trend.items()
+            },
+        }
+
+    # ---------- الحفظ ----------
+
+    def to_dict(self):
+        """الحالة الكاملة بصيغة JSON (لحفظها مع ملخص الإحصائيات)"""
+        return {
+            'version': self.VERSION,
+            'capacity': self._capacity,
+            'pushed': self._pushed,
+            'values': self._values(self._capacity),
+            'ewma': [[span, value] for span, value in self._ewma.items()],
+            'time_windows': [
+                [seconds, window.entries()] for seconds, window in self._time_windows.items()
+            ],
+        }
+
+    def load_dict(self, data):
+        """
+        استعادة حالة محفوظة بنفس الإعدادات
+
+        Raises:
+            ValueError: إذا كانت الحالة بإصدار أو سعة مختلفة
+        """
+        if data.get('version') != self.VERSION or data.get('capacity') != self._capacity:
+            raise ValueError('حالة التحليلات غير متوافقة مع الإعدادات الحالية')
+        values = data['values']
+        self._ring = [None] * self._capacity
+        self._pushed = 0
+        self._sums = {size: [0.0, 0.0, 0, 0] for size in self._sums}
+        for value in values:
+            self._push_slot(value)
+        self._pushed = data['pushed']
+        # إعادة ترتيب المخزن حسب العدد الحقيقي للتسديدات
+        ring = [None] * self._capacity
+        for offset, value in enumerate(values):
+            ring[(self._pushed - len(values) + offset) % self._capacity] = value
+        self._ring = ring
+
+        saved_ewma = dict((span, value) for span, value in data.get('ewma', []))
+        self._ewma = {span: saved_ewma.get(span) for span in self.ewma_spans}
+        saved_time = dict((seconds, entries) for seconds, entries in data.get('time_windows', []))
+        for seconds, window in self._time_windows.items():
+            for timestamp, value in saved_time.get(seconds, []):
+                window.push(value, timestamp)
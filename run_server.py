@@ -5,7 +5,7 @@
 """
 
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
 import sys
@@ -22,9 +22,25 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from backend.billiards.engine import BilliardsEngine
+    from backend.billiards.registry import EngineRegistry, split_tenant_path
     from backend.billiards.calculator import ShotCalculator
-    from backend.models.shot import Shot, Difficulty
+    from backend.billiards.calculation_cache import CalculationCache
+    from backend.models.shot import Shot, Difficulty, ShotResult
+    from backend.services.admission import (
+        OVERLOADED_MESSAGE, RATE_LIMITED_MESSAGE, ConcurrencyLimiter, RateLimiter,
+        client_key, retry_after_header,
+    )
+    from backend.services.health import (
+        LIVE_PATH, LIVENESS_BODY, READY_PATH, ReadinessProbe, check_writable_dir,
+    )
+    from backend.services.profiler import RequestProfiler
+    from config import (
+        PROFILING_ENABLED, PROFILING_SAMPLE_RATE, PROFILING_HEADER,
+        PROFILING_TRACE_MEMORY, PROFILES_DIR, READINESS_TTL, CALCULATION_CACHE_SIZE,
+        TENANTS_DIR, ENGINE_CACHE_SIZE, ENGINE_MEMORY_BUDGET_MB,
+        RATE_LIMIT_RPS, RATE_LIMIT_BURST, RATE_LIMIT_KEY_HEADER,
+        MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT,
+    )
     logger.info("✅ تم استيراد جميع المكتبات بنجاح")
 except ImportError as e:
     logger.error(f"❌ خطأ في الاستيراد: {e}")
@@ -32,8 +48,33 @@ except ImportError as e:
 
 # تهيئة محرك البلياردو
 try:
-    engine = BilliardsEngine()
+    # محرك لكل مستأجر (/api/v1/tenants/<t>/...)؛ المستأجر الافتراضي يستخدم ~/.billiards_pro
+    registry = EngineRegistry(
+        str(TENANTS_DIR),
+        max_engines=ENGINE_CACHE_SIZE,
+        memory_budget_mb=ENGINE_MEMORY_BUDGET_MB,
+        default_dir=str(Path.home() / ".billiards_pro"),
+    )
     calculator = ShotCalculator()
+    # الطلبات المتطابقة تتشارك الحساب؛ حفظ كل تسديقة يبقى لكل طلب
+    calculations = CalculationCache(calculator, max_entries=CALCULATION_CACHE_SIZE)
+    profiler = RequestProfiler(
+        enabled=PROFILING_ENABLED,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        header=PROFILING_HEADER,
+        output_dir=str(PROFILES_DIR),
+        trace_memory=PROFILING_TRACE_MEMORY,
+    )
+    readiness = ReadinessProbe(
+        {
+            "storage": check_writable_dir(registry.default_dir, create=True),
+            "tenants": check_writable_dir(registry.base_dir),
+        },
+        ttl=READINESS_TTL,
+    )
+    # حدود القبول: لكل عميل ثم لكل خيوط الخادم
+    rate_limiter = RateLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST)
+    concurrency = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT)
     logger.info("✅ محرك البلياردو تم تهيئته")
 except Exception as e:
     logger.error(f"❌ خطأ في تهيئة المحرك: {e}")
@@ -43,169 +84,234 @@ except Exception as e:
 class BilliardsAPIHandler(BaseHTTPRequestHandler):
     """معالج طلبات HTTP"""
     
+    def _handle_probe(self) -> bool:
+        """الرد على /livez و /readyz بدون تحليل المسار أو لمس المحرك"""
+        if self.path == LIVE_PATH:
+            status, body = 200, LIVENESS_BODY
+        elif self.path == READY_PATH:
+            ready, body = readiness.check()
+            status = 200 if ready else 503
+        else:
+            return False
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+    
     def do_GET(self):
         """معالجة طلبات GET"""
-        parsed_url = urlparse(self.path)
-        path = parsed_url.path
-        query_params = parse_qs(parsed_url.query)
-        
-        try:
-            # المسار الرئيسي
-            if path == '/':
-                response = {
-                    "message": "مرحباً بك في 5A Diamond System Pro API",
-                    "version": "2.0.0",
-                    "status": "جاهز للخدمة",
-                    "endpoints": {
-                        "health": "/health",
-                        "calculate": "/api/v1/calculate",
-                        "statistics": "/api/v1/statistics",
-                        "shots": "/api/v1/shots",
-                    }
+        if self._handle_probe():
+            return
+        self._admitted(lambda: self._dispatch(self._handle_get))
+    
+    def _handle_get(self, engine, path, query_params):
+        """مسارات GET بمحرك المستأجر"""
+        # المسار الرئيسي
+        if path == '/':
+            response = {
+                "message": "مرحباً بك في 5A Diamond System Pro API",
+                "version": "2.0.0",
+                "status": "جاهز للخدمة",
+                "endpoints": {
+                    "health": "/health",
+                    "live": "/livez",
+                    "ready": "/readyz",
+                    "calculate": "/api/v1/calculate",
+                    "statistics": "/api/v1/statistics",
+                    "shots": "/api/v1/shots",
+                    "metrics": "/api/v1/metrics",
                 }
-                self.send_response(200)
+            }
+            status = 200
+        
+        # فحص الصحة
+        elif path == '/health':
+            snapshot = engine.snapshot()
+            response = {
+                "status": "healthy",
+                "uptime": "جاهز",
+                "total_shots": len(snapshot.shots),
+                "total_calculations": snapshot.statistics.total_calculations,
+                "success_rate": round(snapshot.statistics.success_rate, 2),
+            }
+            status = 200
+        
+        # الحصول على التسديقات
+        elif path == '/api/v1/shots':
+            rails = query_params.get('rails', [None])[0]
+            difficulty = query_params.get('difficulty', [None])[0]
+            
+            shots = engine.shots
+            if rails:
+                shots = [s for s in shots if s.rails == int(rails)]
+            if difficulty:
+                shots = [s for s in shots if s.difficulty.value == difficulty]
             
-            # فحص الصحة
-            elif path == '/health':
+            response = {
+                "total": len(shots),
+                "shots": [s.to_dict() for s in shots],
+            }
+            status = 200
+        
+        # الإحصائيات
+        elif path == '/api/v1/statistics':
+            response = engine.get_statistics()
+            status = 200
+        
+        # إحصائيات حسب الجدران
+        elif path == '/api/v1/statistics/by-rails':
+            snapshot = engine.snapshot()
+            stats = {}
+            for rails in [1, 2, 3, 4]:
+                shots = snapshot.shots_by_rails(rails)
+                if shots:
+                    successful = sum(1 for s in shots if s.executed and s.result == ShotResult.SUCCESSFUL)
+                    stats[f"rails_{rails}"] = {
+                        "total": len(shots),
+                        "successful": successful,
+                        "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
+                    }
+            response = stats
+            status = 200
+        
+        # حدود القبول والمحركات المقيمة
+        elif path == '/api/v1/metrics':
+            response = {
+                "admission": {
+                    "rate_limit": rate_limiter.get_stats(),
+                    "concurrency": concurrency.get_stats(),
+                },
+                "calculations": calculations.get_stats(),
+                "tenants": registry.get_stats(),
+            }
+            status = 200
+        
+        else:
+            response = {"error": "المسار غير موجود"}
+            status = 404
+        
+        return status, response
+    
+    def do_POST(self):
+        """معالجة طلبات POST"""
+        self._admitted(lambda: self._dispatch(self._handle_post))
+    
+    def _handle_post(self, engine, path, query_params):
+        """مسارات POST بمحرك المستأجر"""
+        # حساب تسديقة
+        if path == '/api/v1/calculate':
+            try:
+                rails = int(query_params.get('rails', [1])[0])
+                cue_position = float(query_params.get('cue_position', [5])[0])
+                white_ball = float(query_params.get('white_ball', [3])[0])
+                target = float(query_params.get('target', [2])[0])
+                pocket = int(query_params.get('pocket', [3])[0])
+                
+                shot, summary = calculations.calculate(rails, cue_position, white_ball, target, pocket)
+                engine.add_shot(shot)
+                
                 response = {
-                    "status": "healthy",
-                    "uptime": "جاهز",
-                    "total_shots": len(engine.shots),
-                    "total_calculations": engine.statistics.total_calculations,
-                    "success_rate": round(engine.statistics.success_rate, 2),
+                    "success": True,
+                    "shot": shot.to_dict(),
+                    "summary": summary,
                 }
-                self.send_response(200)
-            
-            # الحصول على التسديقات
-            elif path == '/api/v1/shots':
-                rails = query_params.get('rails', [None])[0]
-                difficulty = query_params.get('difficulty', [None])[0]
+                status = 200
+            except ValueError as e:
+                response = {"error": str(e)}
+                status = 400
+        
+        # تسجيل نتيجة
+        elif path.startswith('/api/v1/shots/') and path.endswith('/record'):
+            try:
+                shot_id = int(path.split('/')[4])
+                successful = query_params.get('successful', ['true'])[0].lower() == 'true'
                 
-                shots = engine.shots
-                if rails:
-                    shots = [s for s in shots if s.rails == int(rails)]
-                if difficulty:
-                    shots = [s for s in shots if s.difficulty.value == difficulty]
+                engine.record_result(shot_id, successful)
                 
                 response = {
-                    "total": len(shots),
-                    "shots": [s.to_dict() for s in shots],
+                    "success": True,
+                    "message": "تم تسجيل النتيجة بنجاح",
                 }
-                self.send_response(200)
-            
-            # الإحصائيات
-            elif path == '/api/v1/statistics':
-                response = engine.get_statistics()
-                self.send_response(200)
-            
-            # إحصائيات حسب الجدران
-            elif path == '/api/v1/statistics/by-rails':
-                stats = {}
-                for rails in [1, 2, 3, 4]:
-                    shots = engine.get_shots_by_rails(rails)
-                    if shots:
-                        successful = sum(1 for s in shots if s.executed and s.result)
-                        stats[f"rails_{rails}"] = {
-                            "total": len(shots),
-                            "successful": successful,
-                            "success_rate": round((successful / len(shots)) * 100, 2) if shots else 0,
-                        }
-                response = stats
-                self.send_response(200)
-            
-            else:
-                response = {"error": "المسار غير موجود"}
-                self.send_response(404)
-            
-            # إرسال الرد
-            self.send_header('Content-Type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
-            
-        except Exception as e:
-            logger.error(f"❌ خطأ في معالجة الطلب: {e}")
-            response = {"error": str(e)}
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+                status = 200
+            except (ValueError, IndexError) as e:
+                response = {"error": str(e)}
+                status = 400
+        
+        # تصدير البيانات
+        elif path == '/api/v1/export':
+            snapshot = engine.snapshot()
+            response = {
+                "shots": [s.to_dict() for s in snapshot.shots],
+                "statistics": snapshot.get_statistics(),
+            }
+            status = 200
+        
+        else:
+            response = {"error": "المسار غير موجود"}
+            status = 404
+        
+        return status, response
     
-    def do_POST(self):
-        """معالجة طلبات POST"""
+    def _admitted(self, handler):
+        """
+        تنفيذ المعالج بعد حد المعدل للعميل وحد التزامن العام
+        
+        الرفض فوري بـ 429 (حد العميل) أو 503 (الطابور ممتلئ أو انتهى
+        الانتظار) مع Retry-After؛ المقاييس مستثناة.
+        """
+        if urlparse(self.path).path == '/api/v1/metrics':
+            return handler()
+        key = client_key(self.headers.get, self.client_address[0], RATE_LIMIT_KEY_HEADER)
+        wait = rate_limiter.acquire(key)
+        if wait:
+            return self._reject(429, RATE_LIMITED_MESSAGE, wait)
+        if not concurrency.acquire():
+            return self._reject(503, OVERLOADED_MESSAGE, concurrency.retry_after)
+        try:
+            handler()
+        finally:
+            concurrency.release()
+    
+    def _reject(self, status, message, retry_after):
+        """رد الرفض مع Retry-After"""
+        body = json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Retry-After', retry_after_header(retry_after))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _dispatch(self, handler):
+        """
+        تحديد المستأجر من المسار وتنفيذ المعالج بمحركه المثبت
+        
+        /api/v1/tenants/<t>/shots يُوجَّه إلى /api/v1/shots بمحرك المستأجر t،
+        والمسارات بدون البادئة تعود للمستأجر الافتراضي.
+        """
         parsed_url = urlparse(self.path)
-        path = parsed_url.path
         query_params = parse_qs(parsed_url.query)
         
         try:
-            # حساب تسديقة
-            if path == '/api/v1/calculate':
-                try:
-                    rails = int(query_params.get('rails', [1])[0])
-                    cue_position = float(query_params.get('cue_position', [5])[0])
-                    white_ball = float(query_params.get('white_ball', [3])[0])
-                    target = float(query_params.get('target', [2])[0])
-                    pocket = int(query_params.get('pocket', [3])[0])
-                    
-                    shot = engine.calculate_shot(rails, cue_position, white_ball, target, pocket)
-                    summary = calculator.get_calculation_summary(shot)
-                    
-                    response = {
-                        "success": True,
-                        "shot": shot.to_dict(),
-                        "summary": summary,
-                    }
-                    self.send_response(200)
-                except ValueError as e:
-                    response = {"error": str(e)}
-                    self.send_response(400)
-            
-            # تسجيل نتيجة
-            elif path.startswith('/api/v1/shots/') and path.endswith('/record'):
-                try:
-                    shot_id = int(path.split('/')[4])
-                    successful = query_params.get('successful', ['true'])[0].lower() == 'true'
-                    
-                    if shot_id < 0 or shot_id >= len(engine.shots):
-                        raise ValueError("التسديقة غير موجودة")
-                    
-                    shot = engine.shots[shot_id]
-                    engine.record_execution(shot, successful)
-                    
-                    response = {
-                        "success": True,
-                        "message": "تم تسجيل النتيجة بنجاح",
-                    }
-                    self.send_response(200)
-                except (ValueError, IndexError) as e:
-                    response = {"error": str(e)}
-                    self.send_response(400)
-            
-            # تصدير البيانات
-            elif path == '/api/v1/export':
-                response = {
-                    "shots": [s.to_dict() for s in engine.shots],
-                    "statistics": engine.get_statistics(),
-                }
-                self.send_response(200)
-            
-            else:
-                response = {"error": "المسار غير موجود"}
-                self.send_response(404)
-            
-            # إرسال الرد
-            self.send_header('Content-Type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
-            
+            tenant, path = split_tenant_path(parsed_url.path)
+            with registry.acquire(tenant) as engine:
+                status, response = handler(engine, path, query_params)
+        except ValueError as e:
+            status, response = 400, {"error": str(e)}
         except Exception as e:
             logger.error(f"❌ خطأ في معالجة الطلب: {e}")
-            response = {"error": str(e)}
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+            status, response = 500, {"error": str(e)}
+        
+        # إرسال الرد
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
     
     def do_OPTIONS(self):
         """معالجة طلبات OPTIONS (CORS)"""
@@ -217,15 +323,41 @@ class BilliardsAPIHandler(BaseHTTPRequestHandler):
     
     def log_message(self, format, *args):
         """تخصيص رسائل السجل"""
+        if self.path in (LIVE_PATH, READY_PATH):
+            return  # الفحوصات الدورية لا تملأ السجل
         logger.info(format % args)
 
 
+class ProfilingAPIHandler(BilliardsAPIHandler):
+    """معالج طلبات مع تحليل الأداء - يُستخدم فقط عند تفعيل التحليل"""
+
+    def _profiled(self, handler):
+        """تنفيذ المعالج داخل محلل الأداء إذا كان الطلب ضمن العينة"""
+        if not profiler.should_profile(self.headers.get):
+            return handler()
+        endpoint = profiler.endpoint_name(self.command, urlparse(self.path).path)
+        with profiler.profile(endpoint):
+            return handler()
+
+    def do_GET(self):
+        """معالجة طلبات GET مع التحليل"""
+        if self._handle_probe():
+            return
+        self._profiled(super().do_GET)
+
+    def do_POST(self):
+        """معالجة طلبات POST مع التحليل"""
+        self._profiled(super().do_POST)
+
+
 def main():
     """تشغيل الخادم"""
     host = '0.0.0.0'
     port = 8001
     
-    server = HTTPServer((host, port), BilliardsAPIHandler)
+    handler_class = ProfilingAPIHandler if profiler.enabled else BilliardsAPIHandler
+    # خيط لكل اتصال؛ حد التزامن يحدد كم منها ينفذ في نفس الوقت
+    server = ThreadingHTTPServer((host, port), handler_class)
     
     print("=" * 70)
     print("🚀 خادم 5A Diamond System Pro جاهز")
@@ -234,6 +366,8 @@ def main():
     print(f"🌐 العناوين:")
     print(f"   • الرئيسية: http://localhost:{port}/")
     print(f"   • الصحة:   http://localhost:{port}/health")
+    print(f"   • الحيوية: http://localhost:{port}/livez")
+    print(f"   • الجاهزية: http://localhost:{port}/readyz")
     print(f"   • حساب:    http://localhost:{port}/api/v1/calculate")
     print(f"   • احصائيات: http://localhost:{port}/api/v1/statistics")
     print("=" * 70)
@@ -243,6 +377,8 @@ def main():
     try:
         server.serve_forever()
     except KeyboardInterrupt:
+        server.server_close()
+        registry.flush_all()
         print("\n✅ تم إيقاف الخادم بنجاح")
         sys.exit(0)
 
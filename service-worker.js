@@ -216,6 +216,24 @@ self.addEventListener('sync', (event) => {
   }
 });
 
+/**
+ * حفظ تسديقة محلياً من الصفحة ثم جدولة المزامنة
+ * navigator.serviceWorker.controller.postMessage({ type: 'SAVE_SHOT', shot })
+ */
+self.addEventListener('message', (event) => {
+  if (!event.data || event.data.type !== 'SAVE_SHOT') return;
+  
+  event.waitUntil((async () => {
+    const db = await openDatabase();
+    await saveShot(db, event.data.shot);
+    if (self.registration.sync) {
+      await self.registration.sync.register('sync-shots');
+    } else {
+      await syncShotsData().catch(() => {});
+    }
+  })());
+});
+
 /**
  * 5. معالجة Push Notifications
  */
@@ -293,25 +311,153 @@ function isAPI(pathname) {
 }
 
 async function syncShotsData() {
+  const db = await openDatabase();
+  let pushError = null;
+  
+  // 1. رفع التعديلات المحلية فقط (كل تسديقة تحمل sync_id و updated_at)
   try {
-    const db = await openDatabase();
-    const unsynced = await getUnsyncedShots(db);
-    
-    if (unsynced.length > 0) {
-      const response = await fetch('/api/v1/sync-shots', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ shots: unsynced })
-      });
-      
-      if (response.ok) {
-        await markShotsAsSynced(db, unsynced);
-      }
-    }
+    await pushShots(db);
+  } catch (error) {
+    console.error('خطأ في رفع التسديقات:', error);
+    pushError = error;
+  }
+  
+  // 2. سحب ما تغير منذ آخر مراجعة فقط (حتى لو فشل الرفع)
+  try {
+    await pullShots(db);
   } catch (error) {
     console.error('خطأ في المزامنة:', error);
     throw error;
   }
+  // إعادة المحاولة لاحقاً للتعديلات التي لم تُرفع
+  if (pushError) throw pushError;
+}
+
+async function pushShots(db) {
+  const unsynced = await getUnsyncedShots(db);
+  if (unsynced.length === 0) return;
+  
+  const response = await fetch('/api/v1/sync/shots', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      // نفس الدفعة = نفس المفتاح: إعادة المحاولة بعد انقطاع لا تطبقها مرتين
+      'Idempotency-Key': await batchKey(unsynced)
+    },
+    body: JSON.stringify({
+      device_id: await getDeviceId(db),
+      changes: unsynced.map(({ synced, ...shot }) => shot)
+    })
+  });
+  if (!response.ok) throw new Error(`فشل رفع التسديقات: ${response.status}`);
+  
+  const result = await response.json();
+  await markShotsAsSynced(db, unsynced.filter(shot => result.applied.includes(shot.sync_id)));
+  // نسخة الخادم فازت في التعارض: تستبدل النسخة المحلية
+  await putShots(db, result.conflicts.map(conflict => conflict.server), true);
+}
+
+async function pullShots(db) {
+  let since = await getMeta(db, 'syncRevision', 0);
+  let page;
+  do {
+    const response = await fetch(`/api/v1/sync/shots?since=${since}`);
+    if (!response.ok) throw new Error(`فشل سحب التسديقات: ${response.status}`);
+    page = await response.json();
+    if (page.reset) await clearShots(db);
+    await putShots(db, page.shots);
+    since = page.revision;
+    await setMeta(db, 'syncRevision', since);
+  } while (page.has_more);
+}
+
+async function batchKey(shots) {
+  const text = shots.map(shot => `${shot.sync_id}@${shot.updated_at}`).join(',');
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+  return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function getDeviceId(db) {
+  let deviceId = await getMeta(db, 'deviceId', null);
+  if (!deviceId) {
+    deviceId = crypto.randomUUID();
+    await setMeta(db, 'deviceId', deviceId);
+  }
+  return deviceId;
+}
+
+function idbRequest(db, store, mode, action) {
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(store, mode);
+    const request = action(tx.objectStore(store));
+    tx.oncomplete = () => resolve(request && request.result);
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+async function getMeta(db, key, fallback) {
+  const record = await idbRequest(db, 'meta', 'readonly', store => store.get(key));
+  return record ? record.value : fallback;
+}
+
+function setMeta(db, key, value) {
+  return idbRequest(db, 'meta', 'readwrite', store => store.put({ key, value }));
+}
+
+function saveShot(db, shot) {
+  // sync_id ثابت للتسديقة، و updated_at يتغير مع كل تعديل (قاعدة حل التعارض في الخادم)
+  const record = {
+    ...shot,
+    sync_id: shot.sync_id || crypto.randomUUID(),
+    updated_at: new Date().toISOString(),
+    synced: false
+  };
+  return idbRequest(db, 'shots', 'readwrite', store => { store.put(record); })
+    .then(() => record);
+}
+
+async function getUnsyncedShots(db) {
+  const shots = await idbRequest(db, 'shots', 'readonly', store => store.getAll());
+  return shots.filter(shot => !shot.synced);
+}
+
+function markShotsAsSynced(db, shots) {
+  if (shots.length === 0) return Promise.resolve();
+  return idbRequest(db, 'shots', 'readwrite', store => {
+    shots.forEach(shot => {
+      const request = store.get(shot.sync_id);
+      request.onsuccess = () => {
+        const current = request.result;
+        // تعديل محلي أحدث من المرفوع يبقى بانتظار الرفع التالي
+        if (current && current.updated_at === shot.updated_at) {
+          store.put({ ...current, synced: true });
+        }
+      };
+    });
+  });
+}
+
+function putShots(db, shots, overwrite = false) {
+  if (shots.length === 0) return Promise.resolve();
+  return idbRequest(db, 'shots', 'readwrite', store => {
+    shots.forEach(shot => {
+      if (overwrite) {
+        store.put({ ...shot, synced: true });
+        return;
+      }
+      const request = store.get(shot.sync_id);
+      request.onsuccess = () => {
+        // لا تُستبدل تعديلات محلية لم تُرفع بعد؛ الخادم يحل التعارض عند رفعها
+        if (!request.result || request.result.synced) {
+          store.put({ ...shot, synced: true });
+        }
+      };
+    });
+  });
+}
+
+function clearShots(db) {
+  return idbRequest(db, 'shots', 'readwrite', store => store.clear());
 }
 
 async function syncStatisticsData() {
@@ -333,6 +479,11 @@ async function syncStatisticsData() {
 async function openDatabase() {
   return new Promise((resolve, reject) => {
     const request = indexedDB.open('BilliardsDB', 1);
+    request.onupgradeneeded = () => {
+      const db = request.result;
+      if (!db.objectStoreNames.contains('shots')) db.createObjectStore('shots', { keyPath: 'sync_id' });
+      if (!db.objectStoreNames.contains('meta')) db.createObjectStore('meta', { keyPath: 'key' });
+    };
     request.onerror = () => reject(request.error);
     request.onsuccess = () => resolve(request.result);
   });
@@ -310,6 +310,9 @@ class SyncService {
         this.syncQueue = [];
         this.isSyncing = false;
         this.lastSync = null;
+        this.liveSource = null;
+        this.liveStatistics = {};
+        this.lastEventId = null;
     }
 
     /**
@@ -350,6 +353,44 @@ class SyncService {
         this.isSyncing = false;
     }
 
+    /**
+     * الاشتراك في البث المباشر بدلاً من استطلاع الإحصائيات
+     * (EventSource يعيد الاتصال تلقائياً ويرسل Last-Event-ID للاستئناف)
+     *
+     * handlers: { shot_created, execution_recorded, shots_replaced, statistics, reset }
+     */
+    connectLive(baseUrl = '', handlers = {}) {
+        if (this.liveSource || typeof EventSource === 'undefined') return;
+
+        this.liveSource = new EventSource(`${baseUrl}/api/v1/events`);
+        this.liveSource.addEventListener('frame', (message) => {
+            const frame = JSON.parse(message.data);
+            this.lastEventId = frame.id;
+            this.lastSync = Date.now();
+
+            // الخادم لم يعد يملك الأحداث المفقودة: يجب إعادة تحميل الحالة كاملة
+            if (frame.reset && handlers.reset) handlers.reset();
+
+            frame.events.forEach(event => {
+                if (event.type === 'statistics') {
+                    this.liveStatistics = { ...this.liveStatistics, ...event.data };
+                }
+                const handler = handlers[event.type];
+                if (handler) handler(event.data, this.liveStatistics);
+            });
+        });
+    }
+
+    /**
+     * إيقاف البث المباشر
+     */
+    disconnectLive() {
+        if (this.liveSource) {
+            this.liveSource.close();
+            this.liveSource = null;
+        }
+    }
+
     /**
      * الحصول على حالة المزامنة
      */
@@ -358,6 +399,8 @@ class SyncService {
             isSyncing: this.isSyncing,
             queueLength: this.syncQueue.length,
             lastSync: this.lastSync,
+            live: this.liveSource !== null,
+            lastEventId: this.lastEventId,
             queue: this.syncQueue
         };
     }
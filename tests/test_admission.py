@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات التحكم في القبول - Rate Limiting & Load Shedding Tests
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.admission import (
+    AdmissionASGIMiddleware, AsyncConcurrencyLimiter, ConcurrencyLimiter, RateLimiter, client_key,
+)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """دلو الرموز لكل عميل"""
+
+    def test_burst_then_refill(self):
+        limiter = RateLimiter(rate=2, burst=3)
+        self.assertEqual([limiter.acquire("a", now=0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.acquire("a", now=0), 0.5)
+        # عميل آخر له دلوه الخاص
+        self.assertEqual(limiter.acquire("b", now=0), 0)
+        self.assertEqual(limiter.acquire("a", now=0.5), 0)
+        self.assertGreater(limiter.acquire("a", now=0.5), 0)
+        self.assertEqual((limiter.allowed, limiter.limited), (5, 2))
+
+    def test_disabled_and_bounded(self):
+        self.assertEqual(RateLimiter(rate=0).acquire("a"), 0)
+        limiter = RateLimiter(rate=1, burst=1, max_clients=2)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key, now=0)
+        self.assertEqual(limiter.get_stats()["clients"], 2)
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=-1)
+
+    def test_client_key(self):
+        headers = {"X-API-Key": "k1"}
+        self.assertEqual(client_key(headers.get, "10.0.0.1"), "key:k1")
+        self.assertEqual(client_key({}.get, "10.0.0.1"), "ip:10.0.0.1")
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    """حد التزامن مع طابور محدود"""
+
+    def test_queue_full_and_timeout(self):
+        limiter = ConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=0.05)
+        self.assertTrue(limiter.acquire())
+        # الطابور فيه مكان: ينتظر ثم تنتهي مهلته
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.timed_out, 1)
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+        limiter.queue_timeout = 5
+        waiter.start()
+        while limiter.queued == 0:
+            pass
+        # الطابور ممتلئ: رفض فوري
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.rejected, 1)
+        limiter.release()
+        waiter.join(5)
+        self.assertEqual(results, [True])
+        self.assertEqual(limiter.get_stats()["active"], 1)
+
+    def test_async_handoff_in_order(self):
+        async def run():
+            limiter = AsyncConcurrencyLimiter(max_active=1, max_queue=2, queue_timeout=5)
+            order = []
+
+            async def request(name):
+                if not await limiter.acquire():
+                    order.append(f"{name}:rejected:{limiter.get_stats()['queued']}")
+                    return
+                order.append(name)
+                await asyncio.sleep(0.01)
+                limiter.release()
+
+            await asyncio.gather(*(request(name) for name in ("a", "b", "c", "d")))
+            return order, limiter.get_stats()
+
+        order, stats = asyncio.run(run())
+        self.assertEqual(order, ["a", "d:rejected:2", "b", "c"])
+        self.assertEqual((stats["active"], stats["queued"], stats["admitted"], stats["rejected"]), (0, 0, 3, 1))
+
+    def test_async_timeout(self):
+        async def run():
+            limiter = AsyncConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=0.01)
+            await limiter.acquire()
+            return await limiter.acquire(), limiter.get_stats()
+
+        admitted, stats = asyncio.run(run())
+        self.assertFalse(admitted)
+        self.assertEqual((stats["timed_out"], stats["queued"]), (1, 0))
+
+
+class TestAdmissionMiddleware(unittest.TestCase):
+    """الرفض بـ 429 و 503 مع Retry-After"""
+
+    def _call(self, middleware, path="/api/v1/calculate", headers=()):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "path": path, "headers": list(headers), "client": ("10.0.0.1", 1234)}
+        asyncio.run(middleware(scope, None, send))
+        start = messages[0]
+        return start["status"], dict(start["headers"]), messages[-1]["body"]
+
+    async def _ok(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    def test_rate_limited_per_client(self):
+        middleware = AdmissionASGIMiddleware(
+            self._ok, RateLimiter(rate=1, burst=1), AsyncConcurrencyLimiter(0), exempt=("/readyz",),
+        )
+        self.assertEqual(self._call(middleware)[0], 200)
+        status, headers, body = self._call(middleware)
+        self.assertEqual(status, 429)
+        self.assertEqual(headers[b"retry-after"], b"1")
+        self.assertIn("detail", json.loads(body))
+        # مفتاح API يُحسب كعميل مستقل، والمسارات المستثناة لا تُحد
+        self.assertEqual(self._call(middleware, headers=[(b"x-api-key", b"k")])[0], 200)
+        self.assertEqual(self._call(middleware, path="/readyz")[0], 200)
+
+    def test_overloaded(self):
+        limiter = AsyncConcurrencyLimiter(max_active=1, max_queue=0, queue_timeout=2)
+        limiter.active = 1  # طلب آخر جارٍ
+        middleware = AdmissionASGIMiddleware(self._ok, RateLimiter(rate=0), limiter,
+                                             unbounded=("/api/v1/events",))
+        status, headers, _ = self._call(middleware)
+        self.assertEqual((status, headers[b"retry-after"]), (503, b"2"))
+        self.assertEqual(self._call(middleware, path="/api/v1/events")[0], 200)
+        self.assertEqual(limiter.get_stats()["rejected"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
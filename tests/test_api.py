@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات خادم FastAPI - API Tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# مجلدات البيانات مؤقتة قبل تحميل الإعدادات حتى لا تُلوث بيانات المستخدم
+_TMP = tempfile.TemporaryDirectory(prefix="billiards-api-test-")
+os.environ.setdefault("TENANTS_DIR", os.path.join(_TMP.name, "tenants"))
+os.environ.setdefault("SWEEPS_DIR", os.path.join(_TMP.name, "sweeps"))
+os.environ.setdefault("JOBS_DIR", os.path.join(_TMP.name, "jobs"))
+os.environ.setdefault("JOBS_DB", os.path.join(_TMP.name, "jobs.sqlite3"))
+
+try:
+    from fastapi.testclient import TestClient
+    with mock.patch.object(Path, "home", return_value=Path(_TMP.name)):
+        import api
+    API_AVAILABLE = api.FASTAPI_AVAILABLE
+except ImportError:
+    API_AVAILABLE = False
+
+from backend.billiards.registry import DEFAULT_TENANT, EngineRegistry
+from backend.services.events import STATISTICS_EVENT, EventHub
+
+CALCULATE = {"rails": 2, "cue_position": 5, "white_ball": 3, "target": 4, "pocket": 1}
+
+
+def tearDownModule():
+    _TMP.cleanup()
+
+
+@unittest.skipUnless(API_AVAILABLE, "FastAPI غير مثبت")
+class APITestCase(unittest.TestCase):
+    """سجل محركات جديد لكل اختبار"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.registry = EngineRegistry(os.path.join(tmp.name, "tenants"),
+                                       default_dir=os.path.join(tmp.name, "default"))
+        patcher = mock.patch.object(api, "registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        api.cache.backend.clear()
+        self.client = TestClient(api.app)
+
+
+class TestWritesOffEventLoop(APITestCase):
+    """نقاط الكتابة لا توقف حلقة الأحداث أثناء انتظار قفل المحرك"""
+
+    def test_record_waits_in_threadpool(self):
+        with TestClient(api.app) as client:
+            self.assertEqual(client.post("/api/v1/calculate", params=CALCULATE).status_code, 200)
+            responses = {}
+
+            def request(name, method, path, **kwargs):
+                responses[name] = client.request(method, path, **kwargs)
+
+            record = threading.Thread(target=request, args=("record", "POST", "/api/v1/shots/0/record"),
+                                      kwargs={"params": {"successful": True}})
+            root = threading.Thread(target=request, args=("root", "GET", "/"))
+            with self.registry.acquire(DEFAULT_TENANT) as engine:
+                # كاتب آخر يمسك القفل (مثل /calculate أثناء حفظ الملف)
+                engine._write_lock.acquire()
+                try:
+                    record.start()
+                    record.join(0.3)
+                    self.assertTrue(record.is_alive())
+                    # مسار async آخر يُجاب بينما /record ينتظر القفل
+                    root.start()
+                    root.join(5)
+                    self.assertFalse(root.is_alive())
+                finally:
+                    engine._write_lock.release()
+            record.join(5)
+
+        self.assertEqual(responses["root"].status_code, 200)
+        self.assertEqual(responses["record"].status_code, 200)
+        self.assertTrue(responses["record"].json()["shot"]["executed"])
+
+
+class TestStatisticsEvents(APITestCase):
+    """فرق الإحصائيات يُنشر بترتيب قراءة اللقطات"""
+
+    def test_concurrent_writers_publish_latest_statistics_last(self):
+        hub = EventHub()
+        patcher = mock.patch.object(api, "events", hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        reading, resume = threading.Event(), threading.Event()
+
+        class Engine:
+            def __init__(self, total, slow=False):
+                self.total, self.slow = total, slow
+
+            def get_statistics(self):
+                if self.slow:
+                    reading.set()
+                    resume.wait(5)
+                return {"total_calculations": self.total}
+
+        # الكاتب الأول قرأ لقطة قديمة ثم تأخر قبل النشر
+        older = threading.Thread(target=api._publish, args=(Engine(1, slow=True), DEFAULT_TENANT, "shot_created", {}))
+        newer = threading.Thread(target=api._publish, args=(Engine(2), DEFAULT_TENANT, "shot_created", {}))
+        older.start()
+        reading.wait(5)
+        newer.start()
+        newer.join(0.2)
+        self.assertTrue(newer.is_alive())
+        resume.set()
+        older.join(5)
+        newer.join(5)
+
+        stats = [event.data for event in hub.since(0)[0] if event.type == STATISTICS_EVENT]
+        self.assertEqual(stats[-1], {"total_calculations": 2})
+
+
+class TestTenantRouting(APITestCase):
+    """نفس المسارات للمستأجر الافتراضي ولكل مستأجر ببيانات منفصلة"""
+
+    def test_default_and_tenant_engines_are_separate(self):
+        self.assertEqual(self.client.post("/api/v1/calculate", params=CALCULATE).status_code, 200)
+        tenant = "/api/v1/tenants/table-1"
+        for _ in range(2):
+            self.assertEqual(self.client.post(f"{tenant}/calculate", params=CALCULATE).status_code, 200)
+
+        self.assertEqual(self.client.get("/api/v1/shots").json()["total"], 1)
+        self.assertEqual(self.client.get(f"{tenant}/shots").json()["total"], 2)
+        self.assertEqual(self.client.get(f"{tenant}/statistics").json()["total_calculations"], 2)
+        self.assertEqual(self.client.get("/api/v1/tenants/other/shots").json()["total"], 0)
+        self.assertEqual(self.client.get("/api/v1/tenants/bad name!/shots").status_code, 400)
+
+    def test_record_unknown_shot(self):
+        self.assertEqual(self.client.post("/api/v1/shots/0/record", params={"successful": True}).status_code, 404)
+        self.client.post("/api/v1/calculate", params=CALCULATE)
+        self.assertEqual(self.client.post("/api/v1/shots/1/record", params={"successful": True}).status_code, 404)
+        response = self.client.post("/api/v1/shots/0/record", params={"successful": False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["shot"]["result"], "فشل")
+
+
+class TestImportExport(APITestCase):
+    """الاستيراد يستبدل التسديقات والتصدير الخلفي يكتمل بملف"""
+
+    def _shots(self, count):
+        return [{"rails": 1, "cue_position": i, "white_ball": 1, "target": 1, "pocket": 0}
+                for i in range(count)]
+
+    def test_import_replaces_shots(self):
+        self.client.post("/api/v1/calculate", params=CALCULATE)
+        body = json.dumps({"shots": self._shots(3)}).encode("utf-8")
+        response = self.client.post("/api/v1/import", files={"file": ("shots.json", body, "application/json")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported_count"], 3)
+
+        shots = self.client.get("/api/v1/shots").json()["shots"]
+        self.assertEqual([s["cue_position"] for s in shots], [0, 1, 2])
+        bad = self.client.post("/api/v1/import", files={"file": ("shots.json", b"{}", "application/json")})
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/shots").json()["total"], 3)
+
+    def test_export_job_done(self):
+        tenant = "/api/v1/tenants/table-2"
+        with TestClient(api.app) as client:
+            client.post(f"{tenant}/calculate", params=CALCULATE)
+            response = client.post(f"{tenant}/jobs/export")
+            self.assertEqual(response.status_code, 202)
+            job_id = response.json()["job_id"]
+
+            self.assertEqual(api.jobs.wait(job_id, timeout=10)["state"], "done")
+            job = client.get(f"/api/v1/jobs/{job_id}").json()
+            self.assertEqual((job["state"], job["result"]["exported_count"]), ("done", 1))
+            exported = client.get(f"/api/v1/jobs/{job_id}/result").json()
+            self.assertEqual(len(exported["shots"]), 1)
+            self.assertEqual(exported["statistics"]["total_calculations"], 1)
+            self.assertEqual(client.get("/api/v1/jobs/missing").status_code, 404)
+
+    def test_queue_runs_with_app_lifespan(self):
+        # الاستيراد وحده لا يشغل خيوط الطابور
+        self.assertFalse(api.jobs._threads)
+        with TestClient(api.app):
+            self.assertTrue(all(thread.is_alive() for thread in api.jobs._threads))
+            self.assertTrue(api.jobs._threads)
+        self.assertFalse(api.jobs._threads)
+
+
+class TestAdmission(APITestCase):
+    """الرفض بـ 429 و 503 من طبقة القبول أمام التطبيق"""
+
+    def test_rate_limited(self):
+        with mock.patch.multiple(api.rate_limiter, rate=1, burst=1), \
+                mock.patch.object(api.rate_limiter, "_buckets", {}):
+            self.assertEqual(self.client.get("/api/v1/shots").status_code, 200)
+            response = self.client.get("/api/v1/shots")
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["retry-after"], "1")
+            # مفتاح API عميل مستقل، والمقاييس مستثناة
+            self.assertEqual(self.client.get("/api/v1/shots", headers={"X-API-Key": "k"}).status_code, 200)
+            self.assertEqual(self.client.get("/api/v1/metrics").status_code, 200)
+
+    def test_overloaded(self):
+        limiter = api.concurrency
+        with mock.patch.multiple(limiter, active=limiter.max_active, max_queue=0):
+            response = self.client.get("/api/v1/shots")
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("retry-after", response.headers)
+            self.assertEqual(self.client.get("/readyz").status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/shots").status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات دمج الحسابات المتطابقة - CalculationCache Tests
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.calculation_cache import CalculationCache
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.engine import BilliardsEngine
+
+PARAMS = (2, 5.0, 3.0, 4.0, 1)
+
+
+class TestCalculationCache(unittest.TestCase):
+    """النتائج مطابقة للحاسبة والتسديقات مستقلة"""
+
+    def setUp(self):
+        self.calculator = ShotCalculator()
+        self.cache = CalculationCache(self.calculator, max_entries=2)
+
+    def test_matches_calculator_with_fresh_shots(self):
+        first, summary = self.cache.calculate(*PARAMS)
+        second, again = self.cache.calculate(*PARAMS)
+
+        expected = self.calculator.create_shot(*PARAMS)
+        self.assertEqual(summary, self.calculator.get_calculation_summary(expected))
+        self.assertEqual(again, summary)
+        self.assertEqual((first.difficulty, first.success_rate), (expected.difficulty, expected.success_rate))
+        self.assertIsNot(first, second)
+        self.assertIsNot(again, summary)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+    def test_lru_bound_and_errors_not_cached(self):
+        for white_ball in (1.0, 2.0, 3.0):
+            self.cache.calculate(1, 5.0, white_ball, 4.0, 0)
+        self.assertEqual(self.cache.get_stats()["entries"], 2)
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.cache.calculate(7, 5.0, 3.0, 4.0, 1)
+        self.assertEqual(self.cache.get_stats()["entries"], 2)
+
+    def test_concurrent_identical_requests_share_one_computation(self):
+        original = self.calculator.create_shot
+        calls = []
+
+        def slow(*args):
+            calls.append(args)
+            time.sleep(0.1)
+            return original(*args)
+
+        results = []
+        with mock.patch.object(self.calculator, "create_shot", slow):
+            threads = [threading.Thread(target=lambda: results.append(self.cache.calculate(*PARAMS)))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(shot) for shot, _ in results}), 4)
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["requests"], stats["computed"], stats["coalesced"]), (4, 1, 3))
+
+
+class TestAddShot(unittest.TestCase):
+    """كل طلب يحفظ تسديقته صراحة"""
+
+    def test_each_request_persists_its_shot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            cache = CalculationCache()
+            for _ in range(2):
+                shot, _ = cache.calculate(*PARAMS)
+                engine.add_shot(shot)
+
+            self.assertEqual(len(engine.shots), 2)
+            self.assertEqual(engine.get_statistics()["total_calculations"], 2)
+            engine.record_execution(shot, True)
+            self.assertFalse(engine.shots[0].executed)
+            self.assertTrue(engine.shots[1].executed)
+            self.assertEqual(len(BilliardsEngine(data_dir=tmp).shots), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
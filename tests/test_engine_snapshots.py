@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات لقطات المحرك والكتابة المتزامنة - EngineSnapshot Tests
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from backend.models.shot import Shot
+
+
+class TestEngineSnapshots(unittest.TestCase):
+    """اللقطة لا تتغير بعد نشرها"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.engine = BilliardsEngine(data_dir=self.tmp.name)
+
+    def test_snapshot_is_isolated_from_later_writes(self):
+        shot = self.engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+        before = self.engine.snapshot()
+
+        self.engine.calculate_shot(1, 5.0, 3.0, 4.0, 1)
+        self.engine.record_execution(shot, True)
+
+        self.assertEqual(len(before.shots), 1)
+        self.assertFalse(before.shots[0].executed)
+        self.assertEqual(before.statistics.total_calculations, 1)
+        self.assertEqual(before.get_statistics()["total_shots_attempted"], 0)
+
+        after = self.engine.snapshot()
+        self.assertGreater(after.version, before.version)
+        self.assertTrue(after.shots[0].executed)
+        # تسديقة الكاتب المعادة من calculate_shot تُحدّث كما كانت
+        self.assertTrue(shot.executed)
+        self.assertIsNot(after.shots[0], shot)
+        # التسديقات غير المتغيرة مشتركة بين اللقطات
+        self.assertIs(after.shots[1], self.engine.snapshot().shots[1])
+
+    def test_derived_structures_published_with_snapshot(self):
+        shot = self.engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+        before = self.engine.snapshot()
+        self.engine.calculate_shot(1, 5.0, 3.0, 4.0, 1)
+        self.engine.record_execution(shot, True)
+
+        self.assertEqual(before.distributions["success_rate"].count, 1)
+        self.assertEqual(len(before.leaderboard.best(25)), 1)
+        self.assertEqual(len(before.trends), 0)
+        after = self.engine.snapshot()
+        self.assertEqual(after.distributions["success_rate"].count, 2)
+        self.assertEqual(len(self.engine.get_leaderboard(k=25)), 2)
+        self.assertEqual(self.engine.get_trends()["count"], 1)
+        # الكاتب لا يعدّل الكائنات المنشورة
+        self.assertIsNot(after.leaderboard, self.engine.leaderboard)
+        self.assertIsNot(after.trends, self.engine.trends)
+
+    def test_record_by_copy_and_by_id(self):
+        self.engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+        self.engine.calculate_shot(3, 5.0, 3.0, 4.0, 1)
+
+        self.engine.record_execution(self.engine.shots[0], False)
+        updated = self.engine.record_result(1, True)
+        self.assertTrue(updated.executed)
+        self.assertEqual(self.engine.get_statistics()["total_shots_successful"], 1)
+        self.assertEqual(self.engine.shot_id(self.engine.shots[1]), 1)
+
+        with self.assertRaises(ValueError):
+            self.engine.record_result(5, True)
+        with self.assertRaises(ValueError):
+            self.engine.record_execution(Shot(rails=4, cue_position=0, white_ball=0, target=0, pocket=0), True)
+
+    def test_equal_shots_resolve_by_identity(self):
+        first = Shot(rails=2, cue_position=5, white_ball=3, target=4, pocket=1)
+        second = Shot(rails=2, cue_position=5, white_ball=3, target=4, pocket=1,
+                      timestamp=first.timestamp)
+        self.engine.add_shot(first)
+        self.engine.add_shot(second)
+        self.assertEqual(self.engine.shots[0], self.engine.shots[1])
+
+        stale = self.engine.shots[1]
+        self.engine.record_execution(stale, True)
+        # نسخة من لقطة سابقة تبقى مرتبطة بنفس التسديقة
+        self.engine.record_execution(stale, False)
+        self.assertEqual(self.engine.shot_id(stale), 1)
+        self.assertFalse(self.engine.shots[0].executed)
+        self.assertTrue(self.engine.shots[1].executed)
+        self.assertFalse(first.executed)
+        self.assertEqual(self.engine.get_statistics()["total_shots_attempted"], 2)
+
+        # تسديقة مساوية في القيم ليست من المحرك
+        with self.assertRaises(ValueError):
+            self.engine.record_execution(Shot(rails=2, cue_position=5, white_ball=3, target=4, pocket=1,
+                                              timestamp=first.timestamp), True)
+
+    def test_replace_shots(self):
+        self.engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+        before = self.engine.snapshot()
+        imported = [Shot(rails=1, cue_position=i, white_ball=1, target=1, pocket=0) for i in range(3)]
+
+        self.engine.shots = imported
+        self.assertEqual(len(before.shots), 1)
+        self.assertEqual([s.cue_position for s in self.engine.shots], [0, 1, 2])
+        self.assertEqual(len(self.engine.index), 3)
+        self.engine.record_execution(imported[2], True)
+        self.assertTrue(self.engine.shots[2].executed)
+
+        reloaded = BilliardsEngine(data_dir=self.tmp.name)
+        self.assertEqual(len(reloaded.shots), 3)
+
+
+class TestConcurrentReaders(unittest.TestCase):
+    """القراء أثناء الكتابة يرون دائماً لقطة متسقة"""
+
+    def test_readers_never_see_torn_state(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            done = threading.Event()
+            errors = []
+
+            def writer(rails):
+                for i in range(25):
+                    shot = engine.calculate_shot(rails, 5.0, i % 10, 4.0, 1)
+                    engine.record_execution(shot, i % 2 == 0)
+
+            def reader():
+                while not done.is_set():
+                    snapshot = engine.snapshot()
+                    executed = sum(1 for s in snapshot.shots if s.executed)
+                    stats = snapshot.get_statistics()
+                    if (len(snapshot.shots), executed) != (
+                        stats["total_calculations"], stats["total_shots_attempted"]
+                    ):
+                        errors.append((len(snapshot.shots), executed, stats))
+                    if any(s.executed and s.result is None for s in snapshot.shots):
+                        errors.append("executed without result")
+                    time.sleep(0.001)  # إتاحة GIL للكتّاب
+
+            readers = [threading.Thread(target=reader) for _ in range(2)]
+            writers = [threading.Thread(target=writer, args=(rails,)) for rails in (1, 2, 3, 4)]
+            for thread in readers + writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            done.set()
+            for thread in readers:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertEqual(len(engine.shots), 100)
+            self.assertEqual(engine.get_statistics()["total_shots_successful"], 52)
+            self.assertEqual(len(engine.index), 100)
+            self.assertEqual(
+                sorted(engine.shot_id(s) for s in engine.shots), list(range(100)),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات البث المباشر - EventHub Tests
+"""
+
+import sys
+import asyncio
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.events import STATISTICS_EVENT, EventHub, sse_message
+
+
+def _types(frame):
+    return [event["type"] for event in frame["events"]]
+
+
+class TestEventHub(unittest.TestCase):
+    """الإطارات والدمج والاستئناف"""
+
+    def test_burst_coalesced_into_one_frame(self):
+        hub = EventHub(frame_interval=0.05)
+
+        async def run():
+            async with hub.subscribe() as subscription:
+                hub.publish("shot_created", {"shot_id": 0})
+                first = await subscription.next_frame(timeout=1)
+
+                # دفعة أثناء فترة التهدئة تخرج في إطار واحد
+                hub.publish("shot_created", {"shot_id": 1})
+                hub.publish_delta(STATISTICS_EVENT, {"total": 1, "rate": 50})
+                hub.publish("execution_recorded", {"shot_id": 1})
+                hub.publish_delta(STATISTICS_EVENT, {"total": 1, "rate": 75})
+                second = await subscription.next_frame(timeout=1)
+                return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(_types(first), ["shot_created"])
+        self.assertEqual(_types(second), ["shot_created", "execution_recorded", STATISTICS_EVENT])
+        self.assertEqual(second["events"][-1]["data"], {"total": 1, "rate": 75})
+        self.assertEqual(second["id"], f"{hub.epoch}:5")
+
+    def test_publish_delta_sends_changed_fields_only(self):
+        hub = EventHub()
+        hub.publish_delta(STATISTICS_EVENT, {"total": 1, "rate": 50})
+        event = hub.publish_delta(STATISTICS_EVENT, {"total": 2, "rate": 50})
+        self.assertEqual(event.data, {"total": 2})
+        self.assertIsNone(hub.publish_delta(STATISTICS_EVENT, {"total": 2, "rate": 50}))
+
+    def test_resume_from_last_event_id(self):
+        hub = EventHub(frame_interval=0)
+        seen = hub.publish("shot_created", {"shot_id": 0})
+        hub.publish("shot_created", {"shot_id": 1})
+
+        async def run():
+            async with hub.subscribe(f"{hub.epoch}:{seen.seq}") as subscription:
+                return await subscription.next_frame(timeout=1)
+
+        frame = asyncio.run(run())
+        self.assertFalse(frame["reset"])
+        self.assertEqual([e["data"]["shot_id"] for e in frame["events"]], [1])
+
+    def test_unknown_or_evicted_id_requests_reset(self):
+        hub = EventHub(history=2, frame_interval=0)
+        for i in range(5):
+            hub.publish("shot_created", {"shot_id": i})
+
+        async def frame_for(event_id):
+            async with hub.subscribe(event_id) as subscription:
+                return await subscription.next_frame(timeout=1)
+
+        evicted = asyncio.run(frame_for(f"{hub.epoch}:1"))
+        restarted = asyncio.run(frame_for("00000000:4"))
+        for frame in (evicted, restarted):
+            self.assertTrue(frame["reset"])
+            self.assertEqual(frame["id"], f"{hub.epoch}:5")
+
+    def test_publish_from_worker_thread_wakes_subscriber(self):
+        hub = EventHub(frame_interval=0)
+
+        async def run():
+            async with hub.subscribe() as subscription:
+                threading.Timer(0.05, hub.publish, ("shot_created", {"shot_id": 0})).start()
+                return await subscription.next_frame(timeout=2)
+
+        self.assertEqual(_types(asyncio.run(run())), ["shot_created"])
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    def test_idle_timeout_returns_heartbeat(self):
+        hub = EventHub()
+
+        async def run():
+            async with hub.subscribe() as subscription:
+                return await subscription.next_frame(timeout=0.01)
+
+        frame = asyncio.run(run())
+        self.assertIsNone(frame)
+        self.assertEqual(sse_message(frame), ": ping\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات فحوصات الحيوية والجاهزية - Liveness / Readiness Tests
+"""
+
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.cache import MemoryCacheBackend
+from backend.services.health import (
+    LIVENESS_BODY, ProbeASGIMiddleware, ProbeWSGIMiddleware, ReadinessProbe,
+    check_cache_backend, check_writable_dir,
+)
+
+
+def _fail_app(*args):
+    raise AssertionError("التطبيق يجب ألا يُستدعى لـ /livez")
+
+
+class TestLivenessMiddleware(unittest.TestCase):
+    """/livez يُجاب بدون المرور بالتطبيق"""
+
+    def test_asgi_livez_bypasses_app(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def run():
+            middleware = ProbeASGIMiddleware(_fail_app)
+            await middleware({"type": "http", "path": "/livez"}, None, send)
+
+        asyncio.run(run())
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertEqual(sent[1]["body"], LIVENESS_BODY)
+
+    def test_asgi_other_paths_reach_app(self):
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+
+        asyncio.run(ProbeASGIMiddleware(app)({"type": "http", "path": "/health"}, None, None))
+        self.assertEqual(calls, ["/health"])
+
+    def test_wsgi_livez_bypasses_app(self):
+        statuses = []
+        body = ProbeWSGIMiddleware(_fail_app)(
+            {"PATH_INFO": "/livez"}, lambda status, headers: statuses.append(status)
+        )
+        self.assertEqual(statuses, ["200 OK"])
+        self.assertEqual(b"".join(body), LIVENESS_BODY)
+
+
+class TestReadinessProbe(unittest.TestCase):
+    """الفحص العميق مع نتيجة مخزنة"""
+
+    def test_result_cached_for_ttl(self):
+        calls = []
+        probe = ReadinessProbe({"db": lambda: calls.append(1)}, ttl=60)
+        first = probe.check()
+        second = probe.check()
+
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        ready, body = first
+        self.assertTrue(ready)
+        self.assertEqual(json.loads(body)["status"], "ready")
+
+    def test_expired_result_rechecked(self):
+        calls = []
+        probe = ReadinessProbe({"db": lambda: calls.append(1)}, ttl=0)
+        probe.check()
+        probe.check()
+        self.assertEqual(len(calls), 2)
+
+    def test_failing_check_reports_not_ready(self):
+        def broken():
+            raise RuntimeError("connection refused")
+
+        probe = ReadinessProbe({"db": broken, "storage": lambda: None}, ttl=0)
+        ready, body = probe.check()
+        data = json.loads(body)
+
+        self.assertFalse(ready)
+        self.assertEqual(data["status"], "not_ready")
+        self.assertFalse(data["checks"]["db"]["ok"])
+        self.assertIn("connection refused", data["checks"]["db"]["error"])
+        self.assertTrue(data["checks"]["storage"]["ok"])
+
+    def test_builtin_checks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            probe = ReadinessProbe({
+                "storage": check_writable_dir(tmp),
+                "cache": check_cache_backend(MemoryCacheBackend()),
+            })
+            self.assertTrue(probe.check()[0])
+
+            missing = ReadinessProbe({"storage": check_writable_dir(Path(tmp) / "missing")})
+            self.assertFalse(missing.check()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات الحل العكسي - InverseSolver Tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.inverse import InverseSolver, brute_force_setups
+
+
+class TestInverseSolver(unittest.TestCase):
+    """مطابقة الفهرس العكسي للحاسبة الأمامية"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.calculator = ShotCalculator()
+        cls.solver = InverseSolver(cls.calculator)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        for _ in range(40):
+            white_ball, target = round(rng.uniform(0, 10), 2), round(rng.uniform(0, 10), 2)
+            with self.subTest(white_ball=white_ball, target=target):
+                setups = self.solver.best_setups(white_ball, target, pocket=2, k=4)
+                self.assertEqual(
+                    [(s.rails, s.diamond, s.success_rate) for s in setups],
+                    brute_force_setups(self.calculator, white_ball, target, 2, k=4),
+                )
+
+    def test_setup_reproduces_forward_shot(self):
+        for setup in self.solver.best_setups(4.0, 5.5, pocket=3, k=4):
+            position = self.calculator.rail_system.get_position(setup.rails, setup.cue_position)
+            self.assertAlmostEqual(position.angle, setup.angle, places=2)
+            shot = self.calculator.create_shot(setup.rails, setup.cue_position, 4.0, 5.5, 3)
+            self.assertEqual(shot.difficulty.value, setup.difficulty)
+            self.assertEqual(shot.success_rate, setup.success_rate)
+            converted = setup.to_shot()
+            self.assertEqual((converted.rails, converted.difficulty, converted.success_rate),
+                             (shot.rails, shot.difficulty, shot.success_rate))
+
+    def test_difficulty_boundaries_match_calculator(self):
+        """حدود الصعوبة المستخرجة بالتنصيف مطابقة عند نقاط الانتقال"""
+        for distance in (0.0, 3.33, 3.34, 5.0, 6.66, 6.67, 10.0):
+            for rails in range(1, 5):
+                difficulty, rate = self.solver.difficulty_for(rails, distance, 0.0)
+                expected = self.calculator.calculate_difficulty(rails, distance, 0.0)
+                self.assertEqual(difficulty, expected)
+                self.assertEqual(rate, self.calculator.calculate_success_rate(rails, expected))
+
+    def test_filters_and_ordering(self):
+        setups = self.solver.best_setups(2.0, 3.0, pocket=0, k=4)
+        rates = [s.success_rate for s in setups]
+        self.assertEqual(rates, sorted(rates, reverse=True))
+        self.assertEqual(setups[0].rails, 1)
+
+        limited = self.solver.best_setups(2.0, 3.0, pocket=0, k=4, max_rails=2, min_success_rate=80)
+        self.assertTrue(all(s.rails <= 2 and s.success_rate >= 80 for s in limited))
+        self.assertEqual(len(self.solver.best_setups(2.0, 3.0, pocket=0, k=1)), 1)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.solver.best_setups(11, 3, pocket=0)
+        with self.assertRaises(ValueError):
+            self.solver.best_setups(1, 3, pocket=6)
+        with self.assertRaises(ValueError):
+            InverseSolver(resolution=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
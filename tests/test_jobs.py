@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات طابور المهام الخلفية - JobQueue Tests
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.jobs import CANCELLED, DONE, FAILED, PENDING, RUNNING, JobQueue
+
+
+def _write(context, data):
+    context.output.write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestJobQueue(unittest.TestCase):
+    """التنفيذ والأولوية والإلغاء والمهلة"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = str(Path(self.tmp.name) / "jobs.db")
+        self.results = str(Path(self.tmp.name) / "results")
+
+    def _queue(self, **kwargs):
+        kwargs.setdefault("poll_interval", 0.05)
+        queue = JobQueue(self.db, self.results, **kwargs)
+        self.addCleanup(queue.close)
+        return queue
+
+    def test_result_written_to_file(self):
+        queue = self._queue()
+        queue.register("echo", lambda context: _write(context, context.params) or {"size": 1})
+        queue.start()
+
+        job = queue.submit("echo", {"value": "٣"})
+        self.assertEqual(job["state"], PENDING)
+        finished = queue.wait(job["job_id"], 5)
+        self.assertEqual((finished["state"], finished["result"], finished["progress"]), (DONE, {"size": 1}, 100.0))
+        path = queue.result_path(job["job_id"])
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"value": "٣"})
+        self.assertEqual(list(Path(self.results).glob("*.part")), [])
+
+        with self.assertRaises(ValueError):
+            queue.submit("missing")
+        with self.assertRaises(ValueError):
+            queue.submit("echo", {"value": object()})
+
+    def test_priority_order_and_kind_limit(self):
+        queue = self._queue(workers=2)
+        order = []
+        gate = threading.Event()
+
+        def record(context):
+            gate.wait(5)
+            order.append(context.params["name"])
+            _write(context, {})
+
+        queue.register("slow", record, concurrency=1)
+        ids = [queue.submit("slow", {"name": name}, priority=priority)["job_id"]
+               for name, priority in (("low", 0), ("high", 5), ("mid", 1))]
+        queue.start()
+        time.sleep(0.2)
+        # حد النوع: مهمة واحدة جارية رغم وجود عاملين
+        self.assertEqual([queue.get(i)["state"] for i in ids].count(RUNNING), 1)
+        gate.set()
+        for job_id in ids:
+            self.assertEqual(queue.wait(job_id, 5)["state"], DONE)
+        self.assertEqual(order, ["high", "mid", "low"])
+
+    def test_cancel_running_job(self):
+        queue = self._queue()
+        started = threading.Event()
+
+        def loop(context):
+            started.set()
+            while True:
+                context.check(0.5)
+                time.sleep(0.01)
+
+        queue.register("loop", loop)
+        queue.start()
+        job_id = queue.submit("loop")["job_id"]
+        self.assertTrue(started.wait(5))
+        self.assertEqual(queue.get(job_id)["progress"], 50.0)
+        self.assertEqual(queue.cancel(job_id)["state"], CANCELLED)
+        time.sleep(0.1)
+        self.assertEqual(queue.get(job_id)["state"], CANCELLED)
+        self.assertIsNone(queue.result_path(job_id))
+        self.assertEqual(queue.get_stats()["running_here"], {"loop": 0})
+
+    def test_timeout_and_failure(self):
+        queue = self._queue(timeout=0.2)
+
+        def loop(context):
+            while True:
+                context.check()
+                time.sleep(0.01)
+
+        def broken(context):
+            raise RuntimeError("boom")
+
+        queue.register("loop", loop)
+        queue.register("broken", broken)
+        queue.start()
+        timed_out = queue.wait(queue.submit("loop")["job_id"], 5)
+        failed = queue.wait(queue.submit("broken")["job_id"], 5)
+        self.assertEqual(timed_out["state"], FAILED)
+        self.assertIn("المهلة", timed_out["error"])
+        self.assertEqual((failed["state"], failed["error"]), (FAILED, "boom"))
+
+
+class TestRestart(unittest.TestCase):
+    """المهام تنجو من إعادة التشغيل"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db = str(Path(self.tmp.name) / "jobs.db")
+        self.results = str(Path(self.tmp.name) / "results")
+
+    def test_pending_jobs_run_after_restart(self):
+        first = JobQueue(self.db, self.results)
+        first.register("echo", lambda context: _write(context, context.params))
+        job_id = first.submit("echo", {"n": 1})["job_id"]
+        first.close()
+
+        second = JobQueue(self.db, self.results, poll_interval=0.05)
+        self.addCleanup(second.close)
+        second.register("echo", lambda context: _write(context, context.params))
+        second.start()
+        self.assertEqual(second.wait(job_id, 5)["state"], DONE)
+
+    def test_abandoned_lease_is_reclaimed(self):
+        queue = JobQueue(self.db, self.results, poll_interval=0.05, max_attempts=2)
+        self.addCleanup(queue.close)
+        queue.register("echo", lambda context: _write(context, context.params))
+        resumed = queue.submit("echo", {"n": 1})["job_id"]
+        exhausted = queue.submit("echo", {"n": 2})["job_id"]
+        # عملية توقفت أثناء التنفيذ: عقدها منتهٍ
+        with sqlite3.connect(self.db) as db:
+            db.execute("UPDATE jobs SET state = ?, owner = 'gone', lease_until = ?, attempts = 1 WHERE id = ?",
+                       (RUNNING, time.time() - 1, resumed))
+            db.execute("UPDATE jobs SET state = ?, owner = 'gone', lease_until = ?, attempts = 2 WHERE id = ?",
+                       (RUNNING, time.time() - 1, exhausted))
+
+        queue.start()
+        job = queue.wait(resumed, 5)
+        self.assertEqual((job["state"], job["attempts"]), (DONE, 2))
+        self.assertEqual(queue.wait(exhausted, 5)["state"], FAILED)
+
+    def test_shutdown_requeues_running_job(self):
+        queue = JobQueue(self.db, self.results, poll_interval=0.05)
+        started = threading.Event()
+
+        def loop(context):
+            started.set()
+            while True:
+                context.check()
+                time.sleep(0.01)
+
+        queue.register("loop", loop)
+        queue.start()
+        job_id = queue.submit("loop")["job_id"]
+        self.assertTrue(started.wait(5))
+        queue.close()
+        job = queue.get(job_id)
+        self.assertEqual((job["state"], job["attempts"]), (PENDING, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات قوائم الأفضل والأسوأ - leaderboard Tests
+"""
+
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from leaderboard import Leaderboard, TopK
+
+
+def _reference(entries, k, largest=True):
+    """الترتيب الكامل: القيمة ثم الأسبق إضافةً"""
+    ordered = sorted(
+        enumerate(entries),
+        key=lambda e: (-e[1][1] if largest else e[1][1], e[0]),
+    )
+    return [(value, item_id) for _, (item_id, value) in ordered[:k]]
+
+
+class TestTopK(unittest.TestCase):
+    """الكومة مطابقة للترتيب الكامل مع الإضافة والحذف"""
+
+    def setUp(self):
+        rng = random.Random(5)
+        # قيم مكررة عمداً لاختبار التعادل
+        self.entries = [(i, float(rng.randint(0, 40))) for i in range(2_000)]
+
+    def test_matches_full_sort(self):
+        for largest in (True, False):
+            top = TopK(k=10, largest=largest)
+            for item_id, value in self.entries:
+                top.push(item_id, value)
+            got = [(value, item_id) for value, item_id, _ in top.top()]
+            self.assertEqual(got, _reference(self.entries, 10, largest))
+            self.assertEqual(len(top), len(self.entries))
+
+    def test_discard_uses_reserve_then_goes_stale(self):
+        top = TopK(k=5, reserve=3)
+        for item_id, value in self.entries:
+            top.push(item_id, value)
+        live = list(self.entries)
+        for _ in range(3):
+            _, item_id, _ = top.top(1)[0]
+            self.assertTrue(top.discard(item_id))
+            live = [e for e in live if e[0] != item_id]
+            self.assertFalse(top.stale)
+            self.assertEqual([(v, i) for v, i, _ in top.top()], _reference(live, 5))
+
+        _, item_id, _ = top.top(1)[0]
+        top.discard(item_id)
+        live = [e for e in live if e[0] != item_id]
+        self.assertTrue(top.stale)
+        top.rebuild((i, v, None) for i, v in live)
+        self.assertFalse(top.stale)
+        self.assertEqual([(v, i) for v, i, _ in top.top()], _reference(live, 5))
+
+    def test_discard_outside_kept(self):
+        top = TopK(k=2)
+        for item_id, value in enumerate([1.0, 2.0, 3.0, 4.0, 5.0]):
+            top.push(item_id, value)
+        self.assertFalse(top.discard(0))
+        self.assertEqual(len(top), 4)
+        self.assertFalse(top.stale)
+
+    def test_k_out_of_range(self):
+        top = TopK(k=3)
+        with self.assertRaises(ValueError):
+            top.top(4)
+        with self.assertRaises(ValueError):
+            TopK(k=0)
+
+
+class TestLeaderboard(unittest.TestCase):
+    """التقسيمات والحفظ"""
+
+    def setUp(self):
+        self.board = Leaderboard(k=3, partitions=('rails', 'difficulty'))
+        rng = random.Random(8)
+        self.rows = [
+            (i, round(rng.uniform(0, 100), 1), rng.randint(1, 4), rng.choice('abc'))
+            for i in range(300)
+        ]
+        for item_id, value, rails, difficulty in self.rows:
+            self.board.add(item_id, value, {'id': item_id}, rails=rails, difficulty=difficulty)
+
+    def test_partitions(self):
+        for rails in (1, 2, 3, 4):
+            entries = [(i, v) for i, v, r, _ in self.rows if r == rails]
+            got = [(v, i) for v, i, _ in self.board.best(rails=rails)]
+            self.assertEqual(got, _reference(entries, 3))
+        entries = [(i, v) for i, v, _, d in self.rows if d == 'b']
+        got = [(v, i) for v, i, _ in self.board.worst(difficulty='b')]
+        self.assertEqual(got, _reference(entries, 3, largest=False))
+        self.assertEqual(self.board.best(rails=9), [])
+
+    def test_invalid_filters(self):
+        with self.assertRaises(ValueError):
+            self.board.best(rails=1, difficulty='a')
+        with self.assertRaises(ValueError):
+            self.board.best(pocket=1)
+        with self.assertRaises(ValueError):
+            self.board.add(1000, 1.0, rails=1)
+
+    def test_remove(self):
+        value, item_id, _ = self.board.best(1)[0]
+        _, _, rails, difficulty = self.rows[item_id]
+        self.board.remove(item_id, rails=rails, difficulty=difficulty)
+        self.assertNotIn(item_id, [i for _, i, _ in self.board.best()])
+        self.assertNotIn(item_id, [i for _, i, _ in self.board.best(rails=rails)])
+
+    def test_copy_is_independent(self):
+        published = self.board.copy()
+        expected = published.best(rails=1)
+        self.board.add(1_000, 100.0, {'id': 1_000}, rails=1, difficulty='a')
+        self.board.add(1_001, 100.0, {'id': 1_001}, rails=4, difficulty='z')
+
+        self.assertEqual(published.best(rails=1), expected)
+        self.assertEqual(published.best(difficulty='z'), [])
+        self.assertEqual(self.board.best(rails=1)[0][1], 1_000)
+        # ترتيب الإضافة يستمر بعد النسخ (التعادل: الأسبق أولاً)
+        self.assertEqual([i for _, i, _ in self.board.best(2)], [1_000, 1_001])
+
+    def test_roundtrip_through_json(self):
+        restored = Leaderboard(k=3, partitions=('rails', 'difficulty'))
+        restored.load_dict(json.loads(json.dumps(self.board.to_dict())))
+        self.assertEqual(restored.best(), self.board.best())
+        self.assertEqual(restored.worst(rails=2), self.board.worst(rails=2))
+        # الإضافة بعد الاستعادة تحافظ على قاعدة التعادل
+        best_value = self.board.best(1)[0][0]
+        restored.add(999, best_value, None, rails=1, difficulty='a')
+        self.assertNotEqual(restored.best(1)[0][1], 999)
+
+
+class TestEngineLeaderboard(unittest.TestCase):
+    """قوائم المحرك تُحدّث مع كل تسديقة وتُعاد بناؤها عند التحميل"""
+
+    def test_engine_leaderboard(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            for rails in (1, 2, 3, 4):
+                for white_ball in (1.0, 5.0, 9.0):
+                    engine.calculate_shot(rails, 5.0, white_ball, 2.0, 1)
+
+            ranked = sorted(range(len(engine.shots)), key=lambda i: (-engine.shots[i].success_rate, i))
+            best = engine.get_leaderboard(k=5)
+            self.assertEqual([e["shot_id"] for e in best], ranked[:5])
+            worst = engine.get_leaderboard(k=1, worst=True, rails=4)
+            self.assertEqual(worst[0]["shot"]["rails"], 4)
+
+            reloaded = BilliardsEngine(data_dir=tmp)
+            self.assertEqual(reloaded.get_leaderboard(k=5), best)
+
+
+if __name__ == '__main__':
+    unittest.main()
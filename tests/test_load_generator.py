@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات مولد الأحمال - Load Generator Tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.load_generator import percentile
+
+
+class TestPercentile(unittest.TestCase):
+    """النسبة المئوية بطريقة أقرب رتبة: القيمة رقم ceil(p × n / 100)"""
+
+    def test_hundred_values(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual([percentile(values, p) for p in (50, 90, 95, 99, 99.9, 100)],
+                         [50.0, 90.0, 95.0, 99.0, 100.0, 100.0])
+        self.assertEqual(percentile(values, 0), 1.0)
+
+    def test_twenty_values(self):
+        values = [float(i) for i in range(1, 21)]
+        self.assertEqual([percentile(values, p) for p in (5, 50, 90, 95, 99)],
+                         [1.0, 10.0, 18.0, 19.0, 20.0])
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات محلل أداء الطلبات - RequestProfiler Tests
+"""
+
+import sys
+import json
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.profiler import RequestProfiler, profiled_route_class
+
+try:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    FASTAPI_INSTALLED = True
+except ImportError:
+    FASTAPI_INSTALLED = False
+
+
+def busy_handler_work():
+    return sum(i * i for i in range(1000))
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """اختبارات فئة RequestProfiler"""
+
+    def setUp(self):
+        """إعداد مجلد مؤقت للتقارير"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name) / "profiles"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_disabled_never_profiles(self):
+        """المحلل المعطل لا يحلل أي طلب ولا ينشئ مجلدات"""
+        profiler = RequestProfiler(enabled=False, sample_rate=1.0,
+                                   output_dir=str(self.output_dir))
+        self.assertFalse(profiler.should_profile(lambda name: "1"))
+        self.assertFalse(self.output_dir.exists())
+
+    def test_debug_header_forces_profiling(self):
+        """ترويسة التصحيح تفرض التحليل حتى مع عينة صفرية"""
+        profiler = RequestProfiler(enabled=True, sample_rate=0.0,
+                                   output_dir=str(self.output_dir))
+        headers = {"X-Debug-Profile": "1"}
+        self.assertTrue(profiler.should_profile(headers.get))
+        self.assertFalse(profiler.should_profile({}.get))
+
+    def test_endpoint_name_normalizes_ids(self):
+        """توحيد المعرفات الرقمية في المسار"""
+        self.assertEqual(
+            RequestProfiler.endpoint_name("POST", "/api/v1/shots/42/record"),
+            "POST /api/v1/shots/{id}/record",
+        )
+
+    def test_profile_writes_reports_and_summary(self):
+        """كتابة التقارير وتجميع الملخص حسب المسار"""
+        profiler = RequestProfiler(enabled=True, sample_rate=1.0,
+                                   output_dir=str(self.output_dir),
+                                   trace_memory=True)
+        for _ in range(2):
+            with profiler.profile("GET /api/v1/statistics"):
+                sum(i * i for i in range(1000))
+
+        summary = profiler.get_summary()
+        self.assertEqual(summary["GET /api/v1/statistics"]["profiled_requests"], 2)
+        self.assertTrue(summary["GET /api/v1/statistics"]["top_functions"])
+
+        endpoint_dir = self.output_dir / "GET_api_v1_statistics"
+        self.assertEqual(len(list(endpoint_dir.glob("*.prof"))), 2)
+        with open(self.output_dir / "summary.json", encoding="utf-8") as f:
+            self.assertIn("GET /api/v1/statistics", json.load(f))
+
+
+    @unittest.skipUnless(FASTAPI_INSTALLED, "FastAPI غير مثبت")
+    def test_sync_endpoint_profiled_in_worker_thread(self):
+        """دالة def تعمل في مجمع الخيوط ويظهر عملها في تقرير الطلب"""
+        profiler = RequestProfiler(enabled=True, sample_rate=0.0,
+                                   output_dir=str(self.output_dir))
+        app = FastAPI()
+        app.router.route_class = profiled_route_class(profiler)
+
+        @app.middleware("http")
+        async def sample(request, call_next):
+            with profiler.sampling(request.headers.get):
+                return await call_next(request)
+
+        @app.get("/items/{item_id}")
+        def read_item(item_id: int):
+            return {"item_id": item_id, "total": busy_handler_work()}
+
+        client = TestClient(app)
+        self.assertEqual(client.get("/items/3", headers={"X-Debug-Profile": "1"}).json()["item_id"], 3)
+        client.get("/items/4")  # خارج العينة
+
+        reports = list((self.output_dir / "GET_items_item_id").glob("*.prof"))
+        self.assertEqual(len(reports), 1)
+        functions = {name for _, _, name in pstats.Stats(str(reports[0])).stats}
+        self.assertIn("read_item", functions)
+        self.assertIn("busy_handler_work", functions)
+
+
+if __name__ == '__main__':
+    unittest.main()
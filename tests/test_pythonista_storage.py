@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات أدوات تخزين Pythonista - pythonista_storage Tests
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+from pythonista_storage import AppendOnlyShotStore, ShotStatsSummary
+
+
+def _shot(shot_id, success):
+    return {'id': shot_id, 'angle': 0.0, 'power': 50.0, 'distance': 100.0,
+            'difficulty': 2, 'cue_type': 'عادي', 'success': success,
+            'timestamp': '2026-01-01T10:00:00'}
+
+
+class TestAppendOnlyShotStore(unittest.TestCase):
+    """اختبارات سجل التسديدات (إضافة فقط)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name)
+        self.path = self.data_dir / 'shots.jsonl'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_load(self):
+        """كل إضافة تكتب سطراً واحداً وتعيد حجم الملف"""
+        store = AppendOnlyShotStore(self.path, compact_every=None)
+        size = store.append(_shot(1, 50.0))
+        store.append(_shot(2, 60.0))
+
+        self.assertEqual([s['id'] for s in store.load()], [1, 2])
+        self.assertLess(size, store.size())
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_migrates_legacy_json(self):
+        """ترحيل shots.json القديم تلقائياً"""
+        legacy = self.data_dir / 'shots.json'
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump([_shot(1, 10.0), _shot(2, 20.0)], f)
+
+        store = AppendOnlyShotStore(self.path, legacy_path=legacy)
+        self.assertEqual(len(store.load()), 2)
+        self.assertFalse(legacy.exists())
+        self.assertTrue((self.data_dir / 'shots.json.migrated').exists())
+
+    def test_truncated_line_is_skipped_and_compacted(self):
+        """السطر المقطوع يُتجاهل، لا يلتصق بالإضافة التالية، ويُزال بالضغط"""
+        store = AppendOnlyShotStore(self.path, compact_every=None)
+        store.append(_shot(1, 50.0))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"id": 2, "succ')
+        store.append(_shot(3, 70.0))
+        self.assertEqual([s['id'] for s in store.load()], [1, 3])
+
+        resized = []
+        store.on_compact = lambda old, new: resized.append((old, new))
+        store.compact()
+        self.assertEqual(len(resized), 1)
+        self.assertLess(resized[0][1], resized[0][0])
+        self.assertEqual([s['id'] for s in store.load()], [1, 3])
+
+
+class TestShotStatsSummary(unittest.TestCase):
+    """اختبارات الملخص الإحصائي التراكمي"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'stats_summary.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_running_aggregates(self):
+        """المتوسط والأفضل والأسوأ تُحدَّث تراكمياً"""
+        summary = ShotStatsSummary(self.path)
+        for i, success in enumerate([40.0, None, 90.0, 10.0]):
+            summary.add(_shot(i, success), source_size=i + 1)
+
+        self.assertEqual(summary.total_shots, 4)
+        self.assertEqual(summary.with_success, 3)
+        self.assertAlmostEqual(summary.avg_success, 140.0 / 3)
+        self.assertEqual(summary.best_shot['id'], 2)
+        self.assertEqual(summary.worst_shot['id'], 3)
+
+    def test_recent_ring_buffer(self):
+        """آخر 10 تسديدات فقط تدخل في متوسط الأخيرة"""
+        summary = ShotStatsSummary(self.path)
+        for i in range(15):
+            summary.add(_shot(i, 10.0 if i < 5 else 50.0), source_size=i)
+        self.assertEqual(len(summary.recent), 10)
+        self.assertEqual(summary.recent_avg, 50.0)
+
+    def test_persisted_and_reloaded(self):
+        """الملخص يُحفظ ويُعاد تحميله بدون قراءة التسديدات"""
+        summary = ShotStatsSummary(self.path)
+        summary.add(_shot(1, 70.0), source_size=123)
+
+        reloaded = ShotStatsSummary(self.path)
+        self.assertFalse(reloaded.is_stale(123))
+        self.assertEqual(reloaded.total_shots, 1)
+        self.assertEqual(reloaded.avg_success, 70.0)
+
+    def test_trend_persisted(self):
+        """نوافذ الاتجاه تُحفظ مع الملخص: آخر 10 مقابل الـ 10 قبلها"""
+        summary = ShotStatsSummary(self.path)
+        for i in range(20):
+            summary.add(_shot(i, 30.0 if i < 10 else 60.0), source_size=i)
+        self.assertEqual(summary.trend['improvement'], 30.0)
+
+        reloaded = ShotStatsSummary(self.path)
+        self.assertEqual(reloaded.trend, summary.trend)
+
+    def test_distributions_persisted(self):
+        """ملخصات التوزيع تُحفظ مع الملخص وتتجاهل التسديدات بدون نجاح"""
+        summary = ShotStatsSummary(self.path)
+        for i in range(9):
+            summary.add(_shot(i, None if i == 0 else i * 10.0), source_size=i)
+        success = summary.distribution('success')
+        self.assertEqual(success['count'], 8)
+        self.assertEqual(success['percentiles']['p50'], 40.0)
+        self.assertEqual(summary.distribution('power')['count'], 9)
+
+        reloaded = ShotStatsSummary(self.path)
+        self.assertEqual(reloaded.distribution('success'), success)
+
+    def test_top_shots_by_difficulty(self):
+        """أفضل وأسوأ K كلياً وحسب الصعوبة، محفوظة مع الملخص"""
+        summary = ShotStatsSummary(self.path, top_k=2)
+        for i, success in enumerate([40.0, 90.0, 10.0, 90.0, 70.0]):
+            shot = _shot(i, success)
+            shot['difficulty'] = 1 if i % 2 else 2
+            summary.add(shot, source_size=i)
+        self.assertEqual([s['id'] for s in summary.top_shots()], [1, 3])
+        self.assertEqual([s['id'] for s in summary.top_shots(worst=True, difficulty=2)], [2, 0])
+
+        reloaded = ShotStatsSummary(self.path, top_k=2)
+        self.assertEqual(reloaded.top_shots(difficulty=1), summary.top_shots(difficulty=1))
+        self.assertEqual(reloaded.best_shot['id'], 1)
+
+    def test_rebuild_when_stale(self):
+        """إعادة البناء عند تغير حجم ملف التسديدات"""
+        summary = ShotStatsSummary(self.path)
+        summary.add(_shot(1, 70.0), source_size=10)
+        self.assertTrue(summary.is_stale(20))
+
+        summary.rebuild([_shot(1, 20.0), _shot(2, 30.0)], source_size=20)
+        self.assertEqual(summary.total_shots, 2)
+        self.assertEqual(summary.avg_success, 25.0)
+        self.assertFalse(summary.is_stale(20))
+
+    def test_source_resized_waits_for_add(self):
+        """خيط الضغط لا يتداخل مع إضافة جارية (تحديث وحجم وحفظ كوحدة واحدة)"""
+        summary = ShotStatsSummary(self.path)
+        summary.add(_shot(1, 70.0), source_size=10)
+        applying, resume = threading.Event(), threading.Event()
+        apply = summary._apply
+
+        def slow_apply(shot_dict):
+            applying.set()
+            resume.wait(5)
+            apply(shot_dict)
+
+        summary._apply = slow_apply
+        adder = threading.Thread(target=summary.add, args=(_shot(2, 30.0), 20))
+        adder.start()
+        applying.wait(5)
+        # الضغط قرأ الحجم 10 قبل الإضافة
+        resizer = threading.Thread(target=summary.source_resized, args=(10, 8))
+        resizer.start()
+        resizer.join(0.2)
+        self.assertTrue(resizer.is_alive())
+        resume.set()
+        adder.join(5)
+        resizer.join(5)
+
+        # الحجم القديم لم يعد مطابقاً بعد الإضافة فلا يُستبدل
+        self.assertEqual(summary.source_size, 20)
+        reloaded = ShotStatsSummary(self.path)
+        self.assertEqual((reloaded.total_shots, reloaded.source_size), (2, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات ملخصات التوزيع - quantile_sketch Tests
+"""
+
+import bisect
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from quantile_sketch import QuantileSketch
+
+
+def _rank_error(sketch, ordered):
+    """أكبر فرق بين الرتبة الحقيقية للمئين المقدّر والمئين المطلوب"""
+    n = len(ordered)
+    return max(
+        abs(bisect.bisect_right(ordered, sketch.quantile(q / 100)) / n - q / 100)
+        for q in range(1, 100)
+    )
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """المئينات ضمن خطأ الرتبة المتوقع بذاكرة محدودة"""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.values = [rng.gauss(60, 15) for _ in range(50_000)]
+        self.ordered = sorted(self.values)
+
+    def test_exact_below_capacity(self):
+        sketch = QuantileSketch()
+        sketch.extend([5.0, 1.0, 3.0, 2.0, 4.0])
+        self.assertEqual(sketch.quantile(0.5), 3.0)
+        self.assertEqual(sketch.quantile(0.0), 1.0)
+        self.assertEqual(sketch.quantile(1.0), 5.0)
+        self.assertEqual(sketch.rank(2.0), 0.4)
+
+    def test_bounded_memory_and_accuracy(self):
+        sketch = QuantileSketch(seed=1)
+        sketch.extend(self.values)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertLess(sketch.retained, 1_000)
+        self.assertLess(_rank_error(sketch, self.ordered), 0.02)
+        self.assertEqual(sketch.min, self.ordered[0])
+        self.assertEqual(sketch.max, self.ordered[-1])
+
+    def test_merge_matches_single_stream(self):
+        """دمج ملخصات عدة عمليات يعطي نفس دقة ملخص واحد"""
+        parts = [QuantileSketch(seed=i) for i in range(4)]
+        for index, value in enumerate(self.values):
+            parts[index % 4].update(value)
+        merged = QuantileSketch.merged(parts, seed=9)
+        self.assertEqual(merged.count, len(self.values))
+        self.assertLess(merged.retained, 1_000)
+        self.assertLess(_rank_error(merged, self.ordered), 0.02)
+
+    def test_copy_is_independent(self):
+        sketch = QuantileSketch(k=16, seed=1)
+        sketch.extend(self.values[:1_000])
+        published = sketch.copy()
+        expected = published.summary()
+        sketch.extend(self.values[1_000:2_000])
+
+        self.assertEqual(published.count, 1_000)
+        self.assertEqual(published.summary(), expected)
+        self.assertEqual(sketch.count, 2_000)
+
+    def test_roundtrip_through_json(self):
+        sketch = QuantileSketch(seed=2)
+        sketch.extend(self.values)
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        self.assertEqual(restored.count, sketch.count)
+        for q in (0.1, 0.5, 0.9):
+            self.assertEqual(restored.quantile(q), sketch.quantile(q))
+
+    def test_corrupted_state_rejected(self):
+        data = QuantileSketch().to_dict()
+        data['count'] = 5
+        with self.assertRaises(ValueError):
+            QuantileSketch.from_dict(data)
+
+    def test_histogram_counts_every_value(self):
+        sketch = QuantileSketch(seed=3)
+        sketch.extend(self.values)
+        bins = sketch.histogram(8)
+        self.assertEqual(len(bins), 8)
+        self.assertEqual(sum(b['count'] for b in bins), len(self.values))
+        self.assertEqual(bins[0]['low'], sketch.min)
+        self.assertEqual(bins[-1]['high'], sketch.max)
+
+        exact = sum(1 for v in self.values if 50 <= v <= 70)
+        counted = sketch.histogram(1, 50, 70)[0]['count']
+        self.assertLess(abs(counted - exact) / len(self.values), 0.02)
+
+    def test_empty_and_invalid(self):
+        sketch = QuantileSketch()
+        sketch.update(None)
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertEqual(sketch.histogram(), [])
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+        with self.assertRaises(ValueError):
+            QuantileSketch(k=4)
+
+
+class TestEngineDistributions(unittest.TestCase):
+    """ملخصات المحرك تُحدّث مع كل تسديقة وتُعاد بناؤها عند التحميل"""
+
+    def test_engine_distributions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            for white_ball in range(11):
+                engine.calculate_shot(2, 5.0, float(white_ball), 3.0, 1)
+
+            rates = sorted(s.success_rate for s in engine.shots)
+            distribution = engine.get_distribution("success_rate", [0, 50, 100])
+            self.assertEqual(distribution["count"], 11)
+            self.assertEqual(distribution["percentiles"]["p50"], rates[5])
+            self.assertEqual(distribution["max"], rates[-1])
+
+            powers = [
+                engine.calculator.calculate_power_required(2, float(w), 3.0) for w in range(11)
+            ]
+            self.assertEqual(engine.get_distribution("power")["min"], round(min(powers), 2))
+            histogram = engine.get_histogram("angle", bins=4)
+            self.assertEqual(sum(b["count"] for b in histogram["bins"]), 11)
+
+            reloaded = BilliardsEngine(data_dir=tmp)
+            self.assertEqual(reloaded.export_distributions(), engine.export_distributions())
+            with self.assertRaises(ValueError):
+                reloaded.get_distribution("spin")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات سجل المحركات متعدد المستأجرين - EngineRegistry Tests
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from backend.billiards.registry import (
+    DEFAULT_TENANT, ENGINE_BASE_BYTES, EngineRegistry, split_tenant_path, validate_tenant,
+)
+
+
+class TestTenantPaths(unittest.TestCase):
+    """فصل المستأجر عن المسار والتحقق منه"""
+
+    def test_split(self):
+        self.assertEqual(split_tenant_path("/api/v1/shots"), (DEFAULT_TENANT, "/api/v1/shots"))
+        self.assertEqual(
+            split_tenant_path("/api/v1/tenants/table-7/shots/3/record"),
+            ("table-7", "/api/v1/shots/3/record"),
+        )
+
+    def test_invalid(self):
+        for tenant in ("", "../etc", "a b", "x" * 65):
+            with self.assertRaises(ValueError):
+                validate_tenant(tenant)
+        with self.assertRaises(ValueError):
+            split_tenant_path("/api/v1/tenants/../shots")
+
+
+class TestEngineRegistry(unittest.TestCase):
+    """التحميل الكسول والعزل والطرد"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.base = Path(self.tmp.name)
+
+    def test_lazy_load_and_isolation(self):
+        registry = EngineRegistry(str(self.base))
+        self.assertNotIn("alice", registry)
+        with registry.acquire("alice") as alice:
+            alice.calculate_shot(2, 5.0, 3.0, 2.0, 1)
+        with registry.acquire("bob") as bob:
+            self.assertEqual(len(bob.shots), 0)
+        with registry.acquire("alice") as again:
+            self.assertIs(again, alice)
+
+        self.assertEqual(alice.data_dir, self.base / "alice")
+        stats = registry.get_stats()
+        self.assertEqual((stats["loads"], stats["hits"]), (2, 1))
+        self.assertEqual(stats["tenants"], {"alice": 1, "bob": 0})
+
+    def test_lru_eviction_flushes_to_disk(self):
+        registry = EngineRegistry(str(self.base), max_engines=2)
+        with registry.acquire("a") as engine:
+            engine.calculate_shot(1, 5.0, 3.0, 2.0, 1)
+        with registry.acquire("b"):
+            pass
+        with registry.acquire("a"):
+            pass  # b أصبح الأقدم استخداماً
+        with registry.acquire("c"):
+            pass
+
+        self.assertIn("a", registry)
+        self.assertNotIn("b", registry)
+        self.assertEqual(registry.evictions, 1)
+
+        with registry.acquire("d"):
+            pass
+        self.assertNotIn("a", registry)
+        with registry.acquire("a") as reloaded:
+            self.assertIsNot(reloaded, engine)
+            self.assertEqual(len(reloaded.shots), 1)
+
+    def test_memory_budget(self):
+        # الميزانية تكفي لمحرك واحد فقط
+        registry = EngineRegistry(str(self.base), memory_budget_mb=ENGINE_BASE_BYTES * 1.5 / 1024 / 1024)
+        for tenant in ("a", "b", "c"):
+            with registry.acquire(tenant):
+                pass
+        self.assertEqual(registry.get_stats()["resident"], 1)
+        self.assertIn("c", registry)
+
+    def test_pinned_engine_not_evicted(self):
+        registry = EngineRegistry(str(self.base), max_engines=1)
+        with registry.acquire("a") as pinned:
+            with registry.acquire("b"):
+                pass
+            self.assertIn("a", registry)
+            with registry.acquire("a") as same:
+                self.assertIs(same, pinned)
+        self.assertIn("a", registry)
+        self.assertNotIn("b", registry)
+
+    def test_request_during_flush_resurrects_engine(self):
+        """طلب يصل أثناء حفظ محرك مطرود يحصل على نفس الكائن"""
+        saving = threading.Event()
+        resume = threading.Event()
+
+        class SlowEngine(BilliardsEngine):
+            def save_to_storage(self):
+                saving.set()
+                resume.wait(5)
+                super().save_to_storage()
+
+        registry = EngineRegistry(str(self.base), max_engines=1, factory=lambda d: SlowEngine(data_dir=d))
+        with registry.acquire("a") as first:
+            first.calculate_shot(1, 5.0, 3.0, 2.0, 1)
+
+        def evict_a():
+            with registry.acquire("b"):
+                pass
+
+        thread = threading.Thread(target=evict_a)
+        thread.start()
+        self.assertTrue(saving.wait(5))
+        with registry.acquire("a") as during:
+            self.assertIs(during, first)
+        resume.set()
+        thread.join(5)
+        self.assertEqual(registry.loads, 2)
+
+    def test_concurrent_first_requests_load_once(self):
+        loads = []
+
+        def factory(data_dir):
+            loads.append(data_dir)
+            return BilliardsEngine(data_dir=data_dir)
+
+        registry = EngineRegistry(str(self.base), factory=factory)
+        engines = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            with registry.acquire("shared") as engine:
+                engines.append(engine)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(len({id(e) for e in engines}), 1)
+
+    def test_reads_do_not_create_tenant_dirs(self):
+        registry = EngineRegistry(str(self.base), max_engines=1)
+        with registry.acquire("ghost") as ghost:
+            self.assertEqual(len(ghost.shots), 0)
+        with registry.acquire("writer") as writer:  # يطرد ghost ويحفظه
+            writer.calculate_shot(1, 5.0, 3.0, 2.0, 1)
+        registry.flush_all()
+
+        self.assertEqual(registry.evictions, 1)
+        self.assertFalse((self.base / "ghost").exists())
+        self.assertTrue((self.base / "writer" / "shots.json").exists())
+
+    def test_flush_all_saves_pending_rollups(self):
+        registry = EngineRegistry(str(self.base))
+        with registry.acquire("a") as engine:
+            engine.calculate_shot(1, 5.0, 3.0, 2.0, 1)
+        self.assertFalse(engine.rollups.path.exists())  # الحفظ بعد دفعة من الكتابات
+        registry.flush_all()
+        self.assertTrue(engine.rollups.load(1))
+
+    def test_default_tenant_uses_default_dir(self):
+        default_dir = self.base / "legacy"
+        registry = EngineRegistry(str(self.base / "tenants"), default_dir=str(default_dir))
+        with registry.acquire() as engine:
+            self.assertEqual(engine.data_dir, default_dir)
+        with self.assertRaises(ValueError):
+            with registry.acquire("bad/name"):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
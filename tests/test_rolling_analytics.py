@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات النوافذ المتحركة - rolling_analytics Tests
+"""
+
+import json
+import random
+import statistics
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from rolling_analytics import DOWN, FLAT, UP, RollingAnalytics
+
+
+def _window(values, size):
+    return [v for v in values[-size:] if v is not None]
+
+
+class TestRollingAnalytics(unittest.TestCase):
+    """المجاميع المتحركة مطابقة لإعادة الحساب الكاملة"""
+
+    def setUp(self):
+        rng = random.Random(4)
+        self.values = [None if rng.random() < 0.1 else rng.uniform(0, 100) for _ in range(1_500)]
+
+    def test_windows_match_recomputation(self):
+        analytics = RollingAnalytics()
+        for index, value in enumerate(self.values, 1):
+            analytics.push(value)
+            if index % 97 == 0 or index == len(self.values):
+                for size in (10, 50, 500):
+                    expected = _window(self.values[:index], size)
+                    self.assertAlmostEqual(analytics.mean(size), statistics.fmean(expected), places=9)
+                    self.assertAlmostEqual(analytics.stdev(size), statistics.stdev(expected), places=6)
+
+    def test_trend_matches_previous_slicing(self):
+        """نفس نتيجة مقارنة shots[-10:] مع shots[-20:-10]"""
+        analytics = RollingAnalytics()
+        analytics.extend(self.values)
+        recent = statistics.fmean(_window(self.values, 10))
+        older = statistics.fmean(_window(self.values[:-10], 10))
+        trend = analytics.trend()
+        self.assertAlmostEqual(trend['improvement'], recent - older, places=9)
+        self.assertIn(trend['direction'], (UP, DOWN, FLAT))
+
+    def test_trend_without_history_uses_neutral(self):
+        analytics = RollingAnalytics()
+        self.assertIsNone(analytics.trend())
+        analytics.extend([80, 90, None])
+        trend = analytics.trend()
+        self.assertEqual(trend['previous'], 50.0)
+        self.assertEqual(trend['direction'], UP)
+
+    def test_time_windows_and_ewma(self):
+        analytics = RollingAnalytics(time_windows=(60,), ewma_spans=(3,))
+        analytics.push(100, timestamp=0)
+        analytics.push(0, timestamp=30)
+        self.assertEqual(analytics.time_mean(60, now=59), 50)
+        self.assertEqual(analytics.time_mean(60, now=61), 0)
+        self.assertEqual(analytics.ewma(3), 50)  # alpha = 0.5
+
+    def test_copy_is_independent_and_reads_do_not_evict(self):
+        analytics = RollingAnalytics(time_windows=(60,))
+        analytics.push(100, timestamp=0)
+        analytics.push(0, timestamp=30)
+        published = analytics.copy()
+        analytics.push(40, timestamp=40)
+
+        self.assertEqual(published.time_mean(60, now=61), 0)
+        # القراءة بوقت لاحق لا تحذف من النافذة
+        self.assertEqual(published.time_mean(60, now=59), 50)
+        self.assertEqual((len(published), published.mean(10)), (2, 50))
+        self.assertEqual(analytics.time_mean(60, now=61), 20)
+
+    def test_state_roundtrip(self):
+        analytics = RollingAnalytics(time_windows=(100,))
+        for second, value in enumerate(self.values):
+            analytics.push(value, timestamp=second)
+        restored = RollingAnalytics(time_windows=(100,))
+        restored.load_dict(json.loads(json.dumps(analytics.to_dict())))
+        self.assertEqual(restored.snapshot(now=1_500), analytics.snapshot(now=1_500))
+
+        analytics.push(10, timestamp=1_500)
+        restored.push(10, timestamp=1_500)
+        self.assertEqual(restored.snapshot(now=1_500), analytics.snapshot(now=1_500))
+
+        with self.assertRaises(ValueError):
+            RollingAnalytics(windows=(5,)).load_dict(analytics.to_dict())
+
+
+class TestEngineTrends(unittest.TestCase):
+    """المحرك يحدّث النوافذ مع كل تنفيذ ويعيد بناءها عند التحميل"""
+
+    def test_engine_trends(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            for successful in (True, True, False, True):
+                engine.record_execution(engine.calculate_shot(1, 5.0, 3.0, 4.0, 2), successful)
+            trends = engine.get_trends()
+            self.assertEqual(trends['windows']['10'], {'count': 4, 'mean': 75.0, 'stdev': 50.0})
+            self.assertEqual(trends['time_windows']['3600'], 75.0)
+
+            reloaded = BilliardsEngine(data_dir=tmp)
+            self.assertEqual(reloaded.get_trends()['windows'], trends['windows'])
+
+
+if __name__ == '__main__':
+    unittest.main()
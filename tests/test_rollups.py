@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات جداول التجميع الزمني - RollupStore Tests
+"""
+
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.analytics.rollups import RollupStore, cover
+from backend.billiards.engine import BilliardsEngine
+from backend.models.shot import Difficulty, Shot, ShotResult
+
+YEAR_START = datetime(2025, 1, 1)
+
+
+def _shots(count, seed=2):
+    rng = random.Random(seed)
+    shots = []
+    for _ in range(count):
+        shot = Shot(
+            rails=rng.randint(1, 4),
+            cue_position=5.0,
+            white_ball=3.0,
+            target=4.0,
+            pocket=rng.randint(0, 5),
+            difficulty=rng.choice(list(Difficulty)),
+            success_rate=rng.choice([30.0, 50.0, 90.0]),
+            timestamp=YEAR_START + timedelta(minutes=rng.randrange(366 * 24 * 60)),
+        )
+        if rng.random() < 0.6:
+            shot.executed = True
+            shot.result = ShotResult.SUCCESSFUL if rng.random() < 0.5 else ShotResult.FAILED
+        shots.append(shot)
+    return shots
+
+
+class TestCover(unittest.TestCase):
+    """تغطية الفترة بأقل عدد من الخانات"""
+
+    def test_year_uses_month_buckets(self):
+        buckets = cover(datetime(2025, 1, 1), datetime(2026, 1, 1))
+        self.assertEqual(len(buckets), 12)
+        self.assertTrue(all(level == "month" for level, _ in buckets))
+
+    def test_ragged_edges(self):
+        start, end = datetime(2025, 3, 30, 22, 58), datetime(2025, 6, 2, 1, 3)
+        buckets = cover(start, end)
+        self.assertEqual(buckets[0], ("minute", start))
+        self.assertEqual([b for b in buckets if b[0] == "month"],
+                         [("month", datetime(2025, 4, 1)), ("month", datetime(2025, 5, 1))])
+        # الخانات متجاورة وتغطي الفترة بالضبط
+        self.assertEqual(buckets[-1], ("minute", datetime(2025, 6, 2, 1, 2)))
+        self.assertEqual(len(buckets), 11)  # 2 دقيقة + ساعة + يوم + شهران + يوم + ساعة + 3 دقائق
+
+
+class TestRollupStore(unittest.TestCase):
+    """مطابقة المجاميع للمرور الكامل على التسديقات"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.shots = _shots(3_000)
+        cls.store = RollupStore()
+        cls.store.rebuild(cls.shots)
+
+    def _scan(self, start, end, **filters):
+        selected = [
+            s for s in self.shots
+            if start <= s.timestamp < end
+            and all(getattr(s, k) == v for k, v in filters.items() if k != "difficulty")
+            and ("difficulty" not in filters or s.difficulty.value == filters["difficulty"])
+        ]
+        executed = [s for s in selected if s.executed]
+        return len(selected), len(executed), sum(1 for s in executed if s.result == ShotResult.SUCCESSFUL)
+
+    def test_ranges_match_scan(self):
+        rng = random.Random(8)
+        for _ in range(30):
+            start = YEAR_START + timedelta(minutes=rng.randrange(300 * 24 * 60))
+            end = start + timedelta(minutes=rng.randrange(1, 90 * 24 * 60))
+            with self.subTest(start=start, end=end):
+                groups = self.store.query(start, end, {"rails": 2})["groups"]
+                expected = self._scan(start, end, rails=2)
+                got = (groups[0]["calculated"], groups[0]["executed"], groups[0]["successful"]) if groups else (0, 0, 0)
+                self.assertEqual(got, expected)
+
+    def test_group_by_and_series(self):
+        end = datetime(2026, 1, 2)
+        result = self.store.query(YEAR_START, end, group_by=["rails", "difficulty"])
+        self.assertEqual(sum(g["calculated"] for g in result["groups"]), len(self.shots))
+        self.assertEqual(len({(g["rails"], g["difficulty"]) for g in result["groups"]}), 20)
+
+        series = self.store.series(YEAR_START, datetime(2025, 1, 8), "day", {"pocket": 3})
+        for point in series:
+            day = datetime.fromisoformat(point["start"])
+            self.assertEqual(point["groups"][0]["calculated"], self._scan(day, day + timedelta(days=1), pocket=3)[0])
+
+    def test_invalid_queries(self):
+        with self.assertRaises(ValueError):
+            self.store.query(YEAR_START, YEAR_START)
+        with self.assertRaises(ValueError):
+            self.store.query(YEAR_START, datetime(2025, 2, 1), group_by=["cue"])
+        with self.assertRaises(ValueError):
+            self.store.series(YEAR_START, datetime(2025, 2, 1), "week")
+
+    def test_pruned_levels_widen_query_edges(self):
+        store = RollupStore()
+        store.rebuild(self.shots)
+        now = datetime(2025, 9, 10, 12, 30)
+        self.assertGreater(store.prune(now), 0)
+        # الدقائق حتى 2025-09-08 12:00 والساعات حتى 2025-06-10 محذوفة
+        self.assertTrue(all(s >= datetime(2025, 9, 8, 12) for s in store._levels["minute"]))
+        self.assertTrue(all(s >= datetime(2025, 6, 10) for s in store._levels["hour"]))
+
+        rng = random.Random(9)
+        for _ in range(30):
+            start = YEAR_START + timedelta(minutes=rng.randrange(350 * 24 * 60))
+            end = start + timedelta(minutes=rng.randrange(1, 20 * 24 * 60))
+            with self.subTest(start=start, end=end):
+                result = store.query(start, end, {"rails": 2})
+                widened = datetime.fromisoformat(result["start"]), datetime.fromisoformat(result["end"])
+                self.assertLessEqual(widened[0], start)
+                self.assertGreaterEqual(widened[1], end)
+                groups = result["groups"]
+                got = (groups[0]["calculated"], groups[0]["executed"], groups[0]["successful"]) if groups else (0, 0, 0)
+                self.assertEqual(got, self._scan(*widened, rails=2))
+
+        start, end = datetime(2025, 3, 4, 5, 17), datetime(2025, 9, 9, 8, 41)
+        result = store.query(start, end)
+        self.assertEqual((result["start"], result["end"]), ("2025-03-04T00:00:00", end.isoformat()))
+
+    def test_batched_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RollupStore(Path(tmp) / "rollups.json", save_every=3, save_interval=3600)
+            for shot in self.shots[:2]:
+                store.add_shot(shot)
+                self.assertFalse(store.maybe_save())
+            store.add_shot(self.shots[2])
+            self.assertTrue(store.maybe_save())
+            self.assertTrue(store.path.exists())
+
+            # أول تغيير بعد الحفظ يحذف الملف حتى لا يُحمّل ناقصاً بعد توقف مفاجئ
+            store.add_shot(self.shots[3])
+            self.assertFalse(store.path.exists())
+            store.flush()
+            self.assertTrue(RollupStore(store.path).load(4))
+
+
+class TestEngineRollups(unittest.TestCase):
+    """المحرك يحدّث الجداول مع كل كتابة ويحفظها"""
+
+    def test_maintained_on_write_and_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            shot = engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+            engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+            engine.record_execution(shot, False)
+            engine.record_execution(shot, True)  # إعادة التسجيل تستبدل النتيجة السابقة
+
+            day = shot.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+            row = engine.rollups.query(day, day + timedelta(days=1))["groups"][0]
+            self.assertEqual((row["calculated"], row["executed"], row["successful"]), (2, 1, 1))
+
+            engine.save_to_storage()
+            reloaded = BilliardsEngine(data_dir=tmp)
+            self.assertTrue(reloaded.rollups.load(2))
+            self.assertEqual(reloaded.rollups.query(day, day + timedelta(days=1))["groups"][0], row)
+
+    def test_unsaved_writes_rebuild_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = BilliardsEngine(data_dir=tmp)
+            shot = engine.calculate_shot(2, 5.0, 3.0, 4.0, 1)
+            engine.save_to_storage()
+            engine.record_execution(shot, True)  # لم تُحفظ الجداول بعدها (توقف مفاجئ)
+
+            day = shot.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+            reloaded = BilliardsEngine(data_dir=tmp)
+            row = reloaded.rollups.query(day, day + timedelta(days=1))["groups"][0]
+            self.assertEqual((row["calculated"], row["executed"], row["successful"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات الخادم البديل - run_server Tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# مجلدات البيانات مؤقتة قبل تحميل الإعدادات حتى لا تُلوث بيانات المستخدم
+_TMP = tempfile.TemporaryDirectory(prefix="billiards-server-test-")
+os.environ.setdefault("TENANTS_DIR", os.path.join(_TMP.name, "tenants"))
+
+with mock.patch.object(Path, "home", return_value=Path(_TMP.name)):
+    import run_server
+
+from backend.billiards.registry import EngineRegistry
+from backend.services.admission import ConcurrencyLimiter, RateLimiter
+
+CALCULATE = "rails=2&cue_position=5&white_ball=3&target=4&pocket=1"
+
+
+def tearDownModule():
+    _TMP.cleanup()
+
+
+class TestRunServer(unittest.TestCase):
+    """التوجيه حسب المستأجر (_dispatch) وحدود القبول (_admitted)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        registry = EngineRegistry(os.path.join(tmp.name, "tenants"),
+                                  default_dir=os.path.join(tmp.name, "default"))
+        for name, value in (("registry", registry),
+                            ("rate_limiter", RateLimiter(rate=0)),
+                            ("concurrency", ConcurrencyLimiter(max_active=4))):
+            patcher = mock.patch.object(run_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), run_server.BilliardsAPIHandler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def request(self, method, path, headers=None):
+        """الحالة والرد والترويسات (بدون رفع استثناء لأخطاء HTTP)"""
+        request = Request(self.url + path, method=method, headers=headers or {})
+        try:
+            with urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except HTTPError as e:
+            return e.code, json.loads(e.read()), e.headers
+
+    def test_tenant_routing(self):
+        self.assertEqual(self.request("POST", f"/api/v1/calculate?{CALCULATE}")[0], 200)
+        for _ in range(2):
+            status, _, _ = self.request("POST", f"/api/v1/tenants/table-1/calculate?{CALCULATE}")
+            self.assertEqual(status, 200)
+
+        self.assertEqual(self.request("GET", "/api/v1/shots")[1]["total"], 1)
+        self.assertEqual(self.request("GET", "/api/v1/tenants/table-1/shots")[1]["total"], 2)
+        self.assertEqual(self.request("GET", "/api/v1/tenants/bad%20name/shots")[0], 400)
+
+        status, _, _ = self.request("POST", "/api/v1/tenants/table-1/shots/1/record?successful=true")
+        self.assertEqual(status, 200)
+        self.assertEqual(self.request("POST", "/api/v1/shots/5/record?successful=true")[0], 400)
+
+    def test_rate_limited(self):
+        with mock.patch.object(run_server, "rate_limiter", RateLimiter(rate=1, burst=1)):
+            self.assertEqual(self.request("GET", "/api/v1/shots")[0], 200)
+            status, body, headers = self.request("GET", "/api/v1/shots")
+            self.assertEqual((status, headers["Retry-After"]), (429, "1"))
+            self.assertIn("error", body)
+            self.assertEqual(self.request("GET", "/api/v1/shots", {"X-API-Key": "k"})[0], 200)
+            self.assertEqual(self.request("GET", "/api/v1/metrics")[0], 200)
+
+    def test_overloaded(self):
+        run_server.concurrency.active = run_server.concurrency.max_active
+        status, _, headers = self.request("GET", "/api/v1/shots")
+        self.assertEqual(status, 503)
+        self.assertIn("Retry-After", headers)
+        self.assertEqual(run_server.concurrency.rejected, 1)
+        # فحص الحيوية لا يمر بحدود القبول
+        self.assertEqual(self.request("GET", "/livez")[0], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات الذاكرة المؤقتة المشتركة - SharedCache / SingleFlight Tests
+"""
+
+import sys
+import time
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.cache import MemoryCacheBackend, SharedCache, create_backend
+from backend.services.singleflight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    """اختبارات دمج الحسابات المتزامنة"""
+
+    def test_concurrent_calls_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        results = _run_concurrently(8, lambda: flight.do("key", compute))
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_error_propagates_to_caller(self):
+        flight = SingleFlight()
+        with self.assertRaises(ZeroDivisionError):
+            flight.do("key", lambda: 1 / 0)
+        self.assertEqual(flight.do("key", lambda: "ok"), "ok")
+
+
+class TestSharedCache(unittest.TestCase):
+    """اختبارات التخزين بالإصدار والحماية من التدافع"""
+
+    def test_hit_after_first_compute(self):
+        cache = SharedCache(MemoryCacheBackend())
+        calls = []
+        compute = lambda: calls.append(1) or {"total": 3}
+
+        self.assertEqual(cache.get_or_compute("shots", "statistics", compute), {"total": 3})
+        self.assertEqual(cache.get_or_compute("shots", "statistics", compute), {"total": 3})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_invalidate_bumps_version(self):
+        cache = SharedCache(MemoryCacheBackend())
+        values = iter([1, 2])
+        cache.get_or_compute("shots", "count", lambda: next(values))
+
+        cache.invalidate("shots")
+        self.assertEqual(cache.version("shots"), 1)
+        self.assertEqual(cache.get_or_compute("shots", "count", lambda: next(values)), 2)
+
+    def test_workers_sharing_backend_compute_once(self):
+        """عدة عمال (نسخ SharedCache) على نفس الخلفية يحسبون القيمة مرة واحدة"""
+        backend = MemoryCacheBackend()
+        workers = [SharedCache(backend, poll_interval=0.005) for _ in range(4)]
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "page"
+
+        index = iter(range(8))
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                worker = workers[next(index) % len(workers)]
+            return worker.get_or_compute("shots", "page:1", compute)
+
+        self.assertEqual(_run_concurrently(8, request), ["page"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_disabled_always_computes(self):
+        cache = SharedCache(MemoryCacheBackend(), enabled=False)
+        calls = []
+        for _ in range(2):
+            cache.get_or_compute("shots", "statistics", lambda: calls.append(1) or 0)
+        self.assertEqual(len(calls), 2)
+
+    def test_memory_backend_expiry(self):
+        backend = create_backend("memory://")
+        backend.set("key", "value", ttl=0.01)
+        self.assertTrue(backend.add("lock", "1", ttl=0.01))
+        self.assertFalse(backend.add("lock", "1", ttl=0.01))
+        time.sleep(0.02)
+        self.assertIsNone(backend.get("key"))
+        self.assertTrue(backend.add("lock", "1"))
+
+    def test_memory_backend_drops_old_versions(self):
+        backend = MemoryCacheBackend(max_entries=50)
+        cache = SharedCache(backend, ttl=0.01)
+        for i in range(2_000):
+            cache.invalidate("shots")
+            self.assertEqual(cache.get_or_compute("shots", "statistics", lambda: i), i)
+            if i % 500 == 0:
+                time.sleep(0.02)
+        self.assertLessEqual(len(backend), 50)
+
+        # العمر لا يكفي: الأقدم استخداماً يُطرد، وعدادات الإصدار تبقى
+        backend = MemoryCacheBackend(max_entries=3)
+        backend.incr("version")
+        for key in "abc":
+            backend.set(key, key, ttl=60)
+        backend.get("b")
+        backend.set("e", "e", ttl=60)
+        self.assertEqual([backend.get(k) for k in "abce"], [None, "b", None, "e"])
+        self.assertEqual(backend.incr("version"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
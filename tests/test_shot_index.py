@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات فهرس التسديقات المشابهة - ShotIndex Tests
+"""
+
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.engine import BilliardsEngine
+from backend.billiards.shot_index import ShotIndex, neighborhood_statistics
+from backend.models.shot import Shot
+
+
+def _distance2(shot, point):
+    return (shot.white_ball - point[0]) ** 2 + (shot.target - point[1]) ** 2 + (shot.cue_position - point[2]) ** 2
+
+
+class TestShotIndex(unittest.TestCase):
+    """مطابقة البحث بالشبكة للمرور الخطي"""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(11)
+        cls.shots = [
+            Shot(
+                rails=rng.randint(1, 4),
+                cue_position=round(rng.uniform(0, 10), 1),
+                white_ball=round(rng.uniform(0, 10), 1),
+                target=round(rng.uniform(0, 10), 1),
+                pocket=rng.randint(0, 5),
+            )
+            for _ in range(3_000)
+        ]
+        cls.index = ShotIndex(cell_size=0.5)
+        cls.index.rebuild(cls.shots)
+        cls.queries = [tuple(rng.uniform(0, 10) for _ in range(3)) for _ in range(25)] + [(0, 0, 0), (10, 10, 10)]
+
+    def _linear(self, point, rails):
+        return sorted(
+            (_distance2(s, point), i) for i, s in enumerate(self.shots) if rails is None or s.rails == rails
+        )
+
+    def test_knn_matches_linear_scan(self):
+        for point in self.queries:
+            for rails in (None, 2):
+                with self.subTest(point=point, rails=rails):
+                    expected = [i for _, i in self._linear(point, rails)[:7]]
+                    self.assertEqual([n.shot_id for n in self.index.knn(*point, rails=rails, k=7)], expected)
+
+    def test_radius_matches_linear_scan(self):
+        for point in self.queries:
+            expected = [i for d2, i in self._linear(point, 3) if d2 <= 1.2 ** 2]
+            found = self.index.radius(*point, radius=1.2, rails=3)
+            self.assertEqual([n.shot_id for n in found], expected)
+
+    def test_incremental_insert(self):
+        index = ShotIndex()
+        self.assertEqual(index.knn(5, 5, 5, k=3), [])
+        index.add(0, Shot(rails=1, cue_position=5, white_ball=5, target=5, pocket=0))
+        index.add(1, Shot(rails=1, cue_position=9, white_ball=9, target=9, pocket=0))
+        self.assertEqual([n.shot_id for n in index.knn(8, 8, 8, rails=1, k=2)], [1, 0])
+        self.assertEqual(index.knn(8, 8, 8, rails=2, k=2), [])
+        self.assertEqual(len(index), 2)
+
+    def test_invalid_query(self):
+        with self.assertRaises(ValueError):
+            self.index.knn(11, 0, 0)
+        with self.assertRaises(ValueError):
+            self.index.knn(1, 1, 1, rails=5)
+        with self.assertRaises(ValueError):
+            self.index.radius(1, 1, 1, radius=-1)
+
+
+class TestEngineSimilarShots(unittest.TestCase):
+    """الفهرس يتبع حسابات المحرك ونتائج التنفيذ"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = BilliardsEngine(data_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_statistics_follow_recorded_results(self):
+        first = self.engine.calculate_shot(1, 5.0, 3.0, 4.0, 2)
+        second = self.engine.calculate_shot(1, 5.2, 3.1, 4.0, 2)
+        self.engine.calculate_shot(3, 1.0, 9.0, 9.0, 0)
+        self.engine.record_execution(first, True)
+        self.engine.record_execution(second, False)
+
+        result = self.engine.find_similar(3.0, 4.0, 5.0, rails=1, k=5)
+        self.assertEqual([n["shot_id"] for n in result["neighbors"]], [0, 1])
+        stats = result["statistics"]
+        self.assertEqual((stats["count"], stats["executed"], stats["successful"]), (2, 2, 1))
+        self.assertEqual(stats["success_rate"], 50.0)
+
+        nearby = self.engine.find_similar(3.0, 4.0, 5.0, radius=0.5)
+        self.assertEqual(nearby["statistics"]["count"], 2)
+
+    def test_index_rebuilt_on_load(self):
+        self.engine.calculate_shot(2, 4.0, 2.0, 2.0, 1)
+        reloaded = BilliardsEngine(data_dir=self.tmp.name)
+        self.assertEqual(len(reloaded.index), 1)
+        self.assertEqual(reloaded.find_similar(2.0, 2.0, 4.0)["neighbors"][0]["distance"], 0)
+
+    def test_empty_neighborhood(self):
+        stats = neighborhood_statistics([])
+        self.assertEqual(stats["count"], 0)
+        self.assertIsNone(stats["success_rate"])
+
+
+if __name__ == "__main__":
+    unittest.main()
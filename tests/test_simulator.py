@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات محاكي مونت كارلو - MonteCarloSimulator Tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards.simulator import (
+    MonteCarloSimulator, NoiseModel, ShotParameters, success_rate, wilson_interval,
+)
+
+SHOT = ShotParameters(angle=20, power=55, distance=120, difficulty=3)
+
+
+class TestMonteCarloSimulator(unittest.TestCase):
+    """التوزيعات وفترات الثقة والتخزين"""
+
+    def setUp(self):
+        self.simulator = MonteCarloSimulator(chunk_size=2_000)
+
+    def test_without_noise_matches_deterministic_rate(self):
+        result = self.simulator.simulate(SHOT, NoiseModel(distribution="none"), samples=5_000)
+        expected = success_rate(20, 55, 120, 3)
+
+        self.assertEqual(result["deterministic_rate"], round(expected, 2))
+        self.assertAlmostEqual(result["probability"]["mean"], expected, places=2)
+        self.assertEqual(result["probability"]["std"], 0)
+        interval = result["confidence_interval"]
+        self.assertLessEqual(interval["low"], expected)
+        self.assertGreaterEqual(interval["high"], expected)
+
+    def test_same_seed_reproducible_and_cached(self):
+        first = self.simulator.simulate(SHOT, samples=5_000, seed=7)
+        self.assertIs(self.simulator.simulate(SHOT, samples=5_000, seed=7), first)
+
+        other = MonteCarloSimulator(chunk_size=2_000).simulate(SHOT, samples=5_000, seed=7)
+        self.assertEqual(other, first)
+        self.assertEqual(sum(first["histogram"]["counts"]), 5_000)
+
+    def test_noise_widens_distribution(self):
+        narrow = self.simulator.simulate(SHOT, NoiseModel(angle=0.5, power=1), samples=5_000)
+        wide = self.simulator.simulate(SHOT, NoiseModel(angle=20, power=30, distance=60), samples=5_000)
+        self.assertGreater(wide["probability"]["std"], narrow["probability"]["std"])
+        percentiles = wide["probability"]["percentiles"]
+        self.assertLessEqual(percentiles["p5"], percentiles["p50"])
+        self.assertLessEqual(percentiles["p50"], percentiles["p95"])
+
+    def test_process_pool_gives_same_result(self):
+        """القطع لها بذور مستقلة فالنتيجة لا تتغير بعدد العمال"""
+        pooled = MonteCarloSimulator(workers=2, chunk_size=1_000)
+        try:
+            result = pooled.simulate(SHOT, samples=3_000, seed=3)
+        finally:
+            pooled.close()
+        self.assertEqual(result, MonteCarloSimulator(chunk_size=1_000).simulate(SHOT, samples=3_000, seed=3))
+
+    def test_cache_key_depends_on_parameters(self):
+        noise = NoiseModel()
+        key = MonteCarloSimulator.cache_key(SHOT, noise, 1000, 0, 0.95)
+        self.assertEqual(key, MonteCarloSimulator.cache_key(SHOT, NoiseModel(), 1000, 0, 0.95))
+        self.assertNotEqual(key, MonteCarloSimulator.cache_key(SHOT, noise, 1000, 1, 0.95))
+
+    def test_invalid_parameters_rejected(self):
+        with self.assertRaises(ValueError):
+            self.simulator.simulate(ShotParameters(angle=20, power=55, distance=120, cue_type="x"))
+        with self.assertRaises(ValueError):
+            self.simulator.simulate(SHOT, NoiseModel(distribution="cauchy"))
+        with self.assertRaises(ValueError):
+            MonteCarloSimulator(max_samples=10).simulate(SHOT, samples=11)
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 اختبارات مسح شبكة المعاملات - SweepService Tests
+"""
+
+import itertools
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.billiards import sweep
+from backend.billiards.calculator import ShotCalculator
+from backend.billiards.sweep import CANCELLED, DONE, SweepGrid, SweepService, evaluate_point
+
+SMALL = SweepGrid(rails=(1, 3), cue_position=(2.0, 8.0), white_ball=(1.0, 5.0, 9.0),
+                  target=(0.0, 4.0), pocket=(0, 5))
+
+
+def _rows(service, job):
+    return [json.loads(line) for line in b"".join(service.stream(job)).splitlines()]
+
+
+class TestSweepGrid(unittest.TestCase):
+    """الشبكة والتحقق من المحاور"""
+
+    def test_ranges_and_point_order(self):
+        grid = SweepGrid.from_dict({"rails": [2], "white_ball": {"start": 0, "stop": 10, "step": 2.5}})
+        self.assertEqual(grid.white_ball, (0.0, 2.5, 5.0, 7.5, 10.0))
+        self.assertEqual(grid.size, 1 * 1 * 5 * 11 * 6)
+        expected = list(itertools.product(*SMALL.axes))
+        self.assertEqual([SMALL.point(i) for i in range(SMALL.size)], expected)
+
+    def test_invalid(self):
+        for data in ({"rails": [5]}, {"pocket": [1.5]}, {"spin": [1]}, {"target": []},
+                     {"white_ball": {"start": 0, "stop": 10, "step": 0}}, {"rails": ["1"]}):
+            with self.assertRaises(ValueError, msg=data):
+                SweepGrid.from_dict(data)
+
+    def test_cache_key_ignores_duplicates(self):
+        self.assertEqual(SweepGrid(rails=(1, 1, 2)).cache_key(), SweepGrid(rails=(1, 2)).cache_key())
+        self.assertNotEqual(SweepGrid(rails=(1,)).cache_key(), SweepGrid(rails=(2,)).cache_key())
+
+
+class TestSweepService(unittest.TestCase):
+    """التنفيذ والتخزين والإلغاء"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = SweepService(self.tmp.name, chunk_size=7)
+
+    def test_rows_match_calculator(self):
+        job = self.service.submit(SMALL)
+        self.assertTrue(job.wait(10))
+        self.assertEqual((job.state, job.completed, job.progress), (DONE, SMALL.size, 1.0))
+
+        rows = _rows(self.service, job)
+        self.assertEqual(len(rows), SMALL.size)
+        calculator = ShotCalculator()
+        self.assertEqual(rows, [evaluate_point(calculator, *SMALL.point(i)) for i in range(SMALL.size)])
+        for row, point in zip(rows, itertools.product(*SMALL.axes)):
+            shot = calculator.create_shot(*point)
+            summary = calculator.get_calculation_summary(shot)
+            self.assertEqual(
+                (row["difficulty"], row["success_rate"], row["power_required"], row["angle_required"]),
+                (summary["difficulty"], summary["success_rate"], summary["power_required"],
+                 summary["angle_required"]),
+            )
+
+    def test_identical_sweep_served_from_file(self):
+        first = self.service.submit(SMALL)
+        first.wait(10)
+        restarted = SweepService(self.tmp.name, chunk_size=7)
+        with mock.patch.object(sweep, "_evaluate_chunk") as evaluate:
+            again = restarted.submit(SweepGrid(**SMALL.to_dict()))
+        evaluate.assert_not_called()
+        self.assertTrue(again.cached)
+        self.assertEqual(again.state, DONE)
+        self.assertEqual(_rows(restarted, again), _rows(self.service, first))
+
+    def test_cancel_and_concurrent_dedup(self):
+        gate = threading.Event()
+        original = sweep._evaluate_chunk
+
+        def slow(grid, start, stop):
+            gate.wait(5)
+            return original(grid, start, stop)
+
+        with mock.patch.object(sweep, "_evaluate_chunk", slow):
+            job = self.service.submit(SMALL)
+            self.assertIs(self.service.submit(SMALL), job)
+            job.cancel()
+            gate.set()
+            self.assertTrue(job.wait(10))
+        self.assertEqual(job.state, CANCELLED)
+        self.assertLess(job.completed, SMALL.size)
+        self.assertFalse(job.path.exists())
+        self.assertFalse(job.partial_path.exists())
+        self.assertIsNot(self.service.submit(SMALL), job)
+
+    def test_stream_follows_running_job(self):
+        job = self.service.submit(SweepGrid(rails=(1, 2, 3, 4), pocket=(0, 1)))
+        rows = _rows(self.service, job)
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(len(rows), job.total)
+
+    def test_too_many_points(self):
+        limited = SweepService(self.tmp.name, max_points=10)
+        with self.assertRaises(ValueError):
+            limited.submit(SMALL)
+
+    def test_process_pool_gives_same_rows(self):
+        pooled = SweepService(tempfile.mkdtemp(dir=self.tmp.name), workers=2, chunk_size=10)
+        try:
+            job = pooled.submit(SMALL)
+            self.assertTrue(job.wait(60))
+        finally:
+            pooled.close()
+        serial = self.service.submit(SMALL)
+        serial.wait(10)
+        self.assertEqual(_rows(pooled, job), _rows(self.service, serial))
+
+
+if __name__ == '__main__':
+    unittest.main()